@@ -1,5 +1,5 @@
 #!/usr/bin/env bash
-# CiteTrack 一键运行全部测试（功能 + 压力）
+# CiteTrack 一键运行全部测试（功能 + 压力 + Python 工具）
 # 用法: ./Tests/run_all_tests.sh  或  bash Tests/run_all_tests.sh
 # 可选: CITETRACK_PROJECT_ROOT=/path/to/repo ./Tests/run_all_tests.sh
 
@@ -15,14 +15,14 @@ echo ""
 
 FAILED=0
 
-echo ">>> 1/2 功能与规范测试 (CiteTrackTests)..."
+echo ">>> 1/3 功能与规范测试 (CiteTrackTests)..."
 if swift Tests/CiteTrackTests.swift; then
   echo ""
 else
   FAILED=1
 fi
 
-echo ">>> 2/2 压力测试 (CiteTrackStressTests)..."
+echo ">>> 2/3 压力测试 (CiteTrackStressTests)..."
 export CITETRACK_PROJECT_ROOT="$ROOT"
 if swift Tests/CiteTrackStressTests.swift; then
   echo ""
@@ -30,6 +30,13 @@ else
   FAILED=1
 fi
 
+echo ">>> 3/3 Python 工具测试 (scripts/tests)..."
+if python3 -m pytest -q scripts/tests; then
+  echo ""
+else
+  FAILED=1
+fi
+
 echo "=============================================="
 if [ "$FAILED" -eq 0 ]; then
   echo "  全部测试通过"
@@ -1,123 +1,81 @@
 #!/usr/bin/env python3
 """
 添加新的视图文件到 Xcode 项目中
+
+    python3 iOS/add_new_views.py [--project CiteTrack_iOS.xcodeproj] [--group Views] \\
+        [CiteTrack/Views/X.swift ...]
+
+文件路径相对于组所在的目录（Views 组只有名字，所以相对于 iOS/），
+相对的 --project 路径相对于本脚本所在的目录。
 """
 
+import argparse
+import os
 import sys
-import uuid
 from pathlib import Path
 
-def generate_uuid():
-    """生成一个24位的16进制UUID（用于Xcode项目文件）"""
-    return uuid.uuid4().hex[:24].upper()
-
-def add_files_to_project(project_path: str, files: list):
-    """添加文件到 Xcode 项目"""
-    
-    with open(project_path, 'r') as f:
-        lines = f.readlines()
-    
-    # 为每个文件生成UUID
-    file_info = []
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / 'scripts'))
+
+from citetrack_tools.pbxproj import load  # noqa: E402
+from citetrack_tools.pbxproj.edit import EditSession  # noqa: E402
+from citetrack_tools.pbxproj.sync import resolve_path  # noqa: E402
+
+NEW_FILES = [
+    'CiteTrack/Views/InfoBanner.swift',
+    'CiteTrack/Views/PublicationListView.swift',
+]
+
+
+def add_files_to_project(project_path: str, files: list, group_name: str = 'Views') -> bool:
+    """添加文件到 Xcode 项目（一次解析，批量写回）；文件不存在时拒绝写入"""
+
+    project = load(project_path)
+    group = project.find_group(group_name)
+    target = project.target('CiteTrack')
+    sources = project.build_phase(target, 'PBXSourcesBuildPhase') if target else None
+    if group is None or sources is None:
+        print(f"❌ 找不到 {group_name} 组或主应用的 Sources build phase")
+        return False
+
+    folder = resolve_path(project, group)
+    missing = [path for path in files if not os.path.exists(os.path.join(folder, path))]
+    if missing:
+        for path in missing:
+            print(f"❌ {path} 不存在（相对于 {os.path.relpath(folder)}）")
+        return False
+
+    session = EditSession(project)
+    names = []
     for file_path in files:
         filename = Path(file_path).name
-        file_ref = generate_uuid()
-        build_ref = generate_uuid()
-        file_info.append({
-            'name': filename,
-            'path': file_path,
-            'file_ref': file_ref,
-            'build_ref': build_ref
-        })
-    
-    # 1. 添加 PBXBuildFile 条目
-    pbx_build_file_index = None
-    for i, line in enumerate(lines):
-        if '/* Begin PBXBuildFile section */' in line:
-            pbx_build_file_index = i + 1
-            break
-    
-    if pbx_build_file_index:
-        for info in file_info:
-            build_entry = f"\t\t{info['build_ref']} /* {info['name']} in Sources */ = {{isa = PBXBuildFile; fileRef = {info['file_ref']} /* {info['name']} */; }};\n"
-            lines.insert(pbx_build_file_index, build_entry)
-            pbx_build_file_index += 1
-    
-    # 2. 添加 PBXFileReference 条目
-    pbx_file_ref_index = None
-    for i, line in enumerate(lines):
-        if '/* Begin PBXFileReference section */' in line:
-            pbx_file_ref_index = i + 1
-            break
-    
-    if pbx_file_ref_index:
-        for info in file_info:
-            file_entry = f"\t\t{info['file_ref']} /* {info['name']} */ = {{isa = PBXFileReference; includeInIndex = 1; lastKnownFileType = sourcecode.swift; path = {info['name']}; sourceTree = \"<group>\"; }};\n"
-            lines.insert(pbx_file_ref_index, file_entry)
-            pbx_file_ref_index += 1
-    
-    # 3. 添加到 Views 组（查找 Views 文件夹组）
-    views_group_index = None
-    for i, line in enumerate(lines):
-        if 'name = Views;' in line or '/* Views */ = {' in line:
-            # 找到 Views 组，向后查找 children 数组
-            for j in range(i, min(i + 20, len(lines))):
-                if 'children = (' in lines[j]:
-                    views_group_index = j + 1
-                    break
-            break
-    
-    if views_group_index:
-        for info in file_info:
-            child_entry = f"\t\t\t\t{info['file_ref']} /* {info['name']} */,\n"
-            lines.insert(views_group_index, child_entry)
-            views_group_index += 1
-    
-    # 4. 添加到编译源文件（PBXSourcesBuildPhase）
-    sources_build_phase_index = None
-    main_target_found = False
-    
-    for i, line in enumerate(lines):
-        if '/* Begin PBXSourcesBuildPhase section */' in line:
-            # 查找主目标的 Sources Build Phase
-            for j in range(i, min(i + 100, len(lines))):
-                if 'files = (' in lines[j]:
-                    # 确保这是主target，不是widget
-                    context = ''.join(lines[max(0, j-10):j])
-                    if 'Widget' not in context:
-                        sources_build_phase_index = j + 1
-                        main_target_found = True
-                        break
-            if main_target_found:
-                break
-    
-    if sources_build_phase_index:
-        for info in file_info:
-            source_entry = f"\t\t\t\t{info['build_ref']} /* {info['name']} in Sources */,\n"
-            lines.insert(sources_build_phase_index, source_entry)
-            sources_build_phase_index += 1
-    
-    # 写回文件
-    with open(project_path, 'w') as f:
-        f.writelines(lines)
-    
+        session.add_file(file_path, group, sources, name=filename)
+        names.append(filename)
+    if not session.save():
+        print("✅ 项目已包含这些文件，未写入")
+        return True
+
     print(f"✅ Successfully added {len(files)} files to project")
-    for info in file_info:
-        print(f"   - {info['name']}")
+    for name in names:
+        print(f"   - {name}")
+    return True
+
 
 def main():
-    project_path = '/Users/tao.shen/google_scholar_plugin/iOS/CiteTrack_iOS.xcodeproj/project.pbxproj'
-    
-    new_files = [
-        'InfoBanner.swift',
-        'PublicationListView.swift',
-        'PublicationStatisticsView.swift'
-    ]
-    
+    parser = argparse.ArgumentParser(description='添加新的视图文件到 Xcode 项目中')
+    parser.add_argument('--project', default='CiteTrack_iOS.xcodeproj',
+                        help='.xcodeproj or project.pbxproj, relative to this script (default: %(default)s)')
+    parser.add_argument('--group', default='Views', help='group to add the files to (default: %(default)s)')
+    parser.add_argument('files', nargs='*', default=NEW_FILES,
+                        help="paths relative to the group's folder (default: the new views)")
+    args = parser.parse_args()
+
     print("Adding new view files to Xcode project...")
-    add_files_to_project(project_path, new_files)
+    if not add_files_to_project(str(HERE / args.project), args.files, args.group):
+        return 1
     print("Done!")
+    return 0
 
-if __name__ == '__main__':
-    main()
 
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,43 +1,42 @@
 #!/usr/bin/env python3
-import re
 import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from citetrack_tools.pbxproj import load
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.settings import PROJECT, SettingRule, rewrite_build_settings
+
+# Debug 和 Release 都生成 dSYM（项目级设置），CiteTrack 的 Release 不剥离符号。
+# 另一层级只有被设成错误值时才改回来。
+DSYM_RULES = [
+    SettingRule('DEBUG_INFORMATION_FORMAT', 'dwarf-with-dsym',
+                targets=[PROJECT], configurations=['Debug', 'Release']),
+    SettingRule('DEBUG_INFORMATION_FORMAT', 'dwarf-with-dsym',
+                targets=['CiteTrack'], match='dwarf'),
+    SettingRule('STRIP_INSTALLED_PRODUCT', 'NO',
+                targets=['CiteTrack'], configurations=['Release']),
+    SettingRule('STRIP_INSTALLED_PRODUCT', 'NO',
+                targets=[PROJECT], configurations=['Release'], match='YES'),
+]
 
 def fix_dsym_settings(project_file):
-    """修复项目文件中的dSYM设置"""
-    
-    with open(project_file, 'r') as f:
-        content = f.read()
-    
-    # 备份原文件
-    with open(project_file + '.backup', 'w') as f:
-        f.write(content)
-    
-    # 查找并修改Debug Information Format设置
-    # 将DWARF改为DWARF with dSYM File
-    content = re.sub(
-        r'DEBUG_INFORMATION_FORMAT = dwarf;',
-        'DEBUG_INFORMATION_FORMAT = dwarf-with-dsym;',
-        content
-    )
-    
-    # 确保Release配置也使用dSYM
-    content = re.sub(
-        r'DEBUG_INFORMATION_FORMAT = dwarf;',
-        'DEBUG_INFORMATION_FORMAT = dwarf-with-dsym;',
-        content
-    )
-    
-    # 禁用Release时的符号剥离
-    content = re.sub(
-        r'STRIP_INSTALLED_PRODUCT = YES;',
-        'STRIP_INSTALLED_PRODUCT = NO;',
-        content
-    )
-    
-    with open(project_file, 'w') as f:
-        f.write(content)
-    
+    """修复项目文件中的dSYM设置（一次遍历，只有实际改动时才原子写回）"""
+
+    project = load(project_file)
+    session = EditSession(project)
+    changes = rewrite_build_settings(session, DSYM_RULES)
+
+    if not changes:
+        print("✅ dSYM设置已正确，无需修改")
+        return
+
+    for target, configuration, key, old, new in changes:
+        print(f"   {target} [{configuration}] {key}: {old or '(未设置)'} -> {new}")
+    session.save()
+
     print("✅ 已修复dSYM设置")
 
 if __name__ == "__main__":
-    fix_dsym_settings("CiteTrack_macOS.xcodeproj/project.pbxproj")
+    fix_dsym_settings(sys.argv[1] if len(sys.argv) > 1 else "CiteTrack_macOS.xcodeproj/project.pbxproj")
@@ -4,91 +4,52 @@ Add a build phase script to sign Sparkle framework components with entitlements.
 This script modifies the Xcode project.pbxproj file to add a Run Script phase.
 """
 
-import re
 import sys
-import uuid
+from pathlib import Path
 
-PROJECT_FILE = "CiteTrack_macOS.xcodeproj/project.pbxproj"
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+
+from citetrack_tools.pbxproj import load
+from citetrack_tools.pbxproj.edit import EditSession
 
-def generate_uuid():
-    """Generate a 24-character hex UUID for Xcode project format."""
-    return ''.join([format(ord(c), 'x') for c in uuid.uuid4().hex[:12]])
+PROJECT_FILE = "CiteTrack_macOS.xcodeproj/project.pbxproj"
+TARGET_ID = "1290956C0876418485365FB9"
+EMBED_FRAMEWORKS_ID = "62DE196BA960438E9052558D"
+SIGN_SCRIPT = '"${SRCROOT}/scripts/sign_sparkle_components.sh"\n'
 
 def add_build_phase_script(project_path):
-    """Add a Run Script phase to sign Sparkle components."""
-    
-    with open(project_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
+    """Add a Run Script phase to sign Sparkle components.
+
+    Only the new phase object and one line of the target's buildPhases list
+    are written; the rest of the file is copied byte for byte.
+    """
+    project = load(project_path)
+
     # Check if script phase already exists
-    if 'sign_sparkle_components.sh' in content:
-        print("✅ Build script phase already exists")
-        return
-    
-    # Generate UUIDs for the new objects
-    script_phase_uuid = generate_uuid()
-    script_uuid_ref = generate_uuid()
-    
-    # Find the target's buildPhases section
-    target_pattern = r'(1290956C0876418485365FB9 /\* CiteTrack \*/ = \{[^}]+buildPhases = \(([^)]+)\);)'
-    match = re.search(target_pattern, content, re.DOTALL)
-    
-    if not match:
+    for phase in project.objects_of('PBXShellScriptBuildPhase'):
+        if 'sign_sparkle_components.sh' in phase.get('shellScript', ''):
+            print("✅ Build script phase already exists")
+            return
+
+    target = project.get(TARGET_ID)
+    if target is None:
         print("❌ Could not find target buildPhases section")
         return
-    
-    # Get existing build phases
-    existing_phases = match.group(2).strip()
-    
-    # Add the new script phase UUID to the buildPhases list (after Embed Frameworks)
-    embed_frameworks_uuid = "62DE196BA960438E9052558D"
-    if embed_frameworks_uuid in existing_phases:
-        # Insert after Embed Frameworks
-        new_phases = existing_phases.replace(
-            f"{embed_frameworks_uuid} /* Embed Frameworks */,",
-            f"{embed_frameworks_uuid} /* Embed Frameworks */,\n\t\t\t\t{script_phase_uuid} /* Sign Sparkle Components */,"
-        )
-    else:
-        # Append at the end
-        new_phases = existing_phases + f",\n\t\t\t\t{script_phase_uuid} /* Sign Sparkle Components */"
-    
-    # Replace the buildPhases section
-    new_target_section = match.group(0).replace(match.group(2), new_phases)
-    content = content.replace(match.group(0), new_target_section)
-    
-    # Add the PBXShellScriptBuildPhase object before the PBXProject section
-    script_phase = f"""
-\t\t{script_phase_uuid} /* Sign Sparkle Components */ = {{
-\t\t\tisa = PBXShellScriptBuildPhase;
-\t\t\tbuildActionMask = 2147483647;
-\t\t\tfiles = (
-\t\t\t);
-\t\t\tinputFileListPaths = (
-\t\t\t);
-\t\t\tinputPaths = (
-\t\t\t);
-\t\t\tname = "Sign Sparkle Components";
-\t\t\toutputFileListPaths = (
-\t\t\t);
-\t\t\toutputPaths = (
-\t\t\t);
-\t\t\trunOnlyForDeploymentPostprocessing = 0;
-\t\t\tshellPath = /bin/sh;
-\t\t\tshellScript = \"\\\"${{SRCROOT}}/scripts/sign_sparkle_components.sh\\\"\\n\";
-\t\t}};
-"""
-    
-    # Insert before PBXProject section
-    project_pattern = r'(/\* Begin PBXProject section \*/)'
-    content = re.sub(project_pattern, script_phase + r'\1', content)
-    
-    # Write back
-    with open(project_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
+
+    # Insert after Embed Frameworks, or append at the end; the phase ID is
+    # derived from the target and name, so every checkout gets the same one
+    phases = target.get('buildPhases', [])
+    index = phases.index(EMBED_FRAMEWORKS_ID) + 1 if EMBED_FRAMEWORKS_ID in phases else None
+    session = EditSession(project)
+    phase = session.add_build_phase(
+        target, 'PBXShellScriptBuildPhase', name='Sign Sparkle Components', index=index,
+        inputFileListPaths=[], inputPaths=[], outputFileListPaths=[], outputPaths=[],
+        shellPath='/bin/sh', shellScript=SIGN_SCRIPT)
+    session.save()
+
     print("✅ Added Sign Sparkle Components build phase")
     print(f"   Script: scripts/sign_sparkle_components.sh")
-    print(f"   UUID: {script_phase_uuid}")
+    print(f"   UUID: {phase.id}")
 
 if __name__ == "__main__":
     import os
@@ -11,11 +11,6 @@ if [ ! -f "CiteTrack_macOS.xcodeproj/project.pbxproj" ]; then
     exit 1
 fi
 
-# 备份原始项目文件
-cp CiteTrack_macOS.xcodeproj/project.pbxproj CiteTrack_macOS.xcodeproj/project.pbxproj.backup
-
-echo "✅ 已备份项目文件"
-
 # 使用sed命令修改项目设置以启用dSYM生成
 # 这需要手动在Xcode中设置，但我们可以提供指导
 
@@ -32,57 +27,8 @@ echo "8. 将 Release 设置为 'NO'"
 echo ""
 echo "或者运行以下命令来自动设置："
 
-# 创建自动修复脚本
-cat > fix_dsym_settings.py << 'EOF'
-#!/usr/bin/env python3
-import re
-import sys
-
-def fix_dsym_settings(project_file):
-    """修复项目文件中的dSYM设置"""
-    
-    with open(project_file, 'r') as f:
-        content = f.read()
-    
-    # 备份原文件
-    with open(project_file + '.backup', 'w') as f:
-        f.write(content)
-    
-    # 查找并修改Debug Information Format设置
-    # 将DWARF改为DWARF with dSYM File
-    content = re.sub(
-        r'DEBUG_INFORMATION_FORMAT = dwarf;',
-        'DEBUG_INFORMATION_FORMAT = dwarf-with-dsym;',
-        content
-    )
-    
-    # 确保Release配置也使用dSYM
-    content = re.sub(
-        r'DEBUG_INFORMATION_FORMAT = dwarf;',
-        'DEBUG_INFORMATION_FORMAT = dwarf-with-dsym;',
-        content
-    )
-    
-    # 禁用Release时的符号剥离
-    content = re.sub(
-        r'STRIP_INSTALLED_PRODUCT = YES;',
-        'STRIP_INSTALLED_PRODUCT = NO;',
-        content
-    )
-    
-    with open(project_file, 'w') as f:
-        f.write(content)
-    
-    print("✅ 已修复dSYM设置")
-
-if __name__ == "__main__":
-    fix_dsym_settings("CiteTrack_macOS.xcodeproj/project.pbxproj")
-EOF
-
-chmod +x fix_dsym_settings.py
-
 echo "🐍 运行Python脚本修复dSYM设置..."
-python3 fix_dsym_settings.py
+python3 "$(dirname "$0")/../fix_dsym_settings.py" CiteTrack_macOS.xcodeproj/project.pbxproj
 
 echo ""
 echo "✅ dSYM设置修复完成！"
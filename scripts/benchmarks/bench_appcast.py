@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark DMG hashing and incremental appcast updates.
+
+Writes ``--dmgs`` synthetic DMGs of ``--mb`` MB and hashes them with
+``citetrack_tools.appcast.digest`` (memory-mapped chunks, a thread pool),
+next to reading each file whole and hashing it, and checks the digests
+agree. A second pass with the digest cache must read nothing, and one after
+touching a DMG only that DMG. Then a feed of ``--items`` releases (the items
+of ``macOS/appcast.xml`` repeated under new versions) is updated with one
+rebuilt and one new release by splicing, next to an ElementTree
+parse-and-rewrite; the spliced feed must differ from the original in
+exactly the edited lines and parse to the new values. Exits non-zero on any
+mismatch.
+
+    python3 benchmarks/bench_appcast.py [--dmgs 6] [--mb 64] [--items 500]
+"""
+
+import argparse
+import difflib
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.appcast.digest import Artifact, DigestCache, hash_files  # noqa: E402
+from citetrack_tools.appcast.feed import Release, plan, read_feed, render  # noqa: E402
+
+FEED = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                    'macOS', 'appcast.xml')
+SPARKLE = '{http://www.andymatuschak.org/xml-namespaces/sparkle}'
+
+
+def timed(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def write_dmgs(directory, count, size):
+    block = os.urandom(1 << 20)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f'CiteTrack-v3.{i}.0.dmg')
+        with open(path, 'wb') as f:
+            for mb in range(size):
+                f.write(mb.to_bytes(8, 'little') + i.to_bytes(8, 'little') + block[16:])
+        paths.append(path)
+    return paths
+
+
+def read_whole(paths):
+    digests = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            digests.append(hashlib.sha256(f.read()).hexdigest())
+    return digests
+
+
+def big_feed(path, items):
+    """The repo's feed with its items repeated under versions 1.0.0 upwards, newest first."""
+    with open(FEED, encoding='utf-8') as f:
+        text = f.read()
+    blocks = re.findall(r'        <item>.*?</item>\n', text, re.S)
+    head, tail = text[:text.index('        <item>')], text[text.rindex('</item>\n') + 8:]
+    body = []
+    for i in reversed(range(items)):
+        version = f'1.{i // 100}.{i % 100}'
+        block = re.sub(r'\d+\.\d+\.\d+', version, blocks[i % len(blocks)])
+        body.append(block + '        \n')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(head + ''.join(body) + tail)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--dmgs', type=int, default=6)
+    parser.add_argument('--mb', type=int, default=64)
+    parser.add_argument('--items', type=int, default=500)
+    args = parser.parse_args()
+    failures = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_dmgs(directory, args.dmgs, args.mb)
+        total = args.dmgs * args.mb
+        expected, seconds, peak = timed(lambda: read_whole(paths))
+        print(f'{"read whole, hash":<30} {total / seconds:>8,.0f} MB/s, peak {peak / 1e6:>7,.1f} MB')
+        for jobs in (1, None):
+            (artifacts, _), seconds, peak = timed(lambda: hash_files(paths, jobs))
+            label = f'mmap chunks, {jobs or "default"} thread{"s" if jobs != 1 else ""}'
+            print(f'{label:<30} {total / seconds:>8,.0f} MB/s, peak {peak / 1e6:>7,.1f} MB')
+            if [artifact.sha256 for artifact in artifacts] != expected:
+                failures.append(f'{label}: digests differ from hashlib over the whole file')
+
+        cache = DigestCache(os.path.join(directory, 'digests.marshal'))
+        hash_files(paths, cache=cache)
+        cache.save()
+        cache = DigestCache(cache.path)
+        (_, hashed), seconds, _ = timed(lambda: hash_files(paths, cache=cache))
+        print(f'cached re-run: {hashed} of {len(paths)} hashed in {seconds * 1000:.2f} ms')
+        if hashed:
+            failures.append('the cached re-run read DMGs')
+        os.utime(paths[0], ns=(time.time_ns(), time.time_ns() + 10**9))
+        (artifacts, hashed), _, _ = timed(lambda: hash_files(paths, cache=cache))
+        if hashed != 1 or artifacts[0].sha256 != expected[0]:
+            failures.append(f'after touching one DMG, {hashed} were hashed')
+
+        feed_path = os.path.join(directory, 'appcast.xml')
+        big_feed(feed_path, args.items)
+        original = read_feed(feed_path)
+        target = original.items[len(original.items) // 2]
+        name = target.url.rsplit('/', 1)[-1]
+        rebuilt = Release(target.version, Artifact(name, 123_456, 0, ''), 'NEWSIG==')
+        new = Release('9.0.0', Artifact(paths[1], os.path.getsize(paths[1]), time.time_ns(), ''), 'SIG9==')
+
+        def splice():
+            feed = read_feed(feed_path)
+            edits, _ = plan(feed, [rebuilt, new])
+            return render(feed, edits)
+
+        def rewrite():
+            ET.register_namespace('sparkle', SPARKLE[1:-1])
+            tree = ET.parse(feed_path)
+            for enclosure in tree.iter('enclosure'):
+                if enclosure.get(f'{SPARKLE}version') == target.version:
+                    enclosure.set('length', '123456')
+                    enclosure.set(f'{SPARKLE}edSignature', 'NEWSIG==')
+            return ET.tostring(tree.getroot(), encoding='utf-8')
+
+        print(f'\nfeed of {len(original.items):,} items, {len(original.data) / 1e6:.1f} MB')
+        spliced, seconds, _ = timed(splice)
+        print(f'{"scan, plan, splice":<30} {seconds * 1000:>8.1f} ms')
+        _, seconds, _ = timed(rewrite)
+        print(f'{"ElementTree parse, rewrite":<30} {seconds * 1000:>8.1f} ms (loses CDATA and layout)')
+
+        changed = [line for line in difflib.unified_diff(original.data.decode().splitlines(),
+                                                         spliced.decode().splitlines(), n=0)
+                   if line[:1] in '+-' and line[:3] not in ('+++', '---')]
+        removed = [line for line in changed if line.startswith('-')]
+        if not removed or any('length=' not in line and 'edSignature=' not in line for line in removed):
+            failures.append(f'the splice changed {len(removed)} existing lines: {removed[:3]}')
+        root = ET.fromstring(spliced)
+        enclosures = {e.get(f'{SPARKLE}version'): e for e in root.iter('enclosure')}
+        if (enclosures[target.version].get('length') != '123456'
+                or enclosures[target.version].get(f'{SPARKLE}edSignature') != 'NEWSIG=='
+                or enclosures.get('9.0.0') is None or len(enclosures) != len(original.items) + 1):
+            failures.append('the spliced feed does not parse to the new values')
+        if root.find('channel/item/enclosure').get(f'{SPARKLE}version') != '9.0.0':
+            failures.append('the new release is not the first item')
+
+    for failure in failures:
+        print(f'❌ {failure}')
+    if not failures:
+        print('✅ digests, cache and feed edits check out')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
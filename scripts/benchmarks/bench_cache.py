@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark the two-tier Scholar page cache.
+
+Fills ``citetrack_tools.scholar.cache.TwoTierCache`` with the parsed rows of
+``--entries`` profile pages (keys from ``scholarPublicationsCacheKey``),
+with a memory tier that holds about a quarter of them, and times puts,
+memory hits, disk hits and misses. It checks that both tiers' byte counts
+equal the marshalled sizes and the files on disk, and that entries expire
+after their TTL. Then it runs a refresh cycle against the local Scholar
+stand-in twice with the cache: the second cycle sends no requests and parses
+no pages. Exits non-zero if a check fails.
+
+    python3 benchmarks/bench_cache.py [--entries 20000] [--scholars 300]
+"""
+
+import argparse
+import asyncio
+import marshal
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.scholar.cache import TwoTierCache, scholar_publications_key  # noqa: E402
+from citetrack_tools.scholar.fetch import refresh  # noqa: E402
+from citetrack_tools.scholar.profile import parse_file  # noqa: E402
+from citetrack_tools.scholar.standin import StandIn  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                       'iOS', 'scholar_kukA0LcAAAAJ.html')
+
+
+def rate(label, count, func):
+    started = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - started
+    print(f'{label:<28} {count / seconds:>12,.0f} /s')
+
+
+def check(cache, failures):
+    stats = cache.stats
+    memory = sum(len(marshal.dumps((key, value))) for (_, key), (value, _, _) in cache.memory.items())
+    disk = sum(os.path.getsize(path) for path in cache.disk)
+    if stats.memory_bytes != memory or stats.memory_bytes > cache.memory_limit:
+        failures.append(f'memory tier counts {stats.memory_bytes:,} bytes, holds {memory:,}')
+    if stats.disk_bytes != disk or stats.disk_bytes > cache.disk_limit:
+        failures.append(f'disk tier counts {stats.disk_bytes:,} bytes, holds {disk:,}')
+
+
+async def cycles(directory, scholars, page):
+    server = StandIn(page)
+    base = await server.start()
+    cache = TwoTierCache(directory)
+    ids = [f'S{i:07d}AAAAJ' for i in range(scholars)]
+    try:
+        reports = [await refresh(ids, base, 16, delay=0, jitter=0, cited_by=1, cache=cache) for _ in range(2)]
+    finally:
+        await server.close()
+    return reports, cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--entries', type=int, default=20_000)
+    parser.add_argument('--scholars', type=int, default=300)
+    args = parser.parse_args()
+    failures = []
+    rows = [tuple(p) for p in parse_file(FIXTURE).publications]
+    keys = [scholar_publications_key(f'S{i:07d}AAAAJ', None, 0) for i in range(args.entries)]
+    entry = len(marshal.dumps((keys[0], rows)))
+    clock = [time.time()]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TwoTierCache(directory, memory_bytes=entry * args.entries // 4, ttl=3600,
+                             clock=lambda: clock[0])
+        print(f'{args.entries:,} entries of {entry:,} bytes; memory tier {cache.memory_limit / 1e6:.1f} MB')
+        rate('put', len(keys), lambda: [cache.put('publications', key, rows) for key in keys])
+        recent = keys[-args.entries // 8:]
+        rate('get, memory hit', len(recent), lambda: [cache.get('publications', key) for key in recent])
+        early = random.Random(0).sample(keys[:args.entries // 2], args.entries // 8)
+        rate('get, disk hit', len(early), lambda: [cache.get('publications', key) for key in early])
+        rate('get, miss', len(keys), lambda: [cache.get('publications', key + 'x') for key in keys])
+        print(cache.stats.summary())
+        check(cache, failures)
+        if cache.stats.disk_hits != len(early) or cache.stats.memory_hits != len(recent):
+            failures.append('hits came from the wrong tier')
+
+        clock[0] += 3601
+        if cache.get('publications', keys[-1]) is not None or cache.get('publications', keys[0]) is not None:
+            failures.append('an expired entry was returned')
+        purged = cache.purge_expired()
+        print(f'{purged:,} expired entries purged')
+        check(cache, failures)
+        if cache.stats.disk_entries or cache.stats.memory_entries:
+            failures.append('expired entries remain after purging')
+
+    with open(FIXTURE, 'rb') as f:
+        page = f.read()
+    with tempfile.TemporaryDirectory() as directory:
+        (cold, warm), cache = asyncio.run(cycles(directory, args.scholars, page))
+        for label, report in (('cold cache', cold), ('warm cache', warm)):
+            print(f'\n{label}')
+            print(report.summary())
+        print(f'\ncache: {cache.stats.summary()}')
+        check(cache, failures)
+        if warm.requests or warm.cached != cold.pages or warm.publications != cold.publications:
+            failures.append('the warm cycle did not come from the cache')
+
+    for failure in failures:
+        print(f'❌ {failure}')
+    if not failures:
+        print('✅ sizes, tiers and expiry check out')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark citing-author aggregation and publication diffs.
+
+Writes a synthetic citing-paper dump (``--papers`` papers, a few authors
+each drawn from a skewed pool, names spelled several ways, ``--duplicates``
+of the papers listed twice) and aggregates it with
+``citetrack_tools.scholar.citing`` in one streaming pass, next to the app's
+approach (load everything, then append every paper to its author's list).
+The counts are checked against a plain ``Counter`` over the distinct papers.
+Then two snapshots of ``--publications`` publications are compared with the
+sorted-key merge and with a dictionary of keys, as ``comparePublications``
+does, and the results checked against each other. Exits non-zero on any
+mismatch.
+
+    python3 benchmarks/bench_citing.py [--papers 200000] [--publications 100000]
+"""
+
+import argparse
+import itertools
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.scholar.citing import aggregate, compare_publications, normalize_name  # noqa: E402
+from citetrack_tools.scholar.profile import Publication  # noqa: E402
+
+GIVEN = ['Yoshua', 'Ian', 'Aaron', 'Geoffrey', 'Yann', 'Li', 'Wei', 'María', 'José', 'Søren', 'Zoë',
+         'Kai']
+SURNAMES = ['Bengio', 'Goodfellow', 'Courville', 'Hinton', 'LeCun', 'Chen', 'Wang', 'García', 'Müller',
+            'Nguyen', 'Kim', 'Smith', 'Ødegaard', 'Zhang', 'Liu', 'Rossi']
+
+
+def spellings(rng, given, surname):
+    """Ways Scholar and users write one name."""
+    return [f'{given} {surname}', f'{given[0]} {surname}', f'{given[0]}. {surname}',
+            f' {given}  {surname} ', f'{given.upper()} {surname.upper()}']
+
+
+def synthetic_papers(n, authors, duplicates, seed=0):
+    rng = random.Random(seed)
+    people = [(rng.choice(GIVEN) + (str(i) if i >= len(GIVEN) else ''), rng.choice(SURNAMES) + str(i // 50))
+              for i in range(authors)]
+    variants = [spellings(rng, *person) for person in people]
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(authors)))
+    papers = []
+    for i in range(n):
+        chosen = rng.choices(range(authors), cum_weights=cumulative, k=rng.randint(1, 6))
+        names = [rng.choice(variants[a][:4]) for a in chosen] + (['Unknown Author'] if i % 97 == 0 else [])
+        papers.append({'id': f'paper{i:08d}', 'title': f'Paper {i}', 'authors': names, 'year': 1990 + i % 35,
+                       'venue': 'Journal', 'citationCount': i % 500, 'citedScholarId': 'kukA0LcAAAAJ',
+                       'fetchedAt': 781000000.0 + i})
+    papers += rng.sample(papers, int(n * duplicates))
+    rng.shuffle(papers)
+    return papers
+
+
+def app_aggregate(papers):
+    """``aggregateAuthorsFromPapers`` with ``generateAuthorId``'s keys."""
+    author_map = {}
+    for paper in papers:
+        for author in paper['authors']:
+            name = author.strip()
+            if not name or name == 'Unknown Author':
+                continue
+            key = 'author_' + name.lower().replace(' ', '_')
+            if key in author_map:
+                author_map[key][1].append(paper)
+            else:
+                author_map[key] = (name, [paper])
+    return sorted(author_map.items(), key=lambda item: -len(item[1][1]))
+
+
+def app_compare(old, new):
+    """``comparePublications``: a dictionary of old publications by key."""
+    def key(p):
+        return p.cluster_id or f'{p.title}_{p.year if p.year is not None else "unknown"}'
+    old_by_key = {}
+    for p in old:
+        old_by_key.setdefault(key(p), p)
+    increased, decreased, added = [], [], []
+    for p in new:
+        before = old_by_key.get(key(p))
+        if before is None:
+            added.append(p)
+        elif (p.citations or 0) != (before.citations or 0):
+            delta = (p.citations or 0) - (before.citations or 0)
+            (increased if delta > 0 else decreased).append((p, delta))
+    increased.sort(key=lambda c: -c[1])
+    return increased, decreased, added
+
+
+def snapshots(n, seed=1):
+    rng = random.Random(seed)
+    old = [Publication(f'Publication {i}', str(10**15 + i) if i % 10 else None, (), rng.randint(0, 5000),
+                       1990 + i % 35) for i in range(n)]
+    new = [p._replace(citations=p.citations + rng.choice((0, 0, 0, 1, 5, -1)))
+           for p in old if rng.random() > 0.01]
+    new += [Publication(f'New publication {i}', str(2 * 10**15 + i), (), 0, 2026) for i in range(n // 50)]
+    rng.shuffle(new)
+    return old, new
+
+
+def peak(func, *args):
+    """Peak bytes allocated while running ``func``."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def timed(label, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    print(f'{label:<36} {time.perf_counter() - started:>8.2f} s')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--papers', type=int, default=200_000)
+    parser.add_argument('--authors', type=int, default=50_000, help='distinct people in the pool')
+    parser.add_argument('--duplicates', type=float, default=0.1, help='fraction of papers listed twice')
+    parser.add_argument('--publications', type=int, default=100_000)
+    args = parser.parse_args()
+    failed = False
+
+    papers = synthetic_papers(args.papers, args.authors, args.duplicates)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'citing_papers.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(papers, f, ensure_ascii=False)
+        size = os.path.getsize(path)
+        print(f'Synthetic dump: {len(papers):,} papers, {size / 1e6:.0f} MB')
+        del papers
+        aggregator = timed('streaming aggregate', aggregate, [path])
+        timed('streaming aggregate, initials', aggregate, [path], True)
+
+        def app(path):
+            with open(path, encoding='utf-8') as f:
+                return app_aggregate(json.load(f))
+        reference = timed('load + per-paper lists (app)', app, path)
+        streaming, loading = peak(aggregate, [path]), peak(app, path)
+        with open(path, encoding='utf-8') as f:
+            papers = {paper['id']: paper for paper in json.load(f)}
+    print(f'{aggregator.papers:,} papers ({aggregator.duplicates:,} duplicates), {len(aggregator):,} authors '
+          f'from {len(aggregator.spellings):,} spellings (the app keys {len(reference):,})')
+    print(f'peak memory {streaming / 1e6:.0f} MB streaming, {loading / 1e6:.0f} MB loading it all')
+    expected = Counter(key for paper in papers.values()
+                       for key in {normalize_name(name) for name in paper['authors']} if key)
+    counts = {author.key: author.citing_paper_count for author in aggregator.authors()}
+    if counts != expected or aggregator.papers != len(papers):
+        print('❌ author counts differ from the reference')
+        failed = True
+
+    old, new = snapshots(args.publications)
+    # keep the collector from rescanning the test data on every timed allocation
+    gc.collect()
+    gc.freeze()
+    changes = timed('sorted-key merge diff', compare_publications, old, new)
+    increased, decreased, added = timed('dictionary diff (app)', app_compare, old, new)
+    mine = ([(c.publication, c.delta) for c in changes.increased],
+            [(c.publication, c.delta) for c in changes.decreased], changes.new_publications)
+    app = (increased, decreased, added)
+    print(f'{len(changes.increased):,} increased, {len(changes.decreased):,} decreased, '
+          f'{len(changes.new_publications):,} new, {len(changes.removed):,} removed')
+    # ties in delta may come in any order from the app's sort
+    deltas = [d for _, d in mine[0]] == [d for _, d in app[0]]
+    if sorted(mine[0]) != sorted(app[0]) or not deltas or mine[1:] != app[1:]:
+        print('❌ publication changes differ from the reference')
+        failed = True
+    if not failed:
+        print('✅ results match the references')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark EditSession on a synthetic ~200k-line project.pbxproj.
+
+Adds k files (file reference + group child + build file + Sources member)
+for increasing k and fits total time to ``fixed + k * marginal``. The fixed
+part is the single pass over the file; a constant marginal cost per file
+means the edit scales linearly in k.
+
+    python3 benchmarks/bench_edit_session.py [--base-files 50000] [--sizes 1000,2000,4000,8000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.pbxproj import parse  # noqa: E402
+from citetrack_tools.pbxproj.edit import EditSession  # noqa: E402
+from citetrack_tools.pbxproj.synthetic import generate  # noqa: E402
+
+
+def run(base_files, sizes, repeat):
+    text = generate(files=base_files)
+    print(f'Synthetic project: {text.count(chr(10)):,} lines, {len(text) / 1e6:.1f} MB')
+    start = time.perf_counter()
+    parse(text)
+    print(f'Parse: {(time.perf_counter() - start) * 1000:.0f} ms\n')
+    print(f'{"files":>8} {"queue ms":>10} {"apply ms":>10} {"total ms":>10}')
+    totals = []
+    for k in sizes:
+        best_queue = best_apply = float('inf')
+        for _ in range(repeat):
+            project = parse(text)
+            group = project.find_group('Group0')
+            phase = project.build_phase(project.target('CiteTrack'), 'PBXSourcesBuildPhase')
+            start = time.perf_counter()
+            session = EditSession(project)
+            for i in range(k):
+                session.add_file(f'New{i}.swift', group, phase)
+            queued = time.perf_counter()
+            session.apply()
+            done = time.perf_counter()
+            best_queue = min(best_queue, queued - start)
+            best_apply = min(best_apply, done - queued)
+        total = best_queue + best_apply
+        totals.append(total)
+        print(f'{k:>8} {best_queue * 1000:>10.1f} {best_apply * 1000:>10.1f} {total * 1000:>10.1f}')
+
+    if len(sizes) > 1:
+        mean_k, mean_t = sum(sizes) / len(sizes), sum(totals) / len(totals)
+        slope = (sum((k - mean_k) * (t - mean_t) for k, t in zip(sizes, totals))
+                 / sum((k - mean_k) ** 2 for k in sizes))
+        print(f'\nFixed cost (one pass): {(mean_t - slope * mean_k) * 1000:.0f} ms, '
+              f'marginal cost: {slope * 1e6:.1f} µs/file')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--base-files', type=int, default=50_000)
+    parser.add_argument('--sizes', default='1000,2000,4000,8000')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.base_files, [int(s) for s in args.sizes.split(',')], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark a full Scholar refresh cycle against the local stand-in server.
+
+Starts ``citetrack_tools.scholar.standin`` in-process on a free port, serving
+the saved profile page with ``--latency`` seconds per response, and refreshes
+``--scholars`` made-up scholars with ``citetrack_tools.scholar.fetch``: all
+profile pages of each, plus the first "Cited by" page of their ``--cited-by``
+most-cited publications. It runs the cycle at several concurrency levels
+with the rate limit off, then against a throttling server (``--rate``
+requests per second) with and without retries, and prints throughput and
+latency percentiles for each, along with how long the same requests would
+take at the app's pacing (2.0 s plus up to 0.5 s between requests).
+
+    python3 benchmarks/bench_fetch.py [--scholars 1000] [--latency 0.05] [--rate 200]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.scholar.fetch import refresh  # noqa: E402
+from citetrack_tools.scholar.standin import StandIn  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                       'iOS', 'scholar_kukA0LcAAAAJ.html')
+
+
+async def cycle(label, page, ids, args, concurrency, rate=None, retries=0):
+    server = StandIn(page, args.latency, args.latency / 2, rate, rate and rate // 4)
+    base = await server.start()
+    try:
+        report = await refresh(ids, base, concurrency, delay=0, jitter=0, retries=retries,
+                               cited_by=args.cited_by)
+    finally:
+        await server.close()
+    print(f'\n{label}')
+    print(report.summary())
+    return report
+
+
+async def run(args):
+    with open(FIXTURE, 'rb') as f:
+        page = f.read()
+    ids = [f'S{i:07d}AAAAJ' for i in range(args.scholars)]
+    report = None
+    for concurrency in args.concurrency:
+        report = await cycle(f'concurrency {concurrency}, no rate limit', page, ids, args, concurrency)
+    top = max(args.concurrency)
+    await cycle(f'concurrency {top}, server throttles at {args.rate:g}/s, no retries (as the app)',
+                page, ids, args, top, args.rate)
+    await cycle(f'concurrency {top}, server throttles at {args.rate:g}/s, 3 retries', page, ids, args, top,
+                args.rate, 3)
+    hours = report.requests * 2.25 / 3600
+    print(f'\nAt the app\'s pacing the same {report.requests:,} requests take about {hours:,.1f} h')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scholars', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.05, help='server seconds per response')
+    parser.add_argument('--rate', type=float, default=200, help='server requests per second when throttling')
+    parser.add_argument('--cited-by', type=int, default=1, help='"Cited by" pages per scholar')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 16, 64])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark streaming CSV/JSON history conversion on a large synthetic file.
+
+Writes a pretty-printed JSON history file like ``iOS/citetrack_init.json``,
+converts it to the app's CSV import format and back with
+``citetrack_tools.history.convert``, and reports throughput (input MB per
+second, both passes included) and tracemalloc peak memory of each direction.
+Peak memory stays flat as ``--records`` grows; it depends on the chunk size
+and the number of scholars only.
+
+    python3 benchmarks/bench_history_convert.py [--records 2000000] [--scholars 5000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.history.convert import convert  # noqa: E402
+from citetrack_tools.history.records import format_timestamp  # noqa: E402
+
+
+def write_history(path, records, scholars):
+    start = 1_700_000_000
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for i in range(records):
+            s = i % scholars
+            body = (f'    "scholarName" : {json.dumps(f"Scholar {s}")},\n'
+                    f'    "timestamp" : "{format_timestamp(start + 3600 * (i // scholars))}",\n'
+                    f'    "citationCount" : {1000 + i // scholars},\n'
+                    f'    "scholarId" : "S{s:07d}AAAAJ"')
+            f.write((',\n' if i else '') + '  {\n' + body + '\n  }')
+        f.write('\n]\n')
+
+
+def measure(source, target, memory):
+    if memory:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        stats = convert(source, target)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if memory else 0
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return stats, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--records', type=int, default=2_000_000)
+    parser.add_argument('--scholars', type=int, default=5000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, name) for name in ('history.json', 'history.csv', 'back.json')]
+        write_history(paths[0], args.records, args.scholars)
+        print(f'Synthetic history: {args.records:,} records, {os.path.getsize(paths[0]) / 1e6:.0f} MB')
+        for source, target in zip(paths, paths[1:]):
+            size = os.path.getsize(source) / 1e6
+            # time without tracemalloc, then measure memory on a second run
+            stats, seconds, _ = measure(source, target, memory=False)
+            _, _, peak = measure(source, target, memory=True)
+            label = f'{source.rsplit(".", 1)[1]} -> {target.rsplit(".", 1)[1]}'
+            print(f'{label:<12} {seconds:>7.2f} s {size / seconds:>7.1f} MB/s '
+                  f'{peak / 1e6:>7.1f} MB peak  ({stats.records:,} records, '
+                  f'{os.path.getsize(target) / 1e6:.0f} MB written)')
+
+
+if __name__ == '__main__':
+    main()
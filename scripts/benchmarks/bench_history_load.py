@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming columnar history loader against json.load.
+
+Writes a synthetic history file in the pretty-printed record format of
+``iOS/citetrack_init.json`` (varying key order, ISO timestamps) and loads it
+with ``citetrack_tools.history.columnar.load`` and with ``json.load``,
+reporting wall time and tracemalloc peak memory of each.
+
+    python3 benchmarks/bench_history_load.py [--records 2000000] [--scholars 5000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.history.columnar import load  # noqa: E402
+from citetrack_tools.history.records import format_timestamp  # noqa: E402
+
+KEY_ORDERS = (
+    ('scholarName', 'timestamp', 'citationCount', 'scholarId'),
+    ('timestamp', 'scholarName', 'citationCount', 'scholarId'),
+    ('scholarId', 'timestamp', 'scholarName', 'citationCount'),
+)
+
+
+def write_history(path, records, scholars):
+    start = 1_700_000_000
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for i in range(records):
+            s = i % scholars
+            values = {'scholarId': f'S{s:07d}AAAAJ', 'scholarName': f'Scholar {s}',
+                      'citationCount': 1000 + i // scholars,
+                      'timestamp': format_timestamp(start + 3600 * (i // scholars))}
+            body = ',\n'.join(f'    {json.dumps(k)} : {json.dumps(values[k])}' for k in KEY_ORDERS[i % 3])
+            f.write((',\n' if i else '') + '  {\n' + body + '\n  }')
+        f.write('\n]\n')
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def json_load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--records', type=int, default=2_000_000)
+    parser.add_argument('--scholars', type=int, default=5000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'history.json')
+        write_history(path, args.records, args.scholars)
+        print(f'Synthetic history: {args.records:,} records, {os.path.getsize(path) / 1e6:.0f} MB')
+        for name, func in (('columnar.load', load), ('json.load', json_load)):
+            seconds, peak = measure(func, path)
+            print(f'{name:<14} {seconds:>7.2f} s {peak / 1e6:>9.0f} MB peak')
+
+
+if __name__ == '__main__':
+    main()
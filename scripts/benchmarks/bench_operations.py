@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for every project operation on synthetic app-shaped projects.
+
+For each size (in lines) a project modeled on CiteTrack_iOS.xcodeproj is
+generated (app, widget and file provider targets; see
+``citetrack_tools.pbxproj.synthetic.generate_app``) and each operation is
+timed (best of ``--repeat`` runs on a freshly parsed project) and measured
+with tracemalloc (peak memory allocated during the operation):
+
+* ``parse``            -- text to object graph
+* ``query``            -- resolve every configuration and run settings queries
+* ``add-files``        -- 100 sources added to the app and the widget
+* ``add-framework``    -- one SDK framework linked into the app
+* ``add-shell-phase``  -- a script phase inserted after the embed phase
+* ``settings-rewrite`` -- the dSYM rules of fix_dsym_settings.py plus SWIFT_VERSION everywhere
+
+Edits are applied in memory (``EditSession.apply``), so disk speed does not
+enter the numbers. Results can be written as JSON and compared with a
+baseline: an operation that got slower than ``--threshold`` times its baseline
+time (or used ``--memory-threshold`` times its memory) fails the run.
+
+    python3 benchmarks/bench_operations.py [--sizes 1000,10000,100000] [--output results.json]
+    python3 benchmarks/bench_operations.py --sizes 1000,10000,100000,1000000 --repeat 1
+    python3 benchmarks/bench_operations.py --update-baseline
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.pbxproj import parse  # noqa: E402
+from citetrack_tools.pbxproj.edit import EditSession  # noqa: E402
+from citetrack_tools.pbxproj.operations import apply_operations  # noqa: E402
+from citetrack_tools.pbxproj.query import query, resolve  # noqa: E402
+from citetrack_tools.pbxproj.settings import PROJECT  # noqa: E402
+from citetrack_tools.pbxproj.synthetic import generate_lines  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Timings below this many seconds apart are noise, whatever their ratio
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 1 << 20
+
+ADD_FILES = [{'op': 'add-files', 'group': 'Views',
+              'targets': ['CiteTrack', 'CiteTrackWidgetExtension'],
+              'files': [f'BenchmarkView{i}.swift' for i in range(100)]}]
+ADD_FRAMEWORK = [{'op': 'add-framework', 'framework': 'StoreKit', 'target': 'CiteTrack'}]
+ADD_SHELL_PHASE = [{'op': 'add-shell-script-phase', 'target': 'CiteTrack',
+                    'name': 'Sign Sparkle Components',
+                    'script': '"${SRCROOT}/scripts/sign_sparkle_components.sh"\n',
+                    'after': 'Embed Foundation Extensions'}]
+SETTINGS_REWRITE = [
+    {'op': 'set-build-settings', 'targets': [PROJECT], 'configurations': ['Debug', 'Release'],
+     'settings': {'DEBUG_INFORMATION_FORMAT': 'dwarf-with-dsym'}},
+    {'op': 'set-build-settings', 'targets': ['CiteTrack'], 'configurations': ['Release'],
+     'settings': {'STRIP_INSTALLED_PRODUCT': 'NO'}},
+    {'op': 'set-build-settings', 'settings': {'SWIFT_VERSION': '6.0'}},
+]
+
+
+def _query(project):
+    tables = {'synthetic': resolve(project)}
+    query(tables, ['SWIFT_VERSION'], configurations=['Release'])
+    query(tables, ['DEBUG_INFORMATION_FORMAT=dwarf'], include_project=True)
+    query(tables, ['*_DEPLOYMENT_TARGET'], targets=['CiteTrackWidgetExtension'])
+
+
+def _operations(operations):
+    def run(project):
+        session = EditSession(project)
+        if not apply_operations(session, operations):
+            raise RuntimeError(f'{operations[0]["op"]} changed nothing')
+        session.apply()
+    return run
+
+
+# name -> (setup(text), measured(state))
+OPERATIONS = {
+    'parse': (lambda text: text, parse),
+    'query': (parse, _query),
+    'add-files': (parse, _operations(ADD_FILES)),
+    'add-framework': (parse, _operations(ADD_FRAMEWORK)),
+    'add-shell-phase': (parse, _operations(ADD_SHELL_PHASE)),
+    'settings-rewrite': (parse, _operations(SETTINGS_REWRITE)),
+}
+
+
+def measure(text, setup, func, repeat):
+    """Best wall time of ``repeat`` runs and the peak bytes allocated by one run."""
+    best = float('inf')
+    for _ in range(repeat):
+        state = setup(text)
+        gc.collect()
+        start = time.perf_counter()
+        func(state)
+        best = min(best, time.perf_counter() - start)
+    state = setup(text)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes, operations, repeat):
+    results = []
+    print(f'{"lines":>9} {"operation":<17} {"ms":>10} {"peak MB":>9}')
+    for lines in sizes:
+        text = generate_lines(lines)
+        actual = text.count('\n')
+        for name in operations:
+            setup, func = OPERATIONS[name]
+            seconds, peak = measure(text, setup, func, repeat)
+            results.append({'lines': lines, 'actual_lines': actual, 'bytes': len(text.encode('utf-8')),
+                            'operation': name, 'seconds': seconds, 'peak_bytes': peak})
+            print(f'{actual:>9,} {name:<17} {seconds * 1000:>10.1f} {peak / 1e6:>9.1f}')
+    return results
+
+
+def report(results, repeat):
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def regressions(results, baseline, threshold, memory_threshold):
+    """Descriptions of every result slower or bigger than its baseline allows."""
+    known = {(r['lines'], r['operation']): r for r in baseline.get('results', ())}
+    found = []
+    for result in results:
+        base = known.get((result['lines'], result['operation']))
+        if base is None:
+            continue
+        label = f'{result["operation"]} @ {result["lines"]:,} lines'
+        seconds, base_seconds = result['seconds'], base['seconds']
+        if seconds > base_seconds * threshold and seconds - base_seconds > MIN_TIME_DELTA:
+            found.append(f'{label}: {seconds * 1000:.1f} ms vs {base_seconds * 1000:.1f} ms '
+                         f'baseline ({seconds / base_seconds:.2f}x > {threshold}x)')
+        peak, base_peak = result['peak_bytes'], base['peak_bytes']
+        if peak > base_peak * memory_threshold and peak - base_peak > MIN_MEMORY_DELTA:
+            found.append(f'{label}: {peak / 1e6:.1f} MB vs {base_peak / 1e6:.1f} MB '
+                         f'baseline ({peak / base_peak:.2f}x > {memory_threshold}x)')
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='project sizes in lines (default: %(default)s)')
+    parser.add_argument('--operations', default=','.join(OPERATIONS),
+                        help='comma-separated subset of: %(default)s')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='results to compare against (default: benchmarks/baseline.json)')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='fail if an operation is this many times slower than its baseline')
+    parser.add_argument('--memory-threshold', type=float, default=1.5,
+                        help='fail if an operation allocates this many times its baseline peak')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store these results as the new baseline instead of comparing')
+    args = parser.parse_args()
+
+    operations = [name.strip() for name in args.operations.split(',') if name.strip()]
+    unknown = [name for name in operations if name not in OPERATIONS]
+    if unknown:
+        parser.error(f'unknown operations: {", ".join(unknown)}')
+    results = run([int(s) for s in args.sizes.split(',')], operations, args.repeat)
+    data = report(results, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+        print(f'\nBaseline written to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'\nNo baseline at {args.baseline}; run with --update-baseline to create one')
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    found = regressions(results, baseline, args.threshold, args.memory_threshold)
+    if found:
+        print(f'\n{len(found)} regressions against {args.baseline}:')
+        for line in found:
+            print(f'  {line}')
+        return 1
+    print(f'\nNo regressions against {args.baseline}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
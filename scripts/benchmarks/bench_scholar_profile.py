@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark the Scholar profile parser on the bundled fixture.
+
+Parses ``iOS/scholar_kukA0LcAAAAJ.html`` with
+``citetrack_tools.scholar.profile`` and checks the result against known
+values and against a per-field parser written the way the apps parse
+(a separate regex search per field, compiled on every call). Exits
+non-zero on any mismatch. Then reports single-process throughput of both,
+and the throughput of the process-pool batch mode over ``--pages`` copies of
+the fixture.
+
+    python3 benchmarks/bench_scholar_profile.py [--pages 2000] [--jobs 4]
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.scholar.profile import parse, parse_files  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                       'iOS', 'scholar_kukA0LcAAAAJ.html')
+
+EXPECTED = {
+    'scholar_id': 'kukA0LcAAAAJ', 'name': 'Yoshua Bengio',
+    'citations': 1009852, 'citations_since': 733098, 'h_index': 252, 'h_index_since': 214,
+    'i10_index': 986, 'i10_index_since': 869, 'since_year': 2020,
+}
+FIRST = ('Generative adversarial nets', '11977070277539609369', 105335, 2014)
+LAST = ('Stacked denoising autoencoders: Learning useful representations in a deep network '
+        'with a local denoising criterion.', '13548556499559547747', 9995, 2010)
+
+
+def first_match(text, pattern):
+    """``extractFirstMatch``: compile, search, return group 1."""
+    match = re.compile(pattern, re.I | re.S).search(text)
+    return match[1] if match else None
+
+
+def clean(text):
+    text = re.sub(r'<[^>]+>', '', text)
+    return re.sub(r'\s+', ' ', html.unescape(text)).strip()
+
+
+def per_field(text):
+    """The apps' approach: one regex scan per field, per row for publications."""
+    re.purge()
+    name = first_match(text, r'<div id="gsc_prf_in">([^<]+)</div>')
+    cells = [int(m) for m in re.compile(r'<td[^>]*class="gsc_rsb_std"[^>]*>(\d+)</td>').findall(text)]
+    rows = []
+    for row in re.compile(r'<tr class="gsc_a_tr">(.*?)</tr>', re.S).findall(text):
+        title = first_match(row, r'<a[^>]*class="gsc_a_at"[^>]*>(.*?)</a>')
+        cites = first_match(row, r'&amp;cites=([0-9,]+)')
+        cited = first_match(row, r'<a[^>]*class="gsc_a_ac[^"]*"[^>]*>(\d+)</a>')
+        year = first_match(row, r'<span class="gsc_a_h[^"]*">(\d{4})</span>')
+        rows.append((clean(title), cites.split(',')[0] if cites else None,
+                     int(cited) if cited else None, int(year) if year else None))
+    return name, cells, rows
+
+
+def check(page):
+    profile = parse(page)
+    problems = [f'{key}: {getattr(profile, key)!r} != {value!r}' for key, value in EXPECTED.items()
+                if getattr(profile, key) != value]
+    rows = [(p.title, p.cluster_id, p.citations, p.year) for p in profile.publications]
+    if len(rows) != 20 or rows[0] != FIRST or rows[-1] != LAST:
+        problems.append(f'publications: {len(rows)} rows, first {rows[:1]}, last {rows[-1:]}')
+    name, cells, reference = per_field(page.decode('utf-8'))
+    stats = [profile.citations, profile.citations_since, profile.h_index, profile.h_index_since,
+             profile.i10_index, profile.i10_index_since]
+    if name != profile.name or cells != stats or reference != rows:
+        problems.append('differs from the per-field parser')
+    return problems
+
+
+def rate(func, page, seconds=1.0):
+    count, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        func(page)
+        count += 1
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--pages', type=int, default=2000, help='copies of the fixture for batch mode')
+    parser.add_argument('--jobs', type=int, help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+    with open(FIXTURE, 'rb') as f:
+        page = f.read()
+
+    problems = check(page)
+    for problem in problems:
+        print(f'❌ {problem}')
+    if problems:
+        return 1
+    print(f'✅ fixture parsed correctly ({len(page) / 1e3:.0f} KB)')
+
+    text = page.decode('utf-8')
+    for label, func, data in (('one pass', parse, page), ('per field', per_field, text)):
+        pages = rate(func, data)
+        print(f'{label:<10} {pages:>8,.0f} pages/s {pages * len(page) / 1e6:>8.1f} MB/s')
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(args.pages):
+            paths.append(os.path.join(directory, f'scholar_{i:06d}.html'))
+            with open(paths[-1], 'wb') as f:
+                f.write(page)
+        for jobs in sorted({1, args.jobs or os.cpu_count() or 1}):
+            started = time.perf_counter()
+            results = list(parse_files(paths, jobs))
+            seconds = time.perf_counter() - started
+            ok = sum(1 for _, profile, _ in results if profile and profile.h_index == 252)
+            print(f'batch, {jobs} job(s): {len(paths):,} pages in {seconds:.2f} s '
+                  f'({len(paths) / seconds:,.0f} pages/s, {ok:,} correct)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
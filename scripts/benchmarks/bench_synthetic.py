@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark the synthetic dataset generator.
+
+Writes a ``--scholars`` x ``--snapshots`` import file (ten million records
+by default) with ``citetrack_tools.history.synthetic`` and reports its
+speed and peak traced memory, which must not grow with the dataset. A
+smaller dataset is then written twice with one seed and once with another
+and must come out byte-identical and different respectively. It is read
+back with ``json.load`` and the columnar loader: every record must be
+there, in the sample file's layout, and each scholar's counts must never
+fall. Finally the profile pages and citing papers of its first
+``--pages`` scholars are generated: each page must parse back to its
+profile, with the total of the scholar's last record, and each citing set
+must have one paper per citation of the top publications, up to the cap.
+Exits non-zero on any mismatch.
+
+    python3 benchmarks/bench_synthetic.py [--scholars 10000] [--snapshots 1000] [--pages 200]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citetrack_tools.history.columnar import load  # noqa: E402
+from citetrack_tools.history.synthetic import write_import  # noqa: E402
+from citetrack_tools.scholar.profile import parse  # noqa: E402
+from citetrack_tools.scholar.synthetic import iter_scholars, render_page  # noqa: E402
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                      'macOS', 'sample_import_data.json')
+
+
+def timed(func, trace=False):
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    if trace:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def digest(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def key_layout(path):
+    """The first record's keys and indentation, as lines without values."""
+    with open(path, encoding='utf-8') as f:
+        head = f.read(4096)
+    lines = head[:head.index('}') + 1].splitlines()
+    return [line.split(':')[0] for line in lines]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scholars', type=int, default=10_000)
+    parser.add_argument('--snapshots', type=int, default=1_000)
+    parser.add_argument('--pages', type=int, default=200)
+    args = parser.parse_args()
+    failures = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        big = os.path.join(directory, 'big.json')
+        records, seconds, _ = timed(lambda: write_import(big, args.scholars, args.snapshots, seed=7))
+        size = os.path.getsize(big)
+        print(f'{records:,} records, {size / 1e6:,.0f} MB in {seconds:.2f} s '
+              f'({records / seconds / 1e6:.2f} M records/s, {size / seconds / 1e6:,.0f} MB/s)')
+        os.remove(big)
+        if records != args.scholars * args.snapshots:
+            failures.append(f'{records:,} records written, not {args.scholars * args.snapshots:,}')
+        peaks = []
+        for scholars in (100, 1_000):
+            _, _, peak = timed(lambda: write_import(big, scholars, 1_000, seed=7), trace=True)
+            peaks.append(peak)
+            print(f'{scholars * 1_000:>10,} records: peak {peak / 1e6:6.1f} MB traced')
+        if peaks[1] > 1.5 * peaks[0]:
+            failures.append('peak memory grows with the dataset')
+
+        paths = [os.path.join(directory, name) for name in ('a.json', 'b.json', 'c.json')]
+        scholars, snapshots = 2_000, 100
+        for path, seed in zip(paths, (7, 7, 8)):
+            write_import(path, scholars, snapshots, seed=seed)
+        digests = [digest(path) for path in paths]
+        if digests[0] != digests[1]:
+            failures.append('the same seed gave different files')
+        if digests[0] == digests[2]:
+            failures.append('different seeds gave the same file')
+
+        with open(paths[0], encoding='utf-8') as f:
+            records = json.load(f)
+        if len(records) != scholars * snapshots:
+            failures.append(f'json.load read {len(records):,} records, not {scholars * snapshots:,}')
+        if key_layout(paths[0]) != key_layout(SAMPLE):
+            failures.append(f'record layout {key_layout(paths[0])} differs from the sample file')
+        history, seconds, _ = timed(lambda: load(paths[0]))
+        print(f'\nloaded {len(history):,} records of {len(history.table):,} scholars in {seconds:.2f} s')
+        counts = history.counts.reshape(scholars, snapshots)
+        timestamps = history.timestamps.reshape(scholars, snapshots)
+        if len(history.table) != scholars or np.any(history.scholars.reshape(scholars, snapshots)
+                                                    != np.arange(scholars)[:, None]):
+            failures.append('records are not grouped by scholar')
+        if np.any(np.diff(counts, axis=1) < 0) or np.any(np.diff(timestamps, axis=1) <= 0):
+            failures.append('a scholar\'s counts fall or timestamps do not increase')
+        growth = counts[:, -1] / np.maximum(counts[:, 0], 1)
+        print(f'first counts {np.percentile(counts[:, 0], [5, 50, 95]).astype(int)} (5/50/95th), '
+              f'median growth over {snapshots} snapshots {np.median(growth) - 1:.1%}')
+
+        def pages():
+            return [(render_page(profile), profile, citing)
+                    for profile, _, citing in iter_scholars(scholars, snapshots, seed=7, limit=args.pages)]
+
+        generated, seconds, _ = timed(pages)
+        print(f'{len(generated)} pages and {sum(len(c) for _, _, c in generated):,} citing papers '
+              f'in {seconds:.2f} s')
+        for page, profile, citing in generated:
+            parsed = parse(page)
+            row = history.table.index[profile.scholar_id]
+            if parsed != profile._replace(publications=profile.publications[:100]):
+                failures.append(f'{profile.scholar_id}: the page does not parse back to its profile')
+            if parsed.citations != counts[row, -1] or parsed.name != history.table.names[row]:
+                failures.append(f'{profile.scholar_id}: the page disagrees with the last record')
+            if sum(p.citations or 0 for p in profile.publications) != profile.citations:
+                failures.append(f'{profile.scholar_id}: publications do not add up to the total')
+            expected = sum(min(p.citations or 0, 50) for p in profile.publications[:5])
+            if len(citing) != expected or any(p['citedScholarId'] != profile.scholar_id for p in citing):
+                failures.append(f'{profile.scholar_id}: {len(citing)} citing papers, not {expected}')
+            if len(failures) > 10:
+                break
+
+    for failure in failures:
+        print(f'❌ {failure}')
+    if not failures:
+        print('✅ size, determinism, layout, growth and pages check out')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""
+CiteTrack developer tooling (Xcode project maintenance and data utilities).
+
+Import or run these modules with ``scripts/`` on the Python path.
+"""
@@ -0,0 +1,9 @@
+"""
+Sparkle appcast tooling: keeping ``macOS/appcast.xml`` in step with the
+release DMGs.
+
+* ``feed`` scans the appcast for its items and splices in new or corrected
+  ``<item>`` entries, leaving the rest of the file byte for byte.
+* ``digest`` hashes DMGs in a thread pool over memory-mapped chunks and
+  caches digests and signatures by path, size and mtime.
+"""
@@ -0,0 +1,165 @@
+"""
+Command-line entry point for the Sparkle appcast tools.
+
+    python3 -m citetrack_tools.appcast list
+    python3 -m citetrack_tools.appcast hash ../macOS/CiteTrack-Charts-Professional-v2.0.0.dmg
+    python3 -m citetrack_tools.appcast update ../macOS/*.dmg --sign ../macOS/Frameworks/bin/sign_update
+    python3 -m citetrack_tools.appcast update ../macOS/CiteTrack-v2.1.0.dmg --notes notes.html --dry-run
+
+``list`` prints the releases in the feed (``../macOS/appcast.xml`` unless
+``--feed`` says otherwise). ``hash`` prints the SHA-256 of DMGs. ``update``
+brings the feed up to date with the DMGs the ``create_v*_dmg.sh`` scripts
+made: it adds an item for each new version and corrects the length (and,
+with ``--sign``, the EdDSA signature) of existing ones, leaving the rest of
+the feed untouched. DMGs are hashed in a thread pool, and digests and
+signatures are cached by path, size and mtime, so re-running over many
+releases only reads new ones.
+"""
+
+import argparse
+import difflib
+import os
+import sys
+import time
+
+from .feed import RELEASES
+
+FEED = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))), 'macOS', 'appcast.xml')
+
+
+def _hash(args):
+    from .digest import DigestCache, hash_files
+
+    cache = None if args.no_cache else DigestCache.open_default()
+    started = time.perf_counter()
+    artifacts, hashed = hash_files(args.dmgs, args.jobs, cache)
+    seconds = time.perf_counter() - started
+    total = sum(artifact.size for artifact in artifacts)
+    print(f'👀 {len(artifacts)} DMGs ({total / 1e6:,.1f} MB), {hashed} hashed, '
+          f'{len(artifacts) - hashed} from cache, in {seconds:.2f} s', file=sys.stderr)
+    return artifacts, cache
+
+
+def cmd_list(args):
+    from .feed import read_feed
+
+    feed = read_feed(args.feed)
+    for item in feed.items:
+        signed = '✅' if item.signature else '⚠️ '
+        length = f'{item.length:,}' if item.length is not None else '?'
+        name = item.url.rsplit('/', 1)[-1] if item.url else '(no enclosure)'
+        print(f'{signed} {item.version or item.short_version or "?":<10} {length:>12} bytes  {name}'
+              f'  {item.pub_date or ""}')
+    print(f'{len(feed.items)} releases, {sum(1 for item in feed.items if item.signature)} signed')
+    return 0
+
+
+def cmd_hash(args):
+    artifacts, cache = _hash(args)
+    for artifact in artifacts:
+        print(f'{artifact.sha256}  {artifact.size:>12,}  {artifact.path}')
+    if cache:
+        cache.save()
+    return 0
+
+
+def cmd_update(args):
+    from .digest import ed_signature
+    from .feed import Release, plan, read_feed, render, save, version_from_name
+
+    if args.version and len(args.dmgs) > 1:
+        print('❌ --version applies to a single DMG', file=sys.stderr)
+        return 1
+    versions = [args.version or version_from_name(path) for path in args.dmgs]
+    unknown = [path for path, version in zip(args.dmgs, versions) if not version]
+    if unknown:
+        print(f'❌ No version in the file name of {", ".join(unknown)} (pass --version)', file=sys.stderr)
+        return 1
+    try:
+        feed = read_feed(args.feed)
+    except (OSError, ValueError) as error:
+        print(f'❌ {args.feed}: {error}', file=sys.stderr)
+        return 1
+    notes = None
+    if args.notes:
+        with open(args.notes, encoding='utf-8') as f:
+            notes = f.read()
+
+    artifacts, cache = _hash(args)
+    releases = []
+    for version, artifact in zip(versions, artifacts):
+        signature = None
+        if args.sign:
+            signature = cache.signature(artifact.sha256, args.sign) if cache else None
+            if signature is None:
+                try:
+                    signature = ed_signature(artifact.path, args.sign)
+                except RuntimeError as error:
+                    print(f'❌ {error}', file=sys.stderr)
+                    return 1
+                if cache:
+                    cache.store_signature(artifact.sha256, args.sign, signature)
+        releases.append(Release(version, artifact, signature))
+
+    edits, changes = plan(feed, releases, args.releases, notes, args.minimum_system_version,
+                          cache.signed_digest if cache else None)
+    if cache:
+        # signatures stay cached while the feed lists them, to tell stale ones apart
+        cache.save(keep=[item.signature for item in feed.items if item.signature])
+    for change in changes:
+        mark = {'added': '✅', 'updated': '✅', 'unchanged': '👀', 'skipped': '⚠️ '}[change.action]
+        detail = f' ({change.detail})' if change.detail else ''
+        print(f'{mark} {change.version} {change.action}{detail}: {os.path.basename(change.path)}')
+    if args.dry_run:
+        old = feed.data.decode('utf-8').splitlines(keepends=True)
+        new = render(feed, edits).decode('utf-8').splitlines(keepends=True)
+        sys.stdout.writelines(difflib.unified_diff(old, new, args.feed, args.feed))
+    elif save(feed, edits):
+        print(f'✅ Wrote {args.feed}')
+    else:
+        print(f'👀 {args.feed} is up to date')
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python3 -m citetrack_tools.appcast',
+                                     description='CiteTrack Sparkle appcast tooling')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def hashing(command):
+        command.add_argument('dmgs', nargs='+', help='release DMGs')
+        command.add_argument('-j', '--jobs', type=int,
+                             help='hashing threads (default: CPU count, at least 2)')
+        command.add_argument('--no-cache', action='store_true',
+                             help='hash every DMG, ignoring cached digests')
+
+    listing = commands.add_parser('list', help='list the releases in the feed')
+    listing.add_argument('--feed', default=FEED, help='appcast (default: ../macOS/appcast.xml)')
+    listing.set_defaults(func=cmd_list)
+
+    digest = commands.add_parser('hash', help='print the SHA-256 of DMGs')
+    hashing(digest)
+    digest.set_defaults(func=cmd_hash)
+
+    update = commands.add_parser('update', help='add or correct the feed items of DMGs')
+    hashing(update)
+    update.add_argument('--feed', default=FEED, help='appcast (default: ../macOS/appcast.xml)')
+    update.add_argument('--version', help='version of the (single) DMG (default: from its file name)')
+    update.add_argument('--sign', metavar='COMMAND',
+                        help="Sparkle's sign_update, to set sparkle:edSignature (signatures are cached)")
+    update.add_argument('--notes', help='HTML release notes for new items')
+    update.add_argument('--minimum-system-version', help='for new items (default: the newest item\'s)')
+    update.add_argument('--releases', default=RELEASES, help='GitHub releases URL new items link to')
+    update.add_argument('-n', '--dry-run', action='store_true', help='print a diff instead of writing')
+    update.set_defaults(func=cmd_update)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
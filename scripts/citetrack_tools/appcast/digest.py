@@ -0,0 +1,177 @@
+"""
+SHA-256 digests of release DMGs, hashed in a thread pool and cached.
+
+Each file is memory-mapped and fed to ``hashlib`` a chunk at a time as
+``memoryview`` slices of the mapping, so nothing is copied into Python
+objects and memory stays flat whatever the DMG's size. ``hashlib`` releases
+the GIL while it hashes, so :func:`hash_files` hashes several DMGs at once
+in threads.
+
+:class:`DigestCache` remembers each file's digest against its size and
+modification time (``st_mtime_ns``), like ``make`` trusts timestamps: re-run
+over an archive of releases, only new or rebuilt DMGs are read. It also keeps
+the EdDSA signatures Sparkle's ``sign_update`` printed, by digest and
+command, since signing the same bytes with the same key gives the same
+signature. The cache is one ``marshal`` file (as in :mod:`..pbxproj.cache`);
+an unreadable one starts empty.
+"""
+
+import hashlib
+import marshal
+import mmap
+import os
+import re
+import shlex
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from ..pbxproj.writer import write_atomic
+
+CHUNK_SIZE = 8 << 20
+
+CACHE_VERSION = 1
+
+_SIGNATURE = re.compile(r'sparkle:edSignature="([^"]+)"')
+
+Artifact = namedtuple('Artifact', 'path size mtime_ns sha256')
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'citetrack_tools', 'appcast')
+
+
+def sha256_file(path, chunk_size=CHUNK_SIZE):
+    """Hash the file at ``path``; return an :class:`Artifact`.
+
+    Size and modification time come from the open file, so they describe
+    the bytes that were hashed.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if st.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mapped) as view:
+                    for offset in range(0, st.st_size, chunk_size):
+                        digest.update(view[offset:offset + chunk_size])
+    return Artifact(path, st.st_size, st.st_mtime_ns, digest.hexdigest())
+
+
+class DigestCache:
+    """Digests by (path, size, mtime) and signatures by (digest, command); see the module docstring.
+
+    ``path`` None keeps the cache in memory only. Call :meth:`save` to
+    write it back; nothing is written when nothing changed.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.digests = {}
+        self.signatures = {}
+        self.changed = False
+        if path:
+            try:
+                with open(path, 'rb') as f:
+                    version, self.digests, self.signatures = marshal.loads(f.read())
+                if version != CACHE_VERSION:
+                    raise ValueError(version)
+            except (OSError, ValueError, EOFError, TypeError):
+                self.digests, self.signatures = {}, {}
+
+    @classmethod
+    def open_default(cls):
+        return cls(os.path.join(default_cache_dir(), 'digests.marshal'))
+
+    def lookup(self, path, st):
+        """The cached :class:`Artifact` for ``path`` if ``st`` (its stat) still matches, else None."""
+        entry = self.digests.get(os.path.abspath(path))
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return Artifact(path, st.st_size, st.st_mtime_ns, entry[2])
+        return None
+
+    def store(self, artifact):
+        entry = (artifact.size, artifact.mtime_ns, artifact.sha256)
+        key = os.path.abspath(artifact.path)
+        if self.digests.get(key) != entry:
+            self.digests[key] = entry
+            self.changed = True
+
+    def signature(self, sha256, command):
+        return self.signatures.get((sha256, command))
+
+    def signed_digest(self, signature):
+        """The digest ``signature`` was made for, or None if it was not made through this cache."""
+        for (sha256, _), value in self.signatures.items():
+            if value == signature:
+                return sha256
+        return None
+
+    def store_signature(self, sha256, command, signature):
+        if self.signatures.get((sha256, command)) != signature:
+            self.signatures[(sha256, command)] = signature
+            self.changed = True
+
+    def save(self, keep=()):
+        """Write the cache, dropping signatures of digests no file has any more.
+
+        Signatures in ``keep`` (those a feed still lists) stay, so a later run
+        can still tell which bytes they were made for.
+        """
+        if not self.path or not self.changed:
+            return
+        live = {entry[2] for entry in self.digests.values()}
+        keep = set(keep)
+        self.signatures = {key: value for key, value in self.signatures.items()
+                           if key[0] in live or value in keep}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            write_atomic(self.path, marshal.dumps((CACHE_VERSION, self.digests, self.signatures)))
+            self.changed = False
+        except OSError:
+            pass  # an unwritable cache only costs speed
+
+
+def hash_files(paths, jobs=None, cache=None, chunk_size=CHUNK_SIZE):
+    """Return ``(artifacts, hashed)``: an :class:`Artifact` per path, in order, and how many were read.
+
+    Files whose size and mtime match ``cache`` are not read; the rest are
+    hashed in a pool of ``jobs`` threads (default: one per CPU, at least
+    two, so one file's I/O overlaps another's hashing) and stored in it.
+    """
+    artifacts = [None] * len(paths)
+    pending = []
+    for index, path in enumerate(paths):
+        found = cache.lookup(path, os.stat(path)) if cache else None
+        if found is None:
+            pending.append(index)
+        else:
+            artifacts[index] = found
+    if pending:
+        workers = min(jobs or max(2, os.cpu_count() or 1), len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            hashed = pool.map(lambda index: sha256_file(paths[index], chunk_size), pending)
+            for index, artifact in zip(pending, hashed):
+                artifacts[index] = artifact
+                if cache:
+                    cache.store(artifact)
+    return artifacts, len(pending)
+
+
+def ed_signature(path, command):
+    """Run Sparkle's ``sign_update`` (``command``) on ``path``; return the EdDSA signature.
+
+    Raises ``RuntimeError`` if the command fails or prints no
+    ``sparkle:edSignature``.
+    """
+    try:
+        result = subprocess.run([*shlex.split(command), path], capture_output=True, text=True)
+    except OSError as error:
+        raise RuntimeError(f'cannot run {command}: {error}') from error
+    found = _SIGNATURE.search(result.stdout)
+    if result.returncode or not found:
+        raise RuntimeError(f'{command} {path} failed: {(result.stderr or result.stdout).strip()}')
+    return found[1]
@@ -0,0 +1,346 @@
+"""
+Incremental edits to a Sparkle appcast (``macOS/appcast.xml``).
+
+:func:`read_feed` scans the feed once with expat (the parser under
+``ElementTree.iterparse``, used directly because it reports the byte offset
+of every tag) and records each ``<item>``: its title, version, enclosure
+attributes and the byte spans of the item and of its ``<enclosure>`` tag.
+
+:func:`plan` matches release DMGs to items -- by the enclosure URL's file
+name, else by ``sparkle:version`` -- and produces edits, as
+:class:`..pbxproj.edit.EditSession` does for projects:
+
+* for a release already in the feed, only the ``<enclosure>`` tag is
+  rewritten, and only the attributes that changed (``length``,
+  ``sparkle:edSignature``, the URL's file name), keeping its layout;
+* a new release gets a new ``<item>`` laid out like the feed's own, placed
+  so the feed stays newest first.
+
+:func:`save` splices the edits into the original bytes and writes the feed
+atomically, and not at all when nothing changed; everything outside the
+edited spans stays byte-identical, comments and hand-written release notes
+included::
+
+    feed = read_feed('../macOS/appcast.xml')
+    edits, changes = plan(feed, [Release('2.0.1', artifact, signature)])
+    save(feed, edits)
+"""
+
+import os
+import re
+import textwrap
+from collections import namedtuple
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.parsers import expat
+from xml.sax.saxutils import escape
+
+from ..pbxproj.writer import splice_bytes, write_atomic
+
+RELEASES = 'https://github.com/tao-shen/CiteTrack/releases'
+ENCLOSURE_TYPE = 'application/octet-stream'
+
+Item = namedtuple('Item', 'title version short_version url length signature pub_date '
+                          'minimum_system_version start end enclosure')
+# ``version`` is the release's version, from the DMG's name unless given
+Release = namedtuple('Release', 'version artifact signature')
+Change = namedtuple('Change', 'action version path detail')
+
+_TAG = re.compile(rb'<(?:"[^"]*"|\'[^\']*\'|[^>"\'])*>')
+_VERSION = re.compile(r'v?(\d+(?:\.\d+)+)')
+_FIELDS = {'title': 'title', 'pubDate': 'pub_date', 'sparkle:version': 'version',
+           'sparkle:shortVersionString': 'short_version',
+           'sparkle:minimumSystemVersion': 'minimum_system_version'}
+
+
+class Feed:
+    """A scanned appcast: its bytes, items in order and the layout new items copy."""
+
+    def __init__(self, path, data, items, channel_end):
+        self.path = path
+        self.data = data
+        self.items = items
+        self.channel_end = channel_end
+
+    def line_indent(self, offset):
+        """The whitespace between the start of the line and ``offset``."""
+        line = self.data.rfind(b'\n', 0, offset) + 1
+        indent = self.data[line:offset].decode('utf-8')
+        return indent if not indent.strip() else ''
+
+    @property
+    def item_indent(self):
+        if self.items:
+            return self.line_indent(self.items[0].start)
+        return self.line_indent(self.channel_end) + '    '
+
+    @property
+    def separator(self):
+        """What separates two items: the whitespace between the first two, else a newline."""
+        if len(self.items) > 1:
+            between = self.data[self.items[0].end:self.items[1].start].decode('utf-8')
+            if not between.strip():
+                return between
+        return '\n' + self.item_indent
+
+
+def read_feed(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    items, channel_end = scan(data)
+    return Feed(path, data, items, channel_end)
+
+
+def scan(data):
+    """Return the feed's :class:`Item` list and the byte offset of ``</channel>``."""
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    items = []
+    text = []
+    current = None
+    channel_end = None
+
+    def tag_end(offset):
+        return _TAG.match(data, offset).end()
+
+    def start(name, attrs):
+        nonlocal current
+        text.clear()
+        if name == 'item':
+            current = dict.fromkeys(Item._fields)
+            current['start'] = parser.CurrentByteIndex
+        elif current is not None and name == 'enclosure':
+            offset = parser.CurrentByteIndex
+            current['enclosure'] = (offset, tag_end(offset))
+            current['url'] = attrs.get('url')
+            current['length'] = int(attrs['length']) if attrs.get('length', '').isdigit() else None
+            current['signature'] = attrs.get('sparkle:edSignature')
+            for attr in ('sparkle:version', 'sparkle:shortVersionString'):
+                if attr in attrs:
+                    current[_FIELDS[attr]] = attrs[attr]
+
+    def end(name):
+        nonlocal current, channel_end
+        if current is None:
+            if name == 'channel':
+                channel_end = parser.CurrentByteIndex
+        elif name == 'item':
+            current['end'] = tag_end(parser.CurrentByteIndex)
+            items.append(Item(**current))
+            current = None
+        elif name in _FIELDS and current[_FIELDS[name]] is None:
+            current[_FIELDS[name]] = ''.join(text).strip()
+        text.clear()
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = text.append
+    parser.Parse(data, True)
+    if channel_end is None:
+        raise ValueError('not an RSS feed: no <channel>')
+    return items, channel_end
+
+
+# MARK: - Versions
+
+def version_from_name(path):
+    """The version in a DMG's file name (``CiteTrack-Charts-Professional-v2.0.0.dmg`` -> ``2.0.0``)."""
+    found = _VERSION.findall(os.path.splitext(os.path.basename(path))[0])
+    return found[-1] if found else None
+
+
+def version_key(version):
+    return tuple(int(part) for part in re.findall(r'\d+', version or ''))
+
+
+def find_item(feed, release):
+    """The item for ``release``: same enclosure file name, else same version; or None."""
+    name = os.path.basename(release.artifact.path)
+    for item in feed.items:
+        if item.url and item.url.rsplit('/', 1)[-1] == name:
+            return item
+    for item in feed.items:
+        if release.version in (item.version, item.short_version):
+            return item
+    return None
+
+
+# MARK: - Edits
+
+def _attribute(value):
+    return escape(value, {'"': '&quot;'})
+
+
+def set_attributes(tag, values, before=None):
+    """``tag`` (the text of a start tag) with attributes set to ``values``.
+
+    Existing attributes keep their place and quoting; a new one goes before
+    the attribute ``before`` names (else after the last one), preceded by
+    the same whitespace as that attribute. A value of None removes the
+    attribute along with the whitespace before it.
+    """
+    for name, value in values.items():
+        pattern = re.compile(r'(\s%s\s*=\s*)(["\'])(.*?)\2' % re.escape(name), re.S)
+        found = pattern.search(tag)
+        if value is None:
+            if found:
+                space = re.search(r'\s+$', tag[:found.start() + 1])
+                tag = tag[:space.start()] + tag[found.end():]
+            continue
+        if found:
+            tag = tag[:found.start(3)] + _attribute(value) + tag[found.end(3):]
+            continue
+        attributes = list(re.finditer(r'(\s+)([\w:.-]+)\s*=\s*(["\']).*?\3', tag, re.S))
+        anchor = next((a for a in attributes if a[2] == (before or {}).get(name)), None)
+        if anchor is not None:
+            tag = tag[:anchor.start()] + f'{anchor[1]}{name}="{_attribute(value)}"' + tag[anchor.start():]
+        else:
+            last = attributes[-1] if attributes else None
+            space = last[1] if last else ' '
+            at = last.end() if last else len(tag.split(None, 1)[0])
+            tag = tag[:at] + f'{space}{name}="{_attribute(value)}"' + tag[at:]
+    return tag
+
+
+def render_item(release, indent, url, notes_url, notes=None, minimum_system_version=None, pub_date=None):
+    """A new ``<item>`` laid out like the ones in ``macOS/appcast.xml``, without leading indentation."""
+    inner, text = indent + '    ', indent + '        '
+    version = escape(release.version)
+    notes = textwrap.dedent(notes or f'<h2>CiteTrack v{version}</h2>').strip()
+    notes = '\n'.join(text + line if line.strip() else '' for line in notes.splitlines())
+    attributes = [('url', url), ('sparkle:version', release.version),
+                  ('sparkle:shortVersionString', release.version)]
+    if release.signature:
+        attributes.append(('sparkle:edSignature', release.signature))
+    attributes += [('length', str(release.artifact.size)), ('type', ENCLOSURE_TYPE)]
+    lines = [
+        '<item>',
+        f'{inner}<title>Version {version}</title>',
+        f'{inner}<description><![CDATA[',
+        notes.replace(']]>', ']]]]><![CDATA[>'),
+        f'{inner}]]></description>',
+        f'{inner}<pubDate>{pub_date}</pubDate>',
+        f'{inner}<sparkle:releaseNotesLink>{escape(notes_url)}</sparkle:releaseNotesLink>',
+        f'{inner}<enclosure',
+        *(f'{text}{name}="{_attribute(value)}"' for name, value in attributes),
+    ]
+    lines[-1] += ' />'
+    if minimum_system_version:
+        lines.append(f'{inner}<sparkle:minimumSystemVersion>{escape(minimum_system_version)}'
+                     f'</sparkle:minimumSystemVersion>')
+    lines.append(f'{indent}</item>')
+    return '\n'.join(lines)
+
+
+def _stale(item, release, signed_digest):
+    """Whether ``item``'s signature was made for other bytes than ``release``'s DMG.
+
+    Decided by digest when ``signed_digest`` knows the signature; otherwise
+    only a changed length shows it.
+    """
+    digest = signed_digest(item.signature) if signed_digest else None
+    if digest is not None:
+        return digest != release.artifact.sha256
+    return item.length != release.artifact.size
+
+
+def _update(feed, item, release, signed_digest=None):
+    """The edit (or None) and the :class:`Change` bringing ``item``'s enclosure up to ``release``."""
+    path = release.artifact.path
+    if item.enclosure is None:
+        return None, Change('skipped', release.version, path, 'the item has no <enclosure>')
+    values = {'length': str(release.artifact.size)}
+    notes = []
+    if release.signature:
+        values['sparkle:edSignature'] = release.signature
+    elif item.signature and _stale(item, release, signed_digest):
+        # Sparkle rejects an update whose signature does not match, so drop it
+        values['sparkle:edSignature'] = None
+        notes.append('stale signature removed, unsigned: pass --sign')
+    elif not item.signature:
+        notes.append('unsigned: pass --sign')
+    name = os.path.basename(path)
+    if item.url and item.url.rsplit('/', 1)[-1] != name:
+        values['url'] = f'{item.url.rsplit("/", 1)[0]}/{name}'
+    start, end = item.enclosure
+    old = feed.data[start:end].decode('utf-8')
+    new = set_attributes(old, values, before={'sparkle:edSignature': 'length', 'length': 'type'})
+    if new == old:
+        return None, Change('unchanged', release.version, path, ', '.join(notes))
+    changed = [label for label, differs in (
+        ('length', item.length != release.artifact.size),
+        ('signature', release.signature and item.signature != release.signature),
+        ('url', 'url' in values)) if differs]
+    return (start, end, new), Change('updated', release.version, path, ', '.join(changed + notes))
+
+
+def plan(feed, releases, releases_url=RELEASES, notes=None, minimum_system_version=None, signed_digest=None):
+    """Return ``(edits, changes)`` bringing ``feed`` up to date with ``releases``.
+
+    ``edits`` are ``(start, end, chunk)`` byte spans for :func:`save`;
+    ``changes`` has a :class:`Change` per release (``added``, ``updated``,
+    ``unchanged`` or ``skipped``). New items link to ``releases_url``'s
+    ``download/v<version>/<file>`` and ``tag/v<version>``, carry ``notes``
+    (HTML; default a heading) and the newest item's minimum system version
+    unless one is given, and are dated by the DMG's modification time.
+
+    ``signed_digest`` (such as :meth:`.digest.DigestCache.signed_digest`)
+    maps an existing ``sparkle:edSignature`` to the digest it signed; a
+    release without a signature of its own then loses one made for other
+    bytes even when the DMG's length is unchanged.
+    """
+    edits, changes, added = [], [], []
+    for release in releases:
+        item = find_item(feed, release)
+        if item is None:
+            added.append(release)
+            continue
+        edit, change = _update(feed, item, release, signed_digest)
+        if edit:
+            edits.append(edit)
+        changes.append(change)
+    if minimum_system_version is None and feed.items:
+        newest = max(feed.items, key=lambda item: version_key(item.version or item.short_version))
+        minimum_system_version = newest.minimum_system_version
+    indent, separator = feed.item_indent, feed.separator
+    # newest first, so new items inserted at the same offset stay in order
+    for release in sorted(added, key=lambda release: version_key(release.version), reverse=True):
+        key = version_key(release.version)
+        name = os.path.basename(release.artifact.path)
+        modified = datetime.fromtimestamp(release.artifact.mtime_ns // 10**9, timezone.utc)
+        text = render_item(release, indent, f'{releases_url}/download/v{release.version}/{name}',
+                           f'{releases_url}/tag/v{release.version}', notes, minimum_system_version,
+                           format_datetime(modified))
+        newer = [item for item in feed.items if version_key(item.version or item.short_version) > key]
+        if newer:
+            edits.append((newer[-1].end, newer[-1].end, separator + text))
+        elif feed.items:
+            edits.append((feed.items[0].start, feed.items[0].start, text + separator))
+        else:
+            closing = feed.line_indent(feed.channel_end)
+            edits.append((feed.channel_end, feed.channel_end, f'{indent[len(closing):]}{text}\n{closing}'))
+        changes.append(Change('added', release.version, release.artifact.path,
+                              f'{release.artifact.size:,} bytes'))
+    return edits, changes
+
+
+def _same(offset):
+    return offset
+
+
+def render(feed, edits):
+    """The feed with ``edits`` applied, as bytes."""
+    return b''.join(splice_bytes(feed.data, edits, _same))
+
+
+def save(feed, edits, path=None):
+    """Write the feed with ``edits`` applied to ``path`` (default: where it was read); return True if written.
+
+    Untouched regions are written as slices of the bytes read, and nothing
+    is written when the edits change nothing.
+    """
+    path = path or feed.path
+    changed = any(chunk.encode('utf-8') != feed.data[start:end] for start, end, chunk in edits)
+    if changed or path != feed.path:
+        write_atomic(path, splice_bytes(feed.data, edits, _same))
+    return changed or path != feed.path
@@ -0,0 +1,15 @@
+"""
+Citation-history data utilities for the JSON/CSV files the apps import and
+export.
+
+* ``records`` cuts history JSON into flat records chunk by chunk.
+* ``columnar`` (needs NumPy) streams them into compact NumPy columns.
+* ``convert`` converts and validates the CSV and JSON import formats.
+* ``merge`` merges overlapping files into one deduplicated import file.
+* ``store`` (needs NumPy) keeps history in an append-only, memory-mapped
+  binary file with per-scholar segments.
+* ``analytics`` (needs NumPy) computes per-scholar statistics, resampled
+  series and anomaly flags for all scholars at once.
+* ``synthetic`` (needs NumPy) streams seeded synthetic import files of any
+  size for stress tests.
+"""
@@ -0,0 +1,455 @@
+"""
+Batch citation analytics over every scholar of a columnar history at once.
+
+The apps compute their figures one scholar at a time: ``CitationStatistics``
+and ``ChartDataService.generateStatistics`` (totals, growth, volatility,
+trend), ``calculateTrendLine`` (least squares over the chart points) and
+``calculateChanges`` (record-to-record deltas). :class:`Analytics` computes
+the same figures for all scholars together. History is sorted once by
+scholar and time, so each scholar is a contiguous segment, and every figure
+is a NumPy reduction over segments (``np.add.reduceat`` and friends) rather
+than a Python loop. Per-record work runs over blocks of whole scholars of
+about ``BLOCK_ROWS`` records, so temporaries stay in cache instead of
+streaming the whole history through memory once per step::
+
+    from citetrack_tools.history.columnar import load
+    from citetrack_tools.history.analytics import Analytics
+
+    analytics = Analytics(load('../iOS/citetrack_init.json'))
+    summary = analytics.summary()          # one row per scholar
+    weekly = analytics.resample('W')       # scholars x weeks
+    weekly.deltas(), weekly.growth_rates(), weekly.rolling_mean(4)
+    flagged = analytics.anomalies()
+
+Resampled series are dense ``(scholars, periods)`` float arrays: the last
+count seen in each period, carried forward over periods without records,
+and NaN before a scholar's first record.
+"""
+
+import numpy as np
+
+DAY = 86400
+FREQUENCIES = ('D', 'W', 'M')
+
+# determineTrend: less than 5% change between the first and last record is stable
+STABLE_PERCENT = 5.0
+TRENDS = np.array(['stable', 'increasing', 'decreasing'])
+
+# rows per block of per-row work (see Analytics._blocks)
+BLOCK_ROWS = 1 << 16
+
+
+def _is_sorted(history):
+    s, t = history.scholars, history.timestamps
+    if len(s) < 2:
+        return True
+    if not np.all(s[1:] >= s[:-1]):
+        return False
+    # time may only go back where the scholar changes
+    back = np.flatnonzero(t[1:] < t[:-1])
+    return bool(np.all(s[back + 1] != s[back]))
+
+
+def _period_table(low, high, freq):
+    """Period number of each day from ``low`` to ``high``: days, Monday weeks or calendar months.
+
+    Records look their period up by day rather than computing it one by one;
+    ``None`` for daily periods, which are the days themselves.
+    """
+    if freq == 'D':
+        return None
+    days = np.arange(low, high + 1)
+    if freq == 'W':
+        # 1970-01-01 was a Thursday
+        return (days + 3) // 7
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def _period_starts(first, last, freq):
+    """datetime64[D] start of each period number from ``first`` to ``last``."""
+    numbers = np.arange(first, last + 1)
+    if freq == 'D':
+        return numbers.astype('datetime64[D]')
+    if freq == 'W':
+        return (numbers * 7 - 3).astype('datetime64[D]')
+    return numbers.astype('datetime64[M]').astype('datetime64[D]')
+
+
+class Analytics:
+    """Per-scholar figures for a :class:`.columnar.History`, computed segment-wise."""
+
+    __slots__ = ('history', 'starts', 'ends')
+
+    def __init__(self, history):
+        self.history = history if _is_sorted(history) else history.sorted()
+        scholars = self.history.scholars
+        if len(scholars):
+            self.starts = np.flatnonzero(np.r_[True, scholars[1:] != scholars[:-1]])
+        else:
+            self.starts = np.zeros(0, dtype=np.int64)
+        self.ends = np.r_[self.starts[1:], len(scholars)].astype(np.int64)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def scholar_ids(self):
+        """IDs of the scholars, in segment order."""
+        ids = self.history.table.ids
+        return [ids[i] for i in self.history.scholars[self.starts].tolist()]
+
+    @property
+    def scholar_names(self):
+        names = self.history.table.names
+        return [names[i] for i in self.history.scholars[self.starts].tolist()]
+
+    def _deltas(self):
+        """Count change from the previous record of the same scholar (0 on each first record)."""
+        counts = self.history.counts
+        deltas = np.empty_like(counts)
+        deltas[:1] = 0
+        np.subtract(counts[1:], counts[:-1], out=deltas[1:])
+        deltas[self.starts] = 0
+        return deltas
+
+    # MARK: - Statistics
+
+    def summary(self):
+        """One row per scholar as a dict of columns.
+
+        ``entries``, ``first``/``last`` (epoch seconds), ``current``,
+        ``total_change``, ``average_daily_change``, ``growth_rate``,
+        ``peak``/``peak_date`` follow ``CitationStatistics``; ``minimum``,
+        ``maximum``, ``average_change``, ``volatility`` and ``trend`` follow
+        ``ChartStatistics``; ``slope``, ``intercept`` and ``correlation`` are
+        ``calculateTrendLine``'s fit over the chart points (x = record index).
+        """
+        t, c = self.history.timestamps, self.history.counts
+        starts, ends = self.starts, self.ends
+        n = ends - starts
+        if not len(starts):
+            return {'scholar_id': [], 'name': [], 'entries': n}
+        last_rows = ends - 1
+        first, current = c[starts], c[last_rows]
+        total_change = current - first
+        days = (t[last_rows] - t[starts]) // DAY
+        parts = [_reduce(c[lo:hi], starts[i:j] - lo, n[i:j]) for i, j, lo, hi in self._blocks()]
+        maximum, minimum, peak_rows, squares, sc, scc, sxy = map(np.concatenate, zip(*parts))
+        peak_rows += starts
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            average_daily = np.where(days > 0, total_change / np.maximum(days, 1), 0.0)
+            growth = np.where(first > 0, total_change / np.maximum(first, 1) * 100, 0.0)
+            spread = maximum - minimum
+            average_change = np.where(n > 1, spread / np.maximum(n - 1, 1), 0.0)
+
+            # volatility: population standard deviation of the record-to-record changes,
+            # whose sum is the total change
+            m = np.maximum(n - 1, 1)
+            mean = total_change / m
+            variance = squares / m - mean * mean
+            volatility = np.where(n > 1, np.sqrt(np.maximum(variance, 0)), 0.0)
+
+            percent = np.where(first > 0, np.abs(total_change) / np.maximum(first, 1) * 100, 0.0)
+            trend = np.where((n < 2) | (percent < STABLE_PERCENT), 0, np.where(total_change > 0, 1, 2))
+
+            # least squares over (index, count), centred on the first count for precision
+            sy = (sc - n * first).astype(np.float64)
+            syy = (scc - 2 * first * sc + n * first * first).astype(np.float64)
+            sxy = (sxy - first * (n * (n - 1) // 2)).astype(np.float64)
+            nf = n.astype(np.float64)
+            sx = nf * (nf - 1) / 2
+            sxx = (nf - 1) * nf * (2 * nf - 1) / 6
+            denominator = nf * sxx - sx * sx
+            numerator = nf * sxy - sx * sy
+            fit = denominator != 0
+            slope = np.where(fit, numerator / denominator, np.nan)
+            intercept = np.where(fit, (sy - slope * sx) / nf + first, np.nan)
+            spread_y = np.sqrt(denominator * (nf * syy - sy * sy))
+            correlation = np.where(fit & (spread_y > 0), numerator / spread_y, np.where(fit, 0.0, np.nan))
+
+        return {
+            'scholar_id': self.scholar_ids, 'name': self.scholar_names,
+            'entries': n, 'first': t[starts], 'last': t[last_rows],
+            'current': current, 'total_change': total_change,
+            'average_daily_change': average_daily, 'growth_rate': growth,
+            'peak': maximum, 'peak_date': t[peak_rows],
+            'minimum': minimum, 'maximum': maximum, 'average_change': average_change,
+            'volatility': volatility, 'trend': TRENDS[trend],
+            'slope': slope, 'intercept': intercept, 'correlation': correlation,
+        }
+
+    def changes(self):
+        """Row indices and deltas of every record whose count changed, as in ``calculateChanges``."""
+        deltas = self._deltas()
+        rows = np.flatnonzero(deltas)
+        return rows, deltas[rows]
+
+    # MARK: - Resampling
+
+    def resample(self, freq='D'):
+        """A :class:`Resampled` grid of every scholar over the whole time range."""
+        if freq not in FREQUENCIES:
+            raise ValueError(f'unknown frequency {freq!r}; use one of {", ".join(FREQUENCIES)}')
+        t, c = self.history.timestamps, self.history.counts
+        if not len(t):
+            return Resampled(freq, np.zeros(0, dtype='datetime64[D]'), np.zeros((0, 0)),
+                             self.history.scholars[:0], self.history.table)
+        # rows are sorted by time within each scholar
+        low, high = int(t[self.starts].min()) // DAY, int(t[self.ends - 1].max()) // DAY
+        table = _period_table(low, high, freq)
+        first, last = (low, high) if table is None else (int(table[0]), int(table[-1]))
+        values = np.empty((len(self.starts), last - first + 1))
+        for i, j, lo, hi in self._blocks():
+            _fill(values[i:j], c[lo:hi], t[lo:hi], self.starts[i:j] - lo, self.ends[i:j] - lo,
+                  table, low, first)
+        return Resampled(freq, _period_starts(first, last, freq), values,
+                         self.history.scholars[self.starts], self.history.table)
+
+    # MARK: - Anomalies
+
+    def anomalies(self, z=6.0, drop=0.01, reversal=0.5):
+        """Records whose change looks like a scraping error rather than growth.
+
+        A record is flagged when its change from the previous record, per day
+        elapsed (at least one), is more than ``z`` winsorized standard
+        deviations from the scholar's usual daily change (``spike``), or when
+        the count falls by more than ``drop`` of its previous value (``drop``).
+        A flagged change that the next record undoes by at least ``reversal``
+        of its size is a ``glitch``: one bad reading. Returns ``{'row',
+        'scholar_id', 'timestamp', 'count', 'delta', 'score', 'kind'}``
+        columns, rows indexing ``self.history``.
+        """
+        c, t = self.history.counts, self.history.timestamps
+        rows, deltas, scores, kinds = [], [], [], []
+        for i, j, lo, hi in self._blocks():
+            block = _flag(c[lo:hi], t[lo:hi], self.starts[i:j] - lo, self.ends[i:j] - lo, z, drop, reversal)
+            rows.append(block[0] + lo)
+            deltas.append(block[1])
+            scores.append(block[2])
+            kinds.append(block[3])
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        ids = self.history.table.ids
+        return {
+            'row': rows,
+            'scholar_id': [ids[i] for i in self.history.scholars[rows].tolist()],
+            'timestamp': t[rows], 'count': c[rows],
+            'delta': np.concatenate(deltas) if deltas else c[:0],
+            'score': np.concatenate(scores) if scores else np.zeros(0),
+            'kind': np.concatenate(kinds) if kinds else np.zeros(0, dtype='<U6'),
+        }
+
+    def _blocks(self):
+        """Yield ``(i, j, lo, hi)``: scholars ``i:j``, about ``BLOCK_ROWS`` rows ``lo:hi``.
+
+        Per-row work is done a block at a time so its temporaries stay in cache; a
+        scholar with more rows than that is a block on its own.
+        """
+        starts = self.starts
+        if not len(starts):
+            return
+        marks = np.arange(0, len(self.history), BLOCK_ROWS)
+        cuts = np.unique(np.searchsorted(starts, marks, side='right') - 1)
+        bounds = np.r_[cuts, len(starts)].tolist()
+        for i, j in zip(bounds, bounds[1:]):
+            yield i, j, int(starts[i]), int(self.ends[j - 1])
+
+
+def _fill(out, c, t, starts, ends, table, low, first):
+    """:meth:`Analytics.resample` over one block, into its rows ``out``."""
+    scholars, width = out.shape
+    periods = t // DAY
+    if table is None:
+        periods -= first
+    else:
+        periods -= low
+        periods = table[periods]
+        periods -= first
+    # flat cell of every row; rows are sorted by scholar and time, so cells ascend
+    # and the last row of each cell is its value
+    row_starts = np.arange(scholars, dtype=np.int64) * width
+    cells = np.repeat(row_starts, ends - starts)
+    cells += periods
+    keep = np.empty(len(cells), dtype=bool)
+    np.not_equal(cells[1:], cells[:-1], out=keep[:-1])
+    keep[-1] = True
+    kept = np.flatnonzero(keep)
+    heads = np.searchsorted(kept, starts)
+    cells, c = cells[kept], c[kept]
+    # each kept row fills the cells up to the next one, across the end of its
+    # scholar's row into the next row's lead; leads before a scholar's first
+    # record are then cleared to NaN
+    lengths = np.empty_like(cells)
+    np.subtract(cells[1:], cells[:-1], out=lengths[:-1])
+    lengths[-1] = scholars * width - cells[-1]
+    lengths[0] += cells[0]
+    out.reshape(-1)[:] = np.repeat(c, lengths)
+    for row, lead in enumerate((cells[heads] - row_starts).tolist()):
+        if lead:
+            out[row, :lead] = np.nan
+
+
+def _reduce(c, starts, n):
+    """Per-scholar sums behind :meth:`Analytics.summary`, over one block.
+
+    Returns the maximum, minimum, row of the first maximum (relative to the
+    scholar's first row), sum of squared deltas, and sums of ``c``, ``c * c``
+    and ``i * c`` (``i`` the row within the scholar). The sums are exact in
+    int64 for any real history, so centring them afterwards loses nothing.
+    """
+    maximum = np.maximum.reduceat(c, starts)
+    minimum = np.minimum.reduceat(c, starts)
+    at_peak = np.flatnonzero(c == np.repeat(maximum, n))
+    peak_rows = at_peak[np.searchsorted(at_peak, starts)] - starts
+    work = np.empty_like(c)
+    work[:1] = 0
+    np.subtract(c[1:], c[:-1], out=work[1:])
+    work[starts] = 0
+    np.multiply(work, work, out=work)
+    squares = np.add.reduceat(work, starts)
+    sc = np.add.reduceat(c, starts)
+    np.multiply(c, c, out=work)
+    scc = np.add.reduceat(work, starts)
+    np.multiply(np.arange(len(c), dtype=np.int64), c, out=work)
+    sic = np.add.reduceat(work, starts) - starts * sc
+    return maximum, minimum, peak_rows, squares, sc, scc, sic
+
+
+def _flag(c, t, starts, ends, z, drop, reversal):
+    """:meth:`Analytics.anomalies` over one block: local rows, deltas, scores and kinds."""
+    n = ends - starts
+    deltas = np.empty_like(c)
+    deltas[:1] = 0
+    np.subtract(c[1:], c[:-1], out=deltas[1:])
+    deltas[starts] = 0
+    rates = deltas.astype(np.float64)
+    elapsed = np.diff(t).astype(np.float64)
+    elapsed /= DAY
+    np.maximum(elapsed, 1.0, out=elapsed)
+    rates[1:] /= elapsed
+    # first records have no change; they count in no sum and are never flagged
+    m = np.maximum(n - 1, 1)
+    mean = np.add.reduceat(rates, starts) / m
+    squares = np.add.reduceat(rates * rates, starts) / m
+    sigma = np.sqrt(np.maximum(squares - mean * mean, 0))
+    # a steady series has no spread; one citation of slack avoids dividing by zero
+    spread = np.maximum(sigma, 1.0)
+    score = np.subtract(rates, np.repeat(mean, n))
+    score /= np.repeat(spread, n)
+    score[starts] = 0
+    candidates = np.flatnonzero(np.abs(score) > min(3.0, z))
+    # winsorize: clip changes beyond 3 sigma and recompute; they are few, so the sums
+    # are corrected only where clipped
+    outliers = candidates if z >= 3 else candidates[np.abs(score[candidates]) > 3]
+    if len(outliers):
+        segments = np.searchsorted(starts, outliers, side='right') - 1
+        original = rates[outliers]
+        bounds = 3 * spread[segments]
+        clipped = np.clip(original, mean[segments] - bounds, mean[segments] + bounds)
+        totals, squares = mean * m, squares * m
+        np.add.at(totals, segments, clipped - original)
+        np.add.at(squares, segments, clipped * clipped - original * original)
+        moved = totals / m
+        spread_after = np.maximum(np.sqrt(np.maximum(squares / m - moved * moved, 0)), 1.0)
+        # a change beyond z now was beyond `reach` before; when that is past the
+        # candidates' threshold everywhere, only the candidates need rescoring
+        reach = (z * spread_after - np.abs(moved - mean)) / spread
+        mean, spread = moved, spread_after
+        if reach.min() < min(3.0, z):
+            np.subtract(rates, np.repeat(mean, n), out=score)
+            score /= np.repeat(spread, n)
+            score[starts] = 0
+            candidates = np.flatnonzero(np.abs(score) > z)
+        else:
+            segments = np.searchsorted(starts, candidates, side='right') - 1
+            score[candidates] = (rates[candidates] - mean[segments]) / spread[segments]
+
+    spikes = candidates[np.abs(score[candidates]) > z]
+    falling = np.flatnonzero(deltas < 0)
+    falling = falling[-deltas[falling] > drop * np.abs(c[falling - 1])]
+    rows = np.union1d(spikes, falling)
+    # every flagged row is scored with the final figures, drops included
+    segments = np.searchsorted(starts, rows, side='right') - 1
+    scores = (rates[rows] - mean[segments]) / spread[segments]
+    row_ends = ends[segments]
+    change = deltas[rows]
+    following = np.where(rows + 1 < row_ends, deltas[np.minimum(rows + 1, len(c) - 1)], 0)
+    glitch = (np.sign(following) == -np.sign(change)) & (np.abs(following) >= reversal * np.abs(change))
+    kind = np.where(glitch, 'glitch', np.where(np.isin(rows, falling), 'drop', 'spike'))
+    return rows, change, scores, kind
+
+
+class Resampled:
+    """Counts on a regular grid: ``values[i, j]`` is scholar ``i`` at the end of period ``j``."""
+
+    __slots__ = ('freq', 'periods', 'values', 'scholars', 'table')
+
+    def __init__(self, freq, periods, values, scholars, table):
+        self.freq = freq
+        # datetime64[D] start of each period
+        self.periods = periods
+        self.values = values
+        # table index of each row
+        self.scholars = scholars
+        self.table = table
+
+    def __repr__(self):
+        return f'Resampled({self.freq}, {self.values.shape[0]} scholars x {self.values.shape[1]} periods)'
+
+    @property
+    def scholar_ids(self):
+        return [self.table.ids[i] for i in self.scholars.tolist()]
+
+    def row(self, scholar_id):
+        """The series of one scholar."""
+        i = self.table.index[scholar_id]
+        return self.values[np.flatnonzero(self.scholars == i)[0]]
+
+    def _blocks(self):
+        """Row slices of about ``BLOCK_ROWS`` cells, to work on the grid a block at a time."""
+        rows = max(1, BLOCK_ROWS // max(self.values.shape[1], 1))
+        for start in range(0, self.values.shape[0], rows):
+            yield slice(start, start + rows)
+
+    def deltas(self):
+        """Change over each period (NaN for the first and before a scholar's first record)."""
+        out = np.empty_like(self.values)
+        out[:, :1] = np.nan
+        np.subtract(self.values[:, 1:], self.values[:, :-1], out=out[:, 1:])
+        return out
+
+    def growth_rates(self):
+        """Percent change over each period, NaN where the previous count is not positive."""
+        out = np.empty_like(self.values)
+        out[:, :1] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for rows in self._blocks():
+                values, rates = self.values[rows], out[rows, 1:]
+                previous = values[:, :-1]
+                np.subtract(values[:, 1:], previous, out=rates)
+                rates /= previous
+                rates *= 100
+                rates[previous <= 0] = np.nan
+        return out
+
+    def rolling_mean(self, window, values=None):
+        """Mean over the last ``window`` periods (of ``values``, by default the counts).
+
+        NaN until a full window of known values is available.
+        """
+        values = self.values if values is None else values
+        out = np.full(values.shape, np.nan)
+        if not 0 < window <= values.shape[1]:
+            return out
+        for rows in self._blocks():
+            block = values[rows]
+            missing = np.isnan(block)
+            sums = np.zeros((block.shape[0], block.shape[1] + 1))
+            np.cumsum(np.where(missing, 0.0, block), axis=1, out=sums[:, 1:])
+            gaps = np.zeros(sums.shape, dtype=np.int32)
+            np.cumsum(missing, axis=1, out=gaps[:, 1:])
+            means = out[rows, window - 1:]
+            np.subtract(sums[:, window:], sums[:, :-window], out=means)
+            means /= window
+            means[gaps[:, window:] != gaps[:, :-window]] = np.nan
+        return out
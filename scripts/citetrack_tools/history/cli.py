@@ -0,0 +1,461 @@
+"""
+Command-line entry point for the citation-history tools.
+
+    python3 -m citetrack_tools.history info ../macOS/sample_import_data.json
+    python3 -m citetrack_tools.history convert export.csv backup.json --since 2025-08-01
+    python3 -m citetrack_tools.history validate export.csv backup.json
+    python3 -m citetrack_tools.history merge a.json b.json export.csv -o merged.json
+    python3 -m citetrack_tools.history pack ../iOS/citetrack_init.json -o history.cthist
+    python3 -m citetrack_tools.history query history.cthist -s kukA0LcAAAAJ --since 2025-08-01
+    python3 -m citetrack_tools.history stats ../iOS/citetrack_init.json --resample W --anomalies
+    python3 -m citetrack_tools.history synthesize big.json --scholars 10000 --snapshots 1000 --seed 7
+
+``info`` streams each history file into columns and summarizes it: records,
+scholars, time span and load time. ``convert`` streams a file between the
+CSV and JSON import formats, optionally keeping only some scholars or a date
+range, and ``validate`` reports what the app's importer would drop or change.
+``merge`` combines overlapping files into one deduplicated import file.
+``pack``, ``unpack``, ``query`` and ``compact`` work on binary history
+stores (needs NumPy). ``stats`` prints each scholar's growth figures and
+trend, and optionally a resampled series and suspicious jumps (needs NumPy).
+``synthesize`` writes a seeded synthetic import file of any size, for stress
+tests (needs NumPy; ``scholar synthesize`` writes the matching pages).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def cmd_info(args):
+    import numpy as np
+
+    from .columnar import load
+    from .records import format_timestamp
+
+    summaries = []
+    for path in args.files:
+        started = time.perf_counter()
+        try:
+            history = load(path)
+        except (OSError, ValueError) as error:
+            print(f'❌ {path}: {error}', file=sys.stderr)
+            return 1
+        seconds = time.perf_counter() - started
+        summary = {
+            'file': path, 'records': len(history), 'scholars': len(history.table),
+            'first': format_timestamp(history.timestamps.min()) if len(history) else None,
+            'last': format_timestamp(history.timestamps.max()) if len(history) else None,
+            'column_bytes': history.nbytes, 'seconds': round(seconds, 4),
+        }
+        if args.scholars:
+            counts = np.bincount(history.scholars, minlength=len(history.table)).tolist()
+            summary['by_scholar'] = [{'id': i, 'name': name, 'records': n} for i, name, n in
+                                     zip(history.scholar_ids, history.scholar_names, counts)]
+        summaries.append(summary)
+    if args.json:
+        print(json.dumps(summaries, indent=2, ensure_ascii=False))
+        return 0
+    for s in summaries:
+        span = f'{s["first"]} .. {s["last"]}' if s['records'] else 'empty'
+        print(f'✅ {s["file"]}: {s["records"]:,} records, {s["scholars"]} scholars, {span} '
+              f'({s["column_bytes"] / 1e6:.1f} MB of columns, {s["seconds"] * 1000:.0f} ms)')
+        for entry in s.get('by_scholar', ()):
+            print(f'   {entry["id"]} {entry["name"] or "(no name)"}: {entry["records"]:,}')
+    return 0
+
+
+def _timezone(args):
+    from .convert import get_timezone
+    return get_timezone(args.timezone)
+
+
+def cmd_convert(args):
+    from .convert import Filter, convert, parse_bound, print_issues
+
+    started = time.perf_counter()
+    try:
+        tz = _timezone(args)
+        row_filter = Filter(args.scholar,
+                            parse_bound(args.since, tz) if args.since else None,
+                            parse_bound(args.until, tz, end=True) if args.until else None)
+        target = sys.stdout if args.output == '-' else args.output
+        target_format = args.to or (None if args.output != '-' else 'json')
+        stats = convert(args.input, target, args.source_format, target_format, row_filter,
+                        tz=tz, lenient=args.lenient_dates)
+    except (OSError, ValueError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - started
+    report = sys.stderr
+    print(f'✅ {stats.records:,} records of {stats.scholars} scholars written '
+          f'({stats.filtered:,} filtered out, {stats.bytes / 1e6:.1f} MB in {seconds:.2f} s)',
+          file=report)
+    if stats.issues:
+        print(f'⚠️  {len(stats.issues):,} rows skipped or changed:', file=report)
+        print_issues(args.input, stats.issues, file=report)
+    return 0
+
+
+def cmd_validate(args):
+    from .convert import print_issues, validate
+
+    failed = False
+    for path in args.files:
+        try:
+            records, scholars, issues = validate(path, args.source_format, _timezone(args),
+                                                 limit=args.limit)
+        except (OSError, ValueError) as error:
+            print(f'❌ {path}: {error}')
+            failed = True
+            continue
+        if issues:
+            failed = True
+            print(f'❌ {path}: {records:,} records of {scholars} scholars import; '
+                  f'{len(issues):,} issues')
+            print_issues(path, issues)
+        else:
+            print(f'✅ {path}: {records:,} records of {scholars} scholars import cleanly')
+    return 1 if failed else 0
+
+
+def cmd_merge(args):
+    from .convert import print_issues
+    from .merge import merge
+
+    started = time.perf_counter()
+    try:
+        stats = merge(args.files, args.output, args.to, args.source_format,
+                      collapse=not args.keep_unchanged,
+                      run_size=args.run_size, tz=_timezone(args), lenient=args.lenient_dates,
+                      tmpdir=args.tmpdir)
+    except (OSError, ValueError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - started
+    print(f'✅ {args.output}: {stats.records:,} records of {stats.scholars} scholars from '
+          f'{stats.read:,} in {stats.inputs} files ({stats.runs} sorted runs, {seconds:.2f} s)')
+    print(f'   dropped {stats.duplicates:,} duplicates and {stats.unchanged:,} unchanged counts')
+    if stats.conflicts:
+        print(f'⚠️  {stats.conflicts:,} records had another count at the same time in an earlier '
+              'file; the earlier one was kept')
+    if stats.issues:
+        print(f'⚠️  {len(stats.issues):,} rows skipped or changed:')
+        print_issues('input', stats.issues)
+    return 0
+
+
+def cmd_pack(args):
+    from . import store
+
+    started = time.perf_counter()
+    try:
+        if args.append and os.path.exists(args.output):
+            from .columnar import load_many
+            appended, refused = store.append(args.output, load_many(args.files))
+            message = f'{appended:,} records appended'
+            if refused:
+                message += f', {refused:,} not newer than the stored ones refused'
+        else:
+            message = f'{store.from_json(args.files, args.output):,} records written'
+    except (OSError, ValueError, store.StoreError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - started
+    print(f'✅ {args.output}: {message} ({os.path.getsize(args.output) / 1e6:.1f} MB, {seconds:.2f} s)')
+    return 0
+
+
+def _bounds(args):
+    from .convert import parse_bound
+    tz = _timezone(args)
+    return (parse_bound(args.since, tz) if args.since else None,
+            parse_bound(args.until, tz, end=True) if args.until else None)
+
+
+def cmd_unpack(args):
+    from . import store
+
+    try:
+        since, until = _bounds(args)
+        target = sys.stdout if args.output == '-' else args.output
+        fmt = args.to or ('json' if args.output == '-' else None)
+        if fmt is None:
+            from .convert import detect_format
+            fmt = detect_format(args.output)
+        records = store.to_json(args.store, target, fmt, args.scholar, since, until)
+    except (OSError, ValueError, store.StoreError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    print(f'✅ {records:,} records written', file=sys.stderr)
+    return 0
+
+
+def cmd_query(args):
+    from . import store
+    from .records import format_timestamp
+
+    try:
+        since, until = _bounds(args)
+        history = store.HistoryStore(args.store)
+    except (OSError, ValueError, store.StoreError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    with history:
+        if not args.scholar:
+            print(f'✅ {args.store}: {len(history):,} records, {len(history.table)} scholars, '
+                  f'{history.file_size / 1e6:.1f} MB')
+            for sid, name, segments in zip(history.scholar_ids, history.scholar_names, history.segments):
+                count = sum(segment.length for segment in segments)
+                print(f'   {sid} {name or "(no name)"}: {count:,} records in {len(segments)} segments')
+            return 0
+        results = {}
+        for sid in args.scholar:
+            started = time.perf_counter()
+            try:
+                rows = history.range(sid, since, until)
+            except KeyError:
+                print(f'❌ {sid}: not in {args.store}', file=sys.stderr)
+                return 1
+            micros = (time.perf_counter() - started) * 1e6
+            results[sid] = [{'timestamp': format_timestamp(t), 'citationCount': c} for t, c in
+                            zip(rows['timestamp'].tolist(), rows['count'].tolist())]
+            if not args.json:
+                print(f'👀 {sid}: {len(rows):,} records ({micros:.0f} µs)')
+                for row in results[sid]:
+                    print(f'   {row["timestamp"]} {row["citationCount"]:>10,}')
+        if args.json:
+            print(json.dumps(results, indent=2))
+    return 0
+
+
+def cmd_compact(args):
+    from . import store
+
+    try:
+        saved = store.compact(args.store)
+    except (OSError, ValueError, store.StoreError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    print(f'✅ {args.store}: {saved:,} bytes reclaimed')
+    return 0
+
+
+def cmd_stats(args):
+    import numpy as np
+
+    from .analytics import Analytics
+    from .columnar import load_many
+    from .records import format_timestamp
+
+    try:
+        started = time.perf_counter()
+        analytics = Analytics(load_many(args.files))
+        summary = analytics.summary()
+        grid = analytics.resample(args.resample) if args.resample else None
+        flagged = analytics.anomalies(z=args.z) if args.anomalies else None
+        seconds = time.perf_counter() - started
+    except (OSError, ValueError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+
+    def number(value):
+        return None if np.isnan(value) else round(float(value), 4)
+
+    if grid is not None:
+        columns = slice(-args.periods, None)
+        periods, values = grid.periods[columns], grid.values[:, columns]
+        deltas, rates = grid.deltas()[:, columns], grid.growth_rates()[:, columns]
+    scholars = []
+    for i, sid in enumerate(summary['scholar_id']):
+        scholar = {
+            'id': sid, 'name': summary['name'][i], 'records': int(summary['entries'][i]),
+            'first': format_timestamp(summary['first'][i]), 'last': format_timestamp(summary['last'][i]),
+            'current': int(summary['current'][i]), 'total_change': int(summary['total_change'][i]),
+            'average_daily_change': number(summary['average_daily_change'][i]),
+            'growth_rate': number(summary['growth_rate'][i]),
+            'peak': int(summary['peak'][i]), 'peak_date': format_timestamp(summary['peak_date'][i]),
+            'volatility': number(summary['volatility'][i]), 'trend': str(summary['trend'][i]),
+            'slope': number(summary['slope'][i]), 'correlation': number(summary['correlation'][i]),
+        }
+        if grid is not None:
+            scholar['series'] = [{'period': str(period), 'count': number(value), 'change': number(delta),
+                                  'growth_rate': number(rate)} for period, value, delta, rate in
+                                 zip(periods, values[i], deltas[i], rates[i])]
+        scholars.append(scholar)
+    anomalies = []
+    if flagged is not None:
+        anomalies = [{'id': sid, 'timestamp': format_timestamp(t), 'count': c, 'change': d,
+                      'score': round(score, 2), 'kind': kind}
+                     for sid, t, c, d, score, kind in zip(
+                         flagged['scholar_id'], flagged['timestamp'].tolist(), flagged['count'].tolist(),
+                         flagged['delta'].tolist(), flagged['score'].tolist(), flagged['kind'].tolist())]
+
+    if args.json:
+        report = {'scholars': scholars}
+        if flagged is not None:
+            report['anomalies'] = anomalies
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return 0
+    print(f'✅ {len(analytics.history):,} records of {len(scholars)} scholars '
+          f'({seconds * 1000:.0f} ms)')
+    for s in scholars:
+        growth = 'n/a' if s['growth_rate'] is None else f'{s["growth_rate"]:+.2f}%'
+        print(f'👀 {s["id"]} {s["name"] or "(no name)"}: {s["current"]:,} citations, '
+              f'{s["total_change"]:+,} ({growth}) since {s["first"][:10]}, '
+              f'{s["average_daily_change"]:.1f}/day, {s["trend"]}')
+        for row in s.get('series', ()):
+            count = '-' if row['count'] is None else f'{row["count"]:,.0f}'
+            change = '' if row['change'] is None else f'{row["change"]:+,.0f}'
+            rate = '' if row['growth_rate'] is None else f'{row["growth_rate"]:+.2f}%'
+            print(f'   {row["period"]} {count:>12} {change:>9} {rate:>8}')
+    if flagged is not None:
+        if anomalies:
+            print(f'⚠️  {len(anomalies):,} suspicious changes:')
+        else:
+            print('✅ no suspicious changes')
+        for a in anomalies:
+            print(f'   {a["id"]} {a["timestamp"]} {a["count"]:>10,} {a["change"]:>+9,} {a["kind"]} '
+                  f'(z {a["score"]:+.1f})')
+    return 0
+
+
+def cmd_synthesize(args):
+    from .synthetic import write_import
+
+    started = time.perf_counter()
+    try:
+        records = write_import(args.output, args.scholars, args.snapshots, args.seed, args.start,
+                               args.every)
+    except (OSError, ValueError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - started
+    size = os.path.getsize(args.output) / 1e6
+    print(f'✅ {args.output}: {records:,} records ({size:.1f} MB, {seconds:.2f} s)')
+    return 0
+
+
+def synthetic_arguments(parser):
+    """The dataset-shape options ``history synthesize`` and ``scholar synthesize`` share."""
+    parser.add_argument('--scholars', type=int, default=1000, help='default: %(default)s')
+    parser.add_argument('--snapshots', type=int, default=365,
+                        help='records per scholar (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='same seed, same data (default: %(default)s)')
+    parser.add_argument('--start', default='2025-01-01',
+                        help='date of the first snapshot (default: %(default)s)')
+    parser.add_argument('--every', type=int, default=86400,
+                        help='seconds between snapshots (default: %(default)s, daily)')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python3 -m citetrack_tools.history',
+                                     description='CiteTrack citation-history tooling')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    info = commands.add_parser('info', help='summarize history files (needs NumPy)')
+    info.add_argument('files', nargs='+', help='history JSON files (record array or export object)')
+    info.add_argument('-s', '--scholars', action='store_true', help='also count records per scholar')
+    info.add_argument('--json', action='store_true', help='print JSON instead of text')
+    info.set_defaults(func=cmd_info)
+
+    formats = ('csv', 'json')
+    zone = argparse.ArgumentParser(add_help=False)
+    zone.add_argument('--from', dest='source_format', choices=formats,
+                      help='input format (default: from the extension)')
+    zone.add_argument('--timezone', default='UTC',
+                      help='time zone of CSV dates, as the importing device sees them: '
+                           'UTC, local or an IANA name (default: %(default)s)')
+
+    convert = commands.add_parser('convert', parents=[zone],
+                                  help='stream between the CSV and JSON import formats')
+    convert.add_argument('input', help='CSV export or JSON history file')
+    convert.add_argument('output', help="output file, or '-' for stdout")
+    convert.add_argument('--to', choices=formats, help='output format (default: from the extension)')
+    convert.add_argument('-s', '--scholar', action='append',
+                         help='keep only this scholar ID (repeatable)')
+    convert.add_argument('--since', help='keep records from this date or ISO timestamp on')
+    convert.add_argument('--until', help='keep records up to this date (inclusive) or timestamp')
+    convert.add_argument('--lenient-dates', action='store_true',
+                         help="also read the app's display dates ('Jul 23, 2025 at 7:13 AM')")
+    convert.set_defaults(func=cmd_convert)
+
+    validate = commands.add_parser('validate', parents=[zone],
+                                   help='report rows the importer would skip or change')
+    validate.add_argument('files', nargs='+', help='CSV exports or JSON history files')
+    validate.add_argument('--limit', type=int, default=20, help='issues to list per file')
+    validate.set_defaults(func=cmd_validate)
+
+    merge = commands.add_parser('merge', parents=[zone],
+                                help='merge overlapping history files into one import file')
+    merge.add_argument('files', nargs='+', help='CSV exports or JSON history files; '
+                                               'earlier files win on conflicting records')
+    merge.add_argument('-o', '--output', required=True, help='merged CSV or JSON file')
+    merge.add_argument('--to', choices=formats, help='output format (default: from the extension)')
+    merge.add_argument('--keep-unchanged', action='store_true',
+                       help='keep records whose count equals the previous one')
+    merge.add_argument('--run-size', type=int, default=250_000,
+                       help='records per sorted run held in memory (default: %(default)s)')
+    merge.add_argument('--tmpdir', help='directory for the sorted runs (default: the system one)')
+    merge.add_argument('--lenient-dates', action='store_true',
+                       help="also read the app's display dates in CSV files")
+    merge.set_defaults(func=cmd_merge)
+
+    pack = commands.add_parser('pack', help='pack history JSON files into a binary store (needs NumPy)')
+    pack.add_argument('files', nargs='+', help='history JSON files (record array or export object)')
+    pack.add_argument('-o', '--output', required=True, help='store file, such as history.cthist')
+    pack.add_argument('-a', '--append', action='store_true',
+                      help='append to the store if it exists instead of replacing it')
+    pack.set_defaults(func=cmd_pack)
+
+    ranged = argparse.ArgumentParser(add_help=False)
+    ranged.add_argument('-s', '--scholar', action='append', help='scholar ID (repeatable)')
+    ranged.add_argument('--since', help='from this date or ISO timestamp on')
+    ranged.add_argument('--until', help='up to this date (inclusive) or timestamp')
+    ranged.add_argument('--timezone', default='UTC', help='time zone of bare dates (default: %(default)s)')
+
+    unpack = commands.add_parser('unpack', parents=[ranged],
+                                 help='write a store (or part of it) as an import file')
+    unpack.add_argument('store')
+    unpack.add_argument('output', help="CSV or JSON file, or '-' for stdout")
+    unpack.add_argument('--to', choices=formats, help='output format (default: from the extension)')
+    unpack.set_defaults(func=cmd_unpack)
+
+    query = commands.add_parser('query', parents=[ranged],
+                                help="list a store's scholars, or the records of some in a range")
+    query.add_argument('store')
+    query.add_argument('--json', action='store_true', help='print JSON instead of text')
+    query.set_defaults(func=cmd_query)
+
+    compact = commands.add_parser('compact', help='rewrite a store with one segment per scholar')
+    compact.add_argument('store')
+    compact.set_defaults(func=cmd_compact)
+
+    stats = commands.add_parser('stats', help="scholars' growth, trend and suspicious jumps (needs NumPy)")
+    stats.add_argument('files', nargs='+', help='history JSON files (record array or export object)')
+    stats.add_argument('-r', '--resample', choices=('D', 'W', 'M'),
+                       help='also show the last periods of a daily, weekly or monthly series')
+    stats.add_argument('--periods', type=int, default=8, help='periods to show (default: %(default)s)')
+    stats.add_argument('-a', '--anomalies', action='store_true', help='list suspicious count changes')
+    stats.add_argument('-z', type=float, default=6.0,
+                       help='standard deviations from the usual daily change that count as a spike '
+                            '(default: %(default)s)')
+    stats.add_argument('--json', action='store_true', help='print JSON instead of text')
+    stats.set_defaults(func=cmd_stats)
+
+    synthesize = commands.add_parser('synthesize', help='write a synthetic import file (needs NumPy)')
+    synthesize.add_argument('output', help='JSON import file')
+    synthetic_arguments(synthesize)
+    synthesize.set_defaults(func=cmd_synthesize)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
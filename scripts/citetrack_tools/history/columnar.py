@@ -0,0 +1,183 @@
+"""
+Columnar loader for citation-history JSON files.
+
+The app writes and reads history in two shapes:
+
+* a top-level array of records, as in ``macOS/sample_import_data.json`` and
+  ``iOS/citetrack_init.json``::
+
+      [{"scholarId": ..., "scholarName": ..., "citationCount": ..., "timestamp": "2025-07-23T07:13:35Z"}, ...]
+
+* an export object with a ``scholars`` array (``id``, ``name``) next to a
+  ``citationHistory`` (or ``history``) array of records without names, as in
+  ``macOS/test_import_data.json``. ``DataExportManager`` encodes timestamps
+  as seconds since 2001-01-01 (Foundation's reference date) in that case.
+
+Key order varies between files and does not matter. :func:`load` streams
+the file in chunks: records are flat JSON objects, so each chunk is cut into
+complete objects with one regex, decoded with a single ``json.loads`` call
+and appended to NumPy columns right away. No list of every record is ever
+built; memory is the columns (20 bytes per record) plus one chunk.
+"""
+
+import re
+from operator import itemgetter
+
+import numpy as np
+
+from .records import CHUNK_SIZE, iter_record_batches, parse_timestamp
+
+_SCHOLAR_ID, _COUNT, _TIMESTAMP = (itemgetter('scholarId'), itemgetter('citationCount'),
+                                   itemgetter('timestamp'))
+
+# Any number of back-to-back ``2025-07-23T07:13:35Z`` timestamps
+_FAST_TIMESTAMPS = re.compile(r'(?:\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ)*')
+
+
+def _epochs(values):
+    """int64 epoch seconds for a batch of timestamps, vectorized for the common ``...Z`` form."""
+    try:
+        joined = ''.join(values)
+    except TypeError:
+        joined = None
+    if joined is not None and _FAST_TIMESTAMPS.fullmatch(joined):
+        # fixed-width ASCII: let NumPy parse all of them in one call
+        fixed = np.frombuffer(joined.encode('ascii'), dtype='S20').astype('S19')
+        return fixed.astype('datetime64[s]').astype(np.int64)
+    return np.fromiter((parse_timestamp(v) for v in values), dtype=np.int64, count=len(values))
+
+
+class ScholarTable:
+    """Interned scholar IDs and names; a scholar is identified by its index."""
+
+    __slots__ = ('ids', 'names', 'index', 'unnamed')
+
+    def __init__(self):
+        self.ids = []
+        self.names = []
+        self.index = {}
+        # scholars seen without a name so far
+        self.unnamed = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def intern(self, scholar_id, name=None):
+        """Index of ``scholar_id``, adding it on first sight; a non-empty ``name`` is remembered."""
+        i = self.index.get(scholar_id)
+        if i is None:
+            i = self.index[scholar_id] = len(self.ids)
+            self.ids.append(scholar_id)
+            self.names.append(name or '')
+            self.unnamed += not name
+        elif name and not self.names[i]:
+            self.names[i] = name
+            self.unnamed -= 1
+        return i
+
+
+class History:
+    """Citation history as parallel NumPy columns, one row per record.
+
+    ``timestamps`` (int64 epoch seconds), ``counts`` (int64) and ``scholars``
+    (int32 index into ``table``) keep the file's record order unless sorted.
+    """
+
+    __slots__ = ('timestamps', 'counts', 'scholars', 'table')
+
+    def __init__(self, timestamps, counts, scholars, table):
+        self.timestamps = timestamps
+        self.counts = counts
+        self.scholars = scholars
+        self.table = table
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __repr__(self):
+        return f'History({len(self)} records, {len(self.table)} scholars)'
+
+    @property
+    def scholar_ids(self):
+        return self.table.ids
+
+    @property
+    def scholar_names(self):
+        return self.table.names
+
+    @property
+    def nbytes(self):
+        return self.timestamps.nbytes + self.counts.nbytes + self.scholars.nbytes
+
+    def take(self, rows):
+        """A new History with the given rows (an index array or boolean mask)."""
+        return History(self.timestamps[rows], self.counts[rows], self.scholars[rows], self.table)
+
+    def sorted(self):
+        """Rows ordered by scholar, then timestamp (stable, so file order breaks ties)."""
+        return self.take(np.lexsort((self.timestamps, self.scholars)))
+
+    def for_scholar(self, scholar_id):
+        """The rows of one scholar, in the current order."""
+        i = self.table.index.get(scholar_id)
+        if i is None:
+            return self.take(np.zeros(0, dtype=np.int64))
+        return self.take(self.scholars == i)
+
+    def records(self):
+        """Yield ``(scholar ID, scholar name, citation count, epoch seconds)`` per row."""
+        ids, names = self.table.ids, self.table.names
+        for s, count, epoch in zip(self.scholars.tolist(), self.counts.tolist(),
+                                   self.timestamps.tolist()):
+            yield ids[s], names[s], count, epoch
+
+
+class _Columns:
+    """Growable columns: per-chunk arrays, concatenated once at the end."""
+
+    def __init__(self, table):
+        self.table = table
+        self.timestamps, self.counts, self.scholars = [], [], []
+
+    def add(self, records):
+        table = self.table
+        history = [r for r in records if 'scholarId' in r]
+        if len(history) < len(records):
+            for record in records:
+                if 'scholarId' not in record and 'id' in record and 'name' in record:
+                    table.intern(record['id'], record['name'])
+        if not history:
+            return
+        rows = list(map(table.index.get, map(_SCHOLAR_ID, history)))
+        if None in rows or table.unnamed:
+            # new scholars, or names still to learn: the slow path, per record
+            intern = table.intern
+            rows = [intern(r['scholarId'], r.get('scholarName')) for r in history]
+        try:
+            counts = list(map(_COUNT, history))
+        except KeyError:
+            counts = [r.get('citationCount', 0) for r in history]
+        self.scholars.append(np.array(rows, dtype=np.int32))
+        self.counts.append(np.array(counts, dtype=np.int64))
+        self.timestamps.append(_epochs(list(map(_TIMESTAMP, history))))
+
+    def finish(self):
+        def join(parts, dtype):
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+        return History(join(self.timestamps, np.int64), join(self.counts, np.int64),
+                       join(self.scholars, np.int32), self.table)
+
+
+def load(path, chunk_size=CHUNK_SIZE):
+    """Stream a history JSON file (either shape) into a :class:`History`."""
+    return load_many([path], chunk_size)
+
+
+def load_many(paths, chunk_size=CHUNK_SIZE):
+    """Stream several files into one :class:`History` with a shared scholar table."""
+    columns = _Columns(ScholarTable())
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for batch in iter_record_batches(f, chunk_size):
+                columns.add(batch)
+    return columns.finish()
@@ -0,0 +1,570 @@
+"""
+Streaming conversion and validation between the apps' CSV and JSON imports.
+
+Two import formats are targeted byte for byte:
+
+* CSV, as read by ``DataExportManager.parseCSVData``::
+
+      Type,Scholar ID,Scholar Name,Citation Count,Date
+      Scholar,kukA0LcAAAAJ,"Yoshua Bengio",974568,"2025-09-17 12:24:25"
+      History,kukA0LcAAAAJ,,959186,"2025-07-23 07:13:35"
+
+  Lines are split on commas outside double quotes; quotes only toggle quoting
+  and are dropped (there is no escaping). Rows with fewer than five fields
+  are skipped, and so are ``History`` rows whose date does not parse as
+  ``yyyy-MM-dd HH:mm:ss`` in the device's time zone. The app's own CSV
+  export writes dates with ``displayString`` ("Jul 23, 2025 at 7:13 AM"),
+  which its importer then drops; ``lenient=True`` reads those too.
+
+* JSON record arrays, as read by ``BackupService.importFromJSONData`` and
+  written by its export (``JSONSerialization`` pretty-printed)::
+
+      [
+        {
+          "citationCount" : 959186,
+          "scholarId" : "kukA0LcAAAAJ",
+          "scholarName" : "Yoshua Bengio",
+          "timestamp" : "2025-07-23T07:13:35Z"
+        }
+      ]
+
+  Timestamps must be ``ISO8601DateFormatter`` strings (no fractional
+  seconds). Export objects with ``scholars`` and ``citationHistory`` (or
+  ``history``) arrays are read as well.
+
+Both directions make two sequential passes over the input in fixed-size
+chunks: the first collects one entry per scholar (name, latest count and
+date, which CSV ``Scholar`` rows need up front), the second writes the
+records, one output chunk per input chunk. Memory is one chunk plus the
+scholar table, whatever the file size.
+"""
+
+import calendar
+import json
+import re
+import sys
+from datetime import datetime, timezone
+
+from .records import CHUNK_SIZE, iter_record_batches, parse_timestamp
+
+CSV_HEADER = 'Type,Scholar ID,Scholar Name,Citation Count,Date'
+
+# DateFormatter.export in Shared/Utilities/DateExtensions.swift
+_EXPORT_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2}) (\d{1,2}):(\d{1,2}):(\d{1,2})')
+# What ISO8601DateFormatter() accepts: no fractional seconds, Z or a numeric offset
+_ISO_DATE = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:Z|[+-]\d\d:?\d\d)')
+_INTEGER = re.compile(r'[+-]?[0-9]+')
+# The time of day after a cached, zero-padded date: ' 07:13:35' or 'T07:13:35Z'
+_CLOCK = re.compile(r' (?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d')
+_ISO_CLOCK = re.compile(r'T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\dZ')
+
+# Date.displayString (medium date, short time) in English locales
+_DISPLAY_FORMATS = ('%b %d, %Y at %I:%M %p', '%b %d, %Y, %I:%M %p', '%b %d, %Y %I:%M %p',
+                    '%d %b %Y at %H:%M', '%d %b %Y, %H:%M', '%Y-%m-%d %H:%M')
+
+# Records seen and dropped per issue kind are all counted; only this many are kept
+MAX_ISSUES = 100
+
+
+def detect_format(path):
+    """``'csv'`` or ``'json'`` from the file extension."""
+    if path.lower().endswith('.csv'):
+        return 'csv'
+    if path.lower().endswith('.json'):
+        return 'json'
+    raise ValueError(f'cannot tell the format of {path}; pass it explicitly')
+
+
+def get_timezone(name):
+    """A tzinfo for ``'UTC'``, ``'local'`` or an IANA zone name such as ``Asia/Shanghai``."""
+    if name.upper() == 'UTC':
+        return timezone.utc
+    if name == 'local':
+        return datetime.now().astimezone().tzinfo
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'unknown time zone {name!r}') from None
+
+
+def parse_bound(value, tz=timezone.utc, end=False):
+    """Epoch seconds of a ``--since``/``--until`` value.
+
+    A bare date (``2025-08-01``) means the start of that day, or its last
+    second with ``end=True``; anything else is read as an ISO timestamp,
+    in ``tz`` unless it carries an offset.
+    """
+    if re.fullmatch(r'\d{4}-\d\d-\d\d', value):
+        day = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=tz)
+        return int(day.timestamp()) + (86399 if end else 0)
+    moment = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=tz)
+    return int(moment.timestamp())
+
+
+def split_csv_line(line):
+    """Fields of one CSV line exactly as ``DataExportManager.parseCSVLine`` splits them."""
+    fields = line.split(',')
+    if '"' not in line:
+        return fields
+    last = fields[-1]
+    if len(last) > 1 and last[0] == '"' == last[-1] and line.count('"') == 2:
+        # only the last field is quoted, as in History rows
+        fields[-1] = last[1:-1]
+        return fields
+    fields = ['']
+    for i, part in enumerate(line.split('"')):
+        if i % 2:
+            fields[-1] += part
+        else:
+            pieces = part.split(',')
+            fields[-1] += pieces[0]
+            fields.extend(pieces[1:])
+    return fields
+
+
+class _Dates:
+    """Parse and format the CSV ``yyyy-MM-dd HH:mm:ss`` dates in one time zone.
+
+    Whole days are cached, so a date costs a dict lookup and some arithmetic.
+    """
+
+    __slots__ = ('tz', 'lenient', '_days', '_labels')
+
+    def __init__(self, tz=timezone.utc, lenient=False):
+        self.tz = tz
+        self.lenient = lenient
+        self._days = {}
+        self._labels = {}
+
+    def _midnight(self, year, month, day):
+        """UTC epoch of a day's start, or None for an impossible date."""
+        key = f'{year:04d}-{month:02d}-{day:02d}'
+        midnight = self._days.get(key)
+        if midnight is None:
+            try:
+                datetime(year, month, day)
+            except ValueError:
+                return None
+            midnight = self._days[key] = calendar.timegm((year, month, day, 0, 0, 0))
+        return midnight
+
+    def parse(self, text):
+        """Epoch seconds, or None where the app's importer would drop the row."""
+        if self.tz is timezone.utc and len(text) == 19:
+            midnight = self._days.get(text[:10])
+            if midnight is not None and _CLOCK.fullmatch(text, 10):
+                return midnight + int(text[11:13]) * 3600 + int(text[14:16]) * 60 + int(text[17:])
+        match = _EXPORT_DATE.fullmatch(text)
+        if match is None:
+            return self._parse_display(text) if self.lenient else None
+        year, month, day, hour, minute, second = map(int, match.groups())
+        if hour > 23 or minute > 59 or second > 59:
+            return None
+        if self.tz is timezone.utc:
+            midnight = self._midnight(year, month, day)
+            return None if midnight is None else midnight + hour * 3600 + minute * 60 + second
+        try:
+            return int(datetime(year, month, day, hour, minute, second, tzinfo=self.tz).timestamp())
+        except ValueError:
+            return None
+
+    def parse_iso(self, text):
+        """Epoch seconds of an ``ISO8601DateFormatter`` string, or None if it would not read it."""
+        if len(text) == 20:
+            midnight = self._days.get(text[:10])
+            if midnight is not None and _ISO_CLOCK.fullmatch(text, 10):
+                return midnight + int(text[11:13]) * 3600 + int(text[14:16]) * 60 + int(text[17:19])
+        if not _ISO_DATE.fullmatch(text):
+            return None
+        try:
+            epoch = parse_timestamp(text)
+        except ValueError:
+            return None
+        if text.endswith('Z'):
+            self._midnight(int(text[:4]), int(text[5:7]), int(text[8:10]))
+        return epoch
+
+    def _parse_display(self, text):
+        text = text.replace('\u202f', ' ').replace('\xa0', ' ').strip()
+        for pattern in _DISPLAY_FORMATS:
+            try:
+                moment = datetime.strptime(text, pattern)
+            except ValueError:
+                continue
+            return int(moment.replace(tzinfo=self.tz).timestamp())
+        return None
+
+    def _label(self, day):
+        label = self._labels.get(day)
+        if label is None:
+            label = self._labels[day] = datetime.fromtimestamp(day * 86400, timezone.utc).strftime('%Y-%m-%d')
+        return label
+
+    def format(self, epoch):
+        """``2025-07-23 07:13:35`` in this time zone."""
+        if self.tz is not timezone.utc:
+            return datetime.fromtimestamp(epoch, self.tz).strftime('%Y-%m-%d %H:%M:%S')
+        day, seconds = divmod(int(epoch), 86400)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        return f'{self._label(day)} {hour:02d}:{minute:02d}:{second:02d}'
+
+    def format_iso(self, epoch):
+        """``2025-07-23T07:13:35Z``, whatever the time zone."""
+        day, seconds = divmod(int(epoch), 86400)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        return f'{self._label(day)}T{hour:02d}:{minute:02d}:{second:02d}Z'
+
+
+class Issues:
+    """Problems found while reading: counted by kind, the first ``limit`` kept in full."""
+
+    __slots__ = ('counts', 'examples', 'limit')
+
+    def __init__(self, limit=MAX_ISSUES):
+        self.counts = {}
+        self.examples = []
+        self.limit = limit
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def add(self, where, kind, detail):
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        if len(self.examples) < self.limit:
+            self.examples.append((where, kind, detail))
+
+
+# MARK: - Reading
+
+# A row is (kind, scholar ID, name, count, epoch seconds); kind is 'S' for a
+# scholar entry (count and epoch may be None) and 'H' for a history record.
+
+def _iter_csv_rows(f, dates, issues, chunk_size):
+    """Batches of rows from a CSV export, dropping what ``parseCSVData`` drops."""
+    buffer = ''
+    number = 0
+    header = True
+    while True:
+        chunk = f.read(chunk_size)
+        buffer += chunk
+        cut = buffer.rfind('\n') + 1 if chunk else len(buffer)
+        lines = buffer[:cut].splitlines()
+        buffer = buffer[cut:]
+        batch = []
+        for line in lines:
+            number += 1
+            if header:
+                header = False
+                if line.lstrip('\ufeff') != CSV_HEADER:
+                    issues.add(number, 'header', f'expected {CSV_HEADER!r}; the importer skips line 1 anyway')
+                continue
+            if not line:
+                continue
+            fields = split_csv_line(line)
+            if len(fields) < 5:
+                issues.add(number, 'short row', f'{len(fields)} fields; the importer skips it')
+                continue
+            kind, scholar_id, name, count, date = fields[:5]
+            if kind == 'History':
+                epoch = dates.parse(date)
+                if epoch is None:
+                    issues.add(number, 'bad date', f'{date!r} is not yyyy-MM-dd HH:mm:ss; '
+                                                   'the importer skips the row')
+                    continue
+                if _INTEGER.fullmatch(count):
+                    count = int(count)
+                else:
+                    issues.add(number, 'bad count', f'{count!r} is not an integer; imported as 0')
+                    count = 0
+                batch.append(('H', scholar_id, '', count, epoch))
+            elif kind == 'Scholar':
+                if _INTEGER.fullmatch(count):
+                    count = int(count)
+                else:
+                    issues.add(number, 'bad count', f'{count!r} is not an integer; imported as none')
+                    count = None
+                batch.append(('S', scholar_id, name, count, dates.parse(date)))
+            else:
+                issues.add(number, 'unknown type', f'{kind!r} rows are ignored by the importer')
+        if batch:
+            yield batch
+        if not chunk:
+            return
+
+
+def _iter_json_rows(f, dates, issues, chunk_size):
+    """Batches of rows from a record array or export object."""
+    number = 0
+    parse_iso = dates.parse_iso
+    for records in iter_record_batches(f, chunk_size):
+        batch = []
+        append = batch.append
+        for record in records:
+            number += 1
+            scholar_id = record.get('scholarId')
+            count = record.get('citationCount')
+            stamp = record.get('timestamp')
+            if type(scholar_id) is str and type(count) is int and type(stamp) is str:
+                epoch = parse_iso(stamp)
+                if epoch is not None and scholar_id:
+                    append(('H', scholar_id, record.get('scholarName') or '', count, epoch))
+                    continue
+            if scholar_id is None:
+                if 'id' in record and 'name' in record:
+                    updated = record.get('lastUpdated')
+                    append(('S', record['id'], record['name'], record.get('citations'),
+                            None if updated is None else parse_timestamp(updated)))
+                else:
+                    issues.add(number, 'not a record', f'keys {sorted(record)}')
+            elif not isinstance(scholar_id, str) or not scholar_id:
+                issues.add(number, 'bad scholar', f'scholarId {scholar_id!r}')
+            elif type(count) is not int:
+                issues.add(number, 'bad count', f'citationCount {count!r}; the importer skips it')
+            elif type(stamp) in (int, float):
+                # reference-date seconds of a DataExportManager export object
+                append(('H', scholar_id, record.get('scholarName') or '', count,
+                        parse_timestamp(stamp)))
+            else:
+                issues.add(number, 'bad date', f'timestamp {stamp!r} is not what ISO8601DateFormatter '
+                                               'reads; the importer skips it')
+        if batch:
+            yield batch
+
+
+def iter_rows(path, fmt=None, dates=None, issues=None, chunk_size=CHUNK_SIZE):
+    """Yield batches of ``(kind, scholar ID, name, count, epoch)`` rows from ``path``."""
+    fmt = fmt or detect_format(path)
+    dates = dates or _Dates()
+    issues = issues if issues is not None else Issues()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            yield from _iter_csv_rows(f, dates, issues, chunk_size)
+        else:
+            yield from _iter_json_rows(f, dates, issues, chunk_size)
+
+
+# MARK: - Converting
+
+class Filter:
+    """Scholar and inclusive time-range filter on history records."""
+
+    __slots__ = ('scholars', 'since', 'until')
+
+    def __init__(self, scholars=None, since=None, until=None):
+        self.scholars = frozenset(scholars) if scholars else None
+        self.since = since
+        self.until = until
+
+    @property
+    def by_time(self):
+        return self.since is not None or self.until is not None
+
+    def keep(self, scholar_id, epoch):
+        if self.scholars is not None and scholar_id not in self.scholars:
+            return False
+        if self.since is not None and epoch < self.since:
+            return False
+        return self.until is None or epoch <= self.until
+
+
+class Stats:
+    """What a conversion read and wrote."""
+
+    __slots__ = ('rows', 'records', 'filtered', 'scholars', 'bytes', 'issues')
+
+    def __init__(self, issues):
+        self.rows = 0
+        self.records = 0
+        self.filtered = 0
+        self.scholars = 0
+        self.bytes = 0
+        self.issues = issues
+
+
+def _scan_scholars(path, fmt, dates, keep, chunk_size):
+    """Pass one: ``{id: [name, latest count, latest epoch, records kept, listed]}`` in file order.
+
+    ``listed`` is the ``(count, epoch)`` of the scholar's own entry (a CSV
+    ``Scholar`` row or an export object's ``scholars`` item), if it has one.
+    """
+    scholars = {}
+    for batch in iter_rows(path, fmt, dates, Issues(0), chunk_size):
+        for kind, scholar_id, name, count, epoch in batch:
+            entry = scholars.get(scholar_id)
+            if entry is None:
+                entry = scholars[scholar_id] = ['', None, None, 0, None]
+            if name and not entry[0]:
+                entry[0] = name
+            if kind == 'S':
+                entry[4] = (count, epoch)
+            elif keep(scholar_id, epoch):
+                if entry[3] == 0 or epoch >= entry[2]:
+                    entry[1], entry[2] = count, epoch
+                entry[3] += 1
+    return scholars
+
+
+def convert(source, target, source_format=None, target_format=None, row_filter=None,
+            tz=timezone.utc, lenient=False, chunk_size=CHUNK_SIZE):
+    """Convert history file ``source`` to ``target`` (a path or an open text stream).
+
+    Formats default to the file extensions. Records the app's importer would
+    drop are skipped and reported in ``stats.issues``; returns a :class:`Stats`.
+    """
+    source_format = source_format or detect_format(source)
+    if target_format is None:
+        target_format = detect_format(target) if isinstance(target, str) else source_format
+    row_filter = row_filter or Filter()
+    keep = row_filter.keep
+    dates = _Dates(tz, lenient)
+    stats = Stats(Issues())
+
+    scholars = _scan_scholars(source, source_format, dates, keep, chunk_size)
+    wanted = {sid for sid, entry in scholars.items()
+              if (row_filter.scholars is None or sid in row_filter.scholars)
+              and (entry[3] or (entry[4] and not row_filter.by_time))}
+    if not row_filter.by_time:
+        # unfiltered, a scholar's own entry is the app's current state: keep it
+        for entry in scholars.values():
+            if entry[4] is not None:
+                entry[1], entry[2] = entry[4]
+
+    scholars = [(sid, entry[0], entry[1], entry[2]) for sid, entry in scholars.items()
+                if sid in wanted]
+
+    def batches():
+        for batch in iter_rows(source, source_format, dates, stats.issues, chunk_size):
+            records = []
+            for kind, sid, _, count, epoch in batch:
+                if kind != 'H':
+                    continue
+                stats.rows += 1
+                if keep(sid, epoch):
+                    records.append((sid, count, epoch))
+                else:
+                    stats.filtered += 1
+            yield records
+
+    writer = write_history(target, target_format, scholars, batches(), dates, stats.issues)
+    stats.records, stats.scholars, stats.bytes = writer.records, writer.scholars, writer.bytes
+    return stats
+
+
+class HistoryWriter:
+    """Writes records in an import format, one chunk of text per :meth:`write`.
+
+    :meth:`begin` takes every scholar up front, as ``(id, name, count,
+    epoch)``: CSV lists them in ``Scholar`` rows before the history, JSON
+    needs their names in each record.
+    """
+
+    def __init__(self, out, fmt, dates, issues):
+        self.out = out
+        self.fmt = fmt
+        self.dates = dates
+        self.issues = issues
+        self.records = 0
+        self.scholars = 0
+        self.bytes = 0
+        self._fragments = {}
+        self._separator = '[\n'
+
+    def _emit(self, text):
+        self.out.write(text)
+        self.bytes += len(text) if text.isascii() else len(text.encode('utf-8'))
+
+    def _csv_name(self, name, scholar_id):
+        # the importer has no quote escaping and splits lines on any newline
+        clean = name.replace('"', '').replace('\r', ' ').replace('\n', ' ')
+        if clean != name:
+            self.issues.add(scholar_id, 'name changed', f'{name!r} written as {clean!r}')
+        return clean
+
+    def begin(self, scholars):
+        if self.fmt == 'csv':
+            head = [CSV_HEADER, '\n']
+            for sid, name, count, epoch in scholars:
+                date = '' if epoch is None else self.dates.format(epoch)
+                head.append(f'Scholar,{sid},"{self._csv_name(name, sid)}",{count or 0},"{date}"\n')
+                self.scholars += 1
+            self._emit(''.join(head))
+            return
+        # JSONSerialization's pretty-printed layout, keys sorted
+        for sid, name, _, _ in scholars:
+            self._fragments[sid] = (f'    "scholarId" : {json.dumps(sid, ensure_ascii=False)},\n'
+                                    f'    "scholarName" : {json.dumps(name, ensure_ascii=False)},\n'
+                                    f'    "timestamp" : "')
+            self.scholars += 1
+
+    def write(self, records):
+        """Write ``(scholar ID, count, epoch)`` records of scholars passed to :meth:`begin`."""
+        if self.fmt == 'csv':
+            fmt = self.dates.format
+            parts = [f'History,{sid},,{count},"{fmt(epoch)}"\n' for sid, count, epoch in records]
+        else:
+            iso = self.dates.format_iso
+            fragments = self._fragments
+            parts = [f'  {{\n    "citationCount" : {count},\n{fragments[sid]}{iso(epoch)}"\n  }}'
+                     for sid, count, epoch in records]
+            if parts:
+                parts = [self._separator, ',\n'.join(parts)]
+                self._separator = ',\n'
+        self.records += len(records)
+        self._emit(''.join(parts))
+
+    def finish(self):
+        if self.fmt == 'json':
+            self._emit('[]\n' if self._separator == '[\n' else '\n]\n')
+
+
+def write_history(target, fmt, scholars, batches, dates=None, issues=None):
+    """Write ``scholars`` and the record ``batches`` to ``target`` (a path or text stream).
+
+    Returns the finished :class:`HistoryWriter`.
+    """
+    dates = dates or _Dates()
+    issues = issues if issues is not None else Issues()
+    if isinstance(target, str):
+        with open(target, 'w', encoding='utf-8', newline='') as out:
+            return write_history(out, fmt, scholars, batches, dates, issues)
+    writer = HistoryWriter(target, fmt, dates, issues)
+    writer.begin(scholars)
+    for records in batches:
+        writer.write(records)
+    writer.finish()
+    return writer
+
+
+# MARK: - Validating
+
+def validate(path, fmt=None, tz=timezone.utc, chunk_size=CHUNK_SIZE, limit=MAX_ISSUES):
+    """``(records the importer takes, scholars, Issues)`` for one file, in one streaming pass."""
+    fmt = fmt or detect_format(path)
+    issues = Issues(limit)
+    records = 0
+    scholars = set()
+    seen = set()
+    for batch in iter_rows(path, fmt, _Dates(tz), issues, chunk_size):
+        for kind, scholar_id, _, _, epoch in batch:
+            scholars.add(scholar_id)
+            if kind == 'H':
+                records += 1
+            elif kind == 'S' and scholar_id in seen:
+                issues.add(scholar_id, 'duplicate scholar', 'listed twice; the importer adds it twice')
+            if kind == 'S':
+                seen.add(scholar_id)
+    if fmt == 'json' and records == 0 and not scholars:
+        issues.add(path, 'empty', 'no history records found')
+    return records, len(scholars), issues
+
+
+def print_issues(path, issues, file=sys.stdout):
+    for kind, n in sorted(issues.counts.items(), key=lambda item: -item[1]):
+        print(f'   {kind}: {n:,}', file=file)
+    for where, kind, detail in issues.examples:
+        print(f'   {path}:{where}: {kind}: {detail}', file=file)
@@ -0,0 +1,189 @@
+"""
+K-way merge of overlapping citation-history files into one import file.
+
+Exports pile up per machine (``sample_import_data.json``,
+``test_import_data.json``, ``citetrack_init.json`` and their descendants) and
+overlap on ``(scholarId, timestamp)``. Importing them one by one duplicates
+every shared record, because ``saveHistoryIfChanged`` only skips a record
+whose count equals the latest one. :func:`merge` instead:
+
+1. reads every input (CSV or JSON, see :mod:`.convert`) in chunks and cuts the
+   records into sorted runs of about ``run_size``, spilled to temporary
+   files (an external sort);
+2. merges the runs with a heap (``heapq.merge``), ordered by scholar,
+   timestamp and input position;
+3. drops every record whose ``(scholarId, timestamp)`` was already written
+   (the first input listing it wins) and, unless ``collapse=False``, each
+   record whose count equals the scholar's previous one, as
+   ``saveHistoryIfChanged`` would;
+4. writes one canonical file, sorted by scholar and time, through
+   :func:`.convert.write_history`.
+
+Memory is one run plus a read buffer per open run and the scholar table,
+however large the inputs are. Runs are merged at most ``FAN_IN`` at a time.
+"""
+
+import heapq
+import os
+import tempfile
+from datetime import timezone
+
+from .convert import Issues, _Dates, detect_format, iter_rows, write_history
+from .records import CHUNK_SIZE
+
+RUN_SIZE = 250_000
+FAN_IN = 64
+
+# Records per write; the output goes out in chunks of about this many lines
+_BATCH = 8192
+
+
+class MergeStats:
+    """What a merge read, dropped and wrote."""
+
+    __slots__ = ('inputs', 'read', 'duplicates', 'conflicts', 'unchanged', 'records',
+                 'scholars', 'runs', 'bytes', 'issues')
+
+    def __init__(self, issues):
+        self.inputs = 0
+        self.read = 0
+        # same key and count / same key, different count (the first input's is kept)
+        self.duplicates = 0
+        self.conflicts = 0
+        self.unchanged = 0
+        self.records = 0
+        self.scholars = 0
+        self.runs = 0
+        self.bytes = 0
+        self.issues = issues
+
+
+def _write_run(directory, number, records):
+    """Spill sorted ``(scholar, epoch, input, count)`` tuples; returns the file path."""
+    path = os.path.join(directory, f'run-{number:05d}.tsv')
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for start in range(0, len(records), _BATCH):
+            f.write(''.join(f'{sid}\t{epoch}\t{source}\t{count}\n'
+                            for sid, epoch, source, count in records[start:start + _BATCH]))
+    return path
+
+
+def _read_run(path):
+    with open(path, 'r', encoding='utf-8', newline='\n') as f:
+        for line in f:
+            sid, epoch, source, count = line.split('\t')
+            yield sid, int(epoch), int(source), int(count)
+
+
+def _merge_runs(directory, paths, stats):
+    """Cascade merges until at most ``FAN_IN`` runs are left; returns their paths."""
+    number = len(paths)
+    while len(paths) > FAN_IN:
+        merged = []
+        for start in range(0, len(paths), FAN_IN):
+            group = paths[start:start + FAN_IN]
+            if len(group) == 1:
+                merged.extend(group)
+                continue
+            out = os.path.join(directory, f'run-{number:05d}.tsv')
+            number += 1
+            with open(out, 'w', encoding='utf-8', newline='\n') as f:
+                f.writelines(f'{sid}\t{epoch}\t{source}\t{count}\n'
+                             for sid, epoch, source, count in heapq.merge(*map(_read_run, group)))
+            for path in group:
+                os.remove(path)
+            merged.append(out)
+            stats.runs += 1
+        paths = merged
+    return paths
+
+
+def _canonical(records, stats, collapse):
+    """Batches of ``(scholar, count, epoch)`` from sorted records, deduplicated."""
+    batch = []
+    last_sid = last_epoch = last_count = None
+    last_source_count = None
+    for sid, epoch, _, count in records:
+        if sid == last_sid:
+            if epoch == last_epoch:
+                if count == last_source_count:
+                    stats.duplicates += 1
+                else:
+                    stats.conflicts += 1
+                continue
+            last_epoch, last_source_count = epoch, count
+            if collapse and count == last_count:
+                stats.unchanged += 1
+                continue
+        else:
+            last_sid, last_epoch, last_source_count = sid, epoch, count
+        last_count = count
+        batch.append((sid, count, epoch))
+        if len(batch) >= _BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def merge(sources, target, target_format=None, source_format=None, collapse=True,
+          run_size=RUN_SIZE, tz=timezone.utc, lenient=False, chunk_size=CHUNK_SIZE, tmpdir=None):
+    """Merge history files ``sources`` into ``target`` (a path or an open text stream).
+
+    Formats come from the file extensions unless given (``source_format``
+    applies to every input). Returns a :class:`MergeStats`.
+    """
+    if target_format is None:
+        target_format = detect_format(target) if isinstance(target, str) else 'json'
+    dates = _Dates(tz, lenient)
+    stats = MergeStats(Issues())
+    # scholar ID -> [name, (latest epoch, -input), latest count, the ID itself]; records
+    # share that one ID string instead of each keeping its own copy
+    scholars = {}
+
+    with tempfile.TemporaryDirectory(prefix='citetrack-merge-', dir=tmpdir) as directory:
+        runs = []
+        buffer = []
+        for source, path in enumerate(sources):
+            stats.inputs += 1
+            for batch in iter_rows(path, source_format, dates, stats.issues, chunk_size):
+                for kind, sid, name, count, epoch in batch:
+                    entry = scholars.get(sid)
+                    if entry is None:
+                        if '\t' in sid or '\n' in sid or '\r' in sid:
+                            stats.issues.add(path, 'bad scholar', f'scholar ID {sid!r}')
+                            continue
+                        entry = scholars[sid] = [name, None, None, sid]
+                    elif name and not entry[0]:
+                        entry[0] = name
+                    if kind != 'H':
+                        continue
+                    sid = entry[3]
+                    order = (epoch, -source)
+                    if entry[1] is None or order > entry[1]:
+                        entry[1], entry[2] = order, count
+                    buffer.append((sid, epoch, source, count))
+                    stats.read += 1
+                if len(buffer) >= run_size:
+                    buffer.sort()
+                    runs.append(_write_run(directory, len(runs), buffer))
+                    buffer = []
+        buffer.sort()
+        if runs:
+            if buffer:
+                runs.append(_write_run(directory, len(runs), buffer))
+                buffer = []
+            stats.runs = len(runs)
+            runs = _merge_runs(directory, runs, stats)
+            records = heapq.merge(*map(_read_run, runs))
+        else:
+            stats.runs = 1 if buffer else 0
+            records = iter(buffer)
+
+        listed = [(sid, name, count, None if order is None else order[0])
+                  for sid, (name, order, count, _) in scholars.items() if order is not None]
+        writer = write_history(target, target_format, listed,
+                               _canonical(records, stats, collapse), dates, stats.issues)
+    stats.records, stats.scholars, stats.bytes = writer.records, writer.scholars, writer.bytes
+    return stats
+
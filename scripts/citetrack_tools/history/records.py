@@ -0,0 +1,78 @@
+"""
+Chunked scanning of citation-history JSON files, standard library only.
+
+History records are flat JSON objects inside an array (see
+:mod:`citetrack_tools.history.columnar` for the shapes the apps use), so a
+file can be read in fixed-size chunks and each chunk cut into complete
+records without ever decoding the whole document.
+"""
+
+import json
+import re
+from datetime import datetime, timezone
+
+CHUNK_SIZE = 1 << 20
+
+# Seconds between 1970-01-01 and Foundation's reference date, 2001-01-01
+APPLE_EPOCH = 978307200
+
+# A flat object (no nested braces) directly inside an array
+_RECORD = re.compile(r'[\[,]\s*(\{[^{}"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^{}"]*)*\})')
+_SEPARATORS = ' \t\r\n,['
+
+
+def parse_timestamp(value):
+    """Epoch seconds of an ISO 8601 string or of Foundation reference-date seconds."""
+    if isinstance(value, (int, float)):
+        return int(value) + APPLE_EPOCH
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def format_timestamp(epoch):
+    """``2025-07-23T07:13:35Z``, the form the app's ISO8601DateFormatter writes."""
+    return datetime.fromtimestamp(int(epoch), timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _split(buffer):
+    """``(records, rest)``: the complete records at the start of ``buffer`` and the unread tail."""
+    cut = buffer.rfind('}') + 1
+    start = buffer.find('{', 0, cut)
+    if start >= 0 and not buffer[:start].strip(_SEPARATORS):
+        # the usual case, a run of array elements: decode it as one array
+        try:
+            records = json.loads('[' + buffer[start:cut] + ']')
+        except ValueError:
+            records = None
+        # a whole small file in one chunk parses too, as a single object of arrays
+        # (or of objects); records are flat
+        if records and type(records[0]) is dict and not any(
+                type(value) in (list, dict) for value in records[0].values()):
+            return records, buffer[cut:]
+    # array boundaries, other keys or a partial record: pick the records out one by one
+    objects = []
+    end = 0
+    for match in _RECORD.finditer(buffer):
+        objects.append(match.group(1))
+        end = match.end()
+    if not objects:
+        return [], buffer
+    # keep the unfinished tail, including the ',' or '[' before the next object
+    return json.loads('[' + ','.join(objects) + ']'), buffer[end:]
+
+
+def iter_record_batches(f, chunk_size=CHUNK_SIZE):
+    """Yield lists of the flat JSON objects in text stream ``f``, one list per chunk."""
+    buffer = ''
+    while True:
+        chunk = f.read(chunk_size)
+        buffer += chunk
+        records, buffer = _split(buffer)
+        if records:
+            yield records
+        if not chunk:
+            return
@@ -0,0 +1,368 @@
+"""
+Append-only binary store for citation history, read through mmap.
+
+A history record in the JSON import files takes about 150 bytes for three
+numbers; here it takes 16: an int64 epoch second and an int64 citation
+count, in per-scholar segments sorted by time. The file is only ever
+appended to::
+
+    header     b'CTHIST\\x00\\x01'
+    segment    records of one scholar, 16 bytes each, 8-byte aligned
+    ...
+    sparse     int64 timestamps of every STRIDE-th record of each segment
+    index      UTF-8 JSON: scholars (ID, name) and their segments
+    trailer    index offset, index length (uint64 each), b'CTHIDX01'
+
+Appending writes the new segments, then a new sparse block, index and
+trailer after the old ones, which stay valid for readers that still map
+them (:func:`compact` drops the stale blocks). A scholar's segments follow
+each other in time, as records older than what is stored are refused.
+
+:class:`HistoryStore` maps the file read-only and answers range queries
+without decoding anything: the segments are found from their first and
+last timestamps, the sparse index narrows the range to one block of
+``STRIDE`` records on each side and a binary search finishes it, so a query
+reads O(log n) pages. Results are NumPy views into the mapping (a copy
+only when a range spans several segments)::
+
+    store = HistoryStore('history.cthist')
+    rows = store.range('kukA0LcAAAAJ', since, until)
+    rows['timestamp'], rows['count']
+"""
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .columnar import History, ScholarTable, load_many
+
+MAGIC = b'CTHIST\x00\x01'
+TRAILER_MAGIC = b'CTHIDX01'
+_TRAILER = struct.Struct('<QQ8s')
+
+RECORD = np.dtype([('timestamp', '<i8'), ('count', '<i8')])
+STRIDE = 64
+VERSION = 1
+
+
+class StoreError(Exception):
+    pass
+
+
+class _Segment:
+    """One run of a scholar's records: where it is and its first and last timestamps."""
+
+    __slots__ = ('offset', 'length', 'first', 'last', 'sparse')
+
+    def __init__(self, offset, length, first, last, sparse):
+        self.offset = offset
+        self.length = length
+        self.first = first
+        self.last = last
+        # element offset of this segment's entries in the sparse block
+        self.sparse = sparse
+
+    def to_json(self):
+        return [self.offset, self.length, self.first, self.last, self.sparse]
+
+
+def _read_index(f, size):
+    if size < len(MAGIC) + _TRAILER.size:
+        raise StoreError('file too short for a history store')
+    f.seek(0)
+    if f.read(len(MAGIC)) != MAGIC:
+        raise StoreError('not a history store (bad magic)')
+    f.seek(size - _TRAILER.size)
+    offset, length, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+    if magic != TRAILER_MAGIC or offset + length + _TRAILER.size != size:
+        raise StoreError('history store has no valid index (interrupted append?)')
+    f.seek(offset)
+    index = json.loads(f.read(length).decode('utf-8'))
+    if index.get('version') != VERSION:
+        raise StoreError(f'unsupported history store version {index.get("version")}')
+    return index
+
+
+class HistoryStore:
+    """A history store file mapped read-only; see the module docstring."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            index = _read_index(f, size)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.stride = index['stride']
+        self.table = ScholarTable()
+        self.segments = []
+        for scholar in index['scholars']:
+            self.table.intern(scholar['id'], scholar['name'])
+            self.segments.append([_Segment(*entry) for entry in scholar['segments']])
+        self._sparse = np.frombuffer(self._map, dtype='<i8', count=index['sparse_length'],
+                                     offset=index['sparse_offset'])
+        self.file_size = size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        return sum(segment.length for segments in self.segments for segment in segments)
+
+    def __repr__(self):
+        return f'HistoryStore({self.path!r}, {len(self)} records, {len(self.table)} scholars)'
+
+    def close(self):
+        self._sparse = None
+        try:
+            self._map.close()
+        except BufferError:
+            # views handed out are still alive; the mapping goes when they do
+            pass
+
+    @property
+    def scholar_ids(self):
+        return self.table.ids
+
+    @property
+    def scholar_names(self):
+        return self.table.names
+
+    def _view(self, segment):
+        """The records of one segment, as a view into the mapping."""
+        return np.frombuffer(self._map, dtype=RECORD, count=segment.length, offset=segment.offset)
+
+    def _bound(self, records, segment, value, side):
+        """``np.searchsorted(records['timestamp'], value, side)`` via the sparse index."""
+        count = -(-segment.length // self.stride)
+        sparse = self._sparse[segment.sparse:segment.sparse + count]
+        k = int(np.searchsorted(sparse, value, side))
+        if k == 0:
+            return 0
+        lo, hi = (k - 1) * self.stride, min(k * self.stride, segment.length)
+        return lo + int(np.searchsorted(records['timestamp'][lo:hi], value, side))
+
+    def _scholar(self, scholar_id):
+        i = self.table.index.get(scholar_id)
+        if i is None:
+            raise KeyError(scholar_id)
+        return self.segments[i]
+
+    def records(self, scholar_id):
+        """All records of a scholar (``timestamp``, ``count``), oldest first."""
+        return self.range(scholar_id)
+
+    def range(self, scholar_id, since=None, until=None):
+        """Records of a scholar with ``since <= timestamp <= until`` (epoch seconds), oldest first.
+
+        A view into the file when the range lies in one segment (always, after
+        :func:`compact`), otherwise a concatenated copy. Raises KeyError for an
+        unknown scholar.
+        """
+        parts = []
+        for segment in self._scholar(scholar_id):
+            if since is not None and segment.last < since:
+                continue
+            if until is not None and segment.first > until:
+                break
+            records = self._view(segment)
+            lo = (0 if since is None or segment.first >= since
+                  else self._bound(records, segment, since, 'left'))
+            hi = (segment.length if until is None or segment.last <= until
+                  else self._bound(records, segment, until, 'right'))
+            parts.append(records[lo:hi])
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD)
+
+    def latest(self, scholar_id):
+        """``(epoch, count)`` of a scholar's newest record."""
+        record = self._view(self._scholar(scholar_id)[-1])[-1]
+        return int(record['timestamp']), int(record['count'])
+
+    def to_history(self):
+        """Everything as a :class:`.columnar.History`, sorted by scholar and time."""
+        parts, rows = [], []
+        for i, segments in enumerate(self.segments):
+            for segment in segments:
+                parts.append(self._view(segment))
+                rows.append(np.full(segment.length, i, dtype=np.int32))
+        if not parts:
+            empty = np.zeros(0, dtype=np.int64)
+            return History(empty, empty, np.zeros(0, dtype=np.int32), self.table)
+        records = np.concatenate(parts)
+        return History(records['timestamp'].copy(), records['count'].copy(),
+                       np.concatenate(rows), self.table)
+
+    def batches(self, scholars=None, since=None, until=None):
+        """Yield ``[(scholar ID, count, epoch)]`` per scholar, for :func:`.convert.write_history`."""
+        for scholar_id in self.table.ids if scholars is None else scholars:
+            if scholar_id not in self.table.index:
+                continue
+            records = self.range(scholar_id, since, until)
+            if len(records):
+                yield [(scholar_id, count, epoch) for epoch, count in
+                       zip(records['timestamp'].tolist(), records['count'].tolist())]
+
+
+# MARK: - Writing
+
+def _pad(f, position):
+    padding = -position % 8
+    f.write(b'\0' * padding)
+    return position + padding
+
+
+def _prepare(history):
+    """Per scholar ``(id, name, records)``, sorted by time with repeated timestamps dropped."""
+    history = history.sorted()
+    records = np.empty(len(history), dtype=RECORD)
+    records['timestamp'] = history.timestamps
+    records['count'] = history.counts
+    scholars = history.scholars
+    # first row of each scholar and of each new timestamp within it
+    keep = np.ones(len(history), dtype=bool)
+    keep[1:] = (scholars[1:] != scholars[:-1]) | (history.timestamps[1:] != history.timestamps[:-1])
+    records, scholars = records[keep], scholars[keep]
+    starts = np.flatnonzero(np.r_[True, scholars[1:] != scholars[:-1]]) if len(scholars) else []
+    ends = list(starts[1:]) + [len(scholars)]
+    for start, end in zip(starts, ends):
+        i = int(scholars[start])
+        yield history.table.ids[i], history.table.names[i], records[start:end]
+
+
+def _write_tail(f, position, scholars, stride):
+    """Write the sparse block, the index and the trailer for ``scholars``."""
+    sparse_offset = position = _pad(f, position)
+    sparse_length = 0
+    for _, _, segments, samples in scholars:
+        for segment, sample in zip(segments, samples):
+            if sample is not None:
+                segment.sparse = sparse_length
+                f.write(sample.astype('<i8').tobytes())
+                sparse_length += len(sample)
+    position += sparse_length * 8
+    index = {
+        'version': VERSION, 'stride': stride,
+        'sparse_offset': sparse_offset, 'sparse_length': sparse_length,
+        'scholars': [{'id': sid, 'name': name, 'segments': [s.to_json() for s in segments]}
+                     for sid, name, segments, _ in scholars],
+    }
+    blob = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    f.write(blob)
+    f.write(_TRAILER.pack(position, len(blob), TRAILER_MAGIC))
+
+
+def write(path, history, stride=STRIDE):
+    """Create (or replace) a store at ``path`` holding ``history``; returns the records written."""
+    scholars = []
+    written = 0
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        position = len(MAGIC)
+        for sid, name, records in _prepare(history):
+            position = _pad(f, position)
+            segment = _Segment(position, len(records), int(records['timestamp'][0]),
+                               int(records['timestamp'][-1]), 0)
+            f.write(records.tobytes())
+            position += records.nbytes
+            written += len(records)
+            scholars.append((sid, name, [segment], [records['timestamp'][::stride]]))
+        _write_tail(f, position, scholars, stride)
+    os.replace(tmp, path)
+    return written
+
+
+def append(path, history):
+    """Append ``history`` to the store at ``path``; returns ``(records appended, refused)``.
+
+    Each scholar's new records go into one new segment. Records not newer than
+    the scholar's latest stored one are refused, keeping segments in time order.
+    """
+    # scholar ID -> [name, segments, sparse samples per segment]
+    scholars = {}
+    with HistoryStore(path) as store:
+        stride = store.stride
+        size = store.file_size
+        for sid, name, segments in zip(store.table.ids, store.table.names, store.segments):
+            samples = [store._sparse[s.sparse:s.sparse - (-s.length // stride)].copy()
+                       for s in segments]
+            scholars[sid] = [name, list(segments), samples]
+    known = len(scholars)
+    appended = refused = 0
+    with open(path, 'r+b') as f:
+        f.seek(size)
+        position = size
+        try:
+            for sid, name, records in _prepare(history):
+                entry = scholars.get(sid)
+                if entry is None:
+                    entry = scholars[sid] = [name, [], []]
+                else:
+                    newer = records['timestamp'] > entry[1][-1].last
+                    refused += len(records) - int(newer.sum())
+                    records = records[newer]
+                    if name and not entry[0]:
+                        entry[0] = name
+                if not len(records):
+                    continue
+                position = _pad(f, position)
+                entry[1].append(_Segment(position, len(records), int(records['timestamp'][0]),
+                                         int(records['timestamp'][-1]), 0))
+                entry[2].append(records['timestamp'][::stride])
+                f.write(records.tobytes())
+                position += records.nbytes
+                appended += len(records)
+            if appended or len(scholars) > known:
+                _write_tail(f, position, [(sid, *entry) for sid, entry in scholars.items()], stride)
+            else:
+                f.truncate(size)
+        except BaseException:
+            # leave the file as it was, old index and trailer last
+            f.truncate(size)
+            raise
+    return appended, refused
+
+
+def compact(path):
+    """Rewrite the store with one segment per scholar and no stale blocks; returns bytes saved."""
+    before = os.path.getsize(path)
+    with HistoryStore(path) as store:
+        history = store.to_history()
+        stride = store.stride
+    write(path, history, stride)
+    return before - os.path.getsize(path)
+
+
+# MARK: - JSON round trip
+
+def from_json(paths, path, append_to_existing=False):
+    """Pack history JSON files into a store (new, or appended to); returns the records stored."""
+    history = load_many(paths)
+    if append_to_existing and os.path.exists(path):
+        return append(path, history)[0]
+    return write(path, history)
+
+
+def to_json(path, target, target_format='json', scholars=None, since=None, until=None):
+    """Write a store's records (optionally some scholars and a time range) as an import file."""
+    from .convert import write_history
+
+    with HistoryStore(path) as store:
+        ids = store.table.ids if scholars is None else [s for s in scholars if s in store.table.index]
+        listed = []
+        for sid in ids:
+            records = store.range(sid, since, until)
+            if len(records):
+                listed.append((sid, store.table.names[store.table.index[sid]],
+                               int(records['count'][-1]), int(records['timestamp'][-1])))
+        writer = write_history(target, target_format, listed,
+                               store.batches([sid for sid, _, _, _ in listed], since, until))
+    return writer.records
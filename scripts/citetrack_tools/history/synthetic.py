@@ -0,0 +1,209 @@
+"""
+Deterministic synthetic citation histories at any scale (needs NumPy).
+
+:func:`iter_blocks` draws ``scholars`` x ``snapshots`` records a block of
+whole scholars at a time. Each scholar gets a stable ID and name, a
+log-normal starting citation count and annual growth rate. Snapshots are
+about ``every`` seconds apart, at a random time within each interval. Each
+step adds a Poisson number of citations whose mean compounds at the growth
+rate, so every series is monotone non-decreasing and grows roughly
+exponentially, like the scholars in ``macOS/sample_import_data.json``. A
+block's random numbers come from a generator seeded with ``(seed, block)``,
+and blocks depend only on the dataset's shape, so the same arguments
+always give the same data, and any block can be regenerated on its own (as
+:mod:`..scholar.synthetic` does for matching profile pages).
+
+:func:`write_import` streams the records into an import file laid out
+exactly like ``sample_import_data.json``. Each block is assembled as a byte
+matrix (one fixed-width row per record, digits and dates gathered from
+lookup tables), and the padding in its variable-width fields is then
+dropped with a mask, so no Python code runs per record. Memory stays at a
+few blocks whatever the size: ten million records take seconds::
+
+    from citetrack_tools.history.synthetic import write_import
+
+    write_import('history.json', scholars=10_000, snapshots=1_000, seed=7)
+"""
+
+import json
+from collections import namedtuple
+
+import numpy as np
+
+# Records per block (whole scholars; a scholar with more snapshots is a block of its own)
+BLOCK_RECORDS = 1 << 14
+
+DAY = 86400
+START = '2025-01-01'
+
+# Scholar ID characters; generated IDs end in 'AAAAJ' like most real ones
+_ALPHABET = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-', np.uint8)
+_ID_MULTIPLIER = 0x9E3779B97F4A7C15 & ((1 << 42) - 1) | 1
+
+GIVEN = ('Yoshua', 'Ian', 'Aaron', 'Geoffrey', 'Yann', 'Li', 'Wei', 'María', 'José', 'Søren', 'Zoë',
+         'Kai', 'Fei-Fei', 'Andrew', 'Daphne', 'Jürgen', 'Hiroshi', 'Priya', 'Chen', 'Olga', 'Amara',
+         'Lucas', 'Sofia', 'Mohammed')
+SURNAMES = ('Bengio', 'Goodfellow', 'Courville', 'Hinton', 'LeCun', 'Chen', 'Wang', 'García', 'Müller',
+            'Nguyen', 'Kim', 'Smith', 'Ødegaard', 'Zhang', 'Liu', 'Rossi', 'Koller', 'Schmidhuber',
+            'Tanaka', 'Patel', 'Ivanova', 'Okafor', 'Silva', 'Haddad')
+_INITIALS = ('',) + tuple(f' {chr(c)}.' for c in range(ord('A'), ord('Z') + 1))
+
+Block = namedtuple('Block', 'first ids names counts timestamps')
+
+
+def _name_table():
+    """Every name :func:`scholar_names` can give, as a padded byte matrix of JSON string bodies."""
+    names = [f'{given}{initial} {surname}'
+             for given in GIVEN for initial in _INITIALS for surname in SURNAMES]
+    encoded = [json.dumps(name, ensure_ascii=False)[1:-1].encode('utf-8') for name in names]
+    table = np.zeros((len(encoded), max(map(len, encoded))), np.uint8)
+    for row, name in zip(table, encoded):
+        row[:len(name)] = np.frombuffer(name, np.uint8)
+    return names, table, np.fromiter(map(len, encoded), np.int64, len(encoded))
+
+
+_NAMES, _NAME_BYTES, _NAME_LENGTHS = _name_table()
+
+
+def _scrambled(indices, seed):
+    """A bijection of scholar indices onto 42-bit numbers, different for every seed."""
+    return (indices.astype(np.uint64) * np.uint64(_ID_MULTIPLIER)
+            + np.uint64(seed * 0x5851F42D4C957F2D & ((1 << 42) - 1))) & np.uint64((1 << 42) - 1)
+
+
+def scholar_ids(indices, seed=0):
+    """Unique 12-character scholar IDs (``x7Qf0bKAAAAJ``) for scholar indices, as an ``(n, 12)`` matrix."""
+    x = _scrambled(np.asarray(indices), seed)
+    ids = np.empty((len(x), 12), np.uint8)
+    for k in range(7):
+        ids[:, k] = _ALPHABET[(x >> np.uint64(6 * k)) & np.uint64(63)]
+    ids[:, 7:] = np.frombuffer(b'AAAAJ', np.uint8)
+    return ids
+
+
+def scholar_names(indices, seed=0):
+    """Indices into the name table (:func:`name`) for scholar indices; names repeat, as real ones do."""
+    x = _scrambled(np.asarray(indices), seed) >> np.uint64(20)
+    return (x % np.uint64(len(_NAMES))).astype(np.int64)
+
+
+def name(index):
+    """The name at ``index`` in the name table."""
+    return _NAMES[index]
+
+
+def blocks(scholars, snapshots):
+    """``(block, first, stop)`` scholar ranges; they depend only on the dataset's shape."""
+    size = max(1, BLOCK_RECORDS // max(1, snapshots))
+    return [(block, first, min(first + size, scholars))
+            for block, first in enumerate(range(0, scholars, size))]
+
+
+def generate_block(block, first, stop, snapshots, seed=0, start=START, every=DAY):
+    """The :class:`Block` of scholars ``first`` to ``stop`` (see :func:`blocks`).
+
+    ``counts`` and ``timestamps`` (epoch seconds) are ``(scholars, snapshots)``
+    int64 arrays; ``ids`` is a byte matrix and ``names`` indices into the
+    name table.
+    """
+    rng = np.random.default_rng([seed, block])
+    n = stop - first
+    indices = np.arange(first, stop)
+    base = np.minimum(rng.lognormal(np.log(2000), 1.6, n), 5e6)
+    rate = np.clip(rng.lognormal(np.log(0.12), 0.5, n), 0.01, 2.0)
+    origin = int(np.datetime64(start, 's').astype(np.int64))
+    slots = origin + np.arange(snapshots, dtype=np.int64) * every
+    timestamps = slots + rng.integers(0, max(1, every * 9 // 10), (n, snapshots))
+    years = (timestamps - origin) / (365 * DAY)
+    gaps = np.diff(timestamps, axis=1, prepend=timestamps[:, :1] - every) / (365 * DAY)
+    # expected new citations per step: the current rate (compounding) over the step's length
+    mean = (base * rate)[:, None] * np.exp(np.log1p(rate)[:, None] * years) * gaps
+    counts = base.astype(np.int64)[:, None] + np.cumsum(rng.poisson(mean + 0.02), axis=1)
+    np.minimum(counts, 10 ** 12 - 1, out=counts)
+    return Block(first, scholar_ids(indices, seed), scholar_names(indices, seed), counts, timestamps)
+
+
+def iter_blocks(scholars, snapshots, seed=0, start=START, every=DAY):
+    """Yield every :class:`Block` of the dataset in order."""
+    for block, first, stop in blocks(scholars, snapshots):
+        yield generate_block(block, first, stop, snapshots, seed, start, every)
+
+
+# MARK: - Import files
+
+_PARTS = (b'  {\n    "citationCount": ', b',\n    "timestamp": "', b'",\n    "scholarId": "',
+          b'",\n    "scholarName": "', b'"\n  },\n')
+_NAME_WIDTH = _NAME_BYTES.shape[1]
+
+# One record as fixed-width fields: the count's twelve digits in groups of
+# four, zero-padded, and the name padded to the longest; encode_block drops
+# the padding with a mask laid out as _MASK.
+_RECORD = np.dtype([('p0', f'V{len(_PARTS[0])}'), ('d0', 'V4'), ('d1', 'V4'), ('d2', 'V4'),
+                    ('p1', f'V{len(_PARTS[1])}'),
+                    ('date', 'V10'), ('time', 'V10'), ('p2', f'V{len(_PARTS[2])}'), ('id', 'V12'),
+                    ('p3', f'V{len(_PARTS[3])}'), ('name', f'V{_NAME_WIDTH}'), ('p4', f'V{len(_PARTS[4])}')])
+_MASK = np.dtype({'names': ['digits', 'name'], 'formats': ['V12', f'V{_NAME_WIDTH}'],
+                  'offsets': [_RECORD.fields['d0'][1], _RECORD.fields['name'][1]],
+                  'itemsize': _RECORD.itemsize})
+_TEMPLATE = np.zeros(_RECORD.itemsize, np.uint8)
+for _i, _part in enumerate(_PARTS):
+    _TEMPLATE[_RECORD.fields[f'p{_i}'][1]:][:len(_part)] = np.frombuffer(_part, np.uint8)
+
+_QUADS = np.array([f'{i:04d}'.encode() for i in range(10_000)], 'V4')
+_TIMES = np.array([f'T{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}Z'.encode() for s in range(DAY)], 'V10')
+_NAMES_V = _NAME_BYTES.view(f'V{_NAME_WIDTH}').ravel()
+_POWERS = 10 ** np.arange(1, 12, dtype=np.int64)
+# which of the twelve digit bytes a count of 1 to 12 digits keeps, and of the name bytes a name keeps
+_KEEP_DIGITS = np.array([[j >= 12 - n for j in range(12)] for n in range(13)]).view('V12')[:, 0]
+_KEEP_NAME = np.array([[j < n for j in range(_NAME_WIDTH)] for n in range(_NAME_WIDTH + 1)]
+                      ).view(f'V{_NAME_WIDTH}')[:, 0]
+
+
+def _dates(first_day, last_day):
+    days = np.arange(first_day, last_day + 1).astype('datetime64[D]')
+    return np.datetime_as_string(days).astype('S10').view('V10')
+
+
+def encode_block(block):
+    """The records of ``block`` as import-file bytes (a uint8 array; each record ends in ``},\\n``)."""
+    n, m = block.counts.shape
+    raw = np.empty((n, m, _RECORD.itemsize), np.uint8)
+    raw[...] = _TEMPLATE
+    rows = raw.view(_RECORD)[..., 0]
+    keep_raw = np.ones((n, m, _RECORD.itemsize), bool)
+    keep = keep_raw.view(_MASK)[..., 0]
+
+    counts = block.counts
+    rows['d0'] = _QUADS[counts // 10 ** 8]
+    rows['d1'] = _QUADS[counts // 10 ** 4 % 10 ** 4]
+    rows['d2'] = _QUADS[counts % 10 ** 4]
+    keep['digits'] = _KEEP_DIGITS[np.searchsorted(_POWERS, counts, side='right') + 1]
+
+    days, seconds = np.divmod(block.timestamps, DAY)
+    first_day = int(days.min())
+    rows['date'] = _dates(first_day, int(days.max()))[days - first_day]
+    rows['time'] = _TIMES[seconds]
+
+    rows['id'] = block.ids.view('V12')
+    rows['name'] = _NAMES_V[block.names][:, None]
+    keep['name'] = _KEEP_NAME[_NAME_LENGTHS[block.names]][:, None]
+    return raw.reshape(-1)[keep_raw.reshape(-1)]
+
+
+def write_import(path, scholars, snapshots, seed=0, start=START, every=DAY):
+    """Write ``scholars`` x ``snapshots`` records to ``path`` as an import file; return how many.
+
+    Records are grouped by scholar, each scholar's in time order, laid out
+    like ``sample_import_data.json`` (``citationCount``, ``timestamp``,
+    ``scholarId``, ``scholarName``, two-space indentation).
+    """
+    records = 0
+    with open(path, 'wb') as f:
+        f.write(b'[\n')
+        pending = np.empty(0, np.uint8)
+        for block in iter_blocks(scholars, snapshots, seed, start, every):
+            f.write(pending)
+            pending = encode_block(block)
+            records += block.counts.size
+        f.write(pending[:-2].tobytes() + b'\n]' if len(pending) else b']')
+    return records
@@ -0,0 +1,15 @@
+"""
+Shared project.pbxproj tooling: parse once, then edit through an indexed
+object graph instead of re-scanning the file with regexes.
+"""
+
+from .parser import PBXParseError, load, parse
+from .project import PBXObject, PBXProject
+
+__all__ = [
+    'PBXObject',
+    'PBXParseError',
+    'PBXProject',
+    'load',
+    'parse',
+]
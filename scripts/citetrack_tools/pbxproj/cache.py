@@ -0,0 +1,168 @@
+"""
+On-disk cache of parsed projects, keyed by a hash of the file contents.
+
+Entries never need invalidating: a changed file has a different hash. Two
+kinds of entry are stored, both as ``marshal`` data (plain dicts, lists and
+strings load much faster than pickled objects):
+
+* the parsed object graph (:func:`load_cached`), rebuilt into a
+  :class:`PBXProject` on load;
+* small derived values such as the resolved build-settings table
+  (:func:`cached_value`), which load in milliseconds whatever the project size.
+  Their keys also hash the source of the module that computes them, so a
+  fixed validator or resolver never serves results of the old code.
+
+Every key also hashes the source of the modules that build the graph
+(:data:`GRAPH_MODULES`), so a changed parser never serves graphs it did not
+build. Bump :data:`CACHE_VERSION` whenever the stored layout changes.
+"""
+
+import hashlib
+import marshal
+import os
+import sys
+
+from . import parser as _parser, profiling, project as _project, settings as _settings
+from .parser import parse
+from .project import PBXObject, PBXProject
+from .writer import write_atomic
+
+CACHE_VERSION = 1
+
+# Modules whose code shapes the cached graph
+GRAPH_MODULES = (_parser, _project, _settings)
+
+# Entries beyond this many (least recently used first) are removed on write
+MAX_ENTRIES = 128
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'citetrack_tools', 'pbxproj')
+
+
+def content_key(data):
+    """Cache key for the raw bytes of a project.pbxproj (marshal is Python-version specific)."""
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    return f'v{CACHE_VERSION}-py{sys.version_info[0]}{sys.version_info[1]}-{graph_key()}-{digest}'
+
+
+_code_keys = {}
+
+
+def _module_key(module):
+    """Short hash of the source file of the module called ``module``."""
+    if module not in _code_keys:
+        try:
+            with open(sys.modules[module].__file__, 'rb') as f:
+                _code_keys[module] = hashlib.blake2b(f.read(), digest_size=6).hexdigest()
+        except (AttributeError, KeyError, OSError, TypeError):
+            _code_keys[module] = 'nocode'
+    return _code_keys[module]
+
+
+def code_key(func):
+    """Short hash of the source file of ``func``'s module, which changes whenever that code does."""
+    return _module_key(func.__module__)
+
+
+def graph_key():
+    """Short hash of the sources of :data:`GRAPH_MODULES`."""
+    parts = ''.join(_module_key(module.__name__) for module in GRAPH_MODULES)
+    return hashlib.blake2b(parts.encode(), digest_size=6).hexdigest()
+
+
+def _read(path):
+    path = str(path)
+    if path.endswith('.xcodeproj'):
+        path = path + '/project.pbxproj'
+    with profiling.span('read', path=path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        profiling.count('bytes_read', len(data))
+    return path, data
+
+
+def _get(cache_dir, name):
+    entry = os.path.join(cache_dir, name)
+    try:
+        with open(entry, 'rb') as f:
+            value = marshal.loads(f.read())  # much faster than marshal.load(f)
+        os.utime(entry)
+        return value
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+
+def _put(cache_dir, name, value):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_atomic(os.path.join(cache_dir, name), marshal.dumps(value))
+        _prune(cache_dir)
+    except OSError:
+        pass  # an unwritable cache only costs speed
+
+
+def _prune(cache_dir):
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith('.marshal')]
+    if len(entries) <= MAX_ENTRIES:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - MAX_ENTRIES]:
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def _freeze(project):
+    root = {key: value for key, value in project.root.items() if key != 'objects'}
+    objects = [(obj.id, obj.props, obj.comment, obj.span) for obj in project.objects.values()]
+    return root, objects, project.text, project.header
+
+
+def _thaw(state, path):
+    root, entries, text, header = state
+    objects = {object_id: PBXObject(object_id, props, comment, tuple(span))
+               for object_id, props, comment, span in entries}
+    root['objects'] = objects
+    return PBXProject(root, objects, path=path, text=text, header=header)
+
+
+def _load(path, data, key, cache_dir):
+    state = _get(cache_dir, key + '.marshal')
+    if state is not None:
+        profiling.count('cache_hits')
+        return _thaw(state, path)
+    profiling.count('cache_misses')
+    project = parse(data.decode('utf-8'), path=path, data=data)
+    _put(cache_dir, key + '.marshal', _freeze(project))
+    return project
+
+
+@profiling.timed('cache: load')
+def load_cached(path, cache_dir=None):
+    """Like :func:`load`, but reuse the parsed object graph while the file is unchanged."""
+    path, data = _read(path)
+    return _load(path, data, content_key(data), cache_dir or default_cache_dir())
+
+
+@profiling.timed('cache: value')
+def cached_value(path, kind, compute, cache_dir=None):
+    """``compute(project)`` for the project at ``path``, cached under ``kind``.
+
+    The result must be marshal-able (dicts, lists, tuples, strings, numbers).
+    The key includes :func:`code_key` of ``compute``, so editing the module
+    that defines it invalidates its results. The project is only loaded on a
+    miss.
+    """
+    path, data = _read(path)
+    cache_dir = cache_dir or default_cache_dir()
+    key = content_key(data)
+    name = f'{key}-{kind}-{code_key(compute)}.marshal'
+    value = _get(cache_dir, name)
+    profiling.count('cache_hits' if value is not None else 'cache_misses')
+    if value is None:
+        value = compute(_load(path, data, key, cache_dir))
+        _put(cache_dir, name, value)
+    return value
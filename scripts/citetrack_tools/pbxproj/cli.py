@@ -0,0 +1,549 @@
+"""
+Command-line entry point for the project tooling.
+
+    python3 -m citetrack_tools.pbxproj apply manifests/project_manifest.json
+
+``apply`` reads a manifest of operations grouped by project, parses each
+project.pbxproj once, applies all of its operations in one edit session and
+writes it back once. Projects are processed concurrently in a process pool.
+
+    python3 -m citetrack_tools.pbxproj settings ../macOS/CiteTrack_macOS.xcodeproj \
+        STRIP_INSTALLED_PRODUCT=NO --target CiteTrack --configuration Release
+
+``settings`` rewrites build settings in the chosen targets and configurations
+and only touches the file when a value actually changes.
+
+    python3 -m citetrack_tools.pbxproj query DEBUG_INFORMATION_FORMAT=dwarf -c Release
+    python3 -m citetrack_tools.pbxproj diff --key 'SWIFT_*'
+
+    python3 -m citetrack_tools.pbxproj sync --dry-run
+
+``sync`` runs the ``sync`` operations of ``manifests/sync_manifest.json``:
+it adds references for new source files and drops references to deleted ones.
+
+``query`` and ``diff`` read resolved build settings (target over project
+level) of the iOS and macOS projects by default, through the parse cache.
+
+    python3 -m citetrack_tools.pbxproj validate
+
+    python3 -m citetrack_tools.pbxproj merge BASE OURS THEIRS [PATH]
+
+``merge`` is a git merge driver: it merges the three versions object by
+object and list member by member, writes the result over OURS and exits
+non-zero if anything conflicted. A version that does not parse falls back to
+``git merge-file``, which leaves the usual conflict markers.
+
+    python3 -m citetrack_tools.pbxproj watch
+    python3 -m citetrack_tools.pbxproj ask find AutoUpdateManager.swift
+
+``watch`` keeps the projects of the sync manifest parsed in memory, syncs
+them as files appear and disappear, and answers ``ask`` over a Unix socket.
+A difference that exists at start-up is only reported (``--sync-now``
+applies it).
+
+``validate`` checks the object graph of each project for duplicate or
+malformed IDs, dangling references and orphaned or duplicated entries, and
+exits non-zero on errors (on warnings too with ``--strict``).
+
+Every command accepts ``--profile`` (per-phase time, allocations and
+counters on stderr) and ``--trace FILE`` (the same phases as Chrome
+trace-event JSON); see :mod:`.profiling`.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import profiling
+from .cache import cached_value
+from .edit import EditSession
+from .merge import merge_projects
+from .operations import OPERATIONS, OperationError, apply_operations
+from .parser import PBXParseError, load
+from .query import Condition, diff, format_setting, project_name, query, resolve, unpaired
+from .settings import PROJECT, SettingRule, rewrite_build_settings
+from .validate import ERROR, validate_file
+from .watch import Daemon, ask, default_socket_path
+from .writer import write_atomic
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DEFAULT_PROJECTS = ('iOS/CiteTrack_iOS.xcodeproj', 'macOS/CiteTrack_macOS.xcodeproj')
+
+
+def project_file(path):
+    """Accept either an .xcodeproj bundle or the project.pbxproj inside it."""
+    if path.endswith('.xcodeproj'):
+        return os.path.join(path, 'project.pbxproj')
+    return path
+
+
+def load_manifest(path, root=None):
+    """Read a manifest; returns ``[(project path, operations), ...]`` with resolved paths."""
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    root = root or os.path.join(base, manifest.get('root', '.'))
+    return [(project_file(os.path.normpath(os.path.join(root, entry['project']))),
+             entry.get('operations', []))
+            for entry in manifest['projects']]
+
+
+def process_project(path, operations, dry_run=False, profile=None):
+    """Parse, mutate and write one project; runs inside a worker process.
+
+    With ``profile`` set (to whether allocations are tracked), the worker
+    profiles itself and returns its trace events under ``'trace'``.
+    """
+    result = {'project': path, 'changes': [], 'error': None, 'missing': False}
+    started = time.perf_counter()
+    if not os.path.exists(path):
+        result['missing'] = True
+        return result
+    profiler = profiling.enable(memory=profile) if profile is not None else None
+    try:
+        with profiling.span('project', path=path):
+            project = load(path)
+            session = EditSession(project)
+            result['changes'] = apply_operations(session, operations)
+            if session and not dry_run:
+                session.save()
+    except (OperationError, PBXParseError, KeyError, ValueError, OSError) as error:
+        result['error'] = f'{type(error).__name__}: {error}'
+    finally:
+        if profiler is not None:
+            profiling.disable()
+            result['trace'] = profiler.events
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def _worker_profile(jobs):
+    """``profile`` argument for pool workers: profile them only if this process is profiled."""
+    profiler = profiling.current()
+    return profiler.memory if profiler is not None and jobs > 1 else None
+
+
+def _collect_traces(results):
+    profiler = profiling.current()
+    for result in results:
+        events = result.pop('trace', None)
+        if profiler is not None and events:
+            profiler.extend(events)
+
+
+def _print_result(result, root):
+    name = os.path.relpath(result['project'], root)
+    if result['missing']:
+        print(f'⚠️  {name}: project file not found, skipped')
+    elif result['error']:
+        print(f'❌ {name}: {result["error"]}')
+    elif not result['changes']:
+        print(f'✅ {name}: already up to date ({result["seconds"] * 1000:.0f} ms)')
+    else:
+        print(f'✅ {name}: {len(result["changes"])} change(s) ({result["seconds"] * 1000:.0f} ms)')
+        for change in result['changes']:
+            print(f'   - {change}')
+
+
+def cmd_apply(args, only=None):
+    projects = load_manifest(args.manifest, args.root)
+    if only is not None:
+        projects = [(path, [spec for spec in ops if spec.get('op') in only])
+                    for path, ops in projects]
+        projects = [(path, ops) for path, ops in projects if ops]
+    root = os.path.commonpath([os.path.dirname(path) for path, _ in projects]) if projects else '.'
+    jobs = min(args.jobs or os.cpu_count() or 1, len(projects)) or 1
+    if jobs == 1:
+        results = [process_project(path, ops, args.dry_run) for path, ops in projects]
+    else:
+        profile = _worker_profile(jobs)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(process_project, path, ops, args.dry_run, profile)
+                       for path, ops in projects]
+            results = [future.result() for future in futures]
+        _collect_traces(results)
+    for result in results:
+        _print_result(result, root)
+    if args.dry_run:
+        print('(dry run: nothing was written)')
+    return 1 if any(result['error'] for result in results) else 0
+
+
+def cmd_sync(args):
+    return cmd_apply(args, only={'sync'})
+
+
+def cmd_settings(args):
+    rules = []
+    for assignment in args.assignments:
+        key, sep, value = assignment.partition('=')
+        if not sep or not key:
+            print(f'❌ expected KEY=VALUE, got {assignment!r}')
+            return 2
+        rules.append(SettingRule(key, value, args.target, args.configuration, args.match))
+    project = load(project_file(args.project))
+    session = EditSession(project)
+    changes = rewrite_build_settings(session, rules)
+    for owner, configuration, key, old, new in changes:
+        print(f'   {owner} [{configuration}] {key}: {old if old is not None else "(unset)"} -> {new}')
+    if not changes:
+        print('✅ build settings already up to date, nothing written')
+    elif args.dry_run:
+        print(f'(dry run: {len(changes)} setting(s) would change)')
+    else:
+        session.save()
+        print(f'✅ updated {len(changes)} setting(s)')
+    return 0
+
+
+def _settings_tables(paths, no_cache=False):
+    """``[(path, resolved settings), ...]``, read through the parse cache."""
+    paths = [project_file(path) for path in
+             paths or [os.path.join(REPO_ROOT, path) for path in DEFAULT_PROJECTS]]
+    return [(path, resolve(load(path)) if no_cache else cached_value(path, 'settings', resolve))
+            for path in paths]
+
+
+def _display(value):
+    return '(unset)' if value is None else format_setting(value)
+
+
+def cmd_query(args):
+    tables = {project_name(path): table for path, table in _settings_tables(args.project, args.no_cache)}
+    rows = query(tables, [Condition(c) for c in args.conditions], args.target,
+                 args.configuration, include_project=args.include_project)
+    if args.json:
+        print(json.dumps([row._asdict() for row in rows], indent=2, ensure_ascii=False))
+        return 0
+    for row in rows:
+        inherited = ' (from project)' if row.source == 'project' and row.target != PROJECT else ''
+        print(f'{row.project} {row.target} [{row.configuration}] '
+              f'{row.key} = {_display(row.value)}{inherited}')
+    if not rows:
+        print('(no matching settings)')
+    return 0
+
+
+def cmd_diff(args):
+    if args.project and len(args.project) != 2:
+        print('❌ diff takes exactly two projects')
+        return 2
+    (left_path, left), (right_path, right) = _settings_tables(args.project, args.no_cache)
+    target_map = {}
+    for pair in args.map or ():
+        a, sep, b = pair.partition('=')
+        if not sep:
+            print(f'❌ expected LEFT=RIGHT, got {pair!r}')
+            return 2
+        target_map[a] = b
+    differences = diff(left, right, target_map, args.configuration, args.key)
+    only_left, only_right = unpaired(left, right, target_map)
+    if args.json:
+        print(json.dumps({
+            'left': left_path, 'right': right_path,
+            'differences': [dict(zip(('left_target', 'right_target', 'configuration', 'key',
+                                      'left', 'right'), d)) for d in differences],
+            'unpaired': {'left': only_left, 'right': only_right},
+        }, indent=2, ensure_ascii=False))
+        return 0
+    print(f'--- {os.path.relpath(left_path)}\n+++ {os.path.relpath(right_path)}')
+    current = None
+    for left_target, right_target, name, key, a, b in differences:
+        heading = (left_target, right_target, name)
+        if heading != current:
+            current = heading
+            pair = left_target if left_target == right_target else f'{left_target} <-> {right_target}'
+            print(f'@@ {pair} [{name}] @@')
+        print(f'  {key}: {_display(a)}  |  {_display(b)}')
+    for side, targets in (('left', only_left), ('right', only_right)):
+        if targets:
+            print(f'⚠️  targets only in {side} project: {", ".join(targets)} (use --map LEFT=RIGHT)')
+    if not differences:
+        print('✅ no differences')
+    return 0
+
+
+def _validate_project(path, use_cache, profile=None):
+    started = time.perf_counter()
+    if not os.path.exists(path):
+        return path, None, 0.0, None
+    profiler = profiling.enable(memory=profile) if profile is not None else None
+    try:
+        with profiling.span('project', path=path):
+            issues = validate_file(path, use_cache)
+    finally:
+        if profiler is not None:
+            profiling.disable()
+    return path, issues, time.perf_counter() - started, profiler.events if profiler else None
+
+
+def cmd_validate(args):
+    paths = [project_file(path) for path in
+             args.project or [os.path.join(REPO_ROOT, path) for path in DEFAULT_PROJECTS]]
+    jobs = min(args.jobs or os.cpu_count() or 1, len(paths)) or 1
+    if jobs == 1:
+        results = [_validate_project(path, not args.no_cache) for path in paths]
+    else:
+        profile = _worker_profile(jobs)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_validate_project, paths, [not args.no_cache] * len(paths),
+                                    [profile] * len(paths)))
+    profiler = profiling.current()
+    for *_, events in results:
+        if profiler is not None and events:
+            profiler.extend(events)
+    results = [result[:3] for result in results]
+    if args.json:
+        print(json.dumps({path: [issue._asdict() for issue in issues] if issues is not None else None
+                          for path, issues, _ in results}, indent=2, ensure_ascii=False))
+    failed = False
+    for path, issues, seconds in results:
+        if issues is None:
+            failed = True
+            if not args.json:
+                print(f'❌ {os.path.relpath(path)}: project file not found')
+            continue
+        errors = sum(1 for issue in issues if issue.severity == ERROR)
+        warnings = len(issues) - errors
+        failed = failed or errors > 0 or (args.strict and warnings > 0)
+        if args.json:
+            continue
+        if args.quiet:
+            issues = [issue for issue in issues if issue.severity == ERROR]
+        for issue in issues:
+            where = f':{issue.line}' if issue.line else ''
+            marker = '❌' if issue.severity == ERROR else '⚠️ '
+            print(f'{marker} {os.path.relpath(path)}{where}: [{issue.code}] {issue.message}')
+        status = '❌' if errors or (args.strict and warnings) else '✅'
+        print(f'{status} {os.path.relpath(path)}: {errors} error(s), {warnings} warning(s) '
+              f'({seconds * 1000:.0f} ms)')
+    return 1 if failed else 0
+
+
+def _read_text(path):
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+def _merge_lines(args, name):
+    """What git does without a driver: ``git merge-file``, leaving conflict markers in the output."""
+    command = ['git', 'merge-file', '-p', '-L', 'ours', '-L', 'base', '-L', 'theirs',
+               args.ours, args.base, args.theirs]
+    try:
+        result = subprocess.run(command, capture_output=True)
+    except OSError as error:
+        print(f'❌ {name}: cannot run git merge-file: {error}', file=sys.stderr)
+        return 2
+    if result.returncode < 0 or result.returncode > 127:
+        print(f'❌ {name}: git merge-file failed: {result.stderr.decode(errors="replace").strip()}',
+              file=sys.stderr)
+        return 2
+    write_atomic(args.output or args.ours, result.stdout)
+    if result.returncode:
+        print(f'❌ {name}: {result.returncode} conflicting hunk(s) left for manual resolution', file=sys.stderr)
+        return 1
+    print(f'✅ {name}: merged line by line', file=sys.stderr)
+    return 0
+
+
+def cmd_merge(args):
+    started = time.perf_counter()
+    name = args.path or args.ours
+    try:
+        result = merge_projects(_read_text(args.base), _read_text(args.ours), _read_text(args.theirs),
+                                favor=args.favor, path=args.ours)
+    except (PBXParseError, UnicodeDecodeError, OSError) as error:
+        print(f'❌ {name}: cannot merge structurally: {error}; merging lines instead', file=sys.stderr)
+        return _merge_lines(args, name)
+    write_atomic(args.output or args.ours, result.text)
+    for conflict in result.conflicts:
+        where = f'{conflict.object} {conflict.key}' if conflict.key else conflict.object
+        print(f'⚠️  {name}: conflict in {where}: ours={conflict.ours!r} theirs={conflict.theirs!r} '
+              f'(kept {args.favor})', file=sys.stderr)
+    for issue in result.errors:
+        print(f'❌ {name}: [{issue.code}] {issue.message}', file=sys.stderr)
+    summary = (f'{len(result.added)} added, {len(result.removed)} removed, '
+               f'{len(result.changed)} merged ({(time.perf_counter() - started) * 1000:.0f} ms)')
+    print(f'{"✅" if result.clean else "❌"} {name}: {summary}', file=sys.stderr)
+    return 0 if result.clean else 1
+
+
+def cmd_watch(args):
+    projects = [(path, ops) for path, ops in load_manifest(args.manifest, args.root)
+                if os.path.exists(path)]
+    daemon = Daemon(projects, args.socket, args.debounce, args.poll, args.interval,
+                    sync_now=args.sync_now)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        print(f'❌ {error}')
+        return 1
+    return 0
+
+
+def cmd_ask(args):
+    request = {'cmd': args.cmd}
+    if args.cmd == 'find':
+        request['path'] = ' '.join(args.args)
+    elif args.cmd == 'flush' and args.all:
+        request['all'] = True
+    elif args.cmd == 'query':
+        request['conditions'] = args.args
+        request['targets'] = args.target
+        request['configurations'] = args.configuration
+    if args.project:
+        request['project'] = args.project
+    started = time.perf_counter()
+    try:
+        response = ask(request, args.socket)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f'❌ no daemon listening on {args.socket or default_socket_path()} (start one with "watch")')
+        return 2
+    elapsed = time.perf_counter() - started
+    print(json.dumps(response, indent=2, ensure_ascii=False))
+    if args.time:
+        print(f'({elapsed * 1000:.2f} ms round trip)', file=sys.stderr)
+    return 0 if response.get('ok') else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python3 -m citetrack_tools.pbxproj',
+                                     description='CiteTrack Xcode project tooling')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    profiled = argparse.ArgumentParser(add_help=False)
+    profiled.add_argument('--profile', action='store_true',
+                          help='print time, allocations and counters per phase to stderr')
+    profiled.add_argument('--trace', metavar='FILE',
+                          help='write the phases as Chrome trace-event JSON (chrome://tracing, Perfetto)')
+    profiled.add_argument('--no-alloc', action='store_true',
+                          help='with --profile/--trace: time phases without tracking allocations')
+
+    apply = commands.add_parser('apply', parents=[profiled], help='apply a manifest of project operations',
+                                description=f'Operations: {", ".join(sorted(OPERATIONS))}')
+    apply.add_argument('manifest', help='JSON manifest of operations per project')
+    apply.add_argument('--root', help='directory project paths are relative to '
+                                      '(default: the manifest\'s "root" entry)')
+    apply.add_argument('-j', '--jobs', type=int, help='worker processes (default: CPU count)')
+    apply.add_argument('-n', '--dry-run', action='store_true', help='report changes without writing')
+    apply.set_defaults(func=cmd_apply)
+
+    sync_cmd = commands.add_parser('sync', parents=[profiled], help='add/remove file references to match the source trees')
+    sync_cmd.add_argument('manifest', nargs='?',
+                          default=os.path.join(REPO_ROOT, 'scripts', 'manifests', 'sync_manifest.json'),
+                          help='manifest whose "sync" operations to run (default: manifests/sync_manifest.json)')
+    sync_cmd.add_argument('--root', help='directory project paths are relative to')
+    sync_cmd.add_argument('-j', '--jobs', type=int, help='worker processes (default: CPU count)')
+    sync_cmd.add_argument('-n', '--dry-run', action='store_true', help='report changes without writing')
+    sync_cmd.set_defaults(func=cmd_sync)
+
+    settings = commands.add_parser('settings', parents=[profiled], help='rewrite build settings in chosen targets/configurations')
+    settings.add_argument('project', help='.xcodeproj bundle or project.pbxproj')
+    settings.add_argument('assignments', nargs='+', metavar='KEY=VALUE')
+    settings.add_argument('-t', '--target', action='append',
+                          help='limit to a target (repeatable; "<project>" for project-level settings)')
+    settings.add_argument('-c', '--configuration', action='append',
+                          help='limit to a configuration such as Debug or Release (repeatable)')
+    settings.add_argument('--match', action='append',
+                          help='only replace settings whose current value is this (repeatable)')
+    settings.add_argument('-n', '--dry-run', action='store_true', help='report changes without writing')
+    settings.set_defaults(func=cmd_settings)
+
+    scope = argparse.ArgumentParser(add_help=False)
+    scope.add_argument('-p', '--project', action='append',
+                       help='project to read (repeatable; default: the iOS and macOS projects)')
+    scope.add_argument('-c', '--configuration', action='append', help='limit to a configuration (repeatable)')
+    scope.add_argument('--json', action='store_true', help='print JSON instead of text')
+    scope.add_argument('--no-cache', action='store_true', help='always parse instead of using the parse cache')
+
+    query_cmd = commands.add_parser('query', parents=[scope, profiled], help='find resolved build settings',
+                                    description='Conditions: KEY, KEY=VALUE, KEY!=VALUE, KEY~GLOB '
+                                                '(KEY may be a glob); all must hold.')
+    query_cmd.add_argument('conditions', nargs='*', metavar='CONDITION')
+    query_cmd.add_argument('-t', '--target', action='append', help='limit to a target (repeatable)')
+    query_cmd.add_argument('--include-project', action='store_true',
+                           help='also list project-level configurations')
+    query_cmd.set_defaults(func=cmd_query)
+
+    diff_cmd = commands.add_parser('diff', parents=[scope, profiled],
+                                   help='compare resolved build settings of two projects')
+    diff_cmd.add_argument('-k', '--key', action='append', help='only compare keys matching this glob (repeatable)')
+    diff_cmd.add_argument('-m', '--map', action='append', metavar='LEFT=RIGHT',
+                          help='pair differently named targets (repeatable)')
+    diff_cmd.set_defaults(func=cmd_diff)
+
+    watch_cmd = commands.add_parser('watch', parents=[profiled], help='keep projects in memory and sync them as files change')
+    watch_cmd.add_argument('manifest', nargs='?',
+                           default=os.path.join(REPO_ROOT, 'scripts', 'manifests', 'sync_manifest.json'),
+                           help='manifest whose "sync" operations to keep applied')
+    watch_cmd.add_argument('--root', help='directory project paths are relative to')
+    watch_cmd.add_argument('--socket', help=f'Unix socket to serve queries on (default: {default_socket_path()})')
+    watch_cmd.add_argument('--debounce', type=float, default=0.3,
+                           help='seconds without events before writing (default: 0.3)')
+    watch_cmd.add_argument('--poll', action='store_true', help='poll instead of using inotify')
+    watch_cmd.add_argument('--interval', type=float, default=1.0, help='polling interval in seconds')
+    watch_cmd.add_argument('--sync-now', action='store_true',
+                           help='also apply the difference that exists at start-up (default: only report it)')
+    watch_cmd.set_defaults(func=cmd_watch)
+
+    ask_cmd = commands.add_parser('ask', parents=[profiled], help='query a running watch daemon')
+    ask_cmd.add_argument('cmd', choices=('ping', 'status', 'find', 'targets', 'query', 'flush'))
+    ask_cmd.add_argument('args', nargs='*', help='path for find, conditions for query')
+    ask_cmd.add_argument('-p', '--project', help='only projects whose path contains this')
+    ask_cmd.add_argument('-t', '--target', action='append', help='limit query to a target (repeatable)')
+    ask_cmd.add_argument('-c', '--configuration', action='append', help='limit query to a configuration')
+    ask_cmd.add_argument('--socket', help='daemon socket (default: per-user socket)')
+    ask_cmd.add_argument('--time', action='store_true', help='print the round-trip time')
+    ask_cmd.add_argument('--all', action='store_true',
+                         help='with flush: apply the whole sync difference, not just pending events')
+    ask_cmd.set_defaults(func=cmd_ask)
+
+    merge_cmd = commands.add_parser('merge', parents=[profiled], help='three-way merge of project.pbxproj (git merge driver)',
+                                    description='Merges BASE, OURS and THEIRS structurally and writes '
+                                                'the result over OURS; exits 1 on conflicts.')
+    merge_cmd.add_argument('base', help='common ancestor (%%O)')
+    merge_cmd.add_argument('ours', help='current version, overwritten with the result (%%A)')
+    merge_cmd.add_argument('theirs', help='other branch\'s version (%%B)')
+    merge_cmd.add_argument('path', nargs='?', help='path of the file in the repository, for messages (%%P)')
+    merge_cmd.add_argument('--favor', choices=('ours', 'theirs'), default='ours',
+                           help='side whose value is kept for conflicting properties (default: ours)')
+    merge_cmd.add_argument('-o', '--output', help='write the result here instead of over OURS')
+    merge_cmd.set_defaults(func=cmd_merge)
+
+    validate_cmd = commands.add_parser('validate', parents=[profiled], help='check object IDs and references for integrity')
+    validate_cmd.add_argument('project', nargs='*',
+                              help='.xcodeproj bundles or project.pbxproj files (default: iOS and macOS)')
+    validate_cmd.add_argument('-j', '--jobs', type=int, help='worker processes (default: CPU count)')
+    validate_cmd.add_argument('--strict', action='store_true', help='fail on warnings as well as errors')
+    validate_cmd.add_argument('-q', '--quiet', action='store_true', help='only print errors and totals')
+    validate_cmd.add_argument('--json', action='store_true', help='print JSON instead of text')
+    validate_cmd.add_argument('--no-cache', action='store_true', help='always parse instead of using the parse cache')
+    validate_cmd.set_defaults(func=cmd_validate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not (args.profile or args.trace):
+        return args.func(args)
+    profiler = profiling.enable(memory=not args.no_alloc)
+    try:
+        with profiling.span(f'command: {args.command}'):
+            return args.func(args)
+    finally:
+        profiling.disable()
+        if args.profile:
+            profiler.print_summary()
+        if args.trace:
+            profiler.write_trace(args.trace)
+            print(f'👀 trace written to {args.trace} ({len(profiler.events)} events)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Three-way structural merge of project.pbxproj files.
+
+Instead of merging lines, :func:`merge_projects` merges the parsed object
+graphs of base, ours and theirs:
+
+* objects added or removed on one side are added or removed;
+* for objects changed on both sides, each property is merged separately:
+  ID lists (``children``, ``files``, ``buildPhases``, ...) member by member,
+  dictionaries (``buildSettings``, ``attributes``) key by key, and scalars
+  only conflict when both sides set different values.
+
+The result is written as edits on top of "ours" through an
+:class:`EditSession`, so the merged file differs from ours only where theirs
+contributed, and stays valid even when there are conflicts (ours wins them,
+or theirs with ``favor='theirs'``). Every step is a dict or set lookup, so
+merging is linear in the number of objects.
+
+Use it as a git merge driver::
+
+    git config merge.pbxproj.driver \\
+        'PYTHONPATH=scripts python3 -m citetrack_tools.pbxproj merge %O %A %B %P'
+    echo '*.pbxproj merge=pbxproj' >> .gitattributes
+"""
+
+import re
+from collections import namedtuple
+
+from . import profiling
+from .edit import EditSession
+from .parser import parse
+from .validate import ERROR, REFERENCE_KEYS, validate
+from .writer import quote
+
+Conflict = namedtuple('Conflict', 'object key ours theirs')
+
+# Top-level keys outside ``objects`` that a merge may have to carry over
+ROOT_KEYS = ('archiveVersion', 'objectVersion', 'rootObject')
+
+_MISSING = object()
+
+
+class MergeResult:
+    """Outcome of :func:`merge_projects`: the merged text plus what happened."""
+
+    def __init__(self, text, conflicts, added, removed, changed, errors=()):
+        self.text = text
+        self.conflicts = conflicts
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        # integrity errors of the merged graph, e.g. a reference one side added
+        # to an object the other side deleted
+        self.errors = list(errors)
+
+    @property
+    def clean(self):
+        return not self.conflicts and not self.errors
+
+
+def merge_lists(base, ours, theirs):
+    """Merge lists of unique IDs: keep ours' order, apply theirs' removals and
+    insert theirs' additions after the item that precedes them in theirs."""
+    if ours == theirs or theirs == base:
+        return list(ours)
+    if ours == base:
+        return list(theirs)
+    base_set, ours_set = set(base), set(ours)
+    removed = base_set - set(theirs)
+    merged = [item for item in ours if item not in removed]
+    present = set(merged)
+    after = {}
+    anchor = None
+    for item in theirs:
+        if item not in base_set and item not in ours_set:
+            after.setdefault(anchor, []).append(item)
+            present.add(item)
+        elif item in present:
+            anchor = item
+    if not after:
+        return merged
+    result = list(after.get(None, ()))
+    for item in merged:
+        result.append(item)
+        result.extend(after.get(item, ()))
+    return result
+
+
+def _merge_value(base, ours, theirs, key, path, conflicts, favor):
+    if ours == theirs:
+        return ours
+    if theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        return _merge_dicts(base, ours, theirs, path, conflicts, favor)
+    if key in REFERENCE_KEYS and isinstance(ours, list) and isinstance(theirs, list):
+        return merge_lists(base if isinstance(base, list) else [], ours, theirs)
+    conflicts.append(Conflict(path[0], '.'.join(path[1:]),
+                              None if ours is _MISSING else ours,
+                              None if theirs is _MISSING else theirs))
+    return theirs if favor == 'theirs' else ours
+
+
+def _merge_dicts(base, ours, theirs, path, conflicts, favor):
+    merged = {}
+    for key in list(ours) + [key for key in theirs if key not in ours]:
+        b = base.get(key, _MISSING)
+        o = ours.get(key, _MISSING)
+        t = theirs.get(key, _MISSING)
+        value = _merge_value(b, o, t, key, path + (key,), conflicts, favor)
+        if value is not _MISSING:
+            merged[key] = value
+    return merged
+
+
+def _reachable(ours, merged):
+    """Whether ``merged`` keeps ours' members in order (so only insertions and removals are needed)."""
+    merged_set, ours_set = set(merged), set(ours)
+    return [item for item in merged if item in ours_set] == [item for item in ours if item in merged_set]
+
+
+def _queue_list(session, obj, key, merged):
+    """Queue member insertions/removals turning ``obj[key]`` into ``merged``."""
+    ours = obj.get(key, [])
+    merged_set, ours_set = set(merged), set(ours)
+    position = {item: i for i, item in enumerate(ours)}
+    index = 0
+    for item in ours:
+        if item not in merged_set:
+            session.remove(obj, key, item)
+    for item in merged:
+        if item in ours_set:
+            index = position[item] + 1
+        else:
+            session.insert(obj, key, index if index < len(ours) else None, item)
+
+
+def _queue_change(session, obj, merged, comment):
+    """Queue the smallest edit that turns ``obj`` into ``merged``.
+
+    List members and build settings are edited line by line when possible;
+    anything else rewrites the object.
+    """
+    props = obj.props
+    changed = [key for key in set(props) | set(merged) if props.get(key) != merged.get(key)]
+    lists = [key for key in changed
+             if key in REFERENCE_KEYS and isinstance(props.get(key), list)
+             and isinstance(merged.get(key), list) and _reachable(props[key], merged[key])]
+    settings = [key for key in changed
+                if key == 'buildSettings' and isinstance(props.get(key), dict)
+                and isinstance(merged.get(key), dict) and set(props[key]) <= set(merged[key])]
+    if comment != obj.comment or len(lists) + len(settings) != len(changed):
+        session.project.replace_props(obj, merged)
+        obj.comment = comment
+        session.update(obj)
+        return
+    for key in lists:
+        _queue_list(session, obj, key, merged[key])
+    if settings:
+        current = props['buildSettings']
+        for key, value in merged['buildSettings'].items():
+            if current.get(key) != value:
+                session.set_build_setting(obj, key, value)
+
+
+@profiling.timed('merge')
+def merge_projects(base_text, ours_text, theirs_text, favor='ours', path=None):
+    """Merge three project.pbxproj texts; returns a :class:`MergeResult`."""
+    if favor not in ('ours', 'theirs'):
+        raise ValueError(f'favor must be "ours" or "theirs", not {favor!r}')
+    base = parse(base_text)
+    ours = parse(ours_text, path=path)
+    theirs = parse(theirs_text)
+    session = EditSession(ours)
+    conflicts = []
+    added, removed, changed = [], [], []
+
+    for object_id, theirs_obj in theirs.objects.items():
+        base_obj = base.objects.get(object_id)
+        ours_obj = ours.objects.get(object_id)
+        if ours_obj is None:
+            if base_obj is None:
+                session.add_object(theirs_obj.isa, theirs_obj.comment, object_id=object_id,
+                                   **{k: v for k, v in theirs_obj.props.items() if k != 'isa'})
+                added.append(object_id)
+            elif theirs_obj.props != base_obj.props:
+                # deleted by us, changed by them: keep the deletion but report it
+                conflicts.append(Conflict(object_id, None, None, theirs_obj.props))
+            continue
+        if theirs_obj.props == ours_obj.props:
+            continue
+        base_props = base_obj.props if base_obj is not None else {}
+        merged = _merge_dicts(base_props, ours_obj.props, theirs_obj.props,
+                              (object_id,), conflicts, favor)
+        comment = ours_obj.comment
+        if base_obj is not None and ours_obj.comment == base_obj.comment:
+            comment = theirs_obj.comment
+        if merged != ours_obj.props or comment != ours_obj.comment:
+            _queue_change(session, ours_obj, merged, comment)
+            changed.append(object_id)
+
+    for object_id, base_obj in base.objects.items():
+        if object_id in theirs.objects or object_id not in ours.objects:
+            continue
+        ours_obj = ours.objects[object_id]
+        if ours_obj.props == base_obj.props:
+            session.remove_object(ours_obj)
+            removed.append(object_id)
+        else:
+            # changed by us, deleted by them: keep ours
+            conflicts.append(Conflict(object_id, None, ours_obj.props, None))
+
+    text = session.apply() if session else ours.text
+    errors = [issue for issue in validate(ours) if issue.severity == ERROR]
+    if errors:
+        # only report what the merge introduced, not what ours already had
+        known = {(issue.code, issue.object, issue.message) for issue in validate(parse(ours_text))}
+        errors = [issue for issue in errors if (issue.code, issue.object, issue.message) not in known]
+    for key in ROOT_KEYS:
+        value = _merge_value(base.root.get(key), ours.root.get(key), theirs.root.get(key),
+                             key, ('<root>', key), conflicts, favor)
+        if isinstance(value, str) and value != ours.root.get(key):
+            text = re.sub(rf'^\t{key} = [^;\n]*;', lambda _: f'\t{key} = {quote(value)};',
+                          text, count=1, flags=re.M)
+    return MergeResult(text, conflicts, added, removed, changed, errors)
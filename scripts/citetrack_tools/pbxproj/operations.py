@@ -0,0 +1,189 @@
+"""
+Project mutations that can be listed in a manifest.
+
+Each operation takes an :class:`EditSession` and the operation's manifest
+entry, queues its edits and returns a short description of what changed
+(or None when there was nothing to do). Operations are idempotent: re-running
+a manifest against an already updated project queues nothing.
+"""
+
+import os
+
+from . import profiling
+from .settings import PROJECT, SettingRule, rewrite_build_settings
+from .sync import apply_plan, plan, resolve_path
+
+
+class OperationError(ValueError):
+    """Raised when a manifest operation cannot be applied to a project."""
+
+
+OPERATIONS = {}
+
+
+def operation(name):
+    def register(func):
+        OPERATIONS[name] = func
+        return func
+    return register
+
+
+def _target(project, name):
+    target = project.target(name)
+    if target is None:
+        raise OperationError(f'target {name!r} not found')
+    return target
+
+
+def _targets(project, spec, default='CiteTrack'):
+    names = spec.get('targets') or [spec.get('target', default)]
+    return [_target(project, name) for name in names]
+
+
+def _group(project, name):
+    group = project.find_group(name)
+    if group is None:
+        raise OperationError(f'group {name!r} not found')
+    return group
+
+
+@operation('add-files')
+def add_files(session, spec):
+    """``{"op": "add-files", "group": "Views", "targets": [...], "files": [...]}``
+
+    ``files`` entries are paths relative to the group's folder (the project
+    directory for name-only groups), or ``{"path": ..., "name": ...}``
+    objects; every file must exist on disk. A file is added to every target
+    listed (for example the app and its widget extension); files the
+    project already references are only added to the targets that do not
+    build them yet.
+    """
+    project = session.project
+    group = _group(project, spec['group'])
+    folder = resolve_path(project, group) if project.path else None
+    phase_isa = spec.get('phase', 'PBXSourcesBuildPhase')
+    targets = _targets(project, spec)
+    added, extended = [], []
+    for entry in spec['files']:
+        if isinstance(entry, str):
+            entry = {'path': entry}
+        path = entry['path']
+        name = entry.get('name') or os.path.basename(path)
+        if folder is not None and not os.path.exists(os.path.join(folder, path)):
+            raise OperationError(f'{path} not found in {os.path.relpath(folder)} (group {spec["group"]!r})')
+        existing = project.find_by_path(path, 'PBXFileReference')
+        if existing:
+            if session.add_to_targets(existing[0], targets, phase_isa):
+                extended.append(name)
+            continue
+        session.add_file(path, group, name=entry.get('name'), targets=targets, isa=phase_isa)
+        added.append(name)
+    parts = []
+    if added:
+        parts.append(f'added {", ".join(added)}')
+    if extended:
+        parts.append(f'added {", ".join(extended)} to more targets')
+    return '; '.join(parts) or None
+
+
+@operation('add-framework')
+def add_framework(session, spec):
+    """``{"op": "add-framework", "framework": "FileProvider.framework", "target": "CiteTrack"}``"""
+    project = session.project
+    name = spec['framework']
+    if not name.endswith('.framework'):
+        name += '.framework'
+    path = spec.get('path', f'System/Library/Frameworks/{name}')
+    if project.find_by_path(path, 'PBXFileReference'):
+        return None
+    group = project.find_group(spec.get('group', 'Frameworks'))
+    if group is None:
+        group = session.add_group(spec.get('group', 'Frameworks'), project.root_object['mainGroup'])
+    session.add_file(path, group, name=name, file_type='wrapper.framework',
+                     source_tree=spec.get('sourceTree', 'SDKROOT'),
+                     targets=_targets(project, spec), isa='PBXFrameworksBuildPhase')
+    return f'added {name}'
+
+
+@operation('add-shell-script-phase')
+def add_shell_script_phase(session, spec):
+    """``{"op": "add-shell-script-phase", "name": ..., "script": ..., "after": "Embed Frameworks"}``"""
+    project = session.project
+    target = _target(project, spec.get('target', 'CiteTrack'))
+    name = spec['name']
+    if any(phase.get('name') == name
+           for phase in project.build_phases(target, 'PBXShellScriptBuildPhase')):
+        return None
+    fields = {
+        'inputFileListPaths': [], 'inputPaths': spec.get('inputPaths', []),
+        'outputFileListPaths': [], 'outputPaths': spec.get('outputPaths', []),
+        'shellPath': spec.get('shellPath', '/bin/sh'), 'shellScript': spec['script'],
+    }
+    index = None
+    after = spec.get('after')
+    if after is not None:
+        for i, phase_id in enumerate(target.get('buildPhases', [])):
+            existing = project.get(phase_id)
+            if existing is not None and (existing.comment == after or existing.get('name') == after):
+                index = i + 1
+                break
+    session.add_build_phase(target, 'PBXShellScriptBuildPhase', name=name, index=index, **fields)
+    return f'added phase {name!r}'
+
+
+@operation('set-build-settings')
+def set_build_settings(session, spec):
+    """``{"op": "set-build-settings", "settings": {...}, "targets": [...], "configurations": ["Release"]}``
+
+    ``targets`` and ``configurations`` scope the change through the
+    configuration lists (default: every list, including the project's);
+    ``match`` maps keys to the current value(s) they must have to be replaced.
+    Only values that actually differ are rewritten.
+    """
+    match = spec.get('match', {})
+    rules = [SettingRule(key, value, spec.get('targets'), spec.get('configurations'), match.get(key))
+             for key, value in spec['settings'].items()]
+    for name in spec.get('targets') or ():
+        if name != PROJECT:
+            _target(session.project, name)
+    changes = rewrite_build_settings(session, rules)
+    configurations = {(owner, name) for owner, name, *_ in changes}
+    return f'updated {len(changes)} settings in {len(configurations)} configurations' if changes else None
+
+
+@operation('sync')
+def sync(session, spec):
+    """``{"op": "sync", "roots": [{"path": "CiteTrack", "exclude": [...]}], "targets": [...]}``
+
+    Adds references (and Sources entries) for files under the roots that the
+    project lacks and removes references to files that no longer exist; see
+    :func:`sync.plan` for the root options.
+    """
+    sync_plan = plan(session.project, spec['roots'])
+    if not sync_plan:
+        return None
+    targets = spec.get('targets') or [spec.get('target', 'CiteTrack')]
+    for name in targets:
+        _target(session.project, name)
+    apply_plan(session, sync_plan, targets)
+    parts = []
+    if sync_plan.added:
+        parts.append(f'added {", ".join(os.path.basename(p) for p, _, _ in sync_plan.added)}')
+    if sync_plan.removed:
+        parts.append(f'removed {", ".join(os.path.basename(p) for p, _ in sync_plan.removed)}')
+    return '; '.join(parts)
+
+
+def apply_operations(session, operations):
+    """Queue every manifest operation; returns the descriptions of those that changed something."""
+    results = []
+    for spec in operations:
+        func = OPERATIONS.get(spec.get('op'))
+        if func is None:
+            raise OperationError(f'unknown operation {spec.get("op")!r}')
+        with profiling.span(f'op: {spec["op"]}'):
+            result = func(session, spec)
+        if result:
+            results.append(f'{spec["op"]}: {result}')
+    return results
+
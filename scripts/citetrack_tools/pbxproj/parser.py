@@ -0,0 +1,257 @@
+"""
+Tokenizer and parser for the OpenStep-style property list used by
+project.pbxproj.
+
+The file is scanned exactly once with a single compiled token pattern.
+Entries of the top-level ``objects`` dictionary become :class:`PBXObject`
+instances that remember the comment after their ID and their character span
+in the source text.
+"""
+
+import re
+
+from . import profiling
+from .project import PBXObject, PBXProject
+
+# Unquoted string; '/' is allowed unless it starts a comment (unrolled for speed)
+_BARE = r'(?:[^\s{}()=;,"/]|/(?![*/]))[^\s{}()=;,"/]*(?:/(?![*/])[^\s{}()=;,"/]*)*'
+_QUOTED = r'"([^"\\]*(?:\\.[^"\\]*)*)"'
+# Whitespace and comments; the comment pattern cannot run past its own */
+_SKIP = r'(?:\s+|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*)*'
+
+# One token per match: leading whitespace/comments are skipped, and a
+# same-line /* comment */ directly after a string is captured with it.
+_TOKEN = re.compile(r'''
+    %(skip)s
+    (?:
+        ([{}()=;,])
+      | (?:
+            %(quoted)s
+          | (%(bare)s)
+        )
+        (?:[ \t]*/\*[ \t]*(.*?)[ \t]*\*/)?
+    )
+''' % {'bare': _BARE, 'quoted': _QUOTED, 'skip': _SKIP}, re.S | re.X)
+# Fast path for the one-line objects (PBXBuildFile, PBXFileReference) that
+# make up most of a large project: flat dictionaries of plain strings.
+_FLAT_OBJECT = re.compile(r'''
+    (%(bare)s)(?:[ \t]*/\*[ \t]*([^\n]*?)[ \t]*\*/)?[ \t]*=[ \t]*\{
+    ((?:[ \t]*%(bare)s[ \t]*=[ \t]*(?:"[^"\\\n]*(?:\\.[^"\\\n]*)*"|%(bare)s)
+        (?:[ \t]*/\*[^\n]*?\*/)?[ \t]*;)*)
+    [ \t]*\};
+''' % {'bare': _BARE}, re.S | re.X)
+_FLAT_PAIR = re.compile(r'''
+    (%(bare)s)[ \t]*=[ \t]*(?:%(quoted)s|(%(bare)s))
+    (?:[ \t]*/\*[^\n]*?\*/)?[ \t]*;
+''' % {'bare': _BARE, 'quoted': _QUOTED}, re.X)
+# Fast path for arrays of plain strings (children, files, buildPhases, ...)
+_FLAT_ARRAY = re.compile(r'''
+    ((?:\s*(?:"[^"\\\n]*(?:\\.[^"\\\n]*)*"|%(bare)s)(?:[ \t]*/\*[^\n]*?\*/)?[ \t]*,)*)
+    \s*\)
+''' % {'bare': _BARE}, re.X)
+_FLAT_ITEM = re.compile(r'''
+    (?:%(quoted)s|(%(bare)s))(?:[ \t]*/\*[^\n]*?\*/)?[ \t]*,
+''' % {'bare': _BARE, 'quoted': _QUOTED}, re.X)
+_SKIPPER = re.compile(_SKIP)
+_TRAILING = re.compile(_SKIP + r'\Z')
+_ESCAPES = re.compile(r'\\(.)', re.S)
+_ESCAPE_MAP = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\', "'": "'"}
+
+
+class PBXParseError(ValueError):
+    """Raised when project.pbxproj is not a well-formed OpenStep plist."""
+
+    def __init__(self, message, text, pos):
+        line = text.count('\n', 0, pos) + 1
+        super().__init__(f'{message} (line {line})')
+        self.pos = pos
+        self.line = line
+
+
+def _unescape(raw):
+    if '\\' not in raw:
+        return raw
+    return _ESCAPES.sub(lambda m: _ESCAPE_MAP.get(m.group(1), m.group(1)), raw)
+
+
+class _Parser:
+    def __init__(self, text, pos=0, duplicates=None):
+        self.text = text
+        self.pos = pos
+        self._match = _TOKEN.match
+        # When a list, repeated object IDs are recorded here instead of raising
+        self.duplicates = duplicates
+
+    def duplicate(self, object_id, pos):
+        if self.duplicates is None:
+            self.pos = pos
+            self.error(f'duplicate object ID {object_id}')
+        self.duplicates.append((object_id, pos))
+
+    def error(self, message):
+        raise PBXParseError(message, self.text, self.pos)
+
+    def next(self):
+        match = self._match(self.text, self.pos)
+        if match is None:
+            self.error('unexpected end of file' if _TRAILING.match(self.text, self.pos)
+                       else 'unexpected character')
+        self.pos = match.end()
+        return match
+
+    def expect(self, char):
+        if self.next().group(1) != char:
+            self.error(f'expected {char!r}')
+
+    def string(self, token):
+        quoted = token.group(2)
+        if quoted is not None:
+            return _unescape(quoted)
+        bare = token.group(3)
+        if bare is None:
+            self.error(f'unexpected {token.group(1)!r}')
+        return bare
+
+    def value(self, token):
+        punct = token.group(1)
+        if punct is None:
+            return self.string(token)
+        if punct == '{':
+            return self.dictionary()
+        if punct == '(':
+            return self.array()
+        self.error(f'unexpected {punct!r}')
+
+    def array(self):
+        flat = _FLAT_ARRAY.match(self.text, self.pos)
+        if flat is not None:
+            self.pos = flat.end()
+            return [bare or _unescape(quoted)
+                    for quoted, bare in _FLAT_ITEM.findall(flat.group(1))]
+        items = []
+        while True:
+            token = self.next()
+            if token.group(1) == ')':
+                return items
+            items.append(self.value(token))
+            punct = self.next().group(1)
+            if punct == ')':
+                return items
+            if punct != ',':
+                self.error("expected ',' or ')'")
+
+    def dictionary(self, top_level=False):
+        result = {}
+        while True:
+            token = self.next()
+            if token.group(1) == '}':
+                return result
+            key = self.string(token)
+            self.expect('=')
+            token = self.next()
+            if top_level and key == 'objects' and token.group(1) == '{':
+                result[key] = self.objects()
+            else:
+                result[key] = self.value(token)
+            self.expect(';')
+
+    def objects(self):
+        objects = {}
+        text = self.text
+        skip = _SKIPPER.match
+        flat_object, flat_pairs = _FLAT_OBJECT.match, _FLAT_PAIR.findall
+        while True:
+            flat = flat_object(text, skip(text, self.pos).end())
+            if flat is not None:
+                object_id = flat.group(1)
+                if object_id in objects:
+                    self.duplicate(object_id, flat.start(1))
+                    self.pos = flat.end()
+                    continue
+                props = {key: _unescape(quoted) if bare == '' else bare
+                         for key, quoted, bare in flat_pairs(flat.group(3))}
+                self.pos = flat.end()
+                objects[object_id] = PBXObject(
+                    object_id, props, flat.group(2), (flat.start(1), self.pos))
+                continue
+            token = self.next()
+            if token.group(1) == '}':
+                return objects
+            object_id = self.string(token)
+            start = token.start(3) if token.group(3) is not None else token.start(2) - 1
+            comment = token.group(4)
+            self.expect('=')
+            if self.next().group(1) != '{':
+                self.error(f'object {object_id} is not a dictionary')
+            props = self.dictionary()
+            self.expect(';')
+            if object_id in objects:
+                self.duplicate(object_id, start)
+                continue
+            objects[object_id] = PBXObject(object_id, props, comment, (start, self.pos))
+
+
+def value_end(text, pos):
+    """Offset just past the plist value (string, array or dictionary) at ``pos``."""
+    parser = _Parser(text, pos)
+    parser.value(parser.next())
+    return parser.pos
+
+
+def array_item_ends(text, pos):
+    """For the array opening at ``pos``: offsets just after each item's comma, and of its ``)``."""
+    parser = _Parser(text, pos)
+    if parser.next().group(1) != '(':
+        parser.error("expected '('")
+    ends = []
+    while True:
+        token = parser.next()
+        if token.group(1) == ')':
+            return ends, token.start(1)
+        parser.value(token)
+        token = parser.next()
+        if token.group(1) == ')':
+            ends.append(token.start(1))
+            return ends, token.start(1)
+        if token.group(1) != ',':
+            parser.error("expected ',' or ')'")
+        ends.append(parser.pos)
+
+
+def parse(text, path=None, data=None, duplicates=None):
+    """Parse project.pbxproj source text into a :class:`PBXProject`.
+
+    ``data`` may pass the UTF-8 bytes ``text`` was decoded from, so writers
+    can copy unchanged regions straight from them. A repeated object ID is an
+    error, unless ``duplicates`` is a list: then ``(object ID, offset)`` of
+    each repeat is appended to it and the first definition is kept.
+    """
+    header = None
+    if text.startswith('//'):
+        header = text[:text.find('\n') + 1 or len(text)]
+    with profiling.span('parse', path=path):
+        parser = _Parser(text, duplicates=duplicates)
+        parser.expect('{')
+        root = parser.dictionary(top_level=True)
+        if not isinstance(root.get('objects'), dict):
+            parser.error('missing top-level objects dictionary')
+        if not _TRAILING.match(text, parser.pos):
+            parser.error('unexpected trailing content')
+        profiling.count('objects', len(root['objects']))
+    return PBXProject(root, root['objects'], path=path, text=text, header=header, data=data)
+
+
+def load(path):
+    """Read and parse a project.pbxproj file (or the .xcodeproj bundle containing it).
+
+    The file is read as bytes and decoded without newline translation, so
+    the original bytes are kept and can be written back unchanged.
+    """
+    path = str(path)
+    if path.endswith('.xcodeproj'):
+        path = path + '/project.pbxproj'
+    with profiling.span('read', path=path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        profiling.count('bytes_read', len(data))
+    return parse(data.decode('utf-8'), path=path, data=data)
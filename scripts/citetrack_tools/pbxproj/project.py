@@ -0,0 +1,292 @@
+"""
+In-memory object graph for an Xcode project.pbxproj file.
+
+Objects are stored in a dict keyed by object ID, with secondary indexes by
+``isa`` and by file path, so lookups after the initial parse are O(1). Targets
+by name and their build phases by type are indexed on first use.
+"""
+
+import re
+from bisect import bisect_right
+from collections import defaultdict
+
+from . import profiling
+
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+# Object types whose ``children`` list defines the group hierarchy
+GROUP_ISAS = ('PBXGroup', 'PBXVariantGroup', 'XCVersionGroup')
+
+TARGET_ISAS = ('PBXNativeTarget', 'PBXAggregateTarget', 'PBXLegacyTarget')
+
+
+class PBXObject:
+    """A single entry of the ``objects`` dictionary."""
+
+    __slots__ = ('id', 'props', 'comment', 'span')
+
+    def __init__(self, object_id, props, comment=None, span=None):
+        self.id = object_id
+        self.props = props
+        # Text of the ``/* ... */`` comment following the ID, if any
+        self.comment = comment
+        # (start, end) character offsets of the entry in the source text;
+        # PBXProject.byte_span() converts them to offsets in the UTF-8 bytes
+        self.span = span
+
+    @property
+    def isa(self):
+        return self.props.get('isa')
+
+    def get(self, key, default=None):
+        return self.props.get(key, default)
+
+    def __getitem__(self, key):
+        return self.props[key]
+
+    def __contains__(self, key):
+        return key in self.props
+
+    def __repr__(self):
+        return f'<{self.isa} {self.id} {self.comment or ""}>'.replace(' >', '>')
+
+
+class PBXProject:
+    """Parsed project.pbxproj with O(1) lookups by ID, isa and path."""
+
+    def __init__(self, root, objects, path=None, text=None, header=None, data=None):
+        self.root = root
+        self.objects = objects
+        self.path = path
+        self.text = text
+        self.header = header
+        # UTF-8 bytes of ``text`` (the file as read); encoded on demand after edits
+        self._data = data
+        self._byte_table = None
+        self.by_isa = defaultdict(dict)
+        self.by_path = defaultdict(dict)
+        self.parents = {}
+        # Built by _target_index() on first use, dropped when a target or phase changes
+        self._targets = None
+        with profiling.span('index: objects'):
+            for obj in objects.values():
+                self._index(obj)
+            profiling.count('objects', len(objects))
+
+    # MARK: - Indexes
+
+    def _index(self, obj):
+        props = obj.props
+        self._invalidate(props.get('isa'))
+        self.by_isa[props.get('isa')][obj.id] = obj
+        path = props.get('path')
+        if isinstance(path, str):
+            self.by_path[path][obj.id] = obj
+        if props.get('isa') in GROUP_ISAS:
+            for child_id in props.get('children', ()):
+                self.parents[child_id] = obj.id
+
+    def _unindex(self, obj):
+        props = obj.props
+        self._invalidate(props.get('isa'))
+        self.by_isa[props.get('isa')].pop(obj.id, None)
+        path = props.get('path')
+        if isinstance(path, str):
+            self.by_path[path].pop(obj.id, None)
+        if props.get('isa') in GROUP_ISAS:
+            for child_id in props.get('children', ()):
+                if self.parents.get(child_id) == obj.id:
+                    del self.parents[child_id]
+
+    def _invalidate(self, isa):
+        if self._targets is not None and isa and (
+                isa in TARGET_ISAS or isa == 'PBXBuildFile' or isa.endswith('BuildPhase')):
+            self._targets = None
+
+    def _target_index(self):
+        """``(native targets by name, {target ID: {phase isa: [phases]}}, {phase ID: {file IDs}})``."""
+        index = self._targets
+        if index is not None:
+            return index
+        by_name, phases, members = {}, {}, {}
+        with profiling.span('index: targets'):
+            for isa in TARGET_ISAS:
+                for target in self.by_isa.get(isa, {}).values():
+                    if isa == 'PBXNativeTarget':
+                        by_name.setdefault(target.get('name'), target)
+                    by_type = phases[target.id] = {}
+                    for phase_id in target.get('buildPhases', ()):
+                        phase = self.objects.get(phase_id)
+                        if phase is None:
+                            continue
+                        by_type.setdefault(phase.isa, []).append(phase)
+                        files = members[phase_id] = set()
+                        for build_file_id in phase.get('files', ()):
+                            build_file = self.objects.get(build_file_id)
+                            if build_file is not None:
+                                files.add(build_file.get('fileRef') or build_file.get('productRef'))
+            profiling.count('phases', len(members))
+        self._targets = index = (by_name, phases, members)
+        return index
+
+    def reindex(self, obj):
+        """Refresh the secondary indexes after mutating ``obj.props`` in place."""
+        self._unindex(obj)
+        self._index(obj)
+
+    def replace_props(self, obj, props):
+        """Give ``obj`` a new ``props`` dict, keeping the indexes consistent."""
+        self._unindex(obj)
+        obj.props = props
+        self._index(obj)
+
+    # MARK: - Source bytes
+
+    @property
+    def data(self):
+        """The UTF-8 source as a read-only ``memoryview`` (slices are zero-copy)."""
+        if self._data is None:
+            self._data = self.text.encode('utf-8')
+        return memoryview(self._data)
+
+    def set_text(self, text):
+        """Replace the source text after an edit; byte data is re-derived lazily."""
+        self.text = text
+        self._data = None
+        self._byte_table = None
+
+    def byte_offset(self, offset):
+        """Offset in :attr:`data` of character ``offset`` of :attr:`text`."""
+        table = self._byte_table
+        if table is None:
+            with profiling.span('index: byte offsets'):
+                table = self._byte_table = self._build_byte_table()
+        positions, extra = table
+        if not positions:
+            return offset
+        index = bisect_right(positions, offset)
+        return offset + (extra[index - 1] if index else 0)
+
+    def byte_span(self, obj):
+        start, end = obj.span
+        return self.byte_offset(start), self.byte_offset(end)
+
+    def _build_byte_table(self):
+        # End offset of each non-ASCII character and the extra bytes UTF-8
+        # needs up to it; empty (identity mapping) for an all-ASCII file
+        positions, extra = [], []
+        if self.text.isascii():
+            return positions, extra
+        total = 0
+        for match in _NON_ASCII.finditer(self.text):
+            total += len(match.group().encode('utf-8')) - 1
+            positions.append(match.end())
+            extra.append(total)
+        return positions, extra
+
+    # MARK: - Lookups
+
+    @property
+    def root_object(self):
+        return self.objects[self.root['rootObject']]
+
+    def __getitem__(self, object_id):
+        return self.objects[object_id]
+
+    def __contains__(self, object_id):
+        return object_id in self.objects
+
+    def __len__(self):
+        return len(self.objects)
+
+    def get(self, object_id, default=None):
+        return self.objects.get(object_id, default)
+
+    def objects_of(self, isa):
+        """All objects of the given ``isa``, in file order."""
+        return list(self.by_isa.get(isa, {}).values())
+
+    def find_by_path(self, path, isa=None):
+        """Objects whose ``path`` attribute equals ``path``, optionally filtered by isa."""
+        found = self.by_path.get(path, {}).values()
+        if isa is None:
+            return list(found)
+        return [obj for obj in found if obj.isa == isa]
+
+    def find_group(self, name):
+        """First group whose path or display name is ``name``."""
+        for obj in self.by_path.get(name, {}).values():
+            if obj.isa in GROUP_ISAS:
+                return obj
+        for isa in GROUP_ISAS:
+            for obj in self.by_isa.get(isa, {}).values():
+                if self.display_name(obj) == name:
+                    return obj
+        return None
+
+    def target(self, name):
+        """The native target called ``name``, or None."""
+        return self._target_index()[0].get(name)
+
+    def targets(self):
+        """``{name: target}`` for every native target."""
+        return dict(self._target_index()[0])
+
+    def build_phases(self, target, isa):
+        """Build phases of ``target`` with the given isa, in build order."""
+        return list(self._target_index()[1].get(target.id, {}).get(isa, ()))
+
+    def build_phase(self, target, isa):
+        """First build phase of ``target`` with the given isa, or None."""
+        phases = self._target_index()[1].get(target.id, {}).get(isa)
+        return phases[0] if phases else None
+
+    def in_phase(self, phase, file_ref):
+        """Whether ``phase`` already has a build file for the file (or package product) ``file_ref``."""
+        phase_id = phase.id if isinstance(phase, PBXObject) else phase
+        ref_id = file_ref.id if isinstance(file_ref, PBXObject) else file_ref
+        return ref_id in self._target_index()[2].get(phase_id, ())
+
+    def parent_of(self, object_id):
+        """The group containing ``object_id``, or None for the main group."""
+        parent_id = self.parents.get(object_id)
+        return self.objects.get(parent_id) if parent_id else None
+
+    def display_name(self, obj):
+        """The name Xcode shows for an object (and writes into its comments)."""
+        return obj.get('name') or obj.get('path') or obj.comment
+
+    def full_path(self, obj):
+        """Resolve a file or group path relative to the project directory.
+
+        Only ``<group>``-relative trees are walked; other source trees are
+        returned as ``$(SOURCE_TREE)/path``.
+        """
+        parts = []
+        current = obj
+        while current is not None:
+            tree = current.get('sourceTree', '<group>')
+            path = current.get('path')
+            if path:
+                parts.append(path)
+            if tree == '<group>':
+                current = self.parent_of(current.id)
+                continue
+            if tree != 'SOURCE_ROOT':
+                parts.append(f'$({tree})')
+            break
+        return '/'.join(reversed(parts))
+
+    # MARK: - Mutation
+
+    def add_object(self, obj):
+        if obj.id in self.objects:
+            raise KeyError(f'duplicate object ID {obj.id}')
+        self.objects[obj.id] = obj
+        self._index(obj)
+        return obj
+
+    def remove_object(self, object_id):
+        obj = self.objects.pop(object_id)
+        self._unindex(obj)
+        return obj
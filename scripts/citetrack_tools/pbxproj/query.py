@@ -0,0 +1,167 @@
+"""
+Queries over resolved build settings, and diffs between projects.
+
+Settings are resolved the way Xcode layers them inside a project file: a
+target's configuration inherits every key of the project-level configuration
+with the same name and overrides some of them. (``.xcconfig`` base
+configurations are not followed.)
+
+:func:`resolve` turns a project into a plain settings table; :func:`query` and
+:func:`diff` work on those tables, so they can come straight from the parse
+cache without loading the object graph.
+"""
+
+import fnmatch
+import os
+import re
+from collections import namedtuple
+
+from . import profiling
+from .settings import PROJECT, configuration_scope
+
+# One resolved value; ``source`` is the level that defines it ('target' or 'project')
+ResolvedSetting = namedtuple('ResolvedSetting',
+                             'project target configuration key value source')
+
+_CONDITION = re.compile(r'^([^=!~]+?)\s*(!=|=|~)\s*(.*)$', re.S)
+
+
+def project_name(path):
+    """``CiteTrack_iOS`` for ``.../CiteTrack_iOS.xcodeproj/project.pbxproj``."""
+    path = path or ''
+    if path.endswith('project.pbxproj'):
+        path = os.path.dirname(path)
+    return os.path.splitext(os.path.basename(path))[0] or '?'
+
+
+def format_setting(value):
+    """Display form of a setting; list values are space-separated like in Xcode."""
+    if isinstance(value, list):
+        return ' '.join(value)
+    return str(value)
+
+
+@profiling.timed('resolve')
+def resolve(project):
+    """``{(target, configuration): {key: (value, source)}}`` for every target configuration.
+
+    The project-level configurations are included under the name :data:`PROJECT`.
+    """
+    project_level = {}
+    target_level = {}
+    for config_id, (owner, name) in configuration_scope(project).items():
+        settings = project[config_id].get('buildSettings', {})
+        if owner == PROJECT:
+            project_level[name] = settings
+        else:
+            target_level[(owner, name)] = settings
+    resolved = {}
+    for name, settings in project_level.items():
+        resolved[(PROJECT, name)] = {key: (value, 'project') for key, value in settings.items()}
+    for (owner, name), settings in target_level.items():
+        merged = {key: (value, 'project') for key, value in project_level.get(name, {}).items()}
+        merged.update((key, (value, 'target')) for key, value in settings.items())
+        resolved[(owner, name)] = merged
+    return resolved
+
+
+class Condition:
+    """``KEY`` (is set), ``KEY=VALUE``, ``KEY!=VALUE`` or ``KEY~GLOB``; KEY may be a glob too."""
+
+    __slots__ = ('key', 'op', 'value')
+
+    def __init__(self, text):
+        match = _CONDITION.match(text)
+        if match is None:
+            self.key, self.op, self.value = text.strip(), None, None
+        else:
+            self.key, self.op, self.value = match.group(1), match.group(2), match.group(3)
+
+    def keys(self, settings):
+        if any(c in self.key for c in '*?['):
+            return [key for key in settings if fnmatch.fnmatchcase(key, self.key)]
+        return [self.key]
+
+    def test(self, value):
+        if self.op == '!=':
+            return value is None or format_setting(value) != self.value
+        if value is None:
+            return False
+        if self.op == '=':
+            return format_setting(value) == self.value
+        if self.op == '~':
+            return fnmatch.fnmatchcase(format_setting(value), self.value)
+        return True
+
+    def __repr__(self):
+        return f'Condition({self.key}{self.op or ""}{self.value or ""})'
+
+
+def query(tables, conditions=(), targets=None, configurations=None, include_project=False):
+    """Resolved settings matching every condition, one row per (target, configuration, key).
+
+    ``tables`` maps project names to :func:`resolve` results. Rows contain the
+    keys named by the conditions; with no conditions every resolved setting is
+    returned. ``targets``/``configurations`` restrict the scope by name;
+    project-level rows are only included if asked for.
+    """
+    conditions = [c if isinstance(c, Condition) else Condition(c) for c in conditions]
+    rows = []
+    for label, table in tables.items():
+        for (target, name), settings in table.items():
+            if target == PROJECT and not include_project:
+                continue
+            if targets and target not in targets:
+                continue
+            if configurations and name not in configurations:
+                continue
+            matched = []
+            for condition in conditions:
+                keys = [key for key in condition.keys(settings)
+                        if condition.test(settings.get(key, (None,))[0])]
+                if not keys:
+                    break
+                matched.extend(keys)
+            else:
+                for key in (dict.fromkeys(matched) if conditions else settings):
+                    value, source = settings.get(key, (None, None))
+                    rows.append(ResolvedSetting(label, target, name, key, value, source))
+    return rows
+
+
+def diff(left_settings, right_settings, target_map=None, configurations=None, keys=None):
+    """Compare the :func:`resolve` tables of two projects.
+
+    Targets are paired by name unless ``target_map`` maps left names to right
+    names; the project-level configurations are always paired. Returns
+    ``(left target, right target, configuration, key, left value, right value)``
+    tuples for every key whose values differ (``None`` where unset).
+    """
+    target_map = dict(target_map or {})
+    target_map.setdefault(PROJECT, PROJECT)
+    differences = []
+    for (target, name), settings in left_settings.items():
+        if configurations and name not in configurations:
+            continue
+        other_target = target_map.get(target, target)
+        other = right_settings.get((other_target, name))
+        if other is None:
+            continue
+        for key in sorted(set(settings) | set(other)):
+            if keys and not any(fnmatch.fnmatchcase(key, pattern) for pattern in keys):
+                continue
+            a = settings.get(key, (None,))[0]
+            b = other.get(key, (None,))[0]
+            if a != b:
+                differences.append((target, other_target, name, key, a, b))
+    return differences
+
+
+def unpaired(left_settings, right_settings, target_map=None):
+    """Target names of each project that have no counterpart in the other."""
+    target_map = dict(target_map or {})
+    left_targets = {target for target, _ in left_settings} - {PROJECT}
+    right_targets = {target for target, _ in right_settings} - {PROJECT}
+    mapped = {target_map.get(target, target) for target in left_targets}
+    return (sorted(t for t in left_targets if target_map.get(t, t) not in right_targets),
+            sorted(right_targets - mapped))
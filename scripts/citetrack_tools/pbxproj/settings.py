@@ -0,0 +1,88 @@
+"""
+Scoped build-settings rewriting.
+
+Every XCBuildConfiguration is reached through the XCConfigurationList of a
+target (or of the project itself), so rules can be limited to particular
+targets and configuration names. :func:`rewrite_build_settings` evaluates any
+number of rules in a single pass over the configurations and queues only the
+values that actually change; the session then edits just those lines.
+"""
+
+from . import profiling
+from .project import TARGET_ISAS
+
+# Owner name used for the project-level configuration list
+PROJECT = '<project>'
+
+
+class SettingRule:
+    """Set ``key`` to ``value`` in the configurations the rule is scoped to.
+
+    ``targets`` and ``configurations`` are collections of names (``None``
+    means all; use :data:`PROJECT` for the project-level list). ``match``
+    limits the rule to configurations whose current value is one of the given
+    values; without it, missing keys are added.
+    """
+
+    __slots__ = ('key', 'value', 'targets', 'configurations', 'match')
+
+    def __init__(self, key, value, targets=None, configurations=None, match=None):
+        self.key = key
+        self.value = value if isinstance(value, (list, dict)) else str(value)
+        self.targets = frozenset(targets) if targets is not None else None
+        self.configurations = frozenset(configurations) if configurations is not None else None
+        if isinstance(match, str):
+            match = (match,)
+        self.match = frozenset(match) if match is not None else None
+
+    def applies_to(self, owner, configuration):
+        return ((self.targets is None or owner in self.targets)
+                and (self.configurations is None or configuration in self.configurations))
+
+    def __repr__(self):
+        return f'SettingRule({self.key}={self.value!r})'
+
+
+def configuration_scope(project):
+    """Map each XCBuildConfiguration ID to ``(owner name, configuration name)``."""
+    owners = [(PROJECT, project.root_object)]
+    for isa in TARGET_ISAS:
+        owners.extend((target.get('name'), target) for target in project.objects_of(isa))
+    scope = {}
+    for name, owner in owners:
+        config_list = project.get(owner.get('buildConfigurationList'))
+        if config_list is None:
+            continue
+        for config_id in config_list.get('buildConfigurations', ()):
+            config = project.get(config_id)
+            if config is not None:
+                scope[config_id] = (name, config.get('name'))
+    return scope
+
+
+@profiling.timed('settings: rewrite')
+def rewrite_build_settings(session, rules):
+    """Queue every rule against every in-scope configuration in one pass.
+
+    Later rules win over earlier ones for the same key. Returns a list of
+    ``(owner, configuration, key, old value, new value)`` for the values that
+    change; an empty list means the project is already up to date.
+    """
+    project = session.project
+    changes = []
+    for config_id, (owner, name) in configuration_scope(project).items():
+        settings = project[config_id].get('buildSettings', {})
+        updates = {}
+        for rule in rules:
+            if not rule.applies_to(owner, name):
+                continue
+            current = settings.get(rule.key)
+            if rule.match is not None and current not in rule.match:
+                continue
+            updates[rule.key] = rule.value
+        for key, value in updates.items():
+            current = settings.get(key)
+            if current != value:
+                session.set_build_setting(config_id, key, value)
+                changes.append((owner, name, key, current, value))
+    return changes
@@ -0,0 +1,228 @@
+"""
+Reconcile a project with the source trees on disk.
+
+The trees are crawled with ``os.scandir`` from a thread pool (one directory
+per task, so large trees are listed in parallel), the result is set-diffed
+against the file references the project resolves to, and every missing
+reference, group and Sources entry is added -- and every reference to a
+deleted file removed -- in a single :class:`EditSession` batch.
+"""
+
+import fnmatch
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .edit import PHASE_NAMES
+
+# Directories Xcode treats as a single file
+BUNDLE_EXTENSIONS = frozenset(('.xcassets', '.xcdatamodeld', '.xcdatamodel', '.framework',
+                               '.bundle', '.lproj', '.playground', '.xcstrings'))
+# Directories that never contain project sources
+SKIP_DIRECTORIES = frozenset(('.xcodeproj', '.xcworkspace', '.build', 'build', 'DerivedData',
+                              '__pycache__', 'Pods', 'node_modules'))
+# Files that are compiled, and therefore get a Sources build phase entry
+COMPILED_EXTENSIONS = frozenset(('.swift', '.m', '.mm', '.c', '.cc', '.cpp'))
+DEFAULT_INCLUDE = ('*.swift', '*.m', '*.mm', '*.c', '*.cc', '*.cpp', '*.h')
+
+
+def _scan_directory(path):
+    files, directories = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                ext = os.path.splitext(name)[1]
+                if ext in BUNDLE_EXTENSIONS:
+                    files.append(entry.path)
+                elif name not in SKIP_DIRECTORIES and ext not in SKIP_DIRECTORIES:
+                    directories.append(entry.path)
+            else:
+                files.append(entry.path)
+    return files, directories
+
+
+def scan(roots, workers=8):
+    """Every file (and bundle directory) under ``roots``, as absolute normalized paths."""
+    found = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_scan_directory, os.path.abspath(root))
+                   for root in roots if os.path.isdir(root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, directories = future.result()
+                found.extend(files)
+                pending.update(pool.submit(_scan_directory, d) for d in directories)
+    return {os.path.normpath(path) for path in found}
+
+
+def project_dir(project):
+    """The directory containing the .xcodeproj bundle (Xcode's SOURCE_ROOT)."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(project.path)))
+
+
+def resolve_path(project, obj, base=None):
+    """Absolute path of a file reference or group, or None if it lives outside the checkout."""
+    path = project.full_path(obj)
+    if path.startswith('$('):
+        tree, _, rest = path[2:].partition(')')
+        if tree != '<absolute>':
+            return None  # BUILT_PRODUCTS_DIR, SDKROOT, DEVELOPER_DIR, ...
+        path = rest[1:]
+    return os.path.normpath(os.path.join(base or project_dir(project), path))
+
+
+def file_references(project):
+    """``{absolute path: PBXFileReference}`` for every reference inside the checkout."""
+    base = project_dir(project)
+    refs = {}
+    for ref in project.objects_of('PBXFileReference'):
+        path = resolve_path(project, ref, base)
+        if path is not None:
+            refs.setdefault(path, ref)
+    return refs
+
+
+def _group_directories(project, base):
+    """``{directory: group}`` guessing which folder each group stands for.
+
+    A group with a ``path`` stands for that folder. A name-only group (like the
+    iOS project's ``Shared/Services``) stands for the folder all of its file
+    children live in.
+    """
+    by_path, by_children = {}, {}
+    for group in project.objects_of('PBXGroup'):
+        location = resolve_path(project, group, base)
+        if location is None:
+            continue
+        if group.get('path') or group.get('sourceTree') == 'SOURCE_ROOT':
+            by_path.setdefault(location, group)
+            continue
+        folders = set()
+        for child_id in group.get('children', ()):
+            child = project.get(child_id)
+            if child is not None and child.isa == 'PBXFileReference':
+                child_path = resolve_path(project, child, base)
+                if child_path is not None:
+                    folders.add(os.path.dirname(child_path))
+        if len(folders) == 1:
+            by_children.setdefault(folders.pop(), group)
+    by_children.update(by_path)
+    return by_children
+
+
+def _included(path, root, include, exclude):
+    name = os.path.basename(path)
+    relative = os.path.relpath(path, root)
+    if any(fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(name, pattern) for pattern in exclude):
+        return False
+    return any(fnmatch.fnmatch(name, pattern) for pattern in include)
+
+
+class SyncPlan:
+    """What :func:`plan` found: files to add and references to remove."""
+
+    def __init__(self):
+        self.added = []    # (absolute path, root folder, root spec)
+        self.removed = []  # (absolute path, PBXFileReference)
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+
+def root_paths(project, roots):
+    """``[(absolute folder, root spec), ...]`` for the ``roots`` of a sync operation."""
+    base = project_dir(project)
+    return [(os.path.normpath(os.path.join(base, root['path'])), root) for root in roots]
+
+
+def plan(project, roots, workers=8, on_disk=None):
+    """Set-diff the files under each root against the project's references.
+
+    ``roots`` are dicts with ``path`` (relative to the project directory),
+    and optionally ``include``/``exclude`` glob lists, ``targets`` and
+    ``group``. A root's files and references only count if they match its
+    filters, so unrelated references are never removed. ``on_disk`` may
+    supply the set of files (as :func:`scan` returns it) instead of a crawl.
+    """
+    refs = file_references(project)
+    result = SyncPlan()
+    resolved = root_paths(project, roots)
+    if on_disk is None:
+        on_disk = scan([path for path, _ in resolved], workers)
+    for root_path, root in resolved:
+        include = root.get('include', DEFAULT_INCLUDE)
+        exclude = root.get('exclude', ())
+        prefix = root_path + os.sep
+
+        def wanted(path):
+            return path.startswith(prefix) and _included(path, root_path, include, exclude)
+
+        for path in sorted(p for p in on_disk if wanted(p) and p not in refs):
+            result.added.append((path, root_path, root))
+        if root.get('remove', True):
+            for path, ref in refs.items():
+                if wanted(path) and path not in on_disk:
+                    result.removed.append((path, ref))
+    return result
+
+
+def apply_plan(session, sync_plan, default_targets=('CiteTrack',)):
+    """Queue the additions and removals of ``sync_plan`` on ``session``."""
+    project = session.project
+    base = project_dir(project)
+    folders = _group_directories(project, base)
+    # where each group's children are resolved from (its own folder, or its parent's)
+    group_bases = {}
+
+    def group_base(group):
+        if group.id not in group_bases:
+            location = resolve_path(project, group, base)
+            group_bases[group.id] = location if location is not None else base
+        return group_bases[group.id]
+
+    def group_for(folder, root_folder, root_group):
+        """The group for ``folder``, creating groups down from the nearest known one."""
+        if folder in folders:
+            return folders[folder]
+        if folder == root_folder:
+            return root_group
+        parent_folder = os.path.dirname(folder)
+        parent = group_for(parent_folder, root_folder, root_group)
+        name = os.path.basename(folder)
+        if group_base(parent) == parent_folder:
+            group = session.add_group(name, parent, path=name)
+            group_bases[group.id] = folder
+        else:
+            group = session.add_group(name, parent)
+            group_bases[group.id] = group_base(parent)
+        folders[folder] = group
+        return group
+
+    main_group = project[project.root_object['mainGroup']]
+    for path, root_folder, root in sync_plan.added:
+        root_group = project.find_group(root['group']) if root.get('group') else None
+        group = group_for(os.path.dirname(path), root_folder, root_group or main_group)
+        relative = os.path.relpath(path, group_base(group))
+        name = os.path.basename(path)
+        compiled = os.path.splitext(path)[1] in COMPILED_EXTENSIONS
+        targets = root.get('targets', default_targets) if compiled else ()
+        session.add_file(relative, group, name=name if relative != name else None, targets=targets)
+
+    removed = {ref.id for _, ref in sync_plan.removed}
+    for _, ref in sync_plan.removed:
+        session.remove_object(ref)
+        parent = project.parent_of(ref.id)
+        if parent is not None:
+            session.remove(parent, 'children', ref)
+    if removed:
+        owners = {build_file_id: phase
+                  for isa in PHASE_NAMES for phase in project.objects_of(isa)
+                  for build_file_id in phase.get('files', ())}
+        for build_file in project.objects_of('PBXBuildFile'):
+            if build_file.get('fileRef') in removed:
+                session.remove_object(build_file)
+                if build_file.id in owners:
+                    session.remove(owners[build_file.id], 'files', build_file)
@@ -0,0 +1,470 @@
+"""
+Synthetic but valid project.pbxproj files for benchmarks.
+
+:func:`generate` writes a minimal single-target project. Each source file
+costs about four lines (build file, file reference, group child and Sources
+member), so ``generate(files=50_000)`` yields roughly a 200k-line project.
+
+:func:`generate_app` is modeled on ``CiteTrack_iOS.xcodeproj`` instead: the
+app target plus widget and file provider extensions (embedded, with target
+dependencies), sources shared between the app and the widget under a
+name-only ``Shared`` group, nested groups, frameworks, Swift package products,
+resources, a shell script phase and full build settings.
+:func:`generate_lines` sizes it to a line count.
+"""
+
+from .writer import INLINE_ISAS, format_value
+
+# ID namespaces keep generated IDs unique and deterministic
+_FILE_REF, _BUILD_FILE, _GROUP, _FIXED = 0xF11E, 0xB111, 0x6909, 0xC0DE
+
+
+def _id(kind, index):
+    return f'{kind:08X}{index:016X}'
+
+
+def generate(files=1000, files_per_group=50, target='CiteTrack'):
+    """Return the text of a single-target project with ``files`` Swift sources."""
+    project_id, main_group, products = _id(_FIXED, 1), _id(_FIXED, 2), _id(_FIXED, 3)
+    target_id, sources, frameworks = _id(_FIXED, 4), _id(_FIXED, 5), _id(_FIXED, 6)
+    product_ref, target_configs, project_configs = _id(_FIXED, 7), _id(_FIXED, 8), _id(_FIXED, 9)
+    debug, release = _id(_FIXED, 10), _id(_FIXED, 11)
+    project_debug, project_release = _id(_FIXED, 12), _id(_FIXED, 13)
+    group_count = (files + files_per_group - 1) // files_per_group
+    out = ['// !$*UTF8*$!\n{\n\tarchiveVersion = 1;\n\tclasses = {\n\t};\n'
+           '\tobjectVersion = 56;\n\tobjects = {\n\n']
+
+    out.append('/* Begin PBXBuildFile section */\n')
+    for i in range(files):
+        out.append(f'\t\t{_id(_BUILD_FILE, i)} /* File{i}.swift in Sources */ = '
+                   f'{{isa = PBXBuildFile; fileRef = {_id(_FILE_REF, i)} /* File{i}.swift */; }};\n')
+    out.append('/* End PBXBuildFile section */\n\n')
+
+    out.append('/* Begin PBXFileReference section */\n')
+    out.append(f'\t\t{product_ref} /* {target}.app */ = {{isa = PBXFileReference; '
+               f'explicitFileType = wrapper.application; includeInIndex = 0; '
+               f'path = {target}.app; sourceTree = BUILT_PRODUCTS_DIR; }};\n')
+    for i in range(files):
+        out.append(f'\t\t{_id(_FILE_REF, i)} /* File{i}.swift */ = {{isa = PBXFileReference; '
+                   f'lastKnownFileType = sourcecode.swift; path = File{i}.swift; '
+                   f'sourceTree = "<group>"; }};\n')
+    out.append('/* End PBXFileReference section */\n\n')
+
+    out.append('/* Begin PBXFrameworksBuildPhase section */\n'
+               f'\t\t{frameworks} /* Frameworks */ = {{\n\t\t\tisa = PBXFrameworksBuildPhase;\n'
+               '\t\t\tbuildActionMask = 2147483647;\n\t\t\tfiles = (\n\t\t\t);\n'
+               '\t\t\trunOnlyForDeploymentPostprocessing = 0;\n\t\t};\n'
+               '/* End PBXFrameworksBuildPhase section */\n\n')
+
+    out.append('/* Begin PBXGroup section */\n')
+    out.append(f'\t\t{main_group} = {{\n\t\t\tisa = PBXGroup;\n\t\t\tchildren = (\n')
+    for g in range(group_count):
+        out.append(f'\t\t\t\t{_id(_GROUP, g)} /* Group{g} */,\n')
+    out.append(f'\t\t\t\t{products} /* Products */,\n\t\t\t);\n'
+               '\t\t\tsourceTree = "<group>";\n\t\t};\n')
+    for g in range(group_count):
+        out.append(f'\t\t{_id(_GROUP, g)} /* Group{g} */ = {{\n\t\t\tisa = PBXGroup;\n'
+                   '\t\t\tchildren = (\n')
+        for i in range(g * files_per_group, min(files, (g + 1) * files_per_group)):
+            out.append(f'\t\t\t\t{_id(_FILE_REF, i)} /* File{i}.swift */,\n')
+        out.append(f'\t\t\t);\n\t\t\tpath = Group{g};\n\t\t\tsourceTree = "<group>";\n\t\t}};\n')
+    out.append(f'\t\t{products} /* Products */ = {{\n\t\t\tisa = PBXGroup;\n\t\t\tchildren = (\n'
+               f'\t\t\t\t{product_ref} /* {target}.app */,\n\t\t\t);\n'
+               '\t\t\tname = Products;\n\t\t\tsourceTree = "<group>";\n\t\t};\n')
+    out.append('/* End PBXGroup section */\n\n')
+
+    out.append('/* Begin PBXNativeTarget section */\n'
+               f'\t\t{target_id} /* {target} */ = {{\n\t\t\tisa = PBXNativeTarget;\n'
+               f'\t\t\tbuildConfigurationList = {target_configs} /* Build configuration list '
+               f'for PBXNativeTarget "{target}" */;\n\t\t\tbuildPhases = (\n'
+               f'\t\t\t\t{sources} /* Sources */,\n\t\t\t\t{frameworks} /* Frameworks */,\n'
+               '\t\t\t);\n\t\t\tbuildRules = (\n\t\t\t);\n\t\t\tdependencies = (\n\t\t\t);\n'
+               f'\t\t\tname = {target};\n\t\t\tproductName = {target};\n'
+               f'\t\t\tproductReference = {product_ref} /* {target}.app */;\n'
+               '\t\t\tproductType = "com.apple.product-type.application";\n\t\t};\n'
+               '/* End PBXNativeTarget section */\n\n')
+
+    out.append('/* Begin PBXProject section */\n'
+               f'\t\t{project_id} /* Project object */ = {{\n\t\t\tisa = PBXProject;\n'
+               f'\t\t\tbuildConfigurationList = {project_configs} /* Build configuration list '
+               f'for PBXProject "{target}" */;\n\t\t\tcompatibilityVersion = "Xcode 14.0";\n'
+               f'\t\t\tmainGroup = {main_group};\n'
+               f'\t\t\tproductRefGroup = {products} /* Products */;\n'
+               '\t\t\tprojectDirPath = "";\n\t\t\tprojectRoot = "";\n'
+               f'\t\t\ttargets = (\n\t\t\t\t{target_id} /* {target} */,\n\t\t\t);\n\t\t}};\n'
+               '/* End PBXProject section */\n\n')
+
+    out.append('/* Begin PBXSourcesBuildPhase section */\n'
+               f'\t\t{sources} /* Sources */ = {{\n\t\t\tisa = PBXSourcesBuildPhase;\n'
+               '\t\t\tbuildActionMask = 2147483647;\n\t\t\tfiles = (\n')
+    for i in range(files):
+        out.append(f'\t\t\t\t{_id(_BUILD_FILE, i)} /* File{i}.swift in Sources */,\n')
+    out.append('\t\t\t);\n\t\t\trunOnlyForDeploymentPostprocessing = 0;\n\t\t};\n'
+               '/* End PBXSourcesBuildPhase section */\n\n')
+
+    out.append('/* Begin XCBuildConfiguration section */\n')
+    for config_id, name, dsym in ((project_debug, 'Debug', 'dwarf'),
+                                  (project_release, 'Release', '"dwarf-with-dsym"'),
+                                  (debug, 'Debug', None), (release, 'Release', None)):
+        out.append(f'\t\t{config_id} /* {name} */ = {{\n\t\t\tisa = XCBuildConfiguration;\n'
+                   '\t\t\tbuildSettings = {\n')
+        if dsym:
+            out.append(f'\t\t\t\tDEBUG_INFORMATION_FORMAT = {dsym};\n')
+        else:
+            out.append(f'\t\t\t\tPRODUCT_NAME = {target};\n\t\t\t\tSWIFT_VERSION = 5.0;\n')
+        out.append(f'\t\t\t}};\n\t\t\tname = {name};\n\t\t}};\n')
+    out.append('/* End XCBuildConfiguration section */\n\n')
+
+    out.append('/* Begin XCConfigurationList section */\n')
+    for list_id, owner, configs in (
+            (project_configs, f'PBXProject "{target}"', (project_debug, project_release)),
+            (target_configs, f'PBXNativeTarget "{target}"', (debug, release))):
+        out.append(f'\t\t{list_id} /* Build configuration list for {owner} */ = {{\n'
+                   '\t\t\tisa = XCConfigurationList;\n\t\t\tbuildConfigurations = (\n'
+                   f'\t\t\t\t{configs[0]} /* Debug */,\n\t\t\t\t{configs[1]} /* Release */,\n'
+                   '\t\t\t);\n\t\t\tdefaultConfigurationIsVisible = 0;\n'
+                   '\t\t\tdefaultConfigurationName = Release;\n\t\t};\n')
+    out.append('/* End XCConfigurationList section */\n')
+
+    out.append(f'\t}};\n\trootObject = {project_id} /* Project object */;\n}}\n')
+    return ''.join(out)
+
+
+# MARK: - App-shaped projects
+
+# (target, product, product type, bundle suffix) of CiteTrack_iOS.xcodeproj plus a file provider
+APP_TARGETS = (
+    ('CiteTrack', 'CiteTrack.app', 'com.apple.product-type.application', ''),
+    ('CiteTrackWidgetExtension', 'CiteTrackWidgetExtension.appex',
+     'com.apple.product-type.app-extension', '.widget'),
+    ('CiteTrackFileProvider', 'CiteTrackFileProvider.appex',
+     'com.apple.product-type.app-extension', '.fileprovider'),
+)
+# Source folders the app's files are spread over, like CiteTrack/ and Shared/
+CATEGORIES = ('Views', 'Models', 'Services', 'Managers', 'Utilities')
+# System frameworks per target
+SYSTEM_FRAMEWORKS = {
+    'CiteTrackWidgetExtension': ('WidgetKit.framework', 'SwiftUI.framework'),
+    'CiteTrackFileProvider': ('FileProvider.framework', 'UniformTypeIdentifiers.framework'),
+}
+# Swift package products linked by the app
+PACKAGE_PRODUCTS = ('FirebaseAnalytics', 'FirebaseCrashlytics')
+
+_PROJECT_SETTINGS = {
+    'ALWAYS_SEARCH_USER_PATHS': 'NO',
+    'CLANG_ANALYZER_NONNULL': 'YES',
+    'CLANG_CXX_LANGUAGE_STANDARD': 'gnu++20',
+    'CLANG_ENABLE_MODULES': 'YES',
+    'CLANG_ENABLE_OBJC_ARC': 'YES',
+    'COPY_PHASE_STRIP': 'NO',
+    'ENABLE_STRICT_OBJC_MSGSEND': 'YES',
+    'GCC_C_LANGUAGE_STANDARD': 'gnu17',
+    'GCC_NO_COMMON_BLOCKS': 'YES',
+    'IPHONEOS_DEPLOYMENT_TARGET': '17.0',
+    'MTL_FAST_MATH': 'YES',
+    'SDKROOT': 'iphoneos',
+}
+_CONFIGURATION_SETTINGS = {
+    'Debug': {
+        'DEBUG_INFORMATION_FORMAT': 'dwarf',
+        'ENABLE_TESTABILITY': 'YES',
+        'GCC_OPTIMIZATION_LEVEL': '0',
+        'GCC_PREPROCESSOR_DEFINITIONS': ['DEBUG=1', '$(inherited)'],
+        'ONLY_ACTIVE_ARCH': 'YES',
+        'SWIFT_ACTIVE_COMPILATION_CONDITIONS': 'DEBUG $(inherited)',
+        'SWIFT_OPTIMIZATION_LEVEL': '-Onone',
+    },
+    'Release': {
+        'DEBUG_INFORMATION_FORMAT': 'dwarf-with-dsym',
+        'ENABLE_NS_ASSERTIONS': 'NO',
+        'SWIFT_COMPILATION_MODE': 'wholemodule',
+        'VALIDATE_PRODUCT': 'YES',
+    },
+}
+
+_CRASHLYTICS_SCRIPT = '"${BUILD_DIR%/Build/*}/SourcePackages/checkouts/firebase-ios-sdk/Crashlytics/run"\n'
+
+
+class _Sections:
+    """Objects formatted as they are added, grouped into Xcode's isa sections.
+
+    Every ID another object refers to must be named (given its comment)
+    before that object is added.
+    """
+
+    def __init__(self):
+        self.comments = {}
+        self.sections = {}
+        self.serial = 0
+
+    def new_id(self, comment=None):
+        self.serial += 1
+        object_id = _id(_FIXED, 0x100 + self.serial)
+        if comment is not None:
+            self.comments[object_id] = comment
+        return object_id
+
+    def add(self, object_id, isa, comment=None, **props):
+        if comment is not None:
+            self.comments[object_id] = comment
+        head = f'{object_id} /* {comment} */' if comment else object_id
+        body = format_value({'isa': isa, **props}, self.comments.get, 2, isa in INLINE_ISAS)
+        self.sections.setdefault(isa, []).append(f'\t\t{head} = {body};\n')
+
+    def text(self, root_id):
+        out = ['// !$*UTF8*$!\n{\n\tarchiveVersion = 1;\n\tclasses = {\n\t};\n'
+               '\tobjectVersion = 77;\n\tobjects = {\n']
+        for isa in sorted(self.sections):
+            out.append(f'\n/* Begin {isa} section */\n')
+            out.extend(self.sections[isa])
+            out.append(f'/* End {isa} section */\n')
+        out.append(f'\t}};\n\trootObject = {root_id} /* Project object */;\n}}\n')
+        return ''.join(out)
+
+
+def _split(files, shared, extensions):
+    """Source counts for (app, shared, widget, file provider)."""
+    n_shared = int(files * shared)
+    n_extension = int(files * extensions)
+    return files - n_shared - 2 * n_extension, n_shared, n_extension, n_extension
+
+
+def generate_app(files=1000, files_per_group=40, shared=0.2, extensions=0.05, name='CiteTrack_iOS'):
+    """Return the text of an app-shaped project with ``files`` Swift sources.
+
+    ``shared`` is the fraction of sources compiled into both the app and the
+    widget, ``extensions`` the fraction that belongs to each extension alone;
+    the rest are app sources. Sources are split into groups of
+    ``files_per_group`` under per-category folders.
+    """
+    s = _Sections()
+    app, widget, provider = (target for target, _, _, _ in APP_TARGETS)
+    target_ids = {target: s.new_id(target) for target, _, _, _ in APP_TARGETS}
+    product_refs = {target: s.new_id(product) for target, product, _, _ in APP_TARGETS}
+    phases = {(target, kind): s.new_id(kind) for target in target_ids
+              for kind in ('Sources', 'Frameworks', 'Resources')}
+    project_id = s.new_id('Project object')
+    main_group, products_group = s.new_id(), s.new_id('Products')
+    frameworks_group = s.new_id('Frameworks')
+    embed = s.new_id('Embed Foundation Extensions')
+    shell = s.new_id('Firebase Crashlytics dSYM Upload')
+    package = s.new_id('XCRemoteSwiftPackageReference "firebase-ios-sdk"')
+    package_products = {product: s.new_id(product) for product in PACKAGE_PRODUCTS}
+    config_lists = {owner: s.new_id(f'Build configuration list for {kind} "{owner}"')
+                    for owner, kind in [(name, 'PBXProject')]
+                    + [(target, 'PBXNativeTarget') for target in target_ids]}
+    phase_files = {key: [] for key in phases}
+    build_index = 0
+
+    def build_file(ref, phase_key, label, **extra):
+        nonlocal build_index
+        build_id = _id(_BUILD_FILE, build_index)
+        build_index += 1
+        kind = s.comments[phases[phase_key]] if phase_key in phases else phase_key
+        s.add(build_id, 'PBXBuildFile', f'{label} in {kind}', fileRef=ref, **extra)
+        return build_id
+
+    # source files, their groups and Sources entries
+    counts = dict(zip(('app', 'shared', 'widget', 'provider'),
+                      _split(files, shared, extensions)))
+    layout = (  # (prefix, top group comment, top group path, targets)
+        ('App', app, app, (app,)),
+        ('Shared', 'Shared', None, (app, widget)),
+        ('Widget', 'CiteTrackWidget', 'CiteTrackWidget', (widget,)),
+        ('FileProvider', provider, provider, (provider,)),
+    )
+    top_groups = []
+    file_index = group_index = 0
+    for (prefix, top_name, top_path, targets), count in zip(layout, counts.values()):
+        top_id = _id(_GROUP, group_index)
+        group_index += 1
+        top_groups.append(top_id)
+        s.comments[top_id] = top_name
+        category_groups = []
+        for c, category in enumerate(CATEGORIES):
+            members = range(c, count, len(CATEGORIES))
+            if not members:
+                continue
+            category_id = _id(_GROUP, group_index)
+            group_index += 1
+            s.comments[category_id] = category
+            category_groups.append((category_id, category, []))
+            for chunk_start in range(0, len(members), files_per_group):
+                chunk_id = _id(_GROUP, group_index)
+                group_index += 1
+                part = f'{category}{chunk_start // files_per_group}'
+                children = []
+                for i in members[chunk_start:chunk_start + files_per_group]:
+                    file_name = f'{prefix}{category}{i}.swift'
+                    ref = _id(_FILE_REF, file_index)
+                    file_index += 1
+                    if top_path is None:
+                        # Shared/ sits next to the project: name-only groups, relative paths
+                        s.add(ref, 'PBXFileReference', file_name, includeInIndex='1',
+                              lastKnownFileType='sourcecode.swift', name=file_name,
+                              path=f'../Shared/{category}/{part}/{file_name}', sourceTree='<group>')
+                    else:
+                        s.add(ref, 'PBXFileReference', file_name,
+                              lastKnownFileType='sourcecode.swift', path=file_name,
+                              sourceTree='<group>')
+                    children.append(ref)
+                    for target in targets:
+                        phase_files[(target, 'Sources')].append(
+                            build_file(ref, (target, 'Sources'), file_name))
+                location = {'name': part} if top_path is None else {'path': part}
+                s.add(chunk_id, 'PBXGroup', part, children=children, **location,
+                      sourceTree='<group>')
+                category_groups[-1][2].append(chunk_id)
+        resources = []
+        if top_path is not None:
+            target = targets[0]
+            for resource, file_type in (('Assets.xcassets', 'folder.assetcatalog'),
+                                        ('Info.plist', 'text.plist.xml'),
+                                        (f'{target}.entitlements', 'text.plist.entitlements')):
+                ref = _id(_FILE_REF, file_index)
+                file_index += 1
+                s.add(ref, 'PBXFileReference', resource, lastKnownFileType=file_type,
+                      path=resource, sourceTree='<group>')
+                resources.append(ref)
+                if resource == 'Assets.xcassets':
+                    phase_files[(target, 'Resources')].append(
+                        build_file(ref, (target, 'Resources'), resource))
+        for category_id, category, chunks in category_groups:
+            location = {'name': category} if top_path is None else {'path': category}
+            s.add(category_id, 'PBXGroup', category, children=chunks, **location,
+                  sourceTree='<group>')
+        location = {'name': top_name} if top_path is None else {'path': top_path}
+        s.add(top_id, 'PBXGroup', top_name,
+              children=[c for c, _, _ in category_groups] + resources, **location,
+              sourceTree='<group>')
+
+    # products, frameworks and packages
+    for target, product, product_type, _ in APP_TARGETS:
+        file_type = 'wrapper.application' if product.endswith('.app') else 'wrapper.app-extension'
+        s.add(product_refs[target], 'PBXFileReference', product, explicitFileType=file_type,
+              includeInIndex='0', path=product, sourceTree='BUILT_PRODUCTS_DIR')
+    framework_refs = []
+    for target, frameworks in SYSTEM_FRAMEWORKS.items():
+        for framework in frameworks:
+            ref = _id(_FILE_REF, file_index)
+            file_index += 1
+            s.add(ref, 'PBXFileReference', framework, lastKnownFileType='wrapper.framework',
+                  name=framework, path=f'System/Library/Frameworks/{framework}', sourceTree='SDKROOT')
+            framework_refs.append(ref)
+            phase_files[(target, 'Frameworks')].append(
+                build_file(ref, (target, 'Frameworks'), framework))
+    for product, product_id in package_products.items():
+        build_id = _id(_BUILD_FILE, build_index)
+        build_index += 1
+        s.add(build_id, 'PBXBuildFile', f'{product} in Frameworks', platformFilter='ios',
+              productRef=product_id)
+        phase_files[(app, 'Frameworks')].append(build_id)
+        s.add(product_id, 'XCSwiftPackageProductDependency', product, package=package,
+              productName=product)
+    s.add(package, 'XCRemoteSwiftPackageReference', s.comments[package],
+          repositoryURL='https://github.com/firebase/firebase-ios-sdk',
+          requirement={'kind': 'upToNextMajorVersion', 'minimumVersion': '11.0.0'})
+
+    s.add(products_group, 'PBXGroup', 'Products', children=list(product_refs.values()),
+          name='Products', sourceTree='<group>')
+    s.add(frameworks_group, 'PBXGroup', 'Frameworks', children=framework_refs,
+          name='Frameworks', sourceTree='<group>')
+    s.add(main_group, 'PBXGroup', children=top_groups + [frameworks_group, products_group],
+          sourceTree='<group>')
+
+    # build phases
+    embedded = [build_file(product_refs[target], 'Embed Foundation Extensions', s.comments[product_refs[target]],
+                           settings={'ATTRIBUTES': ['RemoveHeadersOnCopy']})
+                for target in (widget, provider)]
+    s.add(embed, 'PBXCopyFilesBuildPhase', 'Embed Foundation Extensions',
+          buildActionMask='2147483647', dstPath='', dstSubfolderSpec='13', files=embedded,
+          name='Embed Foundation Extensions', runOnlyForDeploymentPostprocessing='0')
+    s.add(shell, 'PBXShellScriptBuildPhase', s.comments[shell], buildActionMask='2147483647',
+          files=[], inputPaths=['${DWARF_DSYM_FOLDER_PATH}/${DWARF_DSYM_FILE_NAME}',
+                                '$(TARGET_BUILD_DIR)/$(EXECUTABLE_PATH)'],
+          name=s.comments[shell], outputPaths=[], runOnlyForDeploymentPostprocessing='0',
+          shellPath='/bin/sh', shellScript=_CRASHLYTICS_SCRIPT)
+    for (target, kind), phase_id in phases.items():
+        s.add(phase_id, f'PBX{kind}BuildPhase', kind, buildActionMask='2147483647',
+              files=phase_files[(target, kind)], runOnlyForDeploymentPostprocessing='0')
+
+    # targets, with the extensions embedded in (and built before) the app
+    dependencies = []
+    for target in (widget, provider):
+        proxy, dependency = s.new_id('PBXContainerItemProxy'), s.new_id('PBXTargetDependency')
+        s.add(proxy, 'PBXContainerItemProxy', 'PBXContainerItemProxy', containerPortal=project_id,
+              proxyType='1', remoteGlobalIDString=target_ids[target], remoteInfo=target)
+        s.add(dependency, 'PBXTargetDependency', 'PBXTargetDependency', name=target,
+              platformFilter='ios', target=target_ids[target], targetProxy=proxy)
+        dependencies.append(dependency)
+    for target, _, product_type, _ in APP_TARGETS:
+        build_phases = [phases[(target, kind)] for kind in ('Sources', 'Frameworks', 'Resources')]
+        extra = {}
+        if target == app:
+            build_phases += [embed, shell]
+            extra['packageProductDependencies'] = list(package_products.values())
+        s.add(target_ids[target], 'PBXNativeTarget', target,
+              buildConfigurationList=config_lists[target], buildPhases=build_phases,
+              buildRules=[], dependencies=dependencies if target == app else [], name=target,
+              **extra, productName=target, productReference=product_refs[target],
+              productType=product_type)
+
+    # build configurations
+    for owner, list_id in config_lists.items():
+        configurations = []
+        for configuration in ('Debug', 'Release'):
+            config_id = s.new_id(configuration)
+            if owner == name:
+                settings = {**_PROJECT_SETTINGS, **_CONFIGURATION_SETTINGS[configuration]}
+            else:
+                settings = _target_settings(owner, configuration)
+            s.add(config_id, 'XCBuildConfiguration', configuration,
+                  buildSettings=dict(sorted(settings.items())), name=configuration)
+            configurations.append(config_id)
+        s.add(list_id, 'XCConfigurationList', s.comments[list_id], buildConfigurations=configurations,
+              defaultConfigurationIsVisible='0', defaultConfigurationName='Release')
+
+    s.add(project_id, 'PBXProject', 'Project object',
+          attributes={'BuildIndependentTargetsInParallel': '1', 'LastSwiftUpdateCheck': '1640',
+                      'LastUpgradeCheck': '2600',
+                      'TargetAttributes': {target_ids[t]: {'CreatedOnToolsVersion': '15.4'}
+                                           for t in target_ids}},
+          buildConfigurationList=config_lists[name], compatibilityVersion='Xcode 14.0',
+          developmentRegion='en', hasScannedForEncodings='0', knownRegions=['en', 'Base'],
+          mainGroup=main_group, packageReferences=[package], productRefGroup=products_group,
+          projectDirPath='', projectRoot='', targets=list(target_ids.values()))
+    return s.text(project_id)
+
+
+def _target_settings(target, configuration):
+    suffix = next(suffix for name, _, _, suffix in APP_TARGETS if name == target)
+    settings = {
+        'CODE_SIGN_ENTITLEMENTS': f'{target}/{target}.entitlements',
+        'CODE_SIGN_STYLE': 'Automatic',
+        'CURRENT_PROJECT_VERSION': '2',
+        'DEVELOPMENT_TEAM': 'HNU7NA3S7L',
+        'INFOPLIST_FILE': f'{target}/Info.plist',
+        'LD_RUNPATH_SEARCH_PATHS': ['$(inherited)', '@executable_path/Frameworks'],
+        'MARKETING_VERSION': '1.1.3',
+        'PRODUCT_BUNDLE_IDENTIFIER': f'com.citetrack.CiteTrack{suffix}',
+        'PRODUCT_NAME': '$(TARGET_NAME)',
+        'SWIFT_EMIT_LOC_STRINGS': 'YES',
+        'SWIFT_VERSION': '5.0',
+        'TARGETED_DEVICE_FAMILY': '1,2',
+    }
+    if suffix:
+        settings['LD_RUNPATH_SEARCH_PATHS'].append('@executable_path/../../Frameworks')
+        settings['SKIP_INSTALL'] = 'YES'
+    else:
+        settings['ASSETCATALOG_COMPILER_APPICON_NAME'] = 'AppIcon'
+    if configuration == 'Release':
+        settings['VALIDATE_PRODUCT'] = 'YES'
+    return settings
+
+
+def generate_lines(lines, **options):
+    """:func:`generate_app` sized to about ``lines`` lines (1k to 1M and beyond)."""
+    base = generate_app(files=0, **options).count('\n')
+    sample = 10_000
+    per_file = (generate_app(files=sample, **options).count('\n') - base) / sample
+    return generate_app(files=max(0, round((lines - base) / per_file)), **options)
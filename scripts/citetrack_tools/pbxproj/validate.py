@@ -0,0 +1,190 @@
+"""
+Referential-integrity checks for project.pbxproj.
+
+:func:`validate` walks the object graph once and reports:
+
+* ``duplicate-id`` -- an object ID defined twice (the later entry is ignored
+  by Xcode, which usually loses a file or build file);
+* ``malformed-id`` -- an ID that is not 24 upper-case hex digits, such as the
+  hand-written ``AutoUpdateMgr123...`` ones;
+* ``dangling-reference`` -- a reference to an ID with no object;
+* ``orphan-file`` / ``orphan-group`` -- a file reference or group that no
+  group lists as a child;
+* ``orphan-build-file`` -- a PBXBuildFile that no build phase lists;
+* ``duplicate-build-file`` -- the same file twice in one kind of build phase
+  of a target (in Sources: compiled twice, which fails the link).
+
+Every check is a dict or set lookup per reference, so a project is validated
+in time linear in its size. Results of :func:`validate_file` are cached by
+file contents, so unchanged projects cost only a hash.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter, namedtuple
+
+from . import profiling
+from .cache import cached_value
+from .parser import PBXParseError, load, parse
+from .project import GROUP_ISAS, TARGET_ISAS
+
+Issue = namedtuple('Issue', 'severity code object line message')
+
+ERROR = 'error'
+WARNING = 'warning'
+
+_OBJECT_ID = re.compile(r'[0-9A-F]{24}\Z')
+
+# Properties whose value is an object ID (or a list of them)
+REFERENCE_KEYS = frozenset((
+    'baseConfigurationReference', 'buildConfigurationList', 'buildConfigurations',
+    'buildPhases', 'buildRules', 'children', 'containerPortal', 'dependencies', 'exceptions',
+    'fileRef', 'fileSystemSynchronizedGroups', 'files', 'mainGroup', 'package',
+    'packageProductDependencies', 'packageReferences', 'productRef', 'productRefGroup',
+    'productReference', 'remoteRef', 'target', 'targetProxy', 'targets',
+))
+# Keys of the dictionaries in PBXProject.projectReferences
+PROJECT_REFERENCE_KEYS = ('ProductGroup', 'ProjectRef')
+# Objects that belong in the group tree
+GROUPED_ISAS = ('PBXFileReference', 'PBXReferenceProxy') + GROUP_ISAS
+
+
+class _Lines:
+    """Offset -> line number, building the newline table only if an issue needs it."""
+
+    def __init__(self, text):
+        self.text = text
+        self.starts = None
+
+    def __call__(self, obj):
+        if obj is None or obj.span is None or not self.text:
+            return None
+        if self.starts is None:
+            self.starts = [m.end() for m in re.finditer('\n', self.text)]
+        return bisect_right(self.starts, obj.span[0]) + 1
+
+
+def _ids(value):
+    if isinstance(value, str):
+        return (value,)
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, str)]
+    return ()
+
+
+@profiling.timed('validate')
+def validate(project, duplicates=()):
+    """Every integrity issue in ``project``, as :class:`Issue` tuples in file order.
+
+    ``duplicates`` takes the ``(object ID, offset)`` pairs collected by
+    ``parse(..., duplicates=[])`` for files that repeat an ID.
+    """
+    objects = project.objects
+    line_of = _Lines(project.text)
+    issues = []
+
+    def report(severity, code, obj, message):
+        issues.append(Issue(severity, code, obj.id if obj is not None else None,
+                            line_of(obj), message))
+
+    for object_id, offset in duplicates:
+        line = project.text.count('\n', 0, offset) + 1 if project.text else None
+        issues.append(Issue(ERROR, 'duplicate-id', object_id, line,
+                            f'object ID {object_id} is defined more than once'))
+
+    root_id = project.root.get('rootObject')
+    if root_id not in objects:
+        issues.append(Issue(ERROR, 'dangling-reference', None, None,
+                            f'rootObject refers to missing object {root_id}'))
+
+    in_phase = set()
+    for obj in objects.values():
+        if not _OBJECT_ID.match(obj.id):
+            report(WARNING, 'malformed-id', obj,
+                   f'{obj.isa} {obj.id} is not a 24-digit upper-case hex ID')
+        props = obj.props
+        isa = props.get('isa')
+        for key, value in props.items():
+            if key in REFERENCE_KEYS:
+                for ref in _ids(value):
+                    if ref not in objects:
+                        report(ERROR, 'dangling-reference', obj,
+                               f'{isa} {obj.id} {key} refers to missing object {ref}')
+            elif key == 'remoteGlobalIDString' and props.get('containerPortal') == root_id:
+                # proxies into this project name one of its targets
+                if value not in objects:
+                    report(ERROR, 'dangling-reference', obj,
+                           f'{isa} {obj.id} remoteGlobalIDString refers to missing object {value}')
+            elif key == 'projectReferences' and isinstance(value, list):
+                for entry in value:
+                    for ref_key in PROJECT_REFERENCE_KEYS:
+                        ref = entry.get(ref_key) if isinstance(entry, dict) else None
+                        if ref is not None and ref not in objects:
+                            report(ERROR, 'dangling-reference', obj,
+                                   f'{isa} {obj.id} {ref_key} refers to missing object {ref}')
+        if isa and isa.endswith('BuildPhase'):
+            in_phase.update(_ids(props.get('files')))
+
+    main_group = objects[root_id].get('mainGroup') if root_id in objects else None
+    parents = project.parents
+    for isa in GROUPED_ISAS:
+        for obj in project.objects_of(isa):
+            if obj.id not in parents and obj.id != main_group:
+                kind = 'orphan-group' if isa in GROUP_ISAS else 'orphan-file'
+                report(WARNING, kind, obj, f'{project.display_name(obj)} ({obj.id}) is in no group')
+    for obj in project.objects_of('PBXBuildFile'):
+        if obj.id not in in_phase:
+            report(WARNING, 'orphan-build-file', obj, f'{obj.comment or obj.id} is in no build phase')
+
+    for target_isa in TARGET_ISAS:
+        for target in project.objects_of(target_isa):
+            members = {}
+            for phase_id in target.get('buildPhases', ()):
+                phase = objects.get(phase_id)
+                if phase is None or phase.isa == 'PBXShellScriptBuildPhase':
+                    continue
+                # copy phases with different destinations may legitimately share files
+                kind = phase.isa if phase.isa != 'PBXCopyFilesBuildPhase' else phase.id
+                counts = members.setdefault(kind, Counter())
+                for build_file_id in phase.get('files', ()):
+                    build_file = objects.get(build_file_id)
+                    if build_file is not None:
+                        counts[build_file.get('fileRef') or build_file.get('productRef')
+                               or build_file_id] += 1
+            for kind, counts in members.items():
+                for ref, count in counts.items():
+                    if count < 2:
+                        continue
+                    ref_obj = objects.get(ref)
+                    name = project.display_name(ref_obj) if ref_obj is not None else ref
+                    compiled = kind == 'PBXSourcesBuildPhase'
+                    report(ERROR if compiled else WARNING, 'duplicate-build-file', target,
+                           f'{name} is {"compiled" if compiled else "listed"} {count} times '
+                           f'in the {kind if kind.startswith("PBX") else "copy"} phases '
+                           f'of target {target.get("name")}')
+
+    issues.sort(key=lambda issue: (issue.line or 0, issue.code))
+    return issues
+
+
+def _validate_rows(project):
+    return [tuple(issue) for issue in validate(project)]
+
+
+def validate_file(path, use_cache=True):
+    """:func:`validate` one project.pbxproj; a file that does not parse is one ``parse-error``."""
+    try:
+        if use_cache:
+            return [Issue(*row) for row in cached_value(path, 'integrity', _validate_rows)]
+        return validate(load(path))
+    except PBXParseError as error:
+        strict_error = error
+    # only repeated IDs are recoverable: parse again, keeping the first definitions
+    with open(path, 'rb') as f:
+        data = f.read()
+    duplicates = []
+    try:
+        project = parse(data.decode('utf-8'), path=path, data=data, duplicates=duplicates)
+    except PBXParseError:
+        return [Issue(ERROR, 'parse-error', None, strict_error.line, str(strict_error))]
+    return validate(project, duplicates)
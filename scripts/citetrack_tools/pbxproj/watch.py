@@ -0,0 +1,503 @@
+"""
+Watch daemon: keep projects parsed in memory and sync them as files change.
+
+:class:`Daemon` loads every project of a sync manifest once, watches the
+manifest's source roots (inotify on Linux, polling elsewhere), turns file
+create/delete/rename events into one :class:`EditSession` batch per project
+after a quiet period, and answers JSON queries on a Unix socket from the
+resident graph::
+
+    python3 -m citetrack_tools.pbxproj watch &
+    python3 -m citetrack_tools.pbxproj ask status
+    python3 -m citetrack_tools.pbxproj ask find AutoUpdateManager.swift
+
+Requests and responses are single lines of JSON: ``{"cmd": "status"}`` ->
+``{"ok": true, ...}``. A project changed on disk by someone else is re-read
+before the next query or write. Only files created or deleted after
+start-up are synced; an existing difference is reported and left alone
+unless ``--sync-now`` is given.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+from .edit import EditSession
+from .parser import load
+from .query import Condition, query, resolve
+from .sync import BUNDLE_EXTENSIONS, SKIP_DIRECTORIES, apply_plan, plan, root_paths, scan
+
+
+def default_socket_path():
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(base, f'citetrack-pbxproj-{os.getuid()}.sock')
+
+
+# MARK: - Watchers
+
+class PollingWatcher:
+    """Finds created and deleted files by re-scanning the roots every ``interval`` seconds."""
+
+    def __init__(self, roots, interval=1.0):
+        self.roots = list(roots)
+        self.interval = interval
+        self.files = scan(self.roots)
+        self._next = time.monotonic() + interval
+
+    def wait(self, timeout):
+        """``[(kind, path), ...]`` with kind ``'created'`` or ``'deleted'``; waits at most ``timeout``."""
+        delay = self._next - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(timeout, 0))
+            return []
+        time.sleep(max(delay, 0))
+        self._next = time.monotonic() + self.interval
+        files = scan(self.roots)
+        events = [('created', path) for path in files - self.files]
+        events.extend(('deleted', path) for path in self.files - files)
+        self.files = files
+        return events
+
+    def close(self):
+        pass
+
+
+# <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+_EVENT = struct.Struct('iIII')
+_WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR
+
+
+class InotifyWatcher:
+    """Linux inotify through ctypes: one watch per directory, events as they happen."""
+
+    def __init__(self, roots):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.roots = list(roots)
+        self.directories = {}  # watch descriptor -> directory
+        self.files = set()
+        for root in self.roots:
+            if os.path.isdir(root):
+                self._watch_tree(root)
+
+    @classmethod
+    def available(cls):
+        return sys.platform.startswith('linux') and bool(ctypes.util.find_library('c'))
+
+    def _watch_tree(self, directory):
+        """Watch ``directory`` and everything below it; returns the files found."""
+        found = []
+        pending = [directory]
+        while pending:
+            path = pending.pop()
+            wd = self._add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+            if wd < 0:
+                continue  # vanished meanwhile, or over the watch limit
+            self.directories[wd] = path
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                ext = os.path.splitext(entry.name)[1]
+                if entry.is_dir(follow_symlinks=False) and ext not in BUNDLE_EXTENSIONS:
+                    if entry.name not in SKIP_DIRECTORIES and ext not in SKIP_DIRECTORIES:
+                        pending.append(entry.path)
+                else:
+                    found.append(os.path.normpath(entry.path))
+        self.files.update(found)
+        return found
+
+    def _forget_tree(self, directory):
+        prefix = directory + os.sep
+        gone = [path for path in self.files if path.startswith(prefix)]
+        self.files.difference_update(gone)
+        return gone
+
+    def wait(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return []
+        events = []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return events
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                events.extend(self._rescan())
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF):
+                self.directories.pop(wd, None)
+                continue
+            parent = self.directories.get(wd)
+            if parent is None or not name or name.startswith('.'):
+                continue
+            path = os.path.normpath(os.path.join(parent, name))
+            is_bundle = os.path.splitext(name)[1] in BUNDLE_EXTENSIONS
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                if mask & IN_ISDIR and not is_bundle:
+                    events.extend(('created', p) for p in self._watch_tree(path))
+                elif path not in self.files:
+                    self.files.add(path)
+                    events.append(('created', path))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                if mask & IN_ISDIR and not is_bundle:
+                    events.extend(('deleted', p) for p in self._forget_tree(path))
+                elif path in self.files:
+                    self.files.discard(path)
+                    events.append(('deleted', path))
+        return events
+
+    def _rescan(self):
+        files = scan(self.roots)
+        events = [('created', path) for path in files - self.files]
+        events.extend(('deleted', path) for path in self.files - files)
+        self.files = files
+        for root in self.roots:
+            if os.path.isdir(root) and root not in self.directories.values():
+                self._watch_tree(root)
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(roots, poll=False, interval=1.0):
+    if not poll and InotifyWatcher.available():
+        try:
+            return InotifyWatcher(roots)
+        except OSError:
+            pass
+    return PollingWatcher(roots, interval)
+
+
+# MARK: - Resident projects
+
+class ProjectState:
+    """One parsed project plus the sync operations that apply to it."""
+
+    def __init__(self, path, operations):
+        self.path = path
+        self.operations = [spec for spec in operations if spec.get('op') == 'sync']
+        self.lock = threading.RLock()
+        self.project = None
+        self.stat = None
+        self.files = None
+        self.settings = None
+        self.writes = 0
+        self.last_change = None
+        self.reload()
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def reload(self):
+        self.project = load(self.path)
+        self.stat = self._stat()
+        self.settings = None
+
+    def refresh(self):
+        """Re-read the project if it was changed on disk by someone else."""
+        try:
+            stat = self._stat()
+        except FileNotFoundError:
+            return
+        if stat != self.stat:
+            self.reload()
+
+    def roots(self):
+        return [path for spec in self.operations for path, _ in root_paths(self.project, spec['roots'])]
+
+    def _plans(self, files, paths=None):
+        """``[(sync plan, targets), ...]`` for the sync operations, limited to ``paths`` if given."""
+        plans = []
+        for spec in self.operations:
+            sync_plan = plan(self.project, spec['roots'], on_disk=files)
+            if paths is not None:
+                sync_plan.added = [entry for entry in sync_plan.added if entry[0] in paths]
+                sync_plan.removed = [entry for entry in sync_plan.removed if entry[0] in paths]
+            if sync_plan:
+                plans.append((sync_plan, spec.get('targets') or [spec.get('target', 'CiteTrack')]))
+        return plans
+
+    @staticmethod
+    def _describe(plans):
+        parts = []
+        for sync_plan, _ in plans:
+            parts.extend(f'+{os.path.basename(p)}' for p, _, _ in sync_plan.added)
+            parts.extend(f'-{os.path.basename(p)}' for p, _ in sync_plan.removed)
+        return ' '.join(parts)
+
+    def diff(self, files):
+        """What a full sync against ``files`` would change, without writing; a description or None."""
+        with self.lock:
+            self.refresh()
+            return self._describe(self._plans(files)) or None
+
+    def sync(self, files, paths=None):
+        """Apply the sync operations against the known ``files``; returns a description or None.
+
+        With ``paths``, only additions and removals of those files are
+        applied, so differences that predate them are left alone.
+        """
+        with self.lock:
+            self.refresh()
+            plans = self._plans(files, paths)
+            if not plans:
+                return None
+            session = EditSession(self.project)
+            for sync_plan, targets in plans:
+                apply_plan(session, sync_plan, targets)
+            if not session:
+                return None
+            session.save()
+            self.stat = self._stat()
+            self.settings = None
+            self.writes += 1
+            self.last_change = self._describe(plans)
+            return self.last_change
+
+    def resolved_settings(self):
+        if self.settings is None:
+            self.settings = resolve(self.project)
+        return self.settings
+
+
+# MARK: - Queries
+
+def _file_info(state, ref):
+    project = state.project
+    targets = []
+    for name, target in project.targets().items():
+        for phases in (project.build_phases(target, isa) for isa in
+                       ('PBXSourcesBuildPhase', 'PBXResourcesBuildPhase', 'PBXFrameworksBuildPhase')):
+            if any(project.in_phase(phase, ref) for phase in phases):
+                targets.append(name)
+                break
+    group = project.parent_of(ref.id)
+    return {'id': ref.id, 'path': ref.get('path'), 'name': project.display_name(ref),
+            'full_path': project.full_path(ref), 'targets': sorted(targets),
+            'group': project.display_name(group) if group is not None else None}
+
+
+def _handle(daemon, request):
+    cmd = request.get('cmd')
+    if cmd == 'ping':
+        return {'pong': True}
+    if cmd == 'flush':
+        return {'changes': daemon.flush(everything=bool(request.get('all')))}
+    states = daemon.states
+    if request.get('project'):
+        states = [s for s in states if request['project'] in s.path]
+    if cmd == 'status':
+        with daemon.lock:
+            files, pending = daemon.files, len(daemon.pending)
+        result = []
+        for state in states:
+            with state.lock:
+                state.refresh()
+                result.append({'project': state.path, 'objects': len(state.project),
+                               'writes': state.writes, 'last_change': state.last_change,
+                               'unsynced': state.diff(files)})
+        return {'projects': result, 'pending': pending, 'watcher': type(daemon.watcher).__name__}
+    if cmd == 'find':
+        needle = request.get('path', '')
+        matches = []
+        for state in states:
+            with state.lock:
+                state.refresh()
+                project = state.project
+                name = os.path.basename(needle)
+                refs = project.find_by_path(needle, 'PBXFileReference') or [
+                    ref for ref in project.objects_of('PBXFileReference')
+                    if project.display_name(ref) == name and project.full_path(ref).endswith(needle)]
+                matches.extend(dict(_file_info(state, ref), project=state.path) for ref in refs)
+        return {'files': matches}
+    if cmd == 'targets':
+        result = {}
+        for state in states:
+            with state.lock:
+                state.refresh()
+                result[state.path] = sorted(state.project.targets())
+        return {'targets': result}
+    if cmd == 'query':
+        rows = []
+        for state in states:
+            with state.lock:
+                state.refresh()
+                tables = {state.path: state.resolved_settings()}
+            rows.extend(row._asdict() for row in query(
+                tables, [Condition(c) for c in request.get('conditions', ())],
+                request.get('targets'), request.get('configurations')))
+        return {'rows': rows}
+    raise ValueError(f'unknown command {cmd!r}')
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = dict(_handle(self.server.daemon, json.loads(line)), ok=True)
+            except Exception as error:  # answer the client instead of dropping the connection
+                response = {'ok': False, 'error': f'{type(error).__name__}: {error}'}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+# MARK: - Daemon
+
+class Daemon:
+    """Watches the sync roots of ``projects`` (``[(path, operations), ...]``) and serves queries.
+
+    Only files created or deleted while the daemon runs are synced. A
+    difference that already exists at start-up is reported, and applied only
+    with ``sync_now`` (or a ``flush`` request with ``"all": true``).
+
+    Only the watching thread touches the watcher. Under :attr:`lock` it
+    queues events in :attr:`pending` and publishes the known files as the
+    :attr:`files` snapshot, which is all that socket threads and
+    :meth:`flush` read.
+    """
+
+    def __init__(self, projects, socket_path=None, debounce=0.3, poll=False, interval=1.0, log=print,
+                 sync_now=False):
+        self.states = [ProjectState(path, ops) for path, ops in projects]
+        self.socket_path = socket_path or default_socket_path()
+        self.debounce = debounce
+        self.max_delay = max(debounce * 10, 2.0)
+        self.log = log
+        self.sync_now = sync_now
+        roots = sorted({root for state in self.states for root in state.roots()})
+        self.watcher = make_watcher(roots, poll, interval)
+        self.lock = threading.Lock()
+        self.files = frozenset(self.watcher.files)
+        self.pending = []
+        self._first_event = self._last_event = None
+        self._stop = threading.Event()
+        self._server = None
+
+    def flush(self, everything=False):
+        """Apply the pending events now (``everything``: the whole sync diff); returns the changes."""
+        changes = []
+        with self.lock:
+            paths = None if everything else {path for _, path in self.pending}
+            self.pending = []
+            self._first_event = self._last_event = None
+            if paths is not None and not paths:
+                return changes
+            for state in self.states:
+                change = state.sync(self.files, paths)
+                if change:
+                    changes.append(f'{os.path.basename(os.path.dirname(state.path))}: {change}')
+        return changes
+
+    def _serve(self):
+        if os.path.exists(self.socket_path):
+            try:
+                with socket.socket(socket.AF_UNIX) as probe:
+                    probe.connect(self.socket_path)
+                raise OSError(f'another daemon is listening on {self.socket_path}')
+            except ConnectionRefusedError:
+                os.unlink(self.socket_path)  # stale socket from a crashed daemon
+        self._server = _Server(self.socket_path, _RequestHandler)
+        self._server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+
+    def run(self):
+        self._serve()
+        self.log(f'👀 watching {len(self.watcher.roots)} folder(s) with {type(self.watcher).__name__}; '
+                 f'socket {self.socket_path}')
+        if self.sync_now:
+            for change in self.flush(everything=True):
+                self.log(f'✅ {change}')
+        else:
+            for state in self.states:
+                unsynced = state.diff(self.files)
+                if unsynced:
+                    name = os.path.basename(os.path.dirname(state.path))
+                    self.log(f'⚠️  {name} is not in sync: {unsynced} '
+                             '(left alone; restart with --sync-now or "ask flush --all" to apply)')
+        try:
+            while not self._stop.is_set():
+                timeout = self.debounce if self.pending else 1.0
+                events = self.watcher.wait(timeout)
+                now = time.monotonic()
+                with self.lock:
+                    if events:
+                        self.files = frozenset(self.watcher.files)
+                        self.pending.extend(events)
+                        self._last_event = now
+                        self._first_event = self._first_event or now
+                    due = self.pending and (now - self._last_event >= self.debounce
+                                            or now - self._first_event >= self.max_delay)
+                if due:
+                    for change in self.flush():
+                        self.log(f'✅ {change}')
+        finally:
+            self.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+        self.watcher.close()
+
+
+def ask(request, socket_path=None, timeout=5.0):
+    """Send one request to a running daemon and return its response."""
+    with socket.socket(socket.AF_UNIX) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path or default_socket_path())
+        client.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        data = b''
+        while not data.endswith(b'\n'):
+            chunk = client.recv(1 << 16)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
@@ -0,0 +1,154 @@
+"""
+Serialization helpers that reproduce Xcode's project.pbxproj layout, plus a
+splicer that assembles output from slices of the original source, and an
+atomic file writer that can stream those slices straight from the original
+bytes.
+"""
+
+import os
+import re
+import tempfile
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from . import profiling
+
+_BARE = re.compile(r'[A-Za-z0-9_$./]+\Z')
+
+# Objects Xcode writes on a single line
+INLINE_ISAS = frozenset(('PBXBuildFile', 'PBXFileReference'))
+
+# Keys whose values are IDs that Xcode does not annotate with a comment
+_UNCOMMENTED_KEYS = frozenset(('remoteGlobalIDString',))
+
+
+def quote(value):
+    """Quote a string the way Xcode does when writing project.pbxproj."""
+    if value and _BARE.match(value) and '//' not in value and '___' not in value:
+        return value
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"')
+               .replace('\n', '\\n').replace('\t', '\\t'))
+    return f'"{escaped}"'
+
+
+def _reference(value, comment_of, key):
+    text = quote(value)
+    if key in _UNCOMMENTED_KEYS:
+        return text
+    comment = comment_of(value)
+    return f'{text} /* {comment} */' if comment else text
+
+
+def format_value(value, comment_of, indent=3, inline=False, key=None):
+    """Format a parsed value; ``comment_of(id)`` supplies reference comments."""
+    if isinstance(value, str):
+        return _reference(value, comment_of, key)
+    if isinstance(value, list):
+        items = [format_value(item, comment_of, indent + 1, inline, key) for item in value]
+        if inline:
+            return '(' + ''.join(f'{item}, ' for item in items) + ')'
+        pad = '\t' * indent
+        return '(\n' + ''.join(f'{pad}\t{item},\n' for item in items) + pad + ')'
+    if isinstance(value, dict):
+        entries = [
+            f'{quote(k)} = {format_value(v, comment_of, indent + 1, inline, k)};'
+            for k, v in value.items()
+        ]
+        if inline:
+            return '{' + ''.join(f'{entry} ' for entry in entries) + '}'
+        pad = '\t' * indent
+        return '{\n' + ''.join(f'{pad}\t{entry}\n' for entry in entries) + pad + '}'
+    raise TypeError(f'cannot serialize {type(value).__name__}')
+
+
+def format_object(obj, comment_of):
+    """Format one ``objects`` entry (without leading indentation or newline)."""
+    inline = obj.isa in INLINE_ISAS
+    head = f'{quote(obj.id)} /* {obj.comment} */' if obj.comment else quote(obj.id)
+    return f'{head} = {format_value(obj.props, comment_of, 2, inline)};'
+
+
+def splice(text, edits):
+    """Apply non-overlapping ``(start, end, chunk)`` edits to ``text`` in one pass.
+
+    An insertion is an edit with ``start == end``; insertions at an offset
+    come before a replacement starting there, and otherwise edits at the same
+    offset keep their given order. Returns the new text, the output offset of each
+    edit's chunk, and a function mapping untouched old offsets to new ones
+    (``after=True`` places an offset after chunks inserted exactly there).
+    """
+    ordered = sorted(range(len(edits)), key=lambda i: (edits[i][0], edits[i][1], i))
+    starts = [edits[i][0] for i in ordered]
+    deltas = [0] + list(accumulate(
+        len(edits[i][2]) - (edits[i][1] - edits[i][0]) for i in ordered))
+    parts = []
+    positions = [0] * len(edits)
+    last = 0
+    for rank, i in enumerate(ordered):
+        start, end, chunk = edits[i]
+        if start < last:
+            raise ValueError(f'overlapping edits at offset {start}')
+        parts.append(text[last:start])
+        parts.append(chunk)
+        positions[i] = start + deltas[rank]
+        last = end
+    parts.append(text[last:])
+
+    def shift(offset, after=False):
+        index = (bisect_right if after else bisect_left)(starts, offset)
+        return offset + deltas[index]
+
+    return ''.join(parts), positions, shift
+
+
+def splice_bytes(data, edits, byte_offset):
+    """Yield the pieces of ``data`` with ``edits`` applied, without joining them.
+
+    ``edits`` are ``(start, end, chunk)`` in character offsets of the text
+    ``data`` encodes; ``byte_offset`` maps them to byte offsets. Unchanged
+    regions are ``memoryview`` slices of ``data`` (no copies); only the edit
+    chunks are encoded.
+    """
+    view = memoryview(data)
+    last = 0
+    for start, end, chunk in sorted(edits, key=lambda edit: edit[:2]):
+        begin = byte_offset(start)
+        if begin < last:
+            raise ValueError(f'overlapping edits at offset {start}')
+        yield view[last:begin]
+        yield chunk.encode('utf-8')
+        last = byte_offset(end)
+    yield view[last:]
+
+
+def write_atomic(path, content):
+    """Write ``content`` to a temporary file next to ``path`` and rename it over ``path``.
+
+    ``content`` is a str, a bytes-like object or an iterable of bytes-like pieces.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(prefix='.project.', suffix='.tmp', dir=directory)
+    if isinstance(content, str):
+        content = (content.encode('utf-8'),)
+    elif isinstance(content, (bytes, bytearray, memoryview)):
+        content = (content,)
+    try:
+        written = 0
+        with os.fdopen(fd, 'wb') as f:
+            for piece in content:
+                f.write(piece)
+                written += len(piece)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(temp, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(temp, path)
+        profiling.count('bytes_written', written)
+    except BaseException:
+        try:
+            os.unlink(temp)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,18 @@
+"""
+Google Scholar page utilities: parsing saved profile pages offline and
+load-testing the fetch path without touching Scholar.
+
+* ``profile`` parses a profile page (name, citation totals, h-index,
+  i10-index and publication rows) in one scan, and batches of saved pages
+  over a process pool.
+* ``citing`` aggregates citing authors over large citing-paper dumps in one
+  streaming pass and diffs publication snapshots by sorted keys.
+* ``standin`` is a local asyncio stand-in for Scholar that serves profile and
+  "Cited by" pages with configurable latency, 429 throttling and pagination.
+* ``fetch`` runs a refresh cycle with pooled keep-alive connections, bounded
+  concurrency and the apps' rate limit, and reports throughput and latency.
+* ``cache`` keeps parsed pages under the apps' cache keys in a bounded
+  memory LRU in front of a bounded disk store, each entry with a TTL.
+* ``synthetic`` (needs NumPy) writes profile pages and citing-paper dumps
+  that match a synthetic history.
+"""
@@ -0,0 +1,308 @@
+"""
+Two-tier cache for fetched and parsed Scholar pages: a size-bounded LRU in
+memory in front of a size-bounded store on disk, with a TTL per entry.
+
+The apps keep their caches in dictionaries and persist them as one blob
+(``UnifiedCacheManager.persistData``), expire entries 24 hours after they
+were stored (``cacheExpirationInterval``, ``publicationCacheTTL``) and
+estimate their size field by field (``calculateCacheSize``). Refresh jobs
+that cover thousands of scholars need the same semantics with bounded
+memory:
+
+* keys are the apps' -- :func:`scholar_publications_key` and
+  :func:`citing_papers_key` -- within a namespace per kind of page;
+* values are marshal-able plain data (as in :mod:`..pbxproj.cache`), and an
+  entry's size is the exact length of its key and marshalled value, so the
+  byte limits of both tiers are exact rather than estimated;
+* the memory tier keeps decoded values, least recently used evicted first;
+  the disk tier keeps one file per entry, least recently used (by mtime)
+  evicted first, and refills the memory tier on a hit;
+* an entry older than its TTL is a miss in either tier and is removed.
+
+:meth:`TwoTierCache.get_or_compute` parses a page only on a miss, and
+:attr:`TwoTierCache.stats` counts hits (by tier), misses, expirations and
+evictions::
+
+    cache = TwoTierCache('~/.cache/citetrack_tools/scholar', memory_bytes=64 << 20)
+    key = scholar_publications_key('kukA0LcAAAAJ', None, 0)
+    rows = cache.get_or_compute('publications', key, lambda: fetch_and_parse(...))
+"""
+
+import hashlib
+import marshal
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+
+CACHE_TTL = 24 * 60 * 60
+
+MEMORY_BYTES = 64 << 20
+DISK_BYTES = 1 << 30
+
+# Entry file: expiry time (epoch seconds), then marshal.dumps((key, value))
+_HEADER = struct.Struct('<d')
+_SUFFIX = '.entry'
+
+_MISSING = object()
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'citetrack_tools', 'scholar')
+
+
+def scholar_publications_key(scholar_id, sort_by=None, start=0):
+    """``CitationCacheService.scholarPublicationsCacheKey``."""
+    return f'{scholar_id}_{sort_by or "default"}_{start}'
+
+
+def citing_papers_key(cluster_id, sort_by_date=True, start=0):
+    """``CitationCacheService.citingPapersCacheKey`` (Swift writes Bools as ``true``/``false``)."""
+    return f'{cluster_id}_{"true" if sort_by_date else "false"}_{start}'
+
+
+class CacheStats:
+    """Counters since the cache was opened, and the current size of each tier."""
+
+    __slots__ = ('memory_hits', 'disk_hits', 'misses', 'expired', 'puts', 'evictions', 'disk_evictions',
+                 'memory_entries', 'memory_bytes', 'disk_entries', 'disk_bytes')
+
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.puts = 0
+        # entries dropped for space: from memory (still on disk) / from disk (gone)
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.memory_entries = 0
+        self.memory_bytes = 0
+        self.disk_entries = 0
+        self.disk_bytes = 0
+
+    @property
+    def hits(self):
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        return (f'{self.hits:,} hits ({self.memory_hits:,} memory, {self.disk_hits:,} disk), '
+                f'{self.misses:,} misses ({self.expired:,} expired), {self.hit_rate:.1%} hit rate; '
+                f'{self.evictions:,} evicted from memory, {self.disk_evictions:,} from disk; '
+                f'memory {self.memory_entries:,} entries / {self.memory_bytes:,} bytes, '
+                f'disk {self.disk_entries:,} entries / {self.disk_bytes:,} bytes')
+
+
+class TwoTierCache:
+    """See the module docstring.
+
+    ``directory`` None keeps the cache in memory only. ``clock`` returns the
+    current epoch seconds (``time.time``), and can be replaced in tests and
+    benchmarks. The disk tier's size is taken from the directory when the
+    cache is opened; several processes may share a directory, each keeping
+    it under its own ``disk_bytes``.
+    """
+
+    def __init__(self, directory=None, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES, ttl=CACHE_TTL,
+                 clock=time.time):
+        self.directory = os.path.expanduser(directory) if directory else None
+        self.memory_limit = memory_bytes
+        self.disk_limit = disk_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        # (namespace, key) -> (value, size, expires), least recently used first
+        self.memory = OrderedDict()
+        # entry path -> size on disk, least recently used first
+        self.disk = OrderedDict()
+        if self.directory:
+            self._scan()
+
+    # MARK: - Lookups
+
+    def get(self, namespace, key, default=None):
+        """The live value under ``(namespace, key)``, or ``default``."""
+        stats = self.stats
+        entry = self.memory.get((namespace, key))
+        if entry is not None:
+            if self.clock() <= entry[2]:
+                self.memory.move_to_end((namespace, key))
+                stats.memory_hits += 1
+                return entry[0]
+            self.delete(namespace, key)
+            stats.expired += 1
+            stats.misses += 1
+            return default
+        if self.directory:
+            found = self._read(namespace, key)
+            if found is not None:
+                value, size, expires = found
+                stats.disk_hits += 1
+                self._remember(namespace, key, value, size, expires)
+                return value
+        stats.misses += 1
+        return default
+
+    def put(self, namespace, key, value, ttl=None):
+        """Store ``value`` (marshal-able) for ``ttl`` seconds (default: the cache's TTL)."""
+        blob = marshal.dumps((key, value))
+        size = len(blob)
+        expires = self.clock() + (self.ttl if ttl is None else ttl)
+        self.stats.puts += 1
+        self._remember(namespace, key, value, size, expires)
+        if self.directory:
+            self._write(namespace, key, blob, expires)
+
+    def get_or_compute(self, namespace, key, compute, ttl=None):
+        """The cached value, or ``compute()``'s result, stored; None results are not cached."""
+        value = self.get(namespace, key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            if value is not None:
+                self.put(namespace, key, value, ttl)
+        return value
+
+    def delete(self, namespace, key):
+        entry = self.memory.pop((namespace, key), None)
+        if entry is not None:
+            self.stats.memory_bytes -= entry[1]
+            self.stats.memory_entries -= 1
+        if self.directory:
+            self._unlink(self._path(namespace, key))
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        for path in list(self.disk):
+            self._unlink(path)
+        self.memory.clear()
+        self.stats.memory_entries = self.stats.memory_bytes = 0
+
+    def purge_expired(self):
+        """Remove expired entries from both tiers; return how many were removed."""
+        now = self.clock()
+        removed = 0
+        for (namespace, key), (_, _, expires) in list(self.memory.items()):
+            if expires < now:
+                self.delete(namespace, key)
+                removed += 1
+        for path in list(self.disk):
+            try:
+                with open(path, 'rb') as f:
+                    expired = _HEADER.unpack(f.read(_HEADER.size))[0] < now
+            except (OSError, struct.error):
+                expired = True
+            if expired:
+                self._unlink(path)
+                removed += 1
+        self.stats.expired += removed
+        return removed
+
+    # MARK: - Memory tier
+
+    def _remember(self, namespace, key, value, size, expires):
+        stats = self.stats
+        old = self.memory.pop((namespace, key), None)
+        if old is not None:
+            stats.memory_bytes -= old[1]
+            stats.memory_entries -= 1
+        if size > self.memory_limit:
+            return  # larger than the whole tier: disk only
+        self.memory[(namespace, key)] = (value, size, expires)
+        stats.memory_bytes += size
+        stats.memory_entries += 1
+        while stats.memory_bytes > self.memory_limit:
+            _, (_, dropped, _) = self.memory.popitem(last=False)
+            stats.memory_bytes -= dropped
+            stats.memory_entries -= 1
+            stats.evictions += 1
+
+    # MARK: - Disk tier
+
+    def _path(self, namespace, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, namespace, digest[:2], digest + _SUFFIX)
+
+    def _scan(self):
+        entries = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(_SUFFIX):
+                    try:
+                        st = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, os.path.join(root, name), st.st_size))
+        entries.sort()
+        for _, path, size in entries:
+            self.disk[path] = size
+            self.stats.disk_bytes += size
+        self.stats.disk_entries = len(self.disk)
+        self._evict_disk()
+
+    def _read(self, namespace, key):
+        path = self._path(namespace, key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            (expires,), (stored, value) = _HEADER.unpack_from(data), marshal.loads(data[_HEADER.size:])
+        except FileNotFoundError:
+            self._forget(path)
+            return None
+        except (OSError, ValueError, EOFError, TypeError, struct.error):
+            self._unlink(path)  # unreadable: treat as a miss
+            return None
+        if stored != key:
+            return None  # a hash collision: a miss, the other key's entry stays
+        if self.clock() > expires:
+            self._unlink(path)
+            self.stats.expired += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        if path in self.disk:
+            self.disk.move_to_end(path)
+        return value, len(data) - _HEADER.size, expires
+
+    def _write(self, namespace, key, blob, expires):
+        path = self._path(namespace, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(expires))
+                f.write(blob)
+            os.replace(temp, path)
+        except OSError:
+            return  # an unwritable cache only costs speed
+        self._forget(path)
+        self.disk[path] = _HEADER.size + len(blob)
+        self.stats.disk_bytes += _HEADER.size + len(blob)
+        self.stats.disk_entries += 1
+        self._evict_disk()
+
+    def _evict_disk(self):
+        while self.stats.disk_bytes > self.disk_limit and self.disk:
+            self._unlink(next(iter(self.disk)))
+            self.stats.disk_evictions += 1
+
+    def _forget(self, path):
+        size = self.disk.pop(path, None)
+        if size is not None:
+            self.stats.disk_bytes -= size
+            self.stats.disk_entries -= 1
+
+    def _unlink(self, path):
+        self._forget(path)
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,422 @@
+"""
+Citing-author aggregation and publication diffs for large citing-paper dumps.
+
+``CitationFetchService.aggregateAuthorsFromPapers`` folds citing papers into
+``CitingAuthor`` records one paper at a time, appending every paper to its
+author's list and keying authors by ``generateAuthorId`` (the lowercased
+name's ``hashValue``, which changes from launch to launch).
+:class:`AuthorAggregator` does the same for dumps of hundreds of thousands
+of papers in one streaming pass:
+
+* every raw spelling of a name is normalized once (Unicode folding, case,
+  punctuation and whitespace, see :func:`normalize_name`) and interned in a
+  table, so later mentions cost one dict lookup;
+* authors are grouped by their normalized key into an index, and only a
+  paper count is kept per author, not the papers;
+* papers listed more than once (the same paper on several cached pages or
+  sort orders) are counted once, by ``id``, and an author named twice on a
+  paper counts once.
+
+Memory grows with the number of distinct authors and papers, not with the
+size of the input, which is read in chunks (:mod:`..history.records`).
+
+:func:`compare_publications` is ``CitationCacheService.comparePublications``
+as a merge of two key-sorted lists instead of a dictionary of string keys;
+:func:`diff_sorted` is the merge itself, for inputs that arrive sorted.
+"""
+
+import hashlib
+import heapq
+import json
+import re
+import unicodedata
+from collections import namedtuple
+from urllib.parse import quote
+
+from ..history.records import CHUNK_SIZE, iter_record_batches
+from .profile import Publication
+
+SCHOLAR_AUTHOR_URL = 'https://scholar.google.com/scholar?q=author:"{}"'
+
+# Names the app skips
+_UNKNOWN = frozenset(('', 'unknown author'))
+
+_NON_WORD = re.compile(r'[\W_]+')
+_GAP = re.compile(r'[\s,]*')
+
+# Most of a file read to tell JSON Lines from one JSON document
+_SNIFF = 1 << 16
+
+CitingAuthor = namedtuple('CitingAuthor', 'id name key citing_paper_count')
+
+PublicationChange = namedtuple('PublicationChange', 'publication old_count new_count delta')
+
+PublicationChanges = namedtuple('PublicationChanges', 'increased decreased new_publications removed')
+
+
+# MARK: - Names
+
+def normalize_name(name, initials=False):
+    """Grouping key of an author name: ``'Yóshua  Bengio.'`` -> ``'yoshua bengio'``.
+
+    Accents are dropped, case folded and punctuation treated as a space. With
+    ``initials`` given names shrink to initials (``'y bengio'``; ``'YS Chen'``
+    and ``'Yu-Sheng Chen'`` both become ``'ys chen'``), which merges the
+    full and abbreviated forms Scholar mixes, at the risk of merging
+    namesakes. Unknown names give ``''``.
+    """
+    if not name.isascii():
+        name = ''.join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
+    words = _NON_WORD.sub(' ', name).split()
+    if not words or ' '.join(words).casefold() in _UNKNOWN:
+        return ''
+    if initials and len(words) > 1:
+        given = ''.join(w if w.isupper() and len(w) <= 3 else w[0] for w in words[:-1])
+        words = [given, words[-1]]
+    return ' '.join(words).casefold()
+
+
+def author_id(key):
+    """A stable ``author_...`` ID for a normalized name (``generateAuthorId``)."""
+    return 'author_' + hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def author_url(name):
+    return SCHOLAR_AUTHOR_URL.format(quote(name, safe="!$&'()*+,;=:@/?-._~"))
+
+
+# MARK: - Aggregation
+
+def _iter_array(f, buffer, chunk_size):
+    """Yield lists of the elements of the JSON array that ``buffer`` (read from
+    ``f``) starts, a chunk at a time."""
+    decode = json.JSONDecoder().raw_decode
+    pos = buffer.index('[') + 1
+    while True:
+        # usually every element up to the last '}' decodes as one array
+        pos = _GAP.match(buffer, pos).end()
+        cut = buffer.rfind('}') + 1
+        batch = None
+        if cut > pos:
+            try:
+                batch = json.loads(f'[{buffer[pos:cut]}]')
+            except ValueError:
+                pass
+        if batch:
+            pos = cut
+        else:
+            batch = []
+        while True:
+            pos = _GAP.match(buffer, pos).end()
+            if buffer.startswith(']', pos):
+                yield batch
+                return
+            try:
+                element, pos = decode(buffer, pos)
+            except ValueError:
+                break
+            batch.append(element)
+        if batch:
+            yield batch
+        chunk = f.read(chunk_size)
+        if not chunk:
+            raise ValueError(f'malformed or truncated JSON array near {buffer[pos:pos + 40]!r}')
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def _iter_lines(f, buffer, chunk_size):
+    """Yield lists of the objects of a JSON Lines stream, ``buffer`` first."""
+    while True:
+        lines = buffer.split('\n')
+        buffer = lines.pop()
+        yield [json.loads(line) for line in lines if line.strip()]
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+    if buffer.strip():
+        yield [json.loads(buffer)]
+
+
+class _Prefixed:
+    """Text stream ``f`` with ``head``, already read from it, put back in front."""
+
+    __slots__ = ('head', 'f')
+
+    def __init__(self, head, f):
+        self.head = head
+        self.f = f
+
+    def read(self, size):
+        if self.head:
+            head, self.head = self.head, ''
+            return head
+        return self.f.read(size)
+
+
+def iter_papers(f, chunk_size=CHUNK_SIZE):
+    """Yield lists of citing papers from text stream ``f``, chunk by chunk.
+
+    Reads a JSON array of papers, JSON Lines (one paper per line) or any other
+    JSON whose arrays hold the papers, such as a cache export.
+    """
+    head = f.read(chunk_size)
+    if head.lstrip().startswith('['):
+        return _iter_array(f, head, chunk_size)
+    if head.lstrip().startswith('{'):
+        # one paper per line, or an object around the papers?
+        while '\n' not in head.lstrip() and len(head) < _SNIFF:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            head += chunk
+        try:
+            first = json.loads(head.lstrip().split('\n', 1)[0])
+        except ValueError:
+            first = None
+        if isinstance(first, dict) and 'authors' in first:
+            return _iter_lines(f, head, chunk_size)
+    return iter_record_batches(_Prefixed(head, f), chunk_size)
+
+
+class _Spellings(dict):
+    """Raw spelling -> author index; a new spelling is interned on lookup."""
+
+    __slots__ = ('intern',)
+
+    def __init__(self, intern):
+        super().__init__()
+        self.intern = intern
+
+    def __missing__(self, spelling):
+        i = self[spelling] = self.intern(spelling)
+        return i
+
+
+class AuthorAggregator:
+    """Per-author citing-paper counts over a stream of citing papers.
+
+    Feed papers (``CitingPaper`` JSON objects: ``id``, ``title``,
+    ``authors``, ``year``, ...) with :meth:`add` or whole dumps with
+    :meth:`add_file`; :meth:`authors` returns the result, most citing papers
+    first, as the app sorts it.
+    """
+
+    __slots__ = ('initials', 'cited_scholar', 'keys', 'names', 'counts', 'index', 'spellings',
+                 'seen', 'papers', 'duplicates', 'mentions')
+
+    def __init__(self, initials=False, cited_scholar=None):
+        self.initials = initials
+        self.cited_scholar = cited_scholar
+        self.keys = []
+        self.names = []
+        self.counts = []
+        # normalized key -> author index
+        self.index = {}
+        # raw spelling -> author index (-1 for names that are skipped)
+        self.spellings = _Spellings(self._intern)
+        # hashes of the paper IDs counted so far
+        self.seen = set()
+        self.papers = 0
+        self.duplicates = 0
+        self.mentions = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _intern(self, spelling):
+        name = ' '.join(spelling.split())
+        key = normalize_name(name, self.initials)
+        if not key:
+            return -1
+        i = self.index.get(key)
+        if i is None:
+            i = self.index[key] = len(self.keys)
+            self.keys.append(key)
+            self.names.append(name)
+            self.counts.append(0)
+        return i
+
+    def add(self, papers):
+        """Count the authors of an iterable of citing-paper dicts."""
+        spellings, seen, counts, cited_scholar = self.spellings, self.seen, self.counts, self.cited_scholar
+        papers_before, mentions = len(seen), 0
+        for paper in papers:
+            if cited_scholar and paper.get('citedScholarId', cited_scholar) != cited_scholar:
+                continue
+            fingerprint = hash(paper.get('id') or f'{paper.get("title")}_{paper.get("year")}')
+            if fingerprint in seen:
+                self.duplicates += 1
+                continue
+            seen.add(fingerprint)
+            authors = paper.get('authors')
+            if authors:
+                mentions += len(authors)
+                # a set, so an author named twice on a paper counts once
+                for i in {spellings[spelling] for spelling in authors}:
+                    if i >= 0:
+                        counts[i] += 1
+        self.papers += len(seen) - papers_before
+        self.mentions += mentions
+
+    def add_file(self, f, chunk_size=CHUNK_SIZE):
+        """Count a dump read from text stream ``f`` (see :func:`iter_papers`)."""
+        for papers in iter_papers(f, chunk_size):
+            self.add(papers)
+
+    def _author(self, i):
+        key = self.keys[i]
+        return CitingAuthor(author_id(key), self.names[i], key, self.counts[i])
+
+    def authors(self, top=None):
+        """``CitingAuthor`` records by citing-paper count (ties in order of first appearance)."""
+        order = range(len(self.keys))
+        if top is not None:
+            order = heapq.nsmallest(top, order, key=lambda i: (-self.counts[i], i))
+        else:
+            order = sorted(order, key=lambda i: (-self.counts[i], i))
+        return [self._author(i) for i in order]
+
+    def variants(self):
+        """Number of raw spellings seen for each author index."""
+        variants = [0] * len(self.keys)
+        for i in self.spellings.values():
+            if i >= 0:
+                variants[i] += 1
+        return variants
+
+
+def aggregate(paths, initials=False, cited_scholar=None, chunk_size=CHUNK_SIZE):
+    """An :class:`AuthorAggregator` fed every dump in ``paths``."""
+    aggregator = AuthorAggregator(initials, cited_scholar)
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            aggregator.add_file(f, chunk_size)
+    return aggregator
+
+
+def to_dict(author, spellings=None):
+    """A JSON-ready dict with ``CitingAuthor``'s field names."""
+    record = {'id': author.id, 'name': author.name, 'citingPaperCount': author.citing_paper_count,
+              'scholarUrl': author_url(author.name)}
+    if spellings is not None:
+        record['spellings'] = spellings
+    return record
+
+
+# MARK: - Publication diffs
+
+def publication_key(publication):
+    """``comparePublications``'s key: the cluster ID, else ``title_year``."""
+    if publication.cluster_id:
+        return publication.cluster_id
+    return f'{publication.title}_{publication.year if publication.year is not None else "unknown"}'
+
+
+def keyed(publications):
+    """``(key, position, publication)`` sorted by key, the input :func:`diff_sorted` takes."""
+    publications = list(publications)
+    keys = [publication_key(p) for p in publications]
+    # a stable sort of the positions keeps equal keys in list order
+    return [(keys[n], n, publications[n]) for n in sorted(range(len(keys)), key=keys.__getitem__)]
+
+
+def _first_per_key(entries):
+    last = None
+    for entry in entries:
+        if entry[0] != last:
+            last = entry[0]
+            yield entry
+
+
+def diff_sorted(old, new):
+    """Merge two key-sorted ``(key, position, publication)`` streams.
+
+    Yields ``(old, new)`` entry pairs: both set for a key in both, ``old``
+    None for an added key and ``new`` None for a removed one. Later entries
+    with an already seen key are ignored, where the app's dictionary would
+    stop on them.
+    """
+    old, new = _first_per_key(old), _first_per_key(new)
+    a, b = next(old, None), next(new, None)
+    while a is not None and b is not None:
+        if a[0] < b[0]:
+            yield a, None
+            a = next(old, None)
+        elif b[0] < a[0]:
+            yield None, b
+            b = next(new, None)
+        else:
+            yield a, b
+            a, b = next(old, None), next(new, None)
+    if a is not None:
+        yield a, None
+        yield from ((entry, None) for entry in old)
+    if b is not None:
+        yield None, b
+        yield from ((None, entry) for entry in new)
+
+
+def compare_publications(old, new):
+    """:class:`PublicationChanges` between two publication lists, like ``comparePublications``.
+
+    :func:`diff_sorted` over the :func:`keyed` lists. ``increased`` is sorted
+    by delta, largest first; the other lists keep the order of the list they
+    come from. ``removed`` (publications no longer listed) is not reported by
+    the app.
+    """
+    increased, decreased, added, removed = [], [], [], []
+    for a, b in diff_sorted(keyed(old), keyed(new)):
+        if a is None:
+            added.append(b[1:])
+        elif b is None:
+            removed.append(a[1:])
+        else:
+            old_count, new_count = a[2].citations or 0, b[2].citations or 0
+            change = PublicationChange(b[2], old_count, new_count, new_count - old_count)
+            if new_count > old_count:
+                increased.append((-change.delta, b[1], change))
+            elif new_count < old_count:
+                decreased.append((b[1], change))
+    increased.sort(key=lambda entry: entry[:2])
+    decreased.sort(key=lambda entry: entry[0])
+    added.sort(key=lambda entry: entry[0])
+    removed.sort(key=lambda entry: entry[0])
+    return PublicationChanges([change for _, _, change in increased], [change for _, change in decreased],
+                              [publication for _, publication in added],
+                              [publication for _, publication in removed])
+
+
+def load_publications(path):
+    """Publications of a saved profile page, a ``scholar parse --json`` profile
+    (or a one-profile list of them) or a JSON list of ``PublicationSnapshot``s."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.lstrip()[:1] in (b'[', b'{'):
+        from .profile import parse
+        return parse(data).publications
+    data = json.loads(data)
+    if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict) and 'publications' in data[0]:
+        data = data[0]
+    if isinstance(data, dict):
+        data = data.get('publications')
+    if not isinstance(data, list) or not all(isinstance(p, dict) for p in data):
+        raise ValueError(f'{path}: expected a profile page, a profile or a list of publications')
+    return [Publication(p.get('title', ''), p.get('clusterId'), tuple(filter(None, [p.get('clusterId')])),
+                        p.get('citationCount'), p.get('year')) for p in data]
+
+
+def changes_to_dict(changes):
+    def publication(p):
+        return {'title': p.title, 'clusterId': p.cluster_id, 'citationCount': p.citations, 'year': p.year}
+
+    def change(c):
+        return {'publication': publication(c.publication), 'oldCount': c.old_count, 'newCount': c.new_count,
+                'delta': c.delta}
+
+    return {'increased': [change(c) for c in changes.increased],
+            'decreased': [change(c) for c in changes.decreased],
+            'newPublications': [publication(p) for p in changes.new_publications],
+            'removed': [publication(p) for p in changes.removed],
+            'totalNewCitations': sum(c.delta for c in changes.increased)}
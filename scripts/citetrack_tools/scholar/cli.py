@@ -0,0 +1,298 @@
+"""
+Command-line entry point for the Google Scholar page tools.
+
+    python3 -m citetrack_tools.scholar parse ../iOS/scholar_kukA0LcAAAAJ.html
+    python3 -m citetrack_tools.scholar parse saved/*.html --jobs 8 --json > profiles.json
+    python3 -m citetrack_tools.scholar authors citing_papers.json --top 20
+    python3 -m citetrack_tools.scholar diff old_profile.html new_profile.html
+    python3 -m citetrack_tools.scholar serve --port 8765 --latency 0.2 --rate 50
+    python3 -m citetrack_tools.scholar refresh --synthetic 5000 --base http://127.0.0.1:8765 --delay 0
+    python3 -m citetrack_tools.scholar synthesize pages/ --scholars 10000 --snapshots 1000 --limit 100
+
+``parse`` reads saved profile pages and prints each scholar's name, citation
+totals, h-index and i10-index (and publication rows with ``--publications``),
+or all of it as JSON. Many pages are parsed in a process pool.
+
+``authors`` aggregates citing authors over citing-paper dumps, counting each
+paper once and grouping spellings of a name; ``diff`` compares two snapshots
+of a scholar's publications (saved pages or JSON) like the app's
+publication-change check.
+
+``serve`` runs the local Scholar stand-in on a saved profile page;
+``refresh`` runs a refresh cycle against it (or any base URL) and reports
+throughput and latency percentiles, reusing pages cached with ``--cache``;
+``cache`` shows, purges or clears such a cache.
+
+``synthesize`` writes profile pages and citing-paper dumps for the scholars
+of a synthetic history; with the same options as ``history synthesize``,
+each page's total is the scholar's last count in that import file.
+"""
+
+import argparse
+import asyncio
+import os
+import json
+import sys
+import time
+
+
+def cmd_parse(args):
+    from .profile import parse_files, to_dict
+
+    started = time.perf_counter()
+    profiles, failed = [], False
+    for path, profile, error in parse_files(args.files, args.jobs):
+        if error:
+            print(f'❌ {path}: {error}', file=sys.stderr)
+            failed = True
+            continue
+        if not profile.name and not profile.publications:
+            print(f'⚠️  {path}: not a Scholar profile page', file=sys.stderr)
+            failed = True
+            continue
+        profiles.append((path, profile))
+    seconds = time.perf_counter() - started
+    if args.json:
+        print(json.dumps([dict(file=path, **to_dict(profile)) for path, profile in profiles],
+                         indent=2, ensure_ascii=False))
+    else:
+        for path, p in profiles:
+            since = f' ({p.citations_since:,} since {p.since_year})' if p.citations_since is not None else ''
+            citations = f'{p.citations:,}' if p.citations is not None else '?'
+            print(f'✅ {p.scholar_id or path} {p.name or "(no name)"}: {citations} citations{since}, '
+                  f'h-index {p.h_index}, i10-index {p.i10_index}, {len(p.publications)} publications')
+            if args.publications:
+                for pub in p.publications:
+                    cited = f'{pub.citations:,}' if pub.citations is not None else '-'
+                    print(f'   {pub.year or "----"} {cited:>9} {pub.cluster_id or "-":>20}  {pub.title}')
+    print(f'{len(profiles):,} pages parsed in {seconds:.2f} s', file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_authors(args):
+    from .citing import aggregate, to_dict
+
+    started = time.perf_counter()
+    try:
+        aggregator = aggregate(args.files, args.initials, args.scholar)
+    except (OSError, ValueError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - started
+    authors = aggregator.authors(args.top)
+    if args.json:
+        variants = aggregator.variants()
+        index = aggregator.index
+        print(json.dumps([to_dict(a, variants[index[a.key]]) for a in authors], indent=2, ensure_ascii=False))
+    else:
+        for author in authors:
+            print(f'{author.citing_paper_count:>8,}  {author.name}')
+    print(f'{aggregator.papers:,} papers ({aggregator.duplicates:,} duplicates skipped), '
+          f'{aggregator.mentions:,} author mentions, {len(aggregator):,} authors from '
+          f'{len(aggregator.spellings):,} spellings in {seconds:.2f} s', file=sys.stderr)
+    return 0
+
+
+def cmd_diff(args):
+    from .citing import changes_to_dict, compare_publications, load_publications
+
+    try:
+        old, new = load_publications(args.old), load_publications(args.new)
+    except (OSError, ValueError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    changes = compare_publications(old, new)
+    if args.json:
+        print(json.dumps(changes_to_dict(changes), indent=2, ensure_ascii=False))
+        return 0
+    if not any(changes):
+        print('✅ No changes')
+        return 0
+    for title, items in (('Increased', changes.increased), ('Decreased', changes.decreased)):
+        if items:
+            print(f'{title} ({len(items):,}):')
+            for c in items:
+                print(f'  {c.delta:+8,} {c.old_count:>9,} -> {c.new_count:<9,} {c.publication.title}')
+    for title, items in (('New', changes.new_publications), ('No longer listed', changes.removed)):
+        if items:
+            print(f'{title} ({len(items):,}):')
+            for p in items:
+                cited = f'{p.citations:,}' if p.citations is not None else '-'
+                print(f'  {cited:>9} {p.year or "----"}  {p.title}')
+    print(f'{sum(c.delta for c in changes.increased):+,} new citations')
+    return 0
+
+
+def cmd_cache(args):
+    from .cache import TwoTierCache, default_cache_dir
+
+    cache = TwoTierCache(args.dir or default_cache_dir(), disk_bytes=float('inf'))
+    if args.clear:
+        cache.clear()
+        print('✅ Cache cleared')
+    elif args.purge:
+        print(f'✅ {cache.purge_expired():,} expired entries removed')
+    stats = cache.stats
+    print(f'{cache.directory}: {stats.disk_entries:,} entries, {stats.disk_bytes:,} bytes')
+    return 0
+
+
+def cmd_serve(args):
+    from .standin import StandIn
+
+    with open(args.page, 'rb') as f:
+        server = StandIn(f.read(), args.latency, args.jitter, args.rate, args.burst, args.publications)
+
+    async def serve():
+        base = await server.start(args.host, args.port)
+        print(f'👀 Serving Scholar stand-in at {base} (Ctrl-C to stop)')
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    counts = ', '.join(f'{status}: {count:,}' for status, count in sorted(server.counts.items()))
+    print(f'{sum(server.counts.values()):,} requests ({counts or "none"}) '
+          f'over {server.connections:,} connections')
+    return 0
+
+
+def cmd_refresh(args):
+    from .fetch import refresh
+
+    ids = list(args.ids)
+    if args.ids_file:
+        with open(args.ids_file, encoding='utf-8') as f:
+            ids += [line.strip() for line in f if line.strip()]
+    ids += [f'S{i:07d}AAAAJ' for i in range(args.synthetic)]
+    if not ids:
+        print('❌ No scholar IDs (pass IDs, --ids-file or --synthetic)', file=sys.stderr)
+        return 1
+    cache = None
+    if args.cache:
+        from .cache import TwoTierCache
+        cache = TwoTierCache(args.cache, args.cache_memory << 20, args.cache_disk << 20)
+    report = asyncio.run(refresh(ids, args.base, args.concurrency, args.delay, args.jitter, args.retries,
+                                 args.sort_by, args.max_pages, args.cited_by, args.cited_pages, args.timeout,
+                                 cache=cache))
+    print(report.summary())
+    if cache:
+        print(f'cache: {cache.stats.summary()}')
+    if report.failed:
+        print(f'⚠️  {len(report.failed):,} scholars failed: {", ".join(report.failed[:10])}'
+              f'{", ..." if len(report.failed) > 10 else ""}', file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_synthesize(args):
+    from .synthetic import write_scholars
+
+    started = time.perf_counter()
+    try:
+        written = write_scholars(args.directory, args.scholars, args.snapshots, args.seed, args.start,
+                                 args.every, args.limit, args.rows, args.top, args.per_publication)
+    except (OSError, ValueError) as error:
+        print(f'❌ {error}', file=sys.stderr)
+        return 1
+    seconds = time.perf_counter() - started
+    print(f'✅ {args.directory}: pages and citing papers of {written:,} scholars in {seconds:.2f} s')
+    return 0
+
+
+def build_parser():
+    from ..history.cli import synthetic_arguments
+
+    parser = argparse.ArgumentParser(prog='python3 -m citetrack_tools.scholar',
+                                     description='CiteTrack Google Scholar page tooling')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parse = commands.add_parser('parse', help='parse saved Scholar profile pages')
+    parse.add_argument('files', nargs='+', help='saved profile pages (HTML)')
+    parse.add_argument('-j', '--jobs', type=int, help='worker processes (default: CPU count)')
+    parse.add_argument('-p', '--publications', action='store_true', help='also list publication rows')
+    parse.add_argument('--json', action='store_true', help='print JSON instead of text')
+    parse.set_defaults(func=cmd_parse)
+
+    authors = commands.add_parser('authors', help='aggregate citing authors over citing-paper dumps')
+    authors.add_argument('files', nargs='+', help='citing-paper JSON (arrays, cache exports or JSON Lines)')
+    authors.add_argument('--initials', action='store_true',
+                         help='group names by initials and surname ("Y. Bengio" with "Yoshua Bengio")')
+    authors.add_argument('--scholar', help='only papers citing this scholar ID')
+    authors.add_argument('-n', '--top', type=int, help='only the N authors with most citing papers')
+    authors.add_argument('--json', action='store_true', help='print JSON instead of text')
+    authors.set_defaults(func=cmd_authors)
+
+    diff = commands.add_parser('diff', help="compare two snapshots of a scholar's publications")
+    diff.add_argument('old', help='saved profile page, scholar parse --json output or publication list')
+    diff.add_argument('new', help='the same, later')
+    diff.add_argument('--json', action='store_true', help='print JSON instead of text')
+    diff.set_defaults(func=cmd_diff)
+
+    fixture = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))), 'iOS', 'scholar_kukA0LcAAAAJ.html')
+    serve = commands.add_parser('serve', help='run a local Scholar stand-in server')
+    serve.add_argument('--page', default=fixture, help='saved profile page (default: the iOS fixture)')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    serve.add_argument('--jitter', type=float, default=0.0, help='up to this many more seconds, at random')
+    serve.add_argument('--rate', type=float, help='requests per second before 429s (default: no limit)')
+    serve.add_argument('--burst', type=int, help='requests allowed at once over --rate (default: --rate)')
+    serve.add_argument('--publications', type=int, default=300, help='most publications per scholar')
+    serve.set_defaults(func=cmd_serve)
+
+    refresh = commands.add_parser('refresh', help='refresh scholars against a Scholar stand-in and time it')
+    refresh.add_argument('ids', nargs='*', help='scholar IDs')
+    refresh.add_argument('--ids-file', help='file with one scholar ID per line')
+    refresh.add_argument('--synthetic', type=int, default=0, metavar='N', help='also refresh N made-up IDs')
+    refresh.add_argument('--base', default='http://127.0.0.1:8765', help='server URL (http:// only)')
+    refresh.add_argument('-c', '--concurrency', type=int, default=8, help='scholars (connections) at once')
+    refresh.add_argument('--delay', type=float, default=2.0, help="seconds between requests (app: 2.0)")
+    refresh.add_argument('--jitter', type=float,
+                         help='up to this many more seconds (default: a quarter of --delay; app: 0.5)')
+    refresh.add_argument('--retries', type=int, default=0, help='retries after a 429 (app: 0)')
+    refresh.add_argument('--sort-by', help='profile sort order (e.g. pubdate)')
+    refresh.add_argument('--max-pages', type=int, default=10, help='profile pages per scholar')
+    refresh.add_argument('--cited-by', type=int, default=0, metavar='K',
+                         help='also fetch "Cited by" pages of the K most-cited publications')
+    refresh.add_argument('--cited-pages', type=int, default=1, help='"Cited by" pages per publication')
+    refresh.add_argument('--timeout', type=float, default=30.0, help='seconds per request')
+    refresh.add_argument('--cache', metavar='DIR', help='reuse pages cached here within their TTL (24 h)')
+    refresh.add_argument('--cache-memory', type=int, default=64, metavar='MB', help='memory tier size')
+    refresh.add_argument('--cache-disk', type=int, default=1024, metavar='MB', help='disk tier size')
+    refresh.set_defaults(func=cmd_refresh)
+
+    cache = commands.add_parser('cache', help='show, purge or clear the page cache')
+    cache.add_argument('--dir', help='cache directory (default: ~/.cache/citetrack_tools/scholar)')
+    cache.add_argument('--purge', action='store_true', help='remove expired entries')
+    cache.add_argument('--clear', action='store_true', help='remove every entry')
+    cache.set_defaults(func=cmd_cache)
+
+    synthesize = commands.add_parser(
+        'synthesize', help='write pages and citing papers of a synthetic history (needs NumPy)')
+    synthesize.add_argument('directory', help='where to write scholar_<id>.html and citing_<id>.json')
+    synthetic_arguments(synthesize)
+    synthesize.add_argument('--limit', type=int, default=100,
+                            help='only the first N scholars (default: %(default)s)')
+    synthesize.add_argument('--rows', type=int, default=100,
+                            help='publication rows per page (default: %(default)s)')
+    synthesize.add_argument('--top', type=int, default=5,
+                            help='publications whose citing papers are written (default: %(default)s)')
+    synthesize.add_argument('--per-publication', type=int, default=50,
+                            help='most citing papers per publication (default: %(default)s)')
+    synthesize.set_defaults(func=cmd_synthesize)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
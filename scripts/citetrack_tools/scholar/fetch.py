@@ -0,0 +1,322 @@
+"""
+Asyncio fetcher for Scholar pages: pooled keep-alive connections, bounded
+concurrency and the apps' rate-limit policy.
+
+It runs a refresh cycle like ``CitationFetchCoordinator`` does: for each
+scholar, the profile pages ``buildScholarProfileURL`` builds (100 rows a
+page, following ``cstart`` until a short page) and optionally the first
+"Cited by" pages (``buildCitedByURL``) of their most-cited publications.
+Pages are parsed with :mod:`.profile`; with a :class:`.cache.TwoTierCache`
+a page is neither fetched nor parsed again within its TTL. Each request waits for
+:class:`RateLimit` -- ``applyRateLimit``: the first request goes at once,
+later ones at least ``delay`` plus up to ``jitter`` seconds after the
+previous one (2.0 and 0.5 in the app; ``jitter`` defaults to a quarter of
+``delay``, so ``delay=0`` turns the limit off) -- and a 429 fails the page,
+as in the app, unless ``retries`` allows waiting out its ``Retry-After``.
+
+Pointed at :mod:`.standin`, a cycle over thousands of scholars measures the
+pipeline itself (throughput, p50/p99 latency) without touching the network::
+
+    report = asyncio.run(refresh(ids, 'http://127.0.0.1:8765', concurrency=16, delay=0))
+    print(report.summary())
+
+Plain ``http://`` only; the client speaks just enough HTTP/1.1 for the
+stand-in (``Content-Length`` bodies, keep-alive).
+"""
+
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+from .cache import citing_papers_key, scholar_publications_key
+from .profile import Publication, parse
+
+PAGE_SIZE = 100
+SCHOLAR = 'https://scholar.google.com'
+USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/120.0.0.0 Safari/537.36')
+
+
+# MARK: - URLs
+
+def profile_url(scholar_id, sort_by=None, start=0, base=SCHOLAR):
+    """``buildScholarProfileURL``."""
+    url = f'{base}/citations?user={scholar_id}&hl=en&cstart={start}&pagesize={PAGE_SIZE}'
+    return f'{url}&sortby={sort_by}' if sort_by else url
+
+
+def cited_by_url(cluster_id, start=0, sort_by_date=True, base=SCHOLAR):
+    """``buildCitedByURL``."""
+    url = f'{base}/scholar?hl=en&cites={cluster_id}'
+    if sort_by_date:
+        url += '&scisbd=1'
+    return f'{url}&start={start}' if start > 0 else url
+
+
+# MARK: - Rate limit
+
+class RateLimit:
+    """``applyRateLimit``, shared by every request of a cycle.
+
+    A request that has to wait reserves its slot (``last`` moves to when it
+    will go), so concurrent requests queue up one interval apart.
+    """
+
+    __slots__ = ('delay', 'jitter', 'random', 'last')
+
+    def __init__(self, delay=2.0, jitter=None, seed=None):
+        self.delay = delay
+        self.jitter = delay / 4 if jitter is None else jitter
+        self.random = random.Random(seed)
+        self.last = None
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        if self.last is None:
+            self.last = now
+            return
+        total = self.delay + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        elapsed = now - self.last
+        if elapsed < total:
+            self.last = now + (total - elapsed)
+            await asyncio.sleep(total - elapsed)
+        else:
+            self.last = now
+
+
+# MARK: - Connections
+
+class HTTPError(Exception):
+    pass
+
+
+def retry_after(value):
+    """Seconds a ``Retry-After`` header asks for; 1 when absent or an HTTP date."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, at most ``size`` open.
+
+    Idle connections are reused most-recent first; a reused connection the
+    server has closed in the meantime is replaced once, transparently.
+    """
+
+    def __init__(self, base, size=8, timeout=30.0):
+        url = urlsplit(base)
+        if url.scheme != 'http':
+            raise ValueError(f'only http:// URLs are supported: {base}')
+        self.host, self.port = url.hostname, url.port or 80
+        self.timeout = timeout
+        self.idle = []
+        self.slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def get(self, target):
+        """GET ``target`` (path and query); return ``(status, headers, body)``."""
+        async with self.slots:
+            for attempt in range(2):
+                reused = bool(self.idle)
+                if reused:
+                    reader, writer = self.idle.pop()
+                else:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout)
+                    self.opened += 1
+                try:
+                    response = await asyncio.wait_for(self._exchange(reader, writer, target), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError) as error:
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise HTTPError(f'connection failed: {error}') from error
+                except BaseException:
+                    writer.close()
+                    raise
+                status, headers, body = response
+                if headers.get('connection', '').lower() == 'close':
+                    writer.close()
+                else:
+                    self.idle.append((reader, writer))
+                return response
+
+    async def _exchange(self, reader, writer, target):
+        writer.write((f'GET {target} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+                      f'User-Agent: {USER_AGENT}\r\nAccept: text/html\r\n'
+                      f'Connection: keep-alive\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+        head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(head[0].split(' ', 2)[1])
+        headers = {}
+        for line in head[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip().lower()] = value.strip()
+        if 'content-length' not in headers:
+            raise HTTPError('response without Content-Length')
+        return status, headers, await reader.readexactly(int(headers['content-length']))
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle.clear()
+
+
+# MARK: - Refresh cycle
+
+class Report:
+    """Outcome of a refresh cycle: counts, bytes and per-request latencies."""
+
+    def __init__(self):
+        self.statuses = {}
+        self.latencies = []
+        self.bytes = 0
+        self.pages = 0
+        # pages served from the cache, without a request
+        self.cached = 0
+        self.publications = 0
+        self.citing = 0
+        self.scholars = 0
+        self.failed = []
+        self.errors = 0
+        self.retries = 0
+        self.connections = 0
+        self.seconds = 0.0
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    def percentile(self, p):
+        """Nearest-rank percentile of the request latencies, in seconds."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))]
+
+    def summary(self):
+        seconds = self.seconds or float('nan')
+        statuses = ', '.join(f'{status}: {count:,}' for status, count in sorted(self.statuses.items()))
+        # every page may have come from the cache, leaving no statuses
+        details = '; '.join(part for part in (statuses, f'{self.errors:,} errors, {self.retries:,} retries')
+                            if part)
+        lines = [
+            f'{self.scholars:,} scholars refreshed, {len(self.failed):,} failed, in {self.seconds:.2f} s '
+            f'({self.scholars / seconds:,.1f} scholars/s)',
+            f'{self.requests:,} requests ({details}) '
+            f'over {self.connections:,} connections: {self.requests / seconds:,.1f} requests/s, '
+            f'{self.bytes / 1e6 / seconds:,.1f} MB/s',
+            f'{self.pages:,} pages ({self.cached:,} from cache), {self.publications:,} publications, '
+            f'{self.citing:,} citing papers',
+        ]
+        if self.latencies:
+            p50, p90, p99 = (self.percentile(p) * 1000 for p in (50, 90, 99))
+            lines.append(f'latency p50 {p50:.1f} ms, p90 {p90:.1f} ms, p99 {p99:.1f} ms, '
+                         f'max {max(self.latencies) * 1000:.1f} ms')
+        return '\n'.join(lines)
+
+
+class _Cycle:
+    __slots__ = ('pool', 'limit', 'retries', 'report', 'prefix', 'cache')
+
+    def __init__(self, pool, limit, retries, report, prefix, cache):
+        self.pool, self.limit, self.retries, self.report, self.prefix = pool, limit, retries, report, prefix
+        self.cache = cache
+
+    async def get(self, url):
+        """Fetch one page under the rate limit; the body, or None if it failed."""
+        report = self.report
+        target = url[len(self.prefix):]
+        for attempt in range(self.retries + 1):
+            await self.limit.wait()
+            started = time.perf_counter()
+            try:
+                status, headers, body = await self.pool.get(target)
+            except (HTTPError, OSError, asyncio.TimeoutError):
+                report.errors += 1
+                return None
+            report.latencies.append(time.perf_counter() - started)
+            report.statuses[status] = report.statuses.get(status, 0) + 1
+            report.bytes += len(body)
+            if status == 429 and attempt < self.retries:
+                report.retries += 1
+                await asyncio.sleep(retry_after(headers.get('retry-after')) * 2 ** attempt)
+                continue
+            return body if status == 200 else None
+        return None
+
+    async def scholar(self, scholar_id, sort_by, max_pages, cited_by, cited_pages):
+        report, cache = self.report, self.cache
+        publications = []
+        for page in range(max_pages):
+            key = scholar_publications_key(scholar_id, sort_by, page * PAGE_SIZE)
+            rows = cache.get('publications', key) if cache else None
+            if rows is not None:
+                rows = [Publication(*row) for row in rows]
+                report.cached += 1
+            else:
+                body = await self.get(profile_url(scholar_id, sort_by, page * PAGE_SIZE, self.prefix))
+                if body is None:
+                    report.failed.append(scholar_id)
+                    return
+                rows = parse(body).publications
+                if cache:
+                    cache.put('publications', key, [tuple(row) for row in rows])
+            report.pages += 1
+            publications += rows
+            if len(rows) < PAGE_SIZE:
+                break
+        report.publications += len(publications)
+        top = sorted((p for p in publications if p.cluster_id), key=lambda p: -(p.citations or 0))
+        for publication in top[:cited_by]:
+            for page in range(cited_pages):
+                key = citing_papers_key(publication.cluster_id, True, page * 10)
+                results = cache.get('citing', key) if cache else None
+                if results is not None:
+                    report.cached += 1
+                else:
+                    body = await self.get(cited_by_url(publication.cluster_id, page * 10, base=self.prefix))
+                    if body is None:
+                        break
+                    results = body.count(b'<div class="gs_r ')
+                    if cache:
+                        cache.put('citing', key, results)
+                report.pages += 1
+                report.citing += results
+                if results < 10:
+                    break
+        report.scholars += 1
+
+
+async def refresh(scholar_ids, base, concurrency=8, delay=2.0, jitter=None, retries=0, sort_by=None,
+                  max_pages=10, cited_by=0, cited_pages=1, timeout=30.0, seed=None, cache=None):
+    """Refresh every scholar in ``scholar_ids`` against ``base``; return a :class:`Report`.
+
+    ``concurrency`` scholars are refreshed at a time over at most as many
+    pooled connections; ``delay``/``jitter`` are the rate limit (``jitter``
+    defaults to ``delay / 4``, so ``delay=0`` turns it off). Up to
+    ``max_pages`` profile pages are fetched per scholar, then ``cited_pages``
+    "Cited by" pages for each of the ``cited_by`` most-cited publications. With a :class:`.cache.TwoTierCache`, pages cached within
+    their TTL are neither fetched nor parsed again.
+    """
+    report = Report()
+    pool = ConnectionPool(base, concurrency, timeout)
+    cycle = _Cycle(pool, RateLimit(delay, jitter, seed), retries, report, base.rstrip('/'), cache)
+    ids = iter(scholar_ids)
+
+    async def worker():
+        for scholar_id in ids:
+            await cycle.scholar(scholar_id, sort_by, max_pages, cited_by, cited_pages)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        pool.close()
+    report.seconds = time.perf_counter() - started
+    report.connections = pool.opened
+    return report
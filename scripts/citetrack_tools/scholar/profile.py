@@ -0,0 +1,157 @@
+"""
+One-pass parser for saved Google Scholar profile pages.
+
+The apps parse a profile (``citations?user=...``) with one regex per field:
+``GoogleScholarService.extractScholarName``/``extractCitationCount``, the
+``extractScholarFullInfo`` helpers (each scanning the ``gsc_rsb_std`` cells
+again) and ``CitationFetchService.parseScholarPublications`` (a regex per
+row, then one per field of the row), compiling every ``NSRegularExpression``
+on each call. :func:`parse` instead scans the raw bytes of a page once with a
+single precompiled pattern whose alternatives are the tags that carry data:
+
+* ``<div id="gsc_prf_in">`` -- the scholar's name;
+* ``<link rel="canonical" ...user=...>`` -- the scholar ID;
+* the ``gsc_rsb_st`` table -- citations, h-index and i10-index, each for all
+  years and for the recent window (``Since 2020``);
+* per ``<tr class="gsc_a_tr">`` row: the ``gsc_a_at`` title link, the
+  ``gsc_a_ac`` citation link (its ``cites=`` IDs; the first one is the
+  cluster ID the app keeps) and the ``gsc_a_h`` year.
+
+Only captured fields are decoded. :func:`parse_files` fans many saved pages
+out over a process pool::
+
+    from citetrack_tools.scholar.profile import parse_file
+
+    profile = parse_file('../iOS/scholar_kukA0LcAAAAJ.html')
+    profile.name, profile.citations, profile.h_index, profile.publications[0].cluster_id
+"""
+
+import html
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+Publication = namedtuple('Publication', 'title cluster_id cluster_ids citations year')
+
+Profile = namedtuple('Profile', 'scholar_id name citations citations_since h_index h_index_since '
+                                'i10_index i10_index_since since_year publications')
+
+# Every alternative starts with '<', so the scan jumps from tag to tag. Attributes
+# before a link's class are skipped a quoted value at a time, which is far
+# cheaper than a character-by-character search for the class.
+_TOKENS = re.compile(rb'''<(?:
+    tr\ class="gsc_a_tr"(?P<row>)
+  | a\ (?P<attrs>(?:[\w-]+="[^"]*"\ )*?)class="gsc_a_a
+        (?:t"[^>]*>(?P<title>.*?)|c(?P<more>[^>]*)>(?P<cited>\d*))</a>
+  | span\ class="gsc_a_h[^"]*">(?P<year>\d*)</span>
+  | td\ class="gsc_rsb_std">(?P<stat>\d*)</td>
+  | th\ class="gsc_rsb_sth">[^<\d]*(?P<since>\d{4})</th>
+  | div\ (?:id|class)="gsc_prf_in">(?P<name>[^<]*)</div>
+  | link\ rel="canonical"\ href="[^"]*?[?&;]user=(?P<user>[\w-]+)
+)''', re.X | re.S)
+
+_CITES = re.compile(rb'[?&;]cites=([\d,]+)')
+_TAG = re.compile(r'<[^>]+>')
+_SPACE = re.compile(r'\s+')
+
+
+def _text(raw):
+    """Visible text of an HTML fragment, as ``cleanHTML`` leaves it."""
+    text = raw.decode('utf-8', 'replace')
+    if '<' in text:
+        text = _TAG.sub('', text)
+    if '&' in text:
+        text = html.unescape(text)
+    return _SPACE.sub(' ', text).strip()
+
+
+def _number(raw):
+    return int(raw) if raw else None
+
+
+def parse(page):
+    """Parse a profile page (``bytes`` or ``str``) into a :class:`Profile`.
+
+    Fields the page does not have are ``None`` (``''`` for the name); a
+    publication without citations has ``citations`` None, as in the app.
+    """
+    if isinstance(page, str):
+        page = page.encode('utf-8')
+    scholar_id = name = since = None
+    stats = []
+    publications = []
+    row = None
+    for match in _TOKENS.finditer(page):
+        kind = match.lastgroup
+        if kind == 'row':
+            if row is not None:
+                publications.append(Publication(*row))
+            row = [None, None, (), None, None]
+        elif row is not None and kind == 'title':
+            row[0] = _text(match['title'])
+        elif row is not None and kind == 'cited':
+            cites = _CITES.search(match['attrs']) or _CITES.search(match['more'])
+            if cites:
+                ids = tuple(i for i in cites[1].decode('ascii').split(',') if i)
+                row[1], row[2] = (ids[0] if ids else None), ids
+            row[3] = _number(match['cited'])
+        elif row is not None and kind == 'year':
+            row[4] = _number(match['year'])
+        elif kind == 'stat':
+            stats.append(_number(match['stat']))
+        elif kind == 'since':
+            since = int(match['since'])
+        elif kind == 'name':
+            if name is None:
+                name = html.unescape(match['name'].decode('utf-8', 'replace')).strip()
+        elif kind == 'user':
+            if scholar_id is None:
+                scholar_id = match['user'].decode('ascii')
+    if row is not None:
+        publications.append(Publication(*row))
+    # rows of the statistics table: citations, h-index, i10-index; columns: all, recent
+    stats += [None] * (6 - len(stats))
+    return Profile(scholar_id, name or '', *stats[:6], since, publications)
+
+
+def parse_file(path):
+    with open(path, 'rb') as f:
+        return parse(f.read())
+
+
+def _parse_path(path):
+    try:
+        return path, parse_file(path), None
+    except OSError as error:
+        return path, None, str(error)
+
+
+def parse_files(paths, jobs=None, chunksize=16):
+    """Yield ``(path, profile, error)`` for saved pages, in order.
+
+    Pages are parsed in a pool of ``jobs`` processes (default: one per CPU),
+    ``chunksize`` pages per task so the pool's overhead stays small next to
+    the parsing; ``jobs=1`` parses in this process. ``error`` is the message
+    of a page that could not be read (its ``profile`` is None).
+    """
+    paths = list(paths)
+    jobs = min(jobs or os.cpu_count() or 1, len(paths)) or 1
+    if jobs == 1:
+        yield from map(_parse_path, paths)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_parse_path, paths, chunksize=chunksize)
+
+
+def to_dict(profile):
+    """A JSON-ready dict with the app's field names (``ScholarFullInfo``, ``ScholarPublication``)."""
+    return {
+        'scholarId': profile.scholar_id, 'name': profile.name,
+        'totalCitations': profile.citations, 'citationsSince': profile.citations_since,
+        'hIndex': profile.h_index, 'hIndexSince': profile.h_index_since,
+        'i10Index': profile.i10_index, 'i10IndexSince': profile.i10_index_since,
+        'sinceYear': profile.since_year,
+        'publications': [{'title': p.title, 'clusterId': p.cluster_id, 'citationCount': p.citations,
+                          'year': p.year} for p in profile.publications],
+    }
@@ -0,0 +1,180 @@
+"""
+Local asyncio stand-in for Google Scholar, for load-testing the fetch path.
+
+Serves the two page types ``CitationFetchService`` requests, at the URLs
+``buildScholarProfileURL`` and ``buildCitedByURL`` build:
+
+* ``/citations?user=ID&hl=en&cstart=N&pagesize=100[&sortby=...]`` -- a
+  profile page made from a saved one (``iOS/scholar_kukA0LcAAAAJ.html``):
+  its header and statistics, with the scholar ID swapped in, and publication
+  rows ``cstart`` to ``cstart + pagesize`` of that scholar's list. Each
+  scholar gets a stable number of publications (up to ``publications``),
+  cycled from the saved page's rows, so a refresh has to page through them
+  like it does on Scholar.
+* ``/scholar?hl=en&cites=ID[&scisbd=1][&start=N]`` -- a "Cited by" page of up
+  to ten ``gs_r`` results, again from a stable per-cluster total.
+
+Every response is delayed by ``latency`` seconds (plus up to ``jitter``), and
+a token bucket of ``rate`` requests per second (``burst`` deep) answers
+requests over it with ``429 Too Many Requests`` and a ``Retry-After``, as
+Scholar does when a client polls too fast. Connections are HTTP/1.1
+keep-alive. Nothing leaves the machine::
+
+    server = StandIn(open('../iOS/scholar_kukA0LcAAAAJ.html', 'rb').read(), latency=0.05, rate=200)
+    await server.start('127.0.0.1', 8765)
+    ...
+    await server.close()
+"""
+
+import asyncio
+import random
+import re
+import zlib
+from urllib.parse import parse_qs, urlsplit
+
+PAGE_SIZE = 100
+CITED_BY_PAGE_SIZE = 10
+
+_ROW = re.compile(rb'<tr class="gsc_a_tr">.*?</tr>', re.S)
+_CANONICAL_USER = re.compile(rb'(<link rel="canonical" href="[^"]*?[?&;]user=)[\w-]+')
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 429: 'Too Many Requests'}
+
+
+def _stable(key, salt):
+    """A stable pseudo-random number for ``key``, the same on every run."""
+    return zlib.crc32(f'{salt}:{key}'.encode())
+
+
+class TokenBucket:
+    """``rate`` tokens per second, at most ``burst`` saved up."""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = None
+
+    def take(self, now):
+        """Take a token; return 0, or the seconds until one is available."""
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class StandIn:
+    """The stand-in server; see the module docstring.
+
+    ``counts`` tallies responses by status code; ``connections`` counts
+    accepted connections, so a client's keep-alive reuse shows up as many
+    requests per connection.
+    """
+
+    def __init__(self, page, latency=0.0, jitter=0.0, rate=None, burst=None, publications=300,
+                 citing=200, seed=0):
+        rows = list(_ROW.finditer(page))
+        if not rows:
+            raise ValueError('the saved page has no publication rows')
+        self.head, self.tail = page[:rows[0].start()], page[rows[-1].end():]
+        self.rows = [row[0] for row in rows]
+        self.latency = latency
+        self.jitter = jitter
+        self.bucket = TokenBucket(rate, burst or max(1, rate)) if rate else None
+        self.publications = publications
+        self.citing = citing
+        self.random = random.Random(seed)
+        self.counts = {}
+        self.connections = 0
+        self.server = None
+        self.open = {}
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Listen on ``host:port`` (0 picks a free port); return the base URL."""
+        self.server = await asyncio.start_server(self._serve, host, port)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f'http://{host}:{port}'
+
+    async def close(self):
+        """Stop listening and end open connections."""
+        self.server.close()
+        for writer in self.open.values():
+            writer.close()
+        await asyncio.gather(*self.open, return_exceptions=True)
+        await self.server.wait_closed()
+
+    # MARK: - Pages
+
+    def publication_count(self, scholar_id):
+        return _stable(scholar_id, 'publications') % (self.publications + 1)
+
+    def profile_page(self, scholar_id, start, size):
+        head = _CANONICAL_USER.sub(lambda m: m[1] + scholar_id.encode(), self.head, count=1)
+        stop = min(start + size, self.publication_count(scholar_id))
+        rows = [self.rows[i % len(self.rows)] for i in range(start, stop)]
+        return b''.join([head, *rows, self.tail])
+
+    def cited_by_page(self, cluster_id, start):
+        total = _stable(cluster_id, 'citing') % (self.citing + 1)
+        results = [
+            f'<div class="gs_r gs_or gs_scl" data-cid="{_stable(cluster_id, i):x}"><div class="gs_ri">'
+            f'<h3 class="gs_rt"><a href="/scholar?cluster={_stable(cluster_id, i)}">Citing paper {i + 1} '
+            f'of {cluster_id}</a></h3><div class="gs_a">A Author, B Author - Journal, {2000 + i % 25}'
+            f'</div></div></div>'
+            for i in range(start, min(start + CITED_BY_PAGE_SIZE, total))
+        ]
+        return (f'<!doctype html><html><head><title>Cited by</title></head><body>'
+                f'<div id="gs_res_ccl_mid">{"".join(results)}</div></body></html>').encode()
+
+    def respond(self, target):
+        """Status, extra headers and body for a request target (path and query)."""
+        url = urlsplit(target)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == '/citations' and query.get('user'):
+                start = int(query.get('cstart', 0))
+                size = min(int(query.get('pagesize', 20)), PAGE_SIZE)
+                return 200, {}, self.profile_page(query['user'], start, size)
+            if url.path == '/scholar' and query.get('cites'):
+                return 200, {}, self.cited_by_page(query['cites'], int(query.get('start', 0)))
+        except ValueError:
+            return 400, {}, b'bad request'
+        return 404, {}, b'not found'
+
+    # MARK: - HTTP
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        self.open[asyncio.current_task()] = writer
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                request = await reader.readuntil(b'\r\n\r\n')
+                lines = request.decode('latin-1').split('\r\n')
+                target = lines[0].split(' ')[1] if lines[0].count(' ') == 2 else ''
+                close = any(line.lower() == 'connection: close' for line in lines[1:])
+                wait = self.bucket.take(loop.time()) if self.bucket else 0
+                if wait:
+                    status, headers, body = 429, {'Retry-After': str(max(1, round(wait)))}, b'rate limited'
+                else:
+                    status, headers, body = self.respond(target)
+                self.counts[status] = self.counts.get(status, 0) + 1
+                delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+                if delay:
+                    await asyncio.sleep(delay)
+                head = [f'HTTP/1.1 {status} {_REASONS[status]}', 'Content-Type: text/html; charset=utf-8',
+                        f'Content-Length: {len(body)}', f'Connection: {"close" if close else "keep-alive"}']
+                head += [f'{key}: {value}' for key, value in headers.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            del self.open[asyncio.current_task()]
+            writer.close()
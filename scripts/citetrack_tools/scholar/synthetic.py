@@ -0,0 +1,179 @@
+"""
+Synthetic Scholar profile pages and citing-paper sets that match a
+synthetic history (needs NumPy).
+
+Scholars come from :mod:`..history.synthetic` with the same arguments, so a
+scholar's page and citing papers agree with their records in the import
+file written by ``history synthesize``: the page's total is the scholar's
+count at a snapshot (the last by default), split over a Zipf-like list of
+publications that sums to it exactly, with the h-index and i10-index
+computed from that list. The "Cited by" set of each of the most-cited
+publications has one ``CitingPaper`` per citation, up to a cap, with
+authors drawn from a skewed pool so that names recur across papers as they
+do in real dumps. Everything is seeded per scholar, so a page can be
+regenerated on its own.
+
+Pages are laid out like ``iOS/scholar_kukA0LcAAAAJ.html`` as far as
+:func:`.profile.parse` and the apps' parsers look, so
+``parse(render_page(profile))`` returns ``profile`` (with the rows shown)::
+
+    for profile, timestamp, citing in iter_scholars(100, 1000, seed=7, limit=10):
+        page = render_page(profile)
+"""
+
+import html
+import json
+import os
+
+import numpy as np
+
+from ..history.records import APPLE_EPOCH
+from ..history.synthetic import DAY, START, blocks, generate_block, name, scholar_names
+from .profile import Profile, Publication
+
+ROWS = 100
+
+_WORDS = ('deep', 'learning', 'neural', 'networks', 'representation', 'generative', 'adversarial',
+          'attention', 'graph', 'citation', 'analysis', 'bayesian', 'inference', 'optimization',
+          'stochastic', 'gradient', 'language', 'models', 'vision', 'transformers', 'robust', 'sparse',
+          'recurrent', 'memory', 'scalable', 'causal', 'reinforcement', 'policy', 'embedding', 'metric')
+_VENUES = ('Advances in neural information processing systems', 'Nature', 'Science',
+           'Journal of Machine Learning Research', 'Proceedings of the IEEE', 'arXiv preprint',
+           'International Conference on Machine Learning', 'IEEE Transactions on Pattern Analysis')
+
+_HEAD = ('<!doctype html><html><head><title>{name} - Google Scholar</title>'
+         '<link rel="canonical" href="https://scholar.google.com/citations?user={scholar_id}&amp;hl=en">'
+         '</head><body><div id="gsc_prf_w"><div id="gsc_prf_i"><div id="gsc_prf_in">{name}</div>'
+         '<div class="gsc_prf_il">Synthetic profile</div></div></div>'
+         '<div id="gsc_rsb_cit"><table id="gsc_rsb_st"><thead><tr><th class="gsc_rsb_sth"></th>'
+         '<th class="gsc_rsb_sth">All</th><th class="gsc_rsb_sth">Since {since_year}</th></tr></thead>'
+         '<tbody>'
+         '<tr><td class="gsc_rsb_sc1">Citations</td><td class="gsc_rsb_std">{citations}</td>'
+         '<td class="gsc_rsb_std">{citations_since}</td></tr>'
+         '<tr><td class="gsc_rsb_sc1">h-index</td><td class="gsc_rsb_std">{h_index}</td>'
+         '<td class="gsc_rsb_std">{h_index_since}</td></tr>'
+         '<tr><td class="gsc_rsb_sc1">i10-index</td><td class="gsc_rsb_std">{i10_index}</td>'
+         '<td class="gsc_rsb_std">{i10_index_since}</td></tr></tbody></table></div>'
+         '<table id="gsc_a_t"><tbody id="gsc_a_b">')
+_ROW = ('<tr class="gsc_a_tr"><td class="gsc_a_t"><a href="/citations?view_op=view_citation&amp;hl=en&amp;'
+        'user={scholar_id}&amp;citation_for_view={scholar_id}:{index}" class="gsc_a_at">{title}</a>'
+        '<div class="gs_gray">{authors}</div><div class="gs_gray">{venue}</div></td>'
+        '<td class="gsc_a_c"><a href="https://scholar.google.com/scholar?oi=bibs&amp;hl=en&amp;'
+        'cites={cites}" class="gsc_a_ac gs_ibl">{citations}</a></td><td class="gsc_a_y">'
+        '<span class="gsc_a_h gsc_a_hc gs_ibl">{year}</span></td></tr>')
+_TAIL = ('</tbody></table><div id="gsc_lwp"><span id="gsc_a_nn">Articles 1&ndash;{rows}</span></div>'
+         '</body></html>')
+
+
+def _h_index(citations):
+    """h-index and i10-index of citation counts sorted in decreasing order."""
+    return int(np.sum(citations >= np.arange(1, len(citations) + 1))), int(np.sum(citations >= 10))
+
+
+def scholar_profile(block, row, seed=0, at=-1):
+    """``(profile, timestamp)`` of row ``row`` of a history :class:`Block` at snapshot ``at``."""
+    index = block.first + row
+    rng = np.random.default_rng([seed, 1, index])
+    total = int(block.counts[row, at])
+    timestamp = int(block.timestamps[row, at])
+    year = int(np.datetime64(timestamp, 's').astype('datetime64[Y]').astype(int)) + 1970
+    count = int(np.clip(3 * total ** 0.4, 1, 1000))
+    weights = np.sort(np.arange(1, count + 1) ** -1.2 * rng.lognormal(0, 0.6, count))[::-1]
+    citations = np.floor(total * weights / weights.sum()).astype(np.int64)
+    citations[0] += total - citations.sum()
+    recent = np.floor(citations * rng.uniform(0.4, 0.8)).astype(np.int64)
+    recent_sorted = np.sort(recent)[::-1]
+    years = rng.integers(max(1980, year - 30), year + 1, count)
+    clusters = rng.integers(10 ** 17, 2 ** 63 - 1, (count, 2))
+    words = rng.integers(0, len(_WORDS), (count, 5))
+    publications = [
+        Publication(' '.join(_WORDS[w] for w in words[i, :2 + i % 4]).capitalize(),
+                    str(clusters[i, 0]), tuple(map(str, clusters[i, :1 + (i % 7 == 0)])),
+                    int(citations[i]) or None, int(years[i]))
+        for i in range(count)
+    ]
+    h_index, i10_index = _h_index(citations)
+    h_since, i10_since = _h_index(recent_sorted)
+    profile = Profile(block.ids[row].tobytes().decode('ascii'), name(block.names[row]), total,
+                      int(recent.sum()), h_index, h_since, i10_index, i10_since, year - 5, publications)
+    return profile, timestamp
+
+
+def render_page(profile, rows=ROWS):
+    """A saved-page-like profile page (``bytes``) with the first ``rows`` publications."""
+    fields = profile._asdict()
+    fields['name'] = html.escape(profile.name)
+    parts = [_HEAD.format(**fields)]
+    for index, publication in enumerate(profile.publications[:rows]):
+        parts.append(_ROW.format(
+            scholar_id=profile.scholar_id, index=f'{index:04d}', title=html.escape(publication.title),
+            authors=html.escape(profile.name), venue=_VENUES[index % len(_VENUES)],
+            cites=','.join(publication.cluster_ids), citations=publication.citations or '',
+            year=publication.year))
+    parts.append(_TAIL.format(rows=min(rows, len(profile.publications))))
+    return ''.join(parts).encode('utf-8')
+
+
+def citing_papers(profile, timestamp, seed=0, top=5, per_publication=50, authors=5000):
+    """``CitingPaper`` dicts for the ``top`` most-cited publications, up to ``per_publication`` each.
+
+    Authors are the names of the dataset's first ``authors`` scholars,
+    drawn with Zipf-like weights, so the same names recur across papers.
+    """
+    rng = np.random.default_rng([seed, 2, int.from_bytes(profile.scholar_id.encode(), 'little')])
+    pool = np.arange(1, authors + 1) ** -1.1
+    pool = np.cumsum(pool / pool.sum())
+    papers = []
+    fetched = timestamp - APPLE_EPOCH
+    for publication in profile.publications[:top]:
+        n = min(publication.citations or 0, per_publication)
+        ids = rng.integers(10 ** 17, 2 ** 63 - 1, n)
+        sizes = rng.integers(1, 7, n)
+        drawn = scholar_names(np.searchsorted(pool, rng.random(int(sizes.sum()))), seed)
+        words = rng.integers(0, len(_WORDS), (n, 4))
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        for k in range(n):
+            papers.append({
+                'id': str(ids[k]),
+                'title': ' '.join(_WORDS[w] for w in words[k]).capitalize(),
+                'authors': [name(a) for a in drawn[offsets[k]:offsets[k + 1]]],
+                'year': int(rng.integers(publication.year, publication.year + 6)),
+                'venue': _VENUES[k % len(_VENUES)],
+                'citationCount': int(rng.integers(0, 500)),
+                'scholarUrl': f'https://scholar.google.com/scholar?cluster={ids[k]}',
+                'citedScholarId': profile.scholar_id,
+                'fetchedAt': float(fetched),
+            })
+    return papers
+
+
+def iter_scholars(scholars, snapshots, seed=0, start=START, every=DAY, limit=None, at=-1, top=5,
+                  per_publication=50):
+    """Yield ``(profile, timestamp, citing_papers)`` for the first ``limit`` scholars (default: all)."""
+    limit = scholars if limit is None else min(limit, scholars)
+    for block_index, first, stop in blocks(scholars, snapshots):
+        if first >= limit:
+            return
+        block = generate_block(block_index, first, stop, snapshots, seed, start, every)
+        for row in range(min(stop, limit) - first):
+            profile, timestamp = scholar_profile(block, row, seed, at)
+            yield profile, timestamp, citing_papers(profile, timestamp, seed, top, per_publication)
+
+
+def write_scholars(directory, scholars, snapshots, seed=0, start=START, every=DAY, limit=None,
+                   rows=ROWS, top=5, per_publication=50):
+    """Write ``scholar_<id>.html`` and ``citing_<id>.json`` per scholar into ``directory``.
+
+    Returns how many scholars were written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+    for profile, _, papers in iter_scholars(scholars, snapshots, seed, start, every, limit, top=top,
+                                            per_publication=per_publication):
+        with open(os.path.join(directory, f'scholar_{profile.scholar_id}.html'), 'wb') as f:
+            f.write(render_page(profile, rows))
+        path = os.path.join(directory, f'citing_{profile.scholar_id}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(papers, f, ensure_ascii=False, indent=2)
+        written += 1
+    return written
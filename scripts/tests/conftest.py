@@ -0,0 +1,126 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO = os.path.dirname(SCRIPTS)
+sys.path.insert(0, SCRIPTS)
+
+IOS_PROJECT = os.path.join(REPO, 'iOS', 'CiteTrack_iOS.xcodeproj', 'project.pbxproj')
+MACOS_PROJECT = os.path.join(REPO, 'macOS', 'CiteTrack_macOS.xcodeproj', 'project.pbxproj')
+PROJECTS = (IOS_PROJECT, MACOS_PROJECT)
+
+# A one-target app whose Sources group lists Kept.swift (on disk) and Gone.swift (deleted)
+SYNC_FIXTURE = '''// !$*UTF8*$!
+{
+	archiveVersion = 1;
+	classes = {
+	};
+	objectVersion = 56;
+	objects = {
+
+/* Begin PBXBuildFile section */
+		B00000000000000000000001 /* Kept.swift in Sources */ = {isa = PBXBuildFile; fileRef = F00000000000000000000001 /* Kept.swift */; };
+		B00000000000000000000002 /* Gone.swift in Sources */ = {isa = PBXBuildFile; fileRef = F00000000000000000000002 /* Gone.swift */; };
+/* End PBXBuildFile section */
+
+/* Begin PBXFileReference section */
+		F00000000000000000000001 /* Kept.swift */ = {isa = PBXFileReference; lastKnownFileType = sourcecode.swift; path = Kept.swift; sourceTree = "<group>"; };
+		F00000000000000000000002 /* Gone.swift */ = {isa = PBXFileReference; lastKnownFileType = sourcecode.swift; path = Gone.swift; sourceTree = "<group>"; };
+/* End PBXFileReference section */
+
+/* Begin PBXGroup section */
+		G00000000000000000000000 = {
+			isa = PBXGroup;
+			children = (
+				G00000000000000000000001 /* App */,
+			);
+			sourceTree = "<group>";
+		};
+		G00000000000000000000001 /* App */ = {
+			isa = PBXGroup;
+			children = (
+				F00000000000000000000001 /* Kept.swift */,
+				F00000000000000000000002 /* Gone.swift */,
+			);
+			path = App;
+			sourceTree = "<group>";
+		};
+/* End PBXGroup section */
+
+/* Begin PBXNativeTarget section */
+		T00000000000000000000001 /* App */ = {
+			isa = PBXNativeTarget;
+			buildPhases = (
+				S00000000000000000000001 /* Sources */,
+			);
+			name = App;
+			productType = "com.apple.product-type.application";
+		};
+/* End PBXNativeTarget section */
+
+/* Begin PBXProject section */
+		P00000000000000000000001 /* Project object */ = {
+			isa = PBXProject;
+			mainGroup = G00000000000000000000000;
+			targets = (
+				T00000000000000000000001 /* App */,
+			);
+		};
+/* End PBXProject section */
+
+/* Begin PBXSourcesBuildPhase section */
+		S00000000000000000000001 /* Sources */ = {
+			isa = PBXSourcesBuildPhase;
+			buildActionMask = 2147483647;
+			files = (
+				B00000000000000000000001 /* Kept.swift in Sources */,
+				B00000000000000000000002 /* Gone.swift in Sources */,
+			);
+			runOnlyForDeploymentPostprocessing = 0;
+		};
+/* End PBXSourcesBuildPhase section */
+	};
+	rootObject = P00000000000000000000001 /* Project object */;
+}
+'''
+
+
+def copy_project(source, directory):
+    """Copy ``source`` (a project.pbxproj) into ``directory``; returns the new file's path."""
+    path = directory / os.path.basename(os.path.dirname(source)) / 'project.pbxproj'
+    path.parent.mkdir(parents=True)
+    shutil.copyfile(source, path)
+    return str(path)
+
+
+def sync_tree(tmp_path):
+    """``App/{Kept,Added,Skipped}.swift`` and ``App/Views/Nested.swift`` next to App.xcodeproj."""
+    for name in ('Kept.swift', 'Added.swift', 'Skipped.swift', 'Views/Nested.swift', 'notes.txt'):
+        path = tmp_path / 'App' / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('// swift\n', encoding='utf-8')
+    project = tmp_path / 'App.xcodeproj' / 'project.pbxproj'
+    project.parent.mkdir()
+    project.write_text(SYNC_FIXTURE, encoding='utf-8')
+    return str(project)
+
+
+@pytest.fixture
+def project_copy(tmp_path):
+    """A copy of the iOS project file that a test may edit."""
+    return copy_project(IOS_PROJECT, tmp_path)
+
+
+@pytest.fixture
+def macos_copy(tmp_path):
+    """A copy of the macOS project file that a test may edit."""
+    return copy_project(MACOS_PROJECT, tmp_path)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    # keep cached_value and validate_file out of ~/.cache
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
@@ -0,0 +1,119 @@
+import os
+import shutil
+import sys
+
+from citetrack_tools.appcast.cli import main
+from citetrack_tools.appcast.digest import DigestCache, hash_files
+from citetrack_tools.appcast.feed import Release, plan, read_feed, save, version_from_name
+
+from conftest import REPO
+
+APPCAST = os.path.join(REPO, 'macOS', 'appcast.xml')
+DMG_200 = 'CiteTrack-Charts-Professional-v2.0.0.dmg'
+LENGTH_200 = 1967458
+# stands in for Sparkle's sign_update: the "signature" names the bytes' digest
+SIGN_UPDATE = '''import hashlib, sys
+data = open(sys.argv[1], 'rb').read()
+print(f'sparkle:edSignature="SIG-{hashlib.sha256(data).hexdigest()[:16]}" length="{len(data)}"')
+'''
+
+
+def _feed(tmp_path):
+    path = tmp_path / 'appcast.xml'
+    shutil.copyfile(APPCAST, path)
+    return str(path)
+
+
+def _dmg(tmp_path, name, size, fill=b'\0'):
+    path = tmp_path / name
+    path.write_bytes(fill * size)
+    return str(path)
+
+
+def _release(path, signature=None):
+    artifacts, _ = hash_files([path])
+    return Release(version_from_name(path), artifacts[0], signature)
+
+
+def test_read_feed():
+    feed = read_feed(APPCAST)
+    assert [item.version for item in feed.items] == ['2.0.0', '1.1.3', '1.1.2', '1.1.1']
+    assert feed.items[0].length == LENGTH_200 and feed.items[0].signature.endswith('==')
+    assert feed.items[2].signature is None
+
+
+def test_new_release_is_spliced_in_newest_first(tmp_path):
+    path = _feed(tmp_path)
+    feed = read_feed(path)
+    release = _release(_dmg(tmp_path, 'CiteTrack-Charts-Professional-v2.1.0.dmg', 1000))
+    edits, changes = plan(feed, [release])
+    assert [(change.action, change.version) for change in changes] == [('added', '2.1.0')]
+    (start, end, chunk), = edits
+    assert start == end == feed.items[0].start
+    assert save(feed, edits)
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data == feed.data[:start] + chunk.encode('utf-8') + feed.data[start:]
+    updated = read_feed(path)
+    assert [item.version for item in updated.items][:2] == ['2.1.0', '2.0.0']
+    assert (updated.items[0].length, updated.items[0].url.rsplit('/', 1)[-1]) == (
+        1000, 'CiteTrack-Charts-Professional-v2.1.0.dmg')
+    assert plan(updated, [release])[0] == []
+
+
+def test_changed_length_rewrites_only_the_enclosure(tmp_path):
+    feed = read_feed(_feed(tmp_path))
+    edits, changes = plan(feed, [_release(_dmg(tmp_path, DMG_200, 5000))])
+    assert changes[0].action == 'updated' and 'stale signature removed' in changes[0].detail
+    (start, end, chunk), = edits
+    assert (start, end) == feed.items[0].enclosure
+    assert 'length="5000"' in chunk and 'edSignature' not in chunk
+    assert 'sparkle:shortVersionString="2.0.0"' in chunk
+
+
+def test_stale_signature_is_found_by_digest(tmp_path):
+    feed = read_feed(_feed(tmp_path))
+    signature = feed.items[0].signature
+    release = _release(_dmg(tmp_path, DMG_200, LENGTH_200))
+    # same length: without the signed digest nothing tells the DMG changed
+    assert plan(feed, [release])[0] == []
+    assert plan(feed, [release], signed_digest={signature: release.artifact.sha256}.get)[0] == []
+    edits, changes = plan(feed, [release], signed_digest={signature: '0' * 64}.get)
+    assert 'edSignature' not in edits[0][2] and 'stale signature removed' in changes[0].detail
+
+
+def test_update_command_signs_then_drops_the_stale_signature(tmp_path, capsys):
+    path, script = _feed(tmp_path), tmp_path / 'sign_update.py'
+    script.write_text(SIGN_UPDATE, encoding='utf-8')
+    dmg = _dmg(tmp_path, DMG_200, LENGTH_200, b'a')
+    assert main(['update', dmg, '--feed', path, '--sign', f'{sys.executable} {script}']) == 0
+    signature = read_feed(path).items[0].signature
+    assert signature.startswith('SIG-')
+    assert main(['update', dmg, '--feed', path]) == 0 and read_feed(path).items[0].signature == signature
+    # rebuilt with the same length
+    _dmg(tmp_path, DMG_200, LENGTH_200, b'b')
+    os.utime(dmg, ns=(0, 10**9))
+    assert main(['update', dmg, '--feed', path, '--dry-run']) == 0
+    assert '-                sparkle:edSignature="SIG-' in capsys.readouterr().out
+    assert main(['update', dmg, '--feed', path]) == 0
+    assert read_feed(path).items[0].signature is None
+
+
+def test_digest_cache(tmp_path):
+    dmg = _dmg(tmp_path, 'a.dmg', 100)
+    cache = DigestCache(str(tmp_path / 'digests.marshal'))
+    artifacts, hashed = hash_files([dmg], cache=cache)
+    assert hashed == 1 and hash_files([dmg], cache=cache) == (artifacts, 0)
+    cache.store_signature(artifacts[0].sha256, 'sign', 'SIG')
+    assert cache.signed_digest('SIG') == artifacts[0].sha256 and cache.signed_digest('other') is None
+    cache.save()
+    reopened = DigestCache(cache.path)
+    assert reopened.signature(artifacts[0].sha256, 'sign') == 'SIG'
+    # a rebuilt DMG's old signature is dropped unless a feed still lists it
+    _dmg(tmp_path, 'a.dmg', 101)
+    hash_files([dmg], cache=reopened)
+    reopened.save(keep=['SIG'])
+    assert DigestCache(cache.path).signed_digest('SIG') == artifacts[0].sha256
+    reopened.changed = True
+    reopened.save()
+    assert DigestCache(cache.path).signed_digest('SIG') is None
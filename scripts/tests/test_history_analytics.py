@@ -0,0 +1,67 @@
+import os
+import statistics
+
+import numpy as np
+
+from citetrack_tools.history import analytics as analytics_module
+from citetrack_tools.history.analytics import DAY, Analytics
+from citetrack_tools.history.columnar import History, ScholarTable, load_many
+
+from conftest import REPO
+
+INPUTS = [os.path.join(REPO, 'macOS', 'sample_import_data.json'),
+          os.path.join(REPO, 'iOS', 'citetrack_init.json')]
+
+
+def _history(series):
+    """A History from ``{scholar ID: [(day, count), ...]}``."""
+    table, t, c, s = ScholarTable(), [], [], []
+    for sid, points in series.items():
+        i = table.intern(sid, sid)
+        for day, count in points:
+            t.append(day * DAY)
+            c.append(count)
+            s.append(i)
+    return History(np.array(t, dtype=np.int64), np.array(c, dtype=np.int64),
+                   np.array(s, dtype=np.int32), table)
+
+
+def test_summary_matches_one_scholar_at_a_time(monkeypatch):
+    history = load_many(INPUTS)
+    summary = Analytics(history).summary()
+    for k, sid in enumerate(summary['scholar_id']):
+        counts = history.for_scholar(sid).sorted().counts.tolist()
+        assert summary['entries'][k] == len(counts)
+        assert (summary['current'][k], summary['maximum'][k]) == (counts[-1], max(counts))
+        if len(counts) > 1:
+            changes = [b - a for a, b in zip(counts, counts[1:])]
+            assert np.isclose(summary['volatility'][k], statistics.pstdev(changes))
+            slope, intercept = np.polyfit(range(len(counts)), counts, 1)
+            assert np.isclose(summary['slope'][k], slope) and np.isclose(summary['intercept'][k], intercept)
+    # per-block work gives the same figures whatever the block size
+    monkeypatch.setattr(analytics_module, 'BLOCK_ROWS', 7)
+    blocked = Analytics(history).summary()
+    for key in ('entries', 'current', 'volatility', 'slope', 'correlation', 'trend'):
+        assert np.array_equal(blocked[key], summary[key], equal_nan=key != 'trend')
+
+
+def test_resample_carries_counts_forward():
+    analytics = Analytics(_history({'a': [(0, 10), (2, 12), (2, 13)], 'b': [(1, 5)]}))
+    daily = analytics.resample('D')
+    assert daily.periods.astype(str).tolist() == ['1970-01-01', '1970-01-02', '1970-01-03']
+    assert np.array_equal(daily.row('a'), [10, 10, 13])
+    assert np.array_equal(daily.row('b'), [np.nan, 5, 5], equal_nan=True)
+    assert np.array_equal(daily.deltas()[0], [np.nan, 0, 3], equal_nan=True)
+    assert np.array_equal(daily.rolling_mean(2)[1], [np.nan, np.nan, 5], equal_nan=True)
+
+
+def test_a_one_off_bad_reading_is_a_glitch():
+    points = [(day, 1000 + 10 * day) for day in range(60)]
+    points[30] = (30, 10)
+    flagged = Analytics(_history({'a': points})).anomalies()
+    # the bad reading, then the jump back to the real count
+    assert flagged['row'].tolist() == [30, 31]
+    assert flagged['kind'].tolist() == ['glitch', 'spike']
+    assert flagged['delta'].tolist() == [-1280, 1300]
+    steady = _history({'a': [(day, 1000 + 10 * day) for day in range(60)]})
+    assert Analytics(steady).anomalies()['row'].size == 0
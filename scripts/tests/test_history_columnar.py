@@ -0,0 +1,47 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from citetrack_tools.history.columnar import load, load_many
+
+from conftest import REPO
+
+SAMPLE = os.path.join(REPO, 'macOS', 'sample_import_data.json')
+EXPORT = os.path.join(REPO, 'macOS', 'test_import_data.json')
+INIT = os.path.join(REPO, 'iOS', 'citetrack_init.json')
+
+
+def _epoch(timestamp):
+    return int(datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp())
+
+
+def test_load_matches_json_module():
+    with open(SAMPLE, encoding='utf-8') as f:
+        expected = [(r['scholarId'], r['scholarName'], r['citationCount'], _epoch(r['timestamp']))
+                    for r in json.load(f)]
+    history = load(SAMPLE)
+    assert len(history) == 102 and history.nbytes == 102 * 20
+    assert list(history.records()) == expected
+    # chunks smaller than a record cut nothing in half
+    assert list(load(SAMPLE, chunk_size=64).records()) == expected
+
+
+def test_export_shape_names_scholars():
+    history = load(EXPORT)
+    assert history.scholar_ids == ['test_scholar_1', 'test_scholar_2']
+    assert history.scholar_names == ['Test Scholar 1', 'Test Scholar 2']
+    assert len(history) == 5
+    assert history.for_scholar('test_scholar_1').counts[0] == 1000
+    assert len(history.for_scholar('nobody')) == 0
+
+
+def test_load_many_shares_the_scholar_table():
+    history = load_many([SAMPLE, INIT, EXPORT])
+    assert len(history) == 102 + 62 + 5
+    assert len(set(history.scholar_ids)) == len(history.scholar_ids)
+    ordered = history.sorted()
+    keys = list(zip(ordered.scholars.tolist(), ordered.timestamps.tolist()))
+    assert keys == sorted(keys)
+    assert np.array_equal(np.sort(ordered.counts), np.sort(history.counts))
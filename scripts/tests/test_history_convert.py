@@ -0,0 +1,103 @@
+import io
+import json
+import os
+
+import pytest
+
+from citetrack_tools.history.convert import (CSV_HEADER, Filter, convert, get_timezone, parse_bound,
+                                             split_csv_line, validate)
+
+from conftest import REPO
+
+SAMPLE = os.path.join(REPO, 'macOS', 'sample_import_data.json')
+
+
+def _records(path):
+    with open(path, encoding='utf-8') as f:
+        return sorted((r['scholarId'], r['scholarName'], r['citationCount'], r['timestamp'])
+                      for r in json.load(f))
+
+
+def test_json_csv_json_round_trip(tmp_path):
+    csv_path, json_path = str(tmp_path / 'history.csv'), str(tmp_path / 'history.json')
+    stats = convert(SAMPLE, csv_path)
+    assert (stats.records, stats.scholars, len(stats.issues)) == (102, 3, 0)
+    with open(csv_path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert lines[0] == CSV_HEADER
+    assert [line.split(',')[0] for line in lines[1:]] == ['Scholar'] * 3 + ['History'] * 102
+    stats = convert(csv_path, json_path)
+    assert (stats.records, stats.scholars, len(stats.issues)) == (102, 3, 0)
+    assert _records(json_path) == _records(SAMPLE)
+
+
+def test_csv_output_is_a_fixed_point(tmp_path):
+    paths = [str(tmp_path / name) for name in ('a.csv', 'b.json', 'c.csv')]
+    convert(SAMPLE, paths[0])
+    convert(paths[0], paths[1])
+    convert(paths[1], paths[2])
+    with open(paths[0], 'rb') as a, open(paths[2], 'rb') as c:
+        assert a.read() == c.read()
+
+
+def test_json_output_matches_the_app_export(tmp_path):
+    out = io.StringIO()
+    convert(SAMPLE, out, target_format='json')
+    text = out.getvalue()
+    # JSONSerialization's pretty printing: two-space indent, ' : ', sorted keys
+    assert text.startswith('[\n  {\n    "citationCount" : 959186,\n    "scholarId" : "kukA0LcAAAAJ",\n')
+    assert len(json.loads(text)) == 102
+
+
+def test_time_zone_shifts_csv_dates_only(tmp_path):
+    csv_path, json_path = str(tmp_path / 'history.csv'), str(tmp_path / 'history.json')
+    shanghai = get_timezone('Asia/Shanghai')
+    convert(SAMPLE, csv_path, tz=shanghai)
+    with open(csv_path, encoding='utf-8') as f:
+        assert 'History,kukA0LcAAAAJ,,959186,"2025-07-23 15:13:35"' in f.read().splitlines()
+    convert(csv_path, json_path, tz=shanghai)
+    assert _records(json_path) == _records(SAMPLE)
+
+
+def test_rows_the_importer_drops_are_reported(tmp_path):
+    path = tmp_path / 'history.csv'
+    path.write_text('\n'.join([
+        CSV_HEADER,
+        'Scholar,kukA0LcAAAAJ,"Yoshua Bengio",974568,"2025-09-17 12:24:25"',
+        'History,kukA0LcAAAAJ,,959186,"2025-07-23 07:13:35"',
+        'History,kukA0LcAAAAJ,,959462,"Jul 24, 2025 at 8:37 AM"',
+        'History,kukA0LcAAAAJ,,959462,"2025-02-30 08:37:11"',
+        'History,kukA0LcAAAAJ,959462',
+    ]) + '\n', encoding='utf-8')
+    records, scholars, issues = validate(str(path))
+    assert (records, scholars) == (1, 1)
+    assert sum(issues.counts.values()) == 3
+    out = io.StringIO()
+    stats = convert(str(path), out, target_format='json')
+    assert stats.records == 1
+    out = io.StringIO()
+    stats = convert(str(path), out, target_format='json', lenient=True)
+    assert stats.records == 2
+
+
+def test_filter_by_scholar_and_time(tmp_path):
+    since = parse_bound('2025-08-01')
+    until = parse_bound('2025-08-31', end=True)
+    out = io.StringIO()
+    stats = convert(SAMPLE, out, target_format='json',
+                    row_filter=Filter(['WLN3QrAAAAAJ'], since, until))
+    records = json.loads(out.getvalue())
+    assert records and stats.records == len(records)
+    assert {r['scholarId'] for r in records} == {'WLN3QrAAAAAJ'}
+    assert all('2025-08-01T00:00:00Z' <= r['timestamp'] <= '2025-08-31T23:59:59Z' for r in records)
+    assert stats.filtered == 102 - len(records)
+
+
+@pytest.mark.parametrize('line, fields', [
+    ('History,id,,1,"2025-07-23 07:13:35"', ['History', 'id', '', '1', '2025-07-23 07:13:35']),
+    ('Scholar,id,"Doe, Jane",1,"2025-07-23 07:13:35"',
+     ['Scholar', 'id', 'Doe, Jane', '1', '2025-07-23 07:13:35']),
+    ('Scholar,id,"Jane ""J"" Doe",1,x', ['Scholar', 'id', 'Jane J Doe', '1', 'x']),
+])
+def test_split_csv_line_matches_the_app(line, fields):
+    assert split_csv_line(line) == fields
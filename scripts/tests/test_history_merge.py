@@ -0,0 +1,50 @@
+import json
+import os
+
+from citetrack_tools.history import merge as merge_module
+from citetrack_tools.history.merge import merge
+
+from conftest import REPO
+
+SAMPLE = os.path.join(REPO, 'macOS', 'sample_import_data.json')
+INIT = os.path.join(REPO, 'iOS', 'citetrack_init.json')
+
+
+def _history(path):
+    with open(path, encoding='utf-8') as f:
+        return [(r['scholarId'], r['timestamp'], r['citationCount']) for r in json.load(f)]
+
+
+def test_merging_a_file_with_itself_drops_every_copy(tmp_path):
+    once, twice = str(tmp_path / 'once.json'), str(tmp_path / 'twice.json')
+    single = merge([SAMPLE], once, collapse=False)
+    stats = merge([SAMPLE, SAMPLE], twice, collapse=False)
+    assert (stats.inputs, stats.read) == (2, 204)
+    assert stats.duplicates + stats.conflicts == single.duplicates + single.conflicts + 102
+    assert stats.records == single.records == 102 - single.duplicates - single.conflicts
+    assert _history(twice) == _history(once)
+
+
+def test_external_runs_give_the_in_memory_result(tmp_path, monkeypatch):
+    in_memory, spilled = str(tmp_path / 'memory.json'), str(tmp_path / 'runs.json')
+    expected = merge([SAMPLE, INIT], in_memory)
+    monkeypatch.setattr(merge_module, 'FAN_IN', 3)
+    stats = merge([SAMPLE, INIT], spilled, run_size=10, chunk_size=256)
+    assert stats.runs > 3 and stats.records == expected.records
+    with open(spilled, 'rb') as a, open(in_memory, 'rb') as b:
+        assert a.read() == b.read()
+
+
+def test_first_input_wins_and_unchanged_counts_collapse(tmp_path):
+    def write(name, records):
+        path = tmp_path / name
+        path.write_text(json.dumps([{'scholarId': 's', 'scholarName': 'S', 'citationCount': count,
+                                     'timestamp': f'2025-01-0{day}T00:00:00Z'}
+                                    for day, count in records]), encoding='utf-8')
+        return str(path)
+
+    first, second = write('a.json', [(1, 10), (2, 10), (3, 12)]), write('b.json', [(1, 11), (4, 13)])
+    target = str(tmp_path / 'merged.json')
+    stats = merge([first, second], target)
+    assert (stats.conflicts, stats.unchanged, stats.records) == (1, 1, 3)
+    assert [count for _, _, count in _history(target)] == [10, 12, 13]
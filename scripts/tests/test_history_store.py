@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+from citetrack_tools.history.columnar import History, ScholarTable, load, load_many
+from citetrack_tools.history.store import HistoryStore, StoreError, append, compact, from_json, to_json, write
+
+from conftest import REPO
+
+SAMPLE = os.path.join(REPO, 'macOS', 'sample_import_data.json')
+INIT = os.path.join(REPO, 'iOS', 'citetrack_init.json')
+
+
+def _history(rows):
+    """A History of ``(scholar ID, epoch, count)`` rows."""
+    table = ScholarTable()
+    scholars = [table.intern(sid, sid.upper()) for sid, _, _ in rows]
+    return History(np.array([epoch for _, epoch, _ in rows], dtype=np.int64),
+                   np.array([count for _, _, count in rows], dtype=np.int64),
+                   np.array(scholars, dtype=np.int32), table)
+
+
+def _unique(history):
+    """Sorted ``(scholar ID, epoch, count)`` rows, first row per scholar and timestamp."""
+    rows, seen = [], set()
+    for sid, _, count, epoch in history.sorted().records():
+        if (sid, epoch) not in seen:
+            seen.add((sid, epoch))
+            rows.append((sid, epoch, count))
+    return rows
+
+
+def _rows(store):
+    return [(sid, epoch, count) for sid, _, count, epoch in store.to_history().records()]
+
+
+def test_json_round_trip(tmp_path):
+    path, target = str(tmp_path / 'history.cthist'), str(tmp_path / 'history.json')
+    history = load_many([SAMPLE, INIT])
+    assert from_json([SAMPLE, INIT], path) == len(_unique(history))
+    with HistoryStore(path) as store:
+        assert _rows(store) == _unique(history)
+        assert store.scholar_names == history.scholar_names
+    assert to_json(path, target) == len(_unique(history))
+    assert _unique(load(target)) == _unique(history)
+
+
+def test_range_queries_match_a_scan(tmp_path):
+    path = str(tmp_path / 'history.cthist')
+    rows = [('a', epoch, epoch * 2) for epoch in range(0, 3000, 3)] + [('b', 5, 1)]
+    write(path, _history(rows), stride=8)
+    with HistoryStore(path) as store:
+        for since, until in [(None, None), (100, 200), (101, 101), (-5, 4), (2990, 9999), (4000, None)]:
+            expected = [epoch for _, epoch, _ in rows[:-1]
+                        if (since is None or epoch >= since) and (until is None or epoch <= until)]
+            assert store.range('a', since, until)['timestamp'].tolist() == expected
+        assert store.latest('a') == (2997, 5994)
+        with pytest.raises(KeyError):
+            store.range('nobody')
+
+
+def test_append_refuses_the_past_and_compact_keeps_the_records(tmp_path):
+    path = str(tmp_path / 'history.cthist')
+    write(path, _history([('a', 10, 1), ('a', 20, 2)]))
+    assert append(path, _history([('a', 15, 9), ('a', 30, 3), ('b', 5, 7)])) == (2, 1)
+    assert append(path, _history([('a', 30, 3)])) == (0, 1)
+    with HistoryStore(path) as store:
+        assert len(store.segments[0]) == 2
+        assert store.range('a', 15, 30)['count'].tolist() == [2, 3]
+        before = _rows(store)
+    assert compact(path) > 0
+    with HistoryStore(path) as store:
+        assert _rows(store) == before == [('a', 10, 1), ('a', 20, 2), ('a', 30, 3), ('b', 5, 7)]
+
+
+def test_truncated_files_are_refused(tmp_path):
+    path = str(tmp_path / 'history.cthist')
+    write(path, _history([('a', 10, 1)]))
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 4)
+    with pytest.raises(StoreError):
+        HistoryStore(path)
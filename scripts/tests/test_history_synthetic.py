@@ -0,0 +1,46 @@
+import json
+from itertools import groupby
+
+import numpy as np
+
+from citetrack_tools.history import synthetic
+from citetrack_tools.history.synthetic import blocks, generate_block, iter_blocks, write_import
+
+
+def _write(path, seed=7):
+    return write_import(str(path), scholars=30, snapshots=10, seed=seed), path.read_bytes()
+
+
+def test_same_seed_gives_the_same_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(synthetic, 'BLOCK_RECORDS', 64)  # several blocks
+    assert len(blocks(30, 10)) == 5
+    records, data = _write(tmp_path / 'a.json')
+    assert records == 300
+    assert _write(tmp_path / 'b.json') == (records, data)
+    assert _write(tmp_path / 'c.json', seed=8)[1] != data
+
+
+def test_import_file_layout_and_monotone_series(tmp_path, monkeypatch):
+    monkeypatch.setattr(synthetic, 'BLOCK_RECORDS', 64)
+    _, data = _write(tmp_path / 'a.json')
+    assert data.startswith(b'[\n  {\n    "citationCount": ') and data.endswith(b'  }\n]')
+    records = json.loads(data)
+    assert len(records) == 300
+    assert list(records[0]) == ['citationCount', 'timestamp', 'scholarId', 'scholarName']
+    series = [list(group) for _, group in groupby(records, key=lambda record: record['scholarId'])]
+    assert len(series) == 30 and all(len(records) == 10 for records in series)
+    for records in series:
+        counts = [record['citationCount'] for record in records]
+        timestamps = [record['timestamp'] for record in records]
+        assert counts == sorted(counts) and timestamps == sorted(timestamps)
+        assert len(records[0]['scholarId']) == 12 and records[0]['scholarId'].endswith('AAAAJ')
+
+
+def test_a_block_regenerates_on_its_own(monkeypatch):
+    monkeypatch.setattr(synthetic, 'BLOCK_RECORDS', 64)
+    block_index, first, stop = blocks(30, 10)[3]
+    alone = generate_block(block_index, first, stop, 10, seed=7)
+    streamed = list(iter_blocks(30, 10, seed=7))[3]
+    assert alone.first == streamed.first == first
+    for field in ('ids', 'names', 'counts', 'timestamps'):
+        assert np.array_equal(getattr(alone, field), getattr(streamed, field))
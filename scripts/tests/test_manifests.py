@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from citetrack_tools.pbxproj.cli import load_manifest, process_project
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.operations import OperationError, apply_operations
+from citetrack_tools.pbxproj.parser import load
+
+from conftest import IOS_PROJECT, SCRIPTS
+
+MANIFESTS = os.path.join(SCRIPTS, 'manifests')
+
+
+def _projects(name):
+    return load_manifest(os.path.join(MANIFESTS, name))
+
+
+@pytest.mark.parametrize('name', ['project_manifest.json', 'sync_manifest.json'])
+def test_manifest_applies_cleanly(name):
+    for path, operations in _projects(name):
+        result = process_project(path, operations, dry_run=True)
+        assert result['error'] is None, result['error']
+
+
+def test_add_files_rejects_missing_files():
+    session = EditSession(load(IOS_PROJECT))
+    spec = {'op': 'add-files', 'group': 'Views', 'files': ['InfoBanner.swift']}
+    with pytest.raises(OperationError, match='InfoBanner.swift not found'):
+        apply_operations(session, [spec])
+    assert not session
+
+
+def test_manifest_reapplies_as_a_no_op():
+    projects = dict(_projects('project_manifest.json'))
+    project = load(IOS_PROJECT)
+    session = EditSession(project)
+    apply_operations(session, projects[IOS_PROJECT])
+    session.apply()  # in memory only: the repository's file is not written
+    again = EditSession(project)
+    assert apply_operations(again, projects[IOS_PROJECT]) == []
+    assert not again
@@ -0,0 +1,74 @@
+import os
+
+from citetrack_tools.pbxproj import cache
+from citetrack_tools.pbxproj.cache import cached_value, load_cached
+from citetrack_tools.pbxproj.parser import load
+from citetrack_tools.pbxproj.query import resolve
+
+
+def _entries(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.marshal'))
+
+
+def test_cached_graph_equals_a_fresh_parse(project_copy, tmp_path):
+    directory = str(tmp_path / 'entries')
+    first = load_cached(project_copy, directory)
+    assert len(_entries(directory)) == 1
+    second = load_cached(project_copy, directory)
+    fresh = load(project_copy)
+    for project in (first, second):
+        assert project.text == fresh.text
+        assert {k: (v.props, v.comment, v.span) for k, v in project.objects.items()} == \
+            {k: (v.props, v.comment, v.span) for k, v in fresh.objects.items()}
+        assert project.find_group('Views').id == fresh.find_group('Views').id
+
+
+def test_changed_file_gets_a_new_entry(project_copy, tmp_path):
+    directory = str(tmp_path / 'entries')
+    load_cached(project_copy, directory)
+    with open(project_copy, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    project = load_cached(project_copy, directory)
+    assert project.text.endswith('}\n\n')
+    assert len(_entries(directory)) == 2
+
+
+def test_cached_value_computes_once(project_copy, tmp_path):
+    directory = str(tmp_path / 'entries')
+    calls = []
+
+    def compute(project):
+        calls.append(project)
+        return {f'{target}/{name}': len(settings) for (target, name), settings in resolve(project).items()}
+
+    first = cached_value(project_copy, 'sizes', compute, directory)
+    assert cached_value(project_copy, 'sizes', compute, directory) == first
+    assert len(calls) == 1
+    assert first['CiteTrack/Release'] > first['<project>/Release']
+
+
+def test_corrupt_entries_are_misses(project_copy, tmp_path):
+    directory = str(tmp_path / 'entries')
+    load_cached(project_copy, directory)
+    for name in _entries(directory):
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(b'not marshal')
+    assert load_cached(project_copy, directory).find_group('Views') is not None
+
+
+def test_prune_keeps_the_newest(project_copy, tmp_path, monkeypatch):
+    directory = str(tmp_path / 'entries')
+    monkeypatch.setattr(cache, 'MAX_ENTRIES', 2)
+    for i in range(4):
+        with open(project_copy, 'a', encoding='utf-8') as f:
+            f.write('\n')
+        load_cached(project_copy, directory)
+    assert len(_entries(directory)) == 2
+
+
+def test_changed_parser_code_gets_a_new_entry(project_copy, tmp_path, monkeypatch):
+    directory = str(tmp_path / 'entries')
+    load_cached(project_copy, directory)
+    monkeypatch.setitem(cache._code_keys, cache.GRAPH_MODULES[0].__name__, 'edited')
+    assert load_cached(project_copy, directory).find_group('Views') is not None
+    assert len(_entries(directory)) == 2
@@ -0,0 +1,50 @@
+import difflib
+
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.parser import load
+from citetrack_tools.pbxproj.validate import ERROR, validate
+
+
+def _add_banner(path):
+    project = load(path)
+    session = EditSession(project)
+    views = project.find_group('Views')
+    session.add_file('CiteTrack/Views/InfoBanner.swift', views, name='InfoBanner.swift',
+                     targets=['CiteTrack'])
+    return session
+
+
+def test_add_file_references_and_builds_it(project_copy):
+    assert _add_banner(project_copy).save()
+    project = load(project_copy)
+    refs = project.find_by_path('CiteTrack/Views/InfoBanner.swift', 'PBXFileReference')
+    assert len(refs) == 1
+    assert refs[0].id in project.find_group('Views')['children']
+    sources = project.build_phase(project.target('CiteTrack'), 'PBXSourcesBuildPhase')
+    assert project.in_phase(sources.id, refs[0].id)
+    assert [issue for issue in validate(project) if issue.severity == ERROR] == []
+
+
+def test_splice_only_inserts(project_copy):
+    with open(project_copy, encoding='utf-8') as f:
+        before = f.read().splitlines()
+    _add_banner(project_copy).save()
+    with open(project_copy, encoding='utf-8') as f:
+        after = f.read().splitlines()
+    opcodes = difflib.SequenceMatcher(None, before, after, autojunk=False).get_opcodes()
+    assert {tag for tag, *_ in opcodes} == {'equal', 'insert'}
+    inserted = [line for tag, _, _, start, end in opcodes if tag == 'insert' for line in after[start:end]]
+    # the file reference, its build file, and their entries in the group and in Sources
+    assert len(inserted) == 4
+    assert all('InfoBanner.swift' in line for line in inserted)
+
+
+def test_add_file_again_is_a_no_op(project_copy):
+    _add_banner(project_copy).save()
+    with open(project_copy, 'rb') as f:
+        saved = f.read()
+    session = _add_banner(project_copy)
+    assert not session
+    assert not session.save()
+    with open(project_copy, 'rb') as f:
+        assert f.read() == saved
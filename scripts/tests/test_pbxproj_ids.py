@@ -0,0 +1,25 @@
+from citetrack_tools.pbxproj.ids import ID_LENGTH, IDAllocator, derive_id
+
+
+def test_derived_ids_are_stable_hex():
+    object_id = derive_id('PBXBuildFile', 'A', 'B')
+    assert object_id == derive_id('PBXBuildFile', 'A', 'B')
+    assert len(object_id) == ID_LENGTH and object_id == object_id.upper()
+    int(object_id, 16)
+    assert object_id != derive_id('PBXBuildFile', 'AB')  # parts are separated
+    assert object_id != derive_id('PBXBuildFile', 'A', 'B', salt=1)
+
+
+def test_derive_skips_collisions_unless_accepted():
+    taken = derive_id('key')
+    ids = IDAllocator([taken])
+    assert ids.derive('key') == derive_id('key', salt=1)
+    assert IDAllocator([taken]).derive('key', accept=lambda object_id: object_id == taken) == taken
+    assert derive_id('key', salt=1) in ids
+
+
+def test_allocate_never_repeats():
+    ids = IDAllocator()
+    allocated = ids.allocate(500) + [ids.allocate()]
+    assert len(set(allocated)) == 501 and all(object_id in ids for object_id in allocated)
+    assert not ids.reserve(allocated[0]) and ids.reserve('0' * ID_LENGTH)
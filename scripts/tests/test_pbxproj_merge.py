@@ -0,0 +1,133 @@
+from citetrack_tools.pbxproj.cli import main
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.merge import merge_lists, merge_projects
+from citetrack_tools.pbxproj.parser import parse
+from citetrack_tools.pbxproj.validate import ERROR, validate
+
+from conftest import IOS_PROJECT
+
+
+def _base():
+    with open(IOS_PROJECT, encoding='utf-8') as f:
+        return f.read()
+
+
+def _edited(text, *changes):
+    """``text`` with each of ``changes(session)`` queued and applied."""
+    session = EditSession(parse(text))
+    for change in changes:
+        change(session)
+    return session.apply()
+
+
+def _add(name):
+    def change(session):
+        views = session.project.find_group('Views')
+        session.add_file(f'CiteTrack/Views/{name}', views, name=name, targets=['CiteTrack'])
+    return change
+
+
+def _setting(key, value, configuration='Release'):
+    def change(session):
+        for config in session.project.objects_of('XCBuildConfiguration'):
+            if config.get('name') == configuration and 'PRODUCT_BUNDLE_IDENTIFIER' in config['buildSettings']:
+                session.set_build_setting(config, key, value)
+    return change
+
+
+def _paths(text):
+    return {obj.get('path') for obj in parse(text).objects_of('PBXFileReference')}
+
+
+def test_merge_lists():
+    merged = merge_lists(['a', 'b', 'c'], ['a', 'x', 'b', 'c'], ['a', 'b', 'y', 'c'])
+    assert merged == ['a', 'x', 'b', 'y', 'c']
+    assert merge_lists(['a', 'b', 'c'], ['a', 'c'], ['a', 'b', 'c', 'z']) == ['a', 'c', 'z']
+    assert merge_lists(['a', 'b'], ['b', 'a'], ['a', 'b']) == ['b', 'a']
+
+
+def test_both_sides_add_different_files():
+    base = _base()
+    ours = _edited(base, _add('InfoBanner.swift'))
+    theirs = _edited(base, _add('PublicationListView.swift'))
+    result = merge_projects(base, ours, theirs)
+    assert result.clean
+    paths = _paths(result.text)
+    assert {'CiteTrack/Views/InfoBanner.swift', 'CiteTrack/Views/PublicationListView.swift'} <= paths
+    # theirs' file reference and build file
+    assert len(result.added) == 2
+    merged = parse(result.text)
+    sources = merged.build_phase(merged.target('CiteTrack'), 'PBXSourcesBuildPhase')
+    assert len(sources['files']) == len(parse(base).get(sources.id)['files']) + 2
+    assert [issue for issue in validate(merged) if issue.severity == ERROR] == []
+
+
+def test_duplicate_add_merges_once():
+    # both branches add the same file: the derived IDs agree, so it is not added twice
+    base = _base()
+    ours = _edited(base, _add('InfoBanner.swift'))
+    theirs = _edited(base, _add('InfoBanner.swift'))
+    result = merge_projects(base, ours, theirs)
+    assert result.clean
+    assert result.text == ours
+    merged = parse(result.text)
+    assert len(merged.find_by_path('CiteTrack/Views/InfoBanner.swift', 'PBXFileReference')) == 1
+    assert not [issue for issue in validate(merged) if issue.code == 'duplicate-build-file']
+
+
+def test_conflicting_setting_is_reported_and_ours_wins():
+    base = _base()
+    ours = _edited(base, _setting('SWIFT_VERSION', '5.10'), _add('InfoBanner.swift'))
+    theirs = _edited(base, _setting('SWIFT_VERSION', '6.0'), _add('PublicationListView.swift'))
+    result = merge_projects(base, ours, theirs)
+    assert not result.clean
+    assert {conflict.key for conflict in result.conflicts} == {'buildSettings.SWIFT_VERSION'}
+    assert all((c.ours, c.theirs) == ('5.10', '6.0') for c in result.conflicts)
+    # the rest still merges
+    assert 'CiteTrack/Views/PublicationListView.swift' in _paths(result.text)
+    assert 'SWIFT_VERSION = 5.10;' in result.text
+    assert 'SWIFT_VERSION = 6.0;' not in result.text
+    favored = merge_projects(base, ours, theirs, favor='theirs')
+    assert 'SWIFT_VERSION = 6.0;' in favored.text
+    assert 'SWIFT_VERSION = 5.10;' not in favored.text
+
+
+def test_same_change_on_both_sides_is_not_a_conflict():
+    base = _base()
+    ours = _edited(base, _setting('SWIFT_VERSION', '6.0'))
+    theirs = _edited(base, _setting('SWIFT_VERSION', '6.0'), _add('InfoBanner.swift'))
+    result = merge_projects(base, ours, theirs)
+    assert result.clean
+
+
+def test_reference_to_an_object_the_other_side_deleted_is_an_error():
+    base = _base()
+    project = parse(base)
+    views = project.find_group('Views')
+    victim = project.get(views['children'][0])
+    ours = _edited(base, lambda session: session.remove(views, 'children', victim),
+                   lambda session: session.remove_object(victim))
+    theirs = _edited(base, lambda session: session.add_to_targets(victim, ['CiteTrack'],
+                                                                  'PBXResourcesBuildPhase'))
+    result = merge_projects(base, ours, theirs)
+    assert not result.clean
+    assert [issue.code for issue in result.errors] == ['dangling-reference']
+    assert victim.id in result.errors[0].message
+
+
+def _driver(tmp_path, base, ours, theirs):
+    paths = []
+    for name, text in (('base', base), ('ours', ours), ('theirs', theirs)):
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        paths.append(str(path))
+    return main(['merge', *paths, 'project.pbxproj']), (tmp_path / 'ours').read_text(encoding='utf-8')
+
+
+def test_unparsable_side_falls_back_to_git_merge_file(tmp_path):
+    base = 'a\nb\nc\nd\ne\n'
+    status, text = _driver(tmp_path, base, 'A\nb\nc\nd\ne\n', 'a\nb\nc\nd\nE\n')
+    assert (status, text) == (0, 'A\nb\nc\nd\nE\n')
+    status, text = _driver(tmp_path, base, 'a\nours\nc\n', 'a\ntheirs\nc\n')
+    assert status == 1
+    assert text == 'a\n<<<<<<< ours\nours\n=======\ntheirs\n>>>>>>> theirs\nc\n'
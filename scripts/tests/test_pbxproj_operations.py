@@ -0,0 +1,31 @@
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.operations import apply_operations
+from citetrack_tools.pbxproj.parser import load
+
+from conftest import MACOS_PROJECT, copy_project
+
+EMBED_FRAMEWORKS = '62DE196BA960438E9052558D'
+PHASE = {'op': 'add-shell-script-phase', 'target': 'CiteTrack', 'name': 'Sign Sparkle Components',
+         'script': '"${SRCROOT}/scripts/sign_sparkle_components.sh"\n', 'after': 'Embed Frameworks'}
+
+
+def _apply(path, operations):
+    session = EditSession(load(path))
+    changes = apply_operations(session, operations)
+    session.save()
+    with open(path, 'rb') as f:
+        return changes, f.read()
+
+
+def test_shell_script_phase_after_a_named_phase(tmp_path):
+    first = copy_project(MACOS_PROJECT, tmp_path / 'first')
+    second = copy_project(MACOS_PROJECT, tmp_path / 'second')
+    changes, data = _apply(first, [PHASE])
+    assert changes == ["add-shell-script-phase: added phase 'Sign Sparkle Components'"]
+    assert _apply(second, [PHASE])[1] == data  # the derived ID is the same in every checkout
+
+    project = load(first)
+    phases = project.target('CiteTrack')['buildPhases']
+    phase = project.get(phases[phases.index(EMBED_FRAMEWORKS) + 1])
+    assert phase.isa == 'PBXShellScriptBuildPhase' and phase['name'] == PHASE['name']
+    assert _apply(first, [PHASE]) == ([], data)
@@ -0,0 +1,65 @@
+import pytest
+
+from citetrack_tools.pbxproj.parser import PBXParseError, load, parse
+from citetrack_tools.pbxproj.writer import format_object
+
+from conftest import IOS_PROJECT, PROJECTS
+
+
+def _comment_of(project):
+    return lambda object_id: project.objects[object_id].comment if object_id in project.objects else None
+
+
+@pytest.mark.parametrize('path', PROJECTS)
+def test_formatted_objects_parse_back(path):
+    project = load(path)
+    comment_of = _comment_of(project)
+    for obj in project.objects.values():
+        text = '{ objects = { %s }; }' % format_object(obj, comment_of)
+        again = parse(text).objects[obj.id]
+        assert again.props == obj.props
+        assert again.comment == obj.comment
+
+
+def test_xcode_layout_is_reproduced_exactly():
+    # the iOS project is written by Xcode, so every object formats back to its own span
+    project = load(IOS_PROJECT)
+    comment_of = _comment_of(project)
+    for obj in project.objects.values():
+        start, end = obj.span
+        assert format_object(obj, comment_of) == project.text[start:end]
+
+
+def test_quoting_and_escapes_round_trip():
+    text = r'''// !$*UTF8*$!
+{
+	objects = {
+		AAAAAAAAAAAAAAAAAAAAAAAA /* a */ = {isa = PBXFileReference; name = "a \"b\"\n.swift"; path = x/y.swift; };
+	};
+	rootObject = AAAAAAAAAAAAAAAAAAAAAAAA;
+}
+'''
+    project = parse(text)
+    obj = project.objects['AAAAAAAAAAAAAAAAAAAAAAAA']
+    assert obj['name'] == 'a "b"\n.swift'
+    assert obj['path'] == 'x/y.swift'
+    assert project.header == '// !$*UTF8*$!\n'
+    formatted = format_object(obj, _comment_of(project))
+    assert parse('{ objects = { %s }; }' % formatted).objects[obj.id].props == obj.props
+
+
+@pytest.mark.parametrize('text', ['{ objects = { A = { isa = X; }; }', '{ rootObject = A; }',
+                                  '{ objects = {}; } trailing'])
+def test_malformed_input_raises(text):
+    with pytest.raises(PBXParseError):
+        parse(text)
+
+
+def test_duplicate_ids_are_collected_when_asked():
+    entry = 'AAAAAAAAAAAAAAAAAAAAAAAA = {isa = PBXGroup; };'
+    text = '{ objects = { %s %s }; }' % (entry, entry)
+    with pytest.raises(PBXParseError):
+        parse(text)
+    duplicates = []
+    parse(text, duplicates=duplicates)
+    assert [object_id for object_id, _ in duplicates] == ['AAAAAAAAAAAAAAAAAAAAAAAA']
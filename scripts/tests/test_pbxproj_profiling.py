@@ -0,0 +1,45 @@
+import json
+
+from citetrack_tools.pbxproj import profiling
+from citetrack_tools.pbxproj.cli import main
+
+
+def test_spans_are_no_ops_until_enabled():
+    assert not profiling.enabled()
+    with profiling.span('parse'):
+        profiling.count('objects', 3)
+    assert profiling.current() is None
+
+
+def test_nested_spans_counters_and_summary():
+    profiler = profiling.enable(memory=True)
+    try:
+        with profiling.span('command: apply', path='x'):
+            for _ in range(2):
+                with profiling.span('parse'):
+                    profiling.count('objects', 5)
+                    data = [bytes(1000) for _ in range(100)]
+            profiling.count('bytes_written', 10)
+    finally:
+        assert profiling.disable() is profiler
+    del data
+    outer = profiler.events[-1]
+    assert outer['name'] == 'command: apply' and outer['cat'] == 'command'
+    assert outer['args']['path'] == 'x' and outer['args']['bytes_written'] == 10
+    assert outer['args']['peak_bytes'] >= 100_000
+    rows = {name: (calls, counters) for name, calls, _, _, counters in profiler.summary()}
+    assert rows['parse'] == (2, {'objects': 10})
+    parses = [event for event in profiler.events if event['name'] == 'parse']
+    assert all(outer['ts'] <= event['ts'] and event['dur'] <= outer['dur'] for event in parses)
+
+
+def test_trace_option_writes_chrome_trace(tmp_path, capsys):
+    path = tmp_path / 'trace.json'
+    assert main(['validate', '--no-alloc', '--trace', str(path)]) == 0
+    trace = json.loads(path.read_text(encoding='utf-8'))
+    names = {event['name'] for event in trace['traceEvents']}
+    assert {'process_name', 'command: validate'} <= names
+    timed = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+    assert timed == sorted(timed, key=lambda event: event['ts'])
+    assert not any('alloc_bytes' in event['args'] for event in timed)
+    assert not profiling.enabled()
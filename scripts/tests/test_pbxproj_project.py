@@ -0,0 +1,72 @@
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.operations import apply_operations
+from citetrack_tools.pbxproj.parser import load
+
+from conftest import IOS_PROJECT
+
+WIDGET = 'CiteTrackWidgetExtension'
+
+
+def test_indexes():
+    project = load(IOS_PROJECT)
+    assert sorted(project.targets()) == ['CiteTrack', WIDGET]
+    app = project.target('CiteTrack')
+    assert project.target('Nope') is None
+    sources = project.build_phase(app, 'PBXSourcesBuildPhase')
+    assert project.build_phases(app, 'PBXSourcesBuildPhase') == [sources]
+    assert sources.id in app['buildPhases']
+    ref = project.find_by_path('CiteTrackApp.swift', 'PBXFileReference')[0]
+    assert project.in_phase(sources, ref) and project.in_phase(sources.id, ref.id)
+    assert not project.in_phase(project.build_phase(project.target(WIDGET), 'PBXSourcesBuildPhase'), ref)
+    assert project.full_path(ref) == 'CiteTrack/CiteTrackApp.swift'
+    assert project.parent_of(ref.id)['children'].count(ref.id) == 1
+
+
+def test_add_to_targets_skips_members_and_is_idempotent(project_copy):
+    project = load(project_copy)
+    session = EditSession(project)
+    ref = project.find_by_path('CiteTrackApp.swift', 'PBXFileReference')[0]
+    build_files = session.add_to_targets(ref, ['CiteTrack', WIDGET])
+    assert len(build_files) == 1  # the app already compiles it
+    assert session.add_to_targets(ref, ['CiteTrack', WIDGET]) == []
+    session.save()
+
+    project = load(project_copy)
+    for name in ('CiteTrack', WIDGET):
+        assert project.in_phase(project.build_phase(project.target(name), 'PBXSourcesBuildPhase'), ref.id)
+    assert EditSession(project).add_to_targets(ref.id, ['CiteTrack', WIDGET]) == []
+
+
+def test_missing_phase_is_created_once(project_copy):
+    project = load(project_copy)
+    widget = project.target(WIDGET)
+    assert project.build_phase(widget, 'PBXCopyFilesBuildPhase') is None
+    session = EditSession(project)
+    ref = project.find_by_path('CiteTrackApp.swift', 'PBXFileReference')[0]
+    session.add_to_targets(ref, [WIDGET], 'PBXCopyFilesBuildPhase')
+    phase = session.build_phase(WIDGET, 'PBXCopyFilesBuildPhase')
+    assert phase is not None and session.is_member(ref, phase)
+    session.add_to_targets(ref, [WIDGET], 'PBXCopyFilesBuildPhase')
+    session.save()
+
+    project = load(project_copy)
+    phases = project.build_phases(project.target(WIDGET), 'PBXCopyFilesBuildPhase')
+    assert len(phases) == 1 and len(phases[0]['files']) == 1
+
+
+def test_add_files_to_several_targets():
+    project = load(IOS_PROJECT)
+    spec = {'op': 'add-files', 'group': 'Views', 'targets': ['CiteTrack'],
+            'files': [{'path': 'CiteTrack/Views/InfoBanner.swift', 'name': 'InfoBanner.swift'}]}
+    session = EditSession(project)
+    assert apply_operations(session, [spec]) == ['add-files: added InfoBanner.swift']
+    session.apply()  # in memory only
+    # once referenced, a file is only added to the targets that lack it
+    spec['targets'] = ['CiteTrack', WIDGET]
+    session = EditSession(project)
+    assert apply_operations(session, [spec]) == ['add-files: added InfoBanner.swift to more targets']
+    session.apply()
+    ref = project.find_by_path('CiteTrack/Views/InfoBanner.swift', 'PBXFileReference')[0]
+    for name in ('CiteTrack', WIDGET):
+        assert project.in_phase(project.build_phase(project.target(name), 'PBXSourcesBuildPhase'), ref)
+    assert apply_operations(EditSession(project), [spec]) == []
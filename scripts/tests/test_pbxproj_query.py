@@ -0,0 +1,59 @@
+import json
+
+from citetrack_tools.pbxproj.cli import main
+from citetrack_tools.pbxproj.parser import load
+from citetrack_tools.pbxproj.query import Condition, diff, project_name, query, resolve, unpaired
+from citetrack_tools.pbxproj.settings import PROJECT
+
+from conftest import IOS_PROJECT, MACOS_PROJECT
+
+
+def _tables():
+    return {project_name(path): resolve(load(path)) for path in (IOS_PROJECT, MACOS_PROJECT)}
+
+
+def test_target_settings_override_the_project_level():
+    table = resolve(load(IOS_PROJECT))
+    release = table[('CiteTrack', 'Release')]
+    assert release['SWIFT_VERSION'] == ('5.0', 'target')
+    assert release['SDKROOT'] == ('iphoneos', 'project')
+    assert table[(PROJECT, 'Release')]['SDKROOT'] == ('iphoneos', 'project')
+    assert 'SWIFT_VERSION' not in table[(PROJECT, 'Release')]
+
+
+def test_conditions():
+    assert (Condition('A=1').key, Condition('A=1').op, Condition('A=1').value) == ('A', '=', '1')
+    assert Condition('A!=1').test(None) and not Condition('A=1').test(None)
+    assert Condition('A~dwarf*').test('dwarf-with-dsym')
+    assert Condition('A=x y').test(['x', 'y'])
+    assert Condition('SWIFT_*').keys({'SWIFT_VERSION': 1, 'SDKROOT': 2}) == ['SWIFT_VERSION']
+
+
+def test_query_rows():
+    tables = _tables()
+    rows = query(tables, ['SDKROOT'], configurations=['Release'])
+    assert {(row.project, row.target, row.value) for row in rows} == {
+        ('CiteTrack_iOS', 'CiteTrack', 'iphoneos'), ('CiteTrack_iOS', 'CiteTrackWidgetExtension', 'iphoneos'),
+        ('CiteTrack_macOS', 'CiteTrack', 'macosx')}
+    assert query(tables, ['SDKROOT=android']) == []
+    rows = query(tables, ['SDKROOT'], targets=[PROJECT], include_project=True)
+    assert {row.target for row in rows} == {PROJECT}
+
+
+def test_diff_between_projects():
+    tables = _tables()
+    differences = diff(tables['CiteTrack_iOS'], tables['CiteTrack_macOS'], keys=['SDKROOT'])
+    assert ('CiteTrack', 'CiteTrack', 'Release', 'SDKROOT', 'iphoneos', 'macosx') in differences
+    assert diff(tables['CiteTrack_iOS'], tables['CiteTrack_iOS']) == []
+    assert unpaired(tables['CiteTrack_iOS'], tables['CiteTrack_macOS']) == (['CiteTrackWidgetExtension'], [])
+    mapped = diff(tables['CiteTrack_iOS'], tables['CiteTrack_macOS'],
+                  {'CiteTrackWidgetExtension': 'CiteTrack'}, ['Debug'], ['SDKROOT'])
+    assert {(left, right) for left, right, *_ in mapped} == {
+        (PROJECT, PROJECT), ('CiteTrack', 'CiteTrack'), ('CiteTrackWidgetExtension', 'CiteTrack')}
+
+
+def test_query_command_json(capsys):
+    assert main(['query', 'SDKROOT=macosx', '-c', 'Release', '--json', '--no-cache']) == 0
+    rows = json.loads(capsys.readouterr().out)
+    assert [(row['project'], row['target'], row['source']) for row in rows] == [
+        ('CiteTrack_macOS', 'CiteTrack', 'project')]
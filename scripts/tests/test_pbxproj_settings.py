@@ -0,0 +1,76 @@
+import difflib
+import importlib.util
+import os
+
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.parser import load
+from citetrack_tools.pbxproj.query import resolve
+from citetrack_tools.pbxproj.settings import PROJECT, SettingRule, configuration_scope, rewrite_build_settings
+
+from conftest import REPO
+
+
+def _rewrite(path, rules):
+    session = EditSession(load(path))
+    changes = rewrite_build_settings(session, rules)
+    session.save()
+    return changes
+
+
+def _lines(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_configuration_scope_covers_every_list(project_copy):
+    scope = configuration_scope(load(project_copy))
+    assert sorted(set(scope.values())) == [
+        (PROJECT, 'Debug'), (PROJECT, 'Release'), ('CiteTrack', 'Debug'), ('CiteTrack', 'Release'),
+        ('CiteTrackWidgetExtension', 'Debug'), ('CiteTrackWidgetExtension', 'Release')]
+
+
+def test_rule_is_scoped_to_its_target_and_configuration(project_copy):
+    before = _lines(project_copy)
+    rule = SettingRule('STRIP_INSTALLED_PRODUCT', 'NO', ['CiteTrack'], ['Release'])
+    changes = _rewrite(project_copy, [rule])
+    assert [change[:4] for change in changes] == [('CiteTrack', 'Release', 'STRIP_INSTALLED_PRODUCT', None)]
+    table = resolve(load(project_copy))
+    assert table[('CiteTrack', 'Release')]['STRIP_INSTALLED_PRODUCT'] == ('NO', 'target')
+    assert all('STRIP_INSTALLED_PRODUCT' not in settings for scope, settings in table.items()
+               if scope != ('CiteTrack', 'Release'))
+    # one line added, nothing else touched
+    opcodes = difflib.SequenceMatcher(None, before, _lines(project_copy), autojunk=False).get_opcodes()
+    assert [(tag, j2 - j1) for tag, _, _, j1, j2 in opcodes if tag != 'equal'] == [('insert', 1)]
+
+
+def test_match_limits_the_rule_to_current_values(project_copy):
+    assert _rewrite(project_copy, [SettingRule('SWIFT_VERSION', '6.0', match='4.2')]) == []
+    rules = [SettingRule('SWIFT_VERSION', '6.0', ['CiteTrack'], match=('4.2', '5.0')),
+             SettingRule('NEW_KEY', 'x', match='anything')]
+    changes = _rewrite(project_copy, rules)
+    assert sorted(change[:4] for change in changes) == [('CiteTrack', 'Debug', 'SWIFT_VERSION', '5.0'),
+                                                        ('CiteTrack', 'Release', 'SWIFT_VERSION', '5.0')]
+
+
+def test_later_rules_win_and_reruns_change_nothing(project_copy):
+    rules = [SettingRule('SWIFT_VERSION', '5.10', ['CiteTrack']),
+             SettingRule('SWIFT_VERSION', '6.0', ['CiteTrack'])]
+    changes = _rewrite(project_copy, rules)
+    assert sorted(change[1] for change in changes) == ['Debug', 'Release']
+    assert all(change[2:] == ('SWIFT_VERSION', '5.0', '6.0') for change in changes)
+    mtime = os.stat(project_copy).st_mtime_ns
+    assert _rewrite(project_copy, rules) == []
+    assert os.stat(project_copy).st_mtime_ns == mtime
+
+
+def test_fix_dsym_settings_rules(macos_copy):
+    spec = importlib.util.spec_from_file_location('fix_dsym_settings',
+                                                  os.path.join(REPO, 'macOS', 'fix_dsym_settings.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _rewrite(macos_copy, module.DSYM_RULES)
+    table = resolve(load(macos_copy))
+    for configuration in ('Debug', 'Release'):
+        assert table[('CiteTrack', configuration)]['DEBUG_INFORMATION_FORMAT'][0] == 'dwarf-with-dsym'
+    assert table[('CiteTrack', 'Release')]['STRIP_INSTALLED_PRODUCT'] == ('NO', 'target')
+    assert _rewrite(macos_copy, module.DSYM_RULES) == []
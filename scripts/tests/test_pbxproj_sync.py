@@ -0,0 +1,65 @@
+import os
+
+from citetrack_tools.pbxproj.cli import process_project
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.parser import load
+from citetrack_tools.pbxproj.sync import apply_plan, plan, scan
+from citetrack_tools.pbxproj.validate import ERROR, validate
+
+from conftest import sync_tree
+
+SYNC = [{'op': 'sync', 'target': 'App', 'roots': [{'path': 'App', 'exclude': ['Skipped.swift']}]}]
+
+
+def test_scan_lists_files_and_skips_project_bundles(tmp_path):
+    sync_tree(tmp_path)
+    found = {os.path.relpath(path, tmp_path) for path in scan([str(tmp_path)])}
+    assert found == {'App/Kept.swift', 'App/Added.swift', 'App/Skipped.swift', 'App/Views/Nested.swift',
+                     'App/notes.txt'}
+
+
+def test_plan_adds_new_files_and_removes_deleted_references(tmp_path):
+    project = load(sync_tree(tmp_path))
+    sync_plan = plan(project, SYNC[0]['roots'])
+    assert [os.path.relpath(path, tmp_path) for path, _, _ in sync_plan.added] == [
+        'App/Added.swift', 'App/Views/Nested.swift']
+    assert [ref.id for _, ref in sync_plan.removed] == ['F00000000000000000000002']
+
+
+def test_apply_plan_then_nothing_left_to_do(tmp_path):
+    path = sync_tree(tmp_path)
+    project = load(path)
+    session = EditSession(project)
+    apply_plan(session, plan(project, SYNC[0]['roots']), ['App'])
+    session.save()
+
+    project = load(path)
+    paths = {project.full_path(ref) for ref in project.objects_of('PBXFileReference')}
+    assert paths == {'App/Kept.swift', 'App/Added.swift', 'App/Views/Nested.swift'}
+    assert 'F00000000000000000000002' not in project.objects
+    assert 'B00000000000000000000002' not in project.objects
+    sources = project.build_phase(project.target('App'), 'PBXSourcesBuildPhase')
+    compiled = {project.get(project.get(build_file)['fileRef'])['path'] for build_file in sources['files']}
+    assert compiled == {'Kept.swift', 'Added.swift', 'Nested.swift'}
+    assert project.find_group('Views').get('path') == 'Views'
+    assert [issue for issue in validate(project) if issue.severity == ERROR] == []
+    assert not plan(project, SYNC[0]['roots'])
+
+
+def test_sync_operation_dry_run_and_rerun(tmp_path):
+    path = sync_tree(tmp_path)
+    with open(path, 'rb') as f:
+        original = f.read()
+    result = process_project(path, SYNC, dry_run=True)
+    assert result['changes'] == ['sync: added Added.swift, Nested.swift; removed Gone.swift']
+    with open(path, 'rb') as f:
+        assert f.read() == original
+    assert process_project(path, SYNC)['changes'] == result['changes']
+    assert process_project(path, SYNC)['changes'] == []
+
+
+def test_remove_false_keeps_references(tmp_path):
+    project = load(sync_tree(tmp_path))
+    sync_plan = plan(project, [{'path': 'App', 'remove': False}])
+    assert sync_plan.removed == []
+    assert len(sync_plan.added) == 3
@@ -0,0 +1,45 @@
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.operations import apply_operations
+from citetrack_tools.pbxproj.parser import parse
+from citetrack_tools.pbxproj.synthetic import generate, generate_app, generate_lines
+from citetrack_tools.pbxproj.validate import ERROR, validate
+
+
+def _errors(project):
+    return [issue for issue in validate(project) if issue.severity == ERROR]
+
+
+def test_generate_is_valid_and_deterministic():
+    text = generate(files=120, files_per_group=50)
+    assert text == generate(files=120, files_per_group=50)
+    project = parse(text)
+    assert _errors(project) == []
+    assert len(project.objects_of('PBXFileReference')) == 121  # sources plus the product
+    sources = project.build_phase(project.target('CiteTrack'), 'PBXSourcesBuildPhase')
+    assert len(sources['files']) == 120
+
+
+def test_generate_app_has_the_app_shape():
+    text = generate_app(files=200)
+    assert text == generate_app(files=200)
+    project = parse(text)
+    assert _errors(project) == []
+    assert len(project.targets()) == 3
+    app, widget = (project.build_phase(target, 'PBXSourcesBuildPhase')
+                   for target in list(project.targets().values())[:2])
+    refs = [{project.get(build_file)['fileRef'] for build_file in phase['files']} for phase in (app, widget)]
+    assert len(refs[0] & refs[1]) == 40  # 20% compiled into both
+
+
+def test_edits_on_a_generated_project_round_trip():
+    project = parse(generate_app(files=100))
+    session = EditSession(project)
+    spec = {'op': 'set-build-settings', 'targets': ['<project>'], 'configurations': ['Release'],
+            'settings': {'SWIFT_VERSION': '6.0'}}
+    assert apply_operations(session, [spec])
+    assert _errors(parse(session.apply())) == []
+
+
+def test_generate_lines_sizes_the_project():
+    lines = generate_lines(20_000).count('\n')
+    assert 18_000 < lines < 22_000
@@ -0,0 +1,89 @@
+import pytest
+
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.parser import load, parse
+from citetrack_tools.pbxproj.validate import ERROR, WARNING, validate, validate_file
+
+from conftest import IOS_PROJECT, PROJECTS
+
+
+def _codes(issues, severity=None):
+    return sorted(issue.code for issue in issues if severity is None or issue.severity == severity)
+
+
+@pytest.mark.parametrize('path', PROJECTS)
+def test_repository_projects_have_no_errors(path):
+    assert _codes(validate_file(path), ERROR) == []
+
+
+def test_validate_file_cache_follows_the_contents(project_copy):
+    assert _codes(validate_file(project_copy), ERROR) == []
+    assert _codes(validate_file(project_copy), ERROR) == []  # from the cache
+    project = load(project_copy)
+    start, end = project.find_by_path('CiteTrackApp.swift', 'PBXFileReference')[0].span
+    with open(project_copy, 'w', encoding='utf-8') as f:
+        f.write(project.text[:start] + project.text[end:])
+    assert 'dangling-reference' in _codes(validate_file(project_copy), ERROR)
+
+
+def test_dangling_reference():
+    project = load(IOS_PROJECT)
+    group = project.find_group('Views')
+    ref = project.get(group['children'][0])
+    start, end = ref.span
+    # drop the file reference, keep everything that points at it
+    broken = parse(project.text[:start] + project.text[end:])
+    issues = [issue for issue in validate(broken) if issue.code == 'dangling-reference']
+    assert issues and all(issue.severity == ERROR for issue in issues)
+    assert {issue.object for issue in issues} >= {group.id}
+    assert all(ref.id in issue.message for issue in issues)
+    # reported against the line of the object that holds the reference
+    line = broken.text.count('\n', 0, broken.get(group.id).span[0]) + 1
+    assert line in {issue.line for issue in issues}
+
+
+def test_duplicate_id():
+    project = load(IOS_PROJECT)
+    ref = project.objects_of('PBXFileReference')[0]
+    start, end = ref.span
+    text = project.text[:end] + '\n\t\t' + project.text[start:end] + project.text[end:]
+    duplicates = []
+    issues = validate(parse(text, duplicates=duplicates), duplicates)
+    assert [issue.object for issue in issues if issue.code == 'duplicate-id'] == [ref.id]
+
+
+def test_orphans_and_duplicate_build_files():
+    project = load(IOS_PROJECT)
+    session = EditSession(project)
+    session.add_file_reference('CiteTrack/Nowhere.swift')
+    sources = project.build_phase(project.target('CiteTrack'), 'PBXSourcesBuildPhase')
+    build_file = project.get(sources['files'][0])
+    session.add_object('PBXBuildFile', build_file.comment, fileRef=build_file['fileRef'])
+    before = _codes(validate(project))
+    session.apply()
+    after = _codes(validate(project))
+    for code in before:
+        after.remove(code)
+    assert after == ['orphan-build-file', 'orphan-file']
+    session = EditSession(project)
+    orphan = [obj for obj in project.objects_of('PBXBuildFile') if obj.id not in sources['files']
+              and obj.get('fileRef') == build_file['fileRef']][0]
+    session.append(sources, 'files', orphan)
+    session.apply()
+    duplicates = [issue for issue in validate(project) if issue.code == 'duplicate-build-file']
+    assert [issue.severity for issue in duplicates] == [ERROR]
+    assert 'compiled 2 times' in duplicates[0].message
+
+
+def test_malformed_id_is_a_warning():
+    text = '''{
+	objects = {
+		AutoUpdateMgr123 /* x */ = {isa = PBXGroup; children = (); sourceTree = "<group>"; };
+		AAAAAAAAAAAAAAAAAAAAAAAA = {isa = PBXProject; mainGroup = AutoUpdateMgr123; targets = (); };
+	};
+	rootObject = AAAAAAAAAAAAAAAAAAAAAAAA;
+}
+'''
+    issues = validate(parse(text))
+    assert [(issue.severity, issue.code, issue.object) for issue in issues] == [
+        (WARNING, 'malformed-id', 'AutoUpdateMgr123')]
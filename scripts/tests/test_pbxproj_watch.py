@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+from citetrack_tools.pbxproj.parser import load
+from citetrack_tools.pbxproj.watch import Daemon, _handle, ask
+
+from conftest import sync_tree
+
+SYNC = [{'op': 'sync', 'target': 'App', 'roots': [{'path': 'App', 'exclude': ['Skipped.swift']}]}]
+
+
+def _paths(path):
+    project = load(path)
+    return {project.full_path(ref) for ref in project.objects_of('PBXFileReference')}
+
+
+def _daemon(tmp_path, **options):
+    path = sync_tree(tmp_path)
+    return path, Daemon([(path, SYNC)], str(tmp_path / 'sock'), log=lambda message: None, **options)
+
+
+def test_existing_difference_is_reported_until_flushed(tmp_path):
+    path, daemon = _daemon(tmp_path, poll=True)
+    status = _handle(daemon, {'cmd': 'status'})
+    assert status['projects'][0]['unsynced'] == '+Added.swift +Nested.swift -Gone.swift'
+    assert daemon.flush() == []  # nothing happened since start-up
+    assert daemon.flush(everything=True) == ['App.xcodeproj: +Added.swift +Nested.swift -Gone.swift']
+    assert _paths(path) == {'App/Kept.swift', 'App/Added.swift', 'App/Views/Nested.swift'}
+    status = _handle(daemon, {'cmd': 'status'})
+    assert (status['projects'][0]['unsynced'], status['projects'][0]['writes']) == (None, 1)
+    found = _handle(daemon, {'cmd': 'find', 'path': 'Added.swift'})['files']
+    assert [(entry['full_path'], entry['targets']) for entry in found] == [('App/Added.swift', ['App'])]
+    assert _handle(daemon, {'cmd': 'targets'})['targets'] == {path: ['App']}
+    daemon.close()
+
+
+def test_new_files_are_synced_while_clients_ask(tmp_path):
+    path, daemon = _daemon(tmp_path, poll=True, interval=0.02, debounce=0.02)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(daemon.socket_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for i in range(5):
+            (tmp_path / 'App' / f'New{i}.swift').write_text('// swift\n', encoding='utf-8')
+        answers = []
+        while time.monotonic() < deadline:
+            answers.append(ask({'cmd': 'status'}, daemon.socket_path))
+            if all(f'App/New{i}.swift' in _paths(path) for i in range(5)):
+                break
+        assert all(answer['ok'] for answer in answers)
+        paths = _paths(path)
+        assert {f'App/New{i}.swift' for i in range(5)} <= paths
+        assert 'App/Added.swift' not in paths  # predates start-up: left alone
+    finally:
+        daemon.stop()
+        thread.join()
+    assert not os.path.exists(daemon.socket_path)
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from citetrack_tools.pbxproj.edit import EditSession
+from citetrack_tools.pbxproj.parser import load
+from citetrack_tools.pbxproj.writer import splice, splice_bytes
+
+from conftest import IOS_PROJECT, PROJECTS
+
+
+def test_splicing_spans_back_in_is_identity():
+    project = load(IOS_PROJECT)
+    edits = [(*obj.span, project.text[slice(*obj.span)]) for obj in project.objects.values()]
+    text, _, _ = splice(project.text, edits)
+    assert text == project.text
+
+
+@pytest.mark.parametrize('path', PROJECTS)
+def test_save_elsewhere_without_edits_copies_the_bytes(path, tmp_path):
+    copy = tmp_path / 'project.pbxproj'
+    session = EditSession(load(path))
+    assert not session
+    assert session.save(str(copy))
+    with open(path, 'rb') as original:
+        assert copy.read_bytes() == original.read()
+
+
+def test_save_in_place_without_edits_writes_nothing(project_copy):
+    before = os.stat(project_copy).st_mtime_ns
+    assert not EditSession(load(project_copy)).save()
+    assert os.stat(project_copy).st_mtime_ns == before
+
+
+def test_splice_bytes_matches_splice_with_multibyte_text():
+    text = 'é = {a = 1;};\nß = {b = 2;};\n'
+    data = text.encode('utf-8')
+    offsets = [len(text[:i].encode('utf-8')) for i in range(len(text) + 1)]
+    one, sharp = text.index('1'), text.index('ß')
+    edits = [(one, one + 1, '“one”'), (sharp, sharp, 'ñ\n')]
+    expected, _, _ = splice(text, edits)
+    assert b''.join(splice_bytes(data, edits, offsets.__getitem__)) == expected.encode('utf-8')
+    with pytest.raises(ValueError, match='overlapping'):
+        splice(text, [(0, 5, 'x'), (3, 4, 'y')])
@@ -0,0 +1,142 @@
+import marshal
+import os
+
+from citetrack_tools.scholar.cache import TwoTierCache, citing_papers_key, scholar_publications_key
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _size(key, value):
+    return len(marshal.dumps((key, value)))
+
+
+def _cache(directory=None, entries=None, disk_entries=None, ttl=60):
+    """A cache whose tiers hold ``entries`` / ``disk_entries`` values of ``_value()``."""
+    clock = Clock()
+    size = _size('k0', _value())
+    cache = TwoTierCache(directory, memory_bytes=size * entries if entries else 1 << 20,
+                         disk_bytes=(size + 8) * disk_entries if disk_entries else 1 << 20,
+                         ttl=ttl, clock=clock)
+    return cache, clock
+
+
+def _value():
+    return ['row'] * 10
+
+
+def test_keys_match_the_apps():
+    assert scholar_publications_key('kukA0LcAAAAJ') == 'kukA0LcAAAAJ_default_0'
+    assert scholar_publications_key('kukA0LcAAAAJ', 'pubdate', 100) == 'kukA0LcAAAAJ_pubdate_100'
+    assert citing_papers_key('123', True, 10) == '123_true_10'
+    assert citing_papers_key('123', False) == '123_false_0'
+
+
+def test_hits_misses_and_exact_sizes():
+    cache, _ = _cache()
+    assert cache.get('pages', 'k0') is None
+    cache.put('pages', 'k0', _value())
+    assert cache.get('pages', 'k0') == _value()
+    stats = cache.stats
+    assert (stats.memory_hits, stats.disk_hits, stats.misses, stats.puts) == (1, 0, 1, 1)
+    assert (stats.memory_entries, stats.memory_bytes) == (1, _size('k0', _value()))
+    assert stats.hit_rate == 0.5
+    # namespaces are separate
+    assert cache.get('citing', 'k0') is None
+
+
+def test_ttl_expiry():
+    cache, clock = _cache(ttl=60)
+    cache.put('pages', 'short', _value(), ttl=10)
+    cache.put('pages', 'long', _value())
+    clock.now += 10
+    assert cache.get('pages', 'short') == _value()  # still live at exactly its expiry
+    clock.now += 1
+    assert cache.get('pages', 'short') is None
+    assert cache.get('pages', 'long') == _value()
+    stats = cache.stats
+    assert (stats.expired, stats.misses, stats.memory_entries) == (1, 1, 1)
+    clock.now += 60
+    assert cache.purge_expired() == 1
+    assert (stats.expired, stats.memory_entries, stats.memory_bytes) == (2, 0, 0)
+
+
+def test_memory_lru_eviction():
+    cache, _ = _cache(entries=2)
+    cache.put('pages', 'k0', _value())
+    cache.put('pages', 'k1', _value())
+    cache.get('pages', 'k0')  # k1 is now the least recently used
+    cache.put('pages', 'k2', _value())
+    assert list(key for _, key in cache.memory) == ['k0', 'k2']
+    assert cache.stats.evictions == 1
+    assert cache.stats.memory_entries == 2
+    assert cache.stats.memory_bytes == 2 * _size('k0', _value())
+    assert cache.get('pages', 'k1') is None  # memory only: gone
+
+
+def test_oversized_entry_skips_memory():
+    cache, _ = _cache(entries=1)
+    cache.put('pages', 'big', ['row'] * 100)
+    assert cache.stats.memory_entries == 0
+    assert cache.stats.evictions == 0
+
+
+def test_disk_tier_refills_memory(tmp_path):
+    cache, clock = _cache(str(tmp_path), entries=1)
+    cache.put('pages', 'k0', _value())
+    cache.put('pages', 'k1', _value())  # evicts k0 from memory; it stays on disk
+    assert cache.stats.evictions == 1
+    assert cache.stats.disk_entries == 2
+    assert cache.get('pages', 'k0') == _value()
+    assert (cache.stats.disk_hits, cache.stats.memory_hits) == (1, 0)
+    assert cache.get('pages', 'k0') == _value()
+    assert cache.stats.memory_hits == 1
+
+    # a new process sees the disk tier, entries expire there too
+    reopened = TwoTierCache(str(tmp_path), ttl=60, clock=clock)
+    assert reopened.stats.disk_entries == 2
+    assert reopened.get('pages', 'k1') == _value()
+    clock.now += 61
+    assert reopened.get('pages', 'k0') is None
+    assert reopened.stats.expired == 1
+    assert reopened.stats.disk_entries == 1
+
+
+def test_disk_lru_eviction(tmp_path):
+    cache, _ = _cache(str(tmp_path), entries=1, disk_entries=2)
+    for key in ('k0', 'k1', 'k2'):
+        cache.put('pages', key, _value())
+    stats = cache.stats
+    assert (stats.disk_evictions, stats.disk_entries) == (1, 2)
+    assert stats.disk_bytes == sum(os.path.getsize(path) for path in cache.disk)
+    assert cache.get('pages', 'k0') is None
+    assert cache.get('pages', 'k1') == _value()
+
+
+def test_get_or_compute_only_computes_on_a_miss():
+    cache, _ = _cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return _value()
+
+    assert cache.get_or_compute('pages', 'k0', compute) == _value()
+    assert cache.get_or_compute('pages', 'k0', compute) == _value()
+    assert len(calls) == 1
+    assert cache.get_or_compute('pages', 'none', lambda: None) is None
+    assert cache.stats.puts == 1
+
+
+def test_clear(tmp_path):
+    cache, _ = _cache(str(tmp_path))
+    cache.put('pages', 'k0', _value())
+    cache.clear()
+    stats = cache.stats
+    assert (stats.memory_entries, stats.memory_bytes, stats.disk_entries, stats.disk_bytes) == (0, 0, 0, 0)
+    assert cache.get('pages', 'k0') is None
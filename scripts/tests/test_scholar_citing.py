@@ -0,0 +1,68 @@
+import io
+import json
+
+import pytest
+
+from citetrack_tools.scholar.citing import (AuthorAggregator, aggregate, author_id, compare_publications,
+                                            diff_sorted, keyed, normalize_name)
+from citetrack_tools.scholar.profile import Publication
+
+PAPERS = [
+    {'id': 'p1', 'title': 'A', 'year': 2020, 'authors': ['Yoshua Bengio', 'Aaron Courville']},
+    {'id': 'p2', 'title': 'B', 'year': 2021, 'authors': ['Yóshua  Bengio.', 'Y Bengio', 'Unknown Author']},
+    {'id': 'p1', 'title': 'A', 'year': 2020, 'authors': ['Yoshua Bengio', 'Aaron Courville']},
+    {'title': 'C', 'year': 2022, 'authors': ['A. Courville', 'Yoshua Bengio', 'yoshua bengio']},
+]
+
+
+def _pub(title, cluster_id, citations, year=2020):
+    return Publication(title, cluster_id, (cluster_id,) if cluster_id else (), citations, year)
+
+
+def test_normalize_name():
+    assert normalize_name('Yóshua  Bengio.') == 'yoshua bengio'
+    assert normalize_name('Unknown Author') == normalize_name(' ') == ''
+    assert normalize_name('Yu-Sheng Chen', initials=True) == 'ys chen'
+    assert normalize_name('YS Chen', initials=True) == 'ys chen'
+    assert author_id('yoshua bengio') == author_id('yoshua bengio') != author_id('y bengio')
+
+
+@pytest.mark.parametrize('initials, expected', [
+    (False, [('Yoshua Bengio', 3), ('Aaron Courville', 1), ('Y Bengio', 1), ('A. Courville', 1)]),
+    (True, [('Yoshua Bengio', 3), ('Aaron Courville', 2)]),
+])
+def test_aggregation_counts_each_paper_once(initials, expected):
+    aggregator = AuthorAggregator(initials)
+    aggregator.add(PAPERS)
+    assert (aggregator.papers, aggregator.duplicates) == (3, 1)
+    assert [(author.name, author.citing_paper_count) for author in aggregator.authors()] == expected
+    assert aggregator.authors(top=1)[0].name == 'Yoshua Bengio'
+
+
+@pytest.mark.parametrize('text', [json.dumps(PAPERS), '\n'.join(map(json.dumps, PAPERS)),
+                                  json.dumps({'cache': {'papers': PAPERS}})])
+def test_dump_shapes_and_chunking(tmp_path, text):
+    aggregator = AuthorAggregator()
+    aggregator.add_file(io.StringIO(text), chunk_size=16)
+    path = tmp_path / 'dump.json'
+    path.write_text(text, encoding='utf-8')
+    assert aggregator.authors() == aggregate([str(path)]).authors()
+    assert aggregator.authors()[0].citing_paper_count == 3
+
+
+def test_compare_publications():
+    old = [_pub('Kept', '1', 10), _pub('Gone', '2', 5), _pub('Down', None, 8), _pub('Up', '4', 1)]
+    new = [_pub('Up', '4', 11), _pub('New', '5', 0), _pub('Kept', '1', 12), _pub('Down', None, 7),
+           _pub('Kept again', '1', 99)]
+    changes = compare_publications(old, new)
+    assert [(c.publication.title, c.delta) for c in changes.increased] == [('Up', 10), ('Kept', 2)]
+    assert [(c.publication.title, c.old_count, c.new_count) for c in changes.decreased] == [('Down', 8, 7)]
+    assert [p.title for p in changes.new_publications] == ['New']
+    assert [p.title for p in changes.removed] == ['Gone']
+    assert compare_publications(new, new) == ([], [], [], [])
+
+
+def test_diff_sorted_pairs_first_entries_per_key():
+    old, new = keyed([_pub('a', 'x', 1), _pub('b', 'x', 2)]), keyed([_pub('c', 'y', 3), _pub('d', 'x', 4)])
+    pairs = [(a and a[2].title, b and b[2].title) for a, b in diff_sorted(old, new)]
+    assert pairs == [('a', 'd'), (None, 'c')]
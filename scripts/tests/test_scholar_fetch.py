@@ -0,0 +1,67 @@
+import asyncio
+import os
+
+from citetrack_tools.scholar.cache import TwoTierCache
+from citetrack_tools.scholar.fetch import (PAGE_SIZE, RateLimit, cited_by_url, profile_url, refresh,
+                                           retry_after)
+from citetrack_tools.scholar.standin import StandIn
+
+from conftest import REPO
+
+PAGE = os.path.join(REPO, 'iOS', 'scholar_kukA0LcAAAAJ.html')
+IDS = [f'S{i:07d}AAAAJ' for i in range(12)]
+
+
+def _refresh(server, ids, **options):
+    async def run():
+        base = await server.start()
+        try:
+            return await refresh(ids, base, **options)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+def _standin(**options):
+    with open(PAGE, 'rb') as f:
+        return StandIn(f.read(), **options)
+
+
+def test_urls_match_the_app():
+    assert profile_url('ID', 'pubdate', 100) == (
+        'https://scholar.google.com/citations?user=ID&hl=en&cstart=100&pagesize=100&sortby=pubdate')
+    assert cited_by_url('42', 10) == 'https://scholar.google.com/scholar?hl=en&cites=42&scisbd=1&start=10'
+
+
+def test_rate_limit_defaults():
+    assert (RateLimit().delay, RateLimit().jitter) == (2.0, 0.5)
+    assert RateLimit(0).jitter == 0  # delay=0 turns the limit off
+    assert RateLimit(1.0, 0.2).jitter == 0.2
+
+
+def test_retry_after():
+    assert retry_after('3') == 3.0
+    assert retry_after(None) == retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 1.0
+
+
+def test_refresh_pages_through_every_scholar(tmp_path):
+    server = _standin()
+    report = _refresh(server, IDS, concurrency=4, delay=0, cited_by=1)
+    counts = [server.publication_count(scholar_id) for scholar_id in IDS]
+    assert (report.scholars, report.failed, report.errors) == (len(IDS), [], 0)
+    assert report.publications == sum(counts)
+    assert report.pages >= sum(count // PAGE_SIZE + 1 for count in counts)
+    assert report.statuses == {200: report.requests} and report.connections <= 4
+    assert '12 scholars refreshed, 0 failed' in report.summary()
+
+    cache = TwoTierCache(str(tmp_path / 'cache'))
+    first = _refresh(_standin(), IDS, concurrency=4, delay=0, cited_by=1, cache=cache)
+    second = _refresh(_standin(), IDS, concurrency=4, delay=0, cited_by=1, cache=cache)
+    assert (second.requests, second.cached, second.publications) == (0, first.pages, first.publications)
+
+
+def test_rate_limited_pages_fail_without_retries():
+    # one profile page per scholar, one request's worth of tokens
+    report = _refresh(_standin(rate=0.01, burst=1, publications=50), IDS[:3], concurrency=3, delay=0)
+    assert report.scholars == 1 and len(report.failed) == 2
+    assert report.statuses[429] == 2
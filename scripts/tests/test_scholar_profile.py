@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from citetrack_tools.scholar.profile import parse, parse_file, parse_files, to_dict
+
+from conftest import REPO
+
+PAGE = os.path.join(REPO, 'iOS', 'scholar_kukA0LcAAAAJ.html')
+
+
+def test_parse_saved_profile():
+    profile = parse_file(PAGE)
+    assert (profile.scholar_id, profile.name, profile.citations) == ('kukA0LcAAAAJ', 'Yoshua Bengio', 1009852)
+    assert (profile.h_index, profile.i10_index, profile.since_year) == (252, 986, 2020)
+    assert len(profile.publications) == 20
+    first = profile.publications[0]
+    assert (first.title, first.cluster_id, first.citations, first.year) == (
+        'Generative adversarial nets', '11977070277539609369', 105335, 2014)
+    assert first.cluster_ids[0] == first.cluster_id and len(first.cluster_ids) == 5
+    assert to_dict(profile)['publications'][0]['clusterId'] == first.cluster_id
+
+
+def test_parse_takes_bytes_or_text_and_tolerates_empty_pages():
+    with open(PAGE, 'rb') as f:
+        data = f.read()
+    assert parse(data) == parse(data.decode('utf-8'))
+    empty = parse(b'<html></html>')
+    assert (empty.name, empty.citations, empty.publications) == ('', None, [])
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_parse_files_keeps_order_and_reports_errors(tmp_path, jobs):
+    missing = str(tmp_path / 'missing.html')
+    results = list(parse_files([PAGE, missing, PAGE], jobs=jobs))
+    assert [path for path, _, _ in results] == [PAGE, missing, PAGE]
+    assert results[0][1] == results[2][1] == parse_file(PAGE)
+    assert results[1][1] is None and results[1][2]
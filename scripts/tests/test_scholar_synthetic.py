@@ -0,0 +1,33 @@
+import json
+import os
+
+from citetrack_tools.history.synthetic import iter_blocks
+from citetrack_tools.scholar.profile import parse
+from citetrack_tools.scholar.synthetic import iter_scholars, render_page, write_scholars
+
+
+def _listing(directory):
+    names = sorted(os.listdir(directory))
+    return {name: (directory / name).read_bytes() for name in names}
+
+
+def test_same_seed_gives_the_same_pages(tmp_path):
+    assert write_scholars(str(tmp_path / 'a'), 20, 5, seed=7, limit=4) == 4
+    write_scholars(str(tmp_path / 'b'), 20, 5, seed=7, limit=4)
+    write_scholars(str(tmp_path / 'c'), 20, 5, seed=8, limit=4)
+    first = _listing(tmp_path / 'a')
+    assert len(first) == 8
+    assert _listing(tmp_path / 'b') == first
+    assert _listing(tmp_path / 'c') != first
+
+
+def test_pages_match_the_history_and_parse_back():
+    block = next(iter_blocks(20, 5, seed=7))
+    for row, (profile, timestamp, papers) in enumerate(iter_scholars(20, 5, seed=7, limit=3)):
+        assert profile.scholar_id == block.ids[row].tobytes().decode('ascii')
+        assert (profile.citations, timestamp) == (block.counts[row, -1], block.timestamps[row, -1])
+        assert sum(publication.citations or 0 for publication in profile.publications) == profile.citations
+        parsed = parse(render_page(profile, rows=10))
+        assert parsed == profile._replace(publications=profile.publications[:10])
+        assert papers and {paper['citedScholarId'] for paper in papers} == {profile.scholar_id}
+        json.dumps(papers)